@@ -0,0 +1,182 @@
+# immo_afa.py
+
+import numpy as np
+
+# Lineare AfA-Sätze nach Baujahr (§ 7 Abs. 4 EStG)
+AFA_SAETZE = {'vor 1925': 2.5, '1925 - 2022': 2.0, 'ab 2023': 3.0}
+
+METHODEN = ('linear', 'degressiv', 'verteilt')
+
+DEGRESSIV_SATZ_P = 5.0             # § 7 Abs. 5a EStG, Neubau mit Baubeginn 10/2023 – 09/2029
+SONDER_AFA_P = 5.0                 # § 7b EStG, zusätzlich in den ersten vier Jahren
+SONDER_AFA_JAHRE = 4
+SONDER_AFA_MAX_QM = 4000.0         # Bemessungsgrundlage höchstens 4.000 €/m²
+SONDER_AFA_BAUKOSTEN_MAX_QM = 5200.0  # darüber entfällt die Sonder-AfA ganz
+
+# Behandlung des zusätzlichen Investitionsbedarfs (Modernisierung)
+MODERNISIERUNG = ('gebaeude', 'verteilt')
+
+STANDARD_JAHRE = 50
+
+
+def afa_satz(baujahr_kategorie):
+    """Linearer AfA-Satz in % für eine Baujahr-Kategorie (unbekannt → 2 %)."""
+    return AFA_SAETZE.get(baujahr_kategorie, 2.0)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ABSCHREIBUNGSVERLAUF
+# ═════════════════════════════════════════════════════════════════════════════
+def afa_verlauf(basis, methode='linear', satz_p=2.0, nutzungsdauer=None, sonder_p=0.0, sonder_basis=None,
+                verteilung_jahre=1, start_jahr=1, jahre=STANDARD_JAHRE):
+    """
+    AfA je Jahr für beliebig viele Komponenten zugleich. Alle Parameter
+    dürfen Arrays sein (eine Komponente je Element, auch mit gemischten
+    Methoden); Jahr 1 ist das Erwerbsjahr, ohne Zwölftelung.
+
+    - 'linear': satz_p von der Basis bis zum Ende der Nutzungsdauer
+      (Standard 100 / satz_p Jahre)
+    - 'degressiv': satz_p vom Restwert; sobald die lineare Verteilung des
+      Restwerts auf die Restnutzungsdauer höher ist, wird gewechselt
+    - 'verteilt': Erhaltungsaufwand gleichmäßig über verteilung_jahre
+      (§ 82b EStDV, 1 = sofort absetzbar)
+    - sonder_p: Sonder-AfA (§ 7b) zusätzlich in den ersten SONDER_AFA_JAHRE
+      Jahren auf sonder_basis; danach wird ein linearer Restwert auf die
+      Restnutzungsdauer verteilt (§ 7a Abs. 9)
+
+    Ergebnis: {'afa', 'restbuchwert'}, je Form der Parameter × jahre.
+    """
+    methode = np.asarray(methode)
+    if not np.isin(methode, METHODEN).all():
+        raise ValueError(f"Unbekannte AfA-Methode (erlaubt: {', '.join(METHODEN)})")
+    basis, satz = np.asarray(basis, dtype=np.float64), np.asarray(satz_p, dtype=np.float64) / 100
+    with np.errstate(divide='ignore'):
+        nd = np.asarray(np.where(satz > 0, 1 / satz, np.inf) if nutzungsdauer is None else nutzungsdauer,
+                        dtype=np.float64)
+    sonder = np.asarray(sonder_p, dtype=np.float64) / 100 * (basis if sonder_basis is None else sonder_basis)
+    verteilung_jahre, start_jahr = np.asarray(verteilung_jahre), np.asarray(start_jahr)
+    form = np.broadcast_shapes(basis.shape, methode.shape, satz.shape, nd.shape, sonder.shape,
+                               verteilung_jahre.shape, start_jahr.shape)
+    linear, degressiv, verteilt = (np.broadcast_to(methode == m, form) for m in METHODEN)
+    mit_sonder = np.broadcast_to(sonder > 0, form)
+
+    rest = np.broadcast_to(basis, form).copy()
+    afa = np.zeros(form + (jahre,))
+    restbuchwert = np.zeros(form + (jahre,))
+    for t in range(jahre):
+        j = t + 1 - start_jahr                              # 0 = erstes AfA-Jahr
+        rest_nd = np.maximum(nd - j, 1)                     # Restnutzungsdauer inkl. laufendem Jahr
+        regulaer = np.where(degressiv, np.maximum(rest * satz, rest / rest_nd), basis * satz)
+        regulaer = np.where(linear & mit_sonder & (j >= SONDER_AFA_JAHRE), rest / rest_nd, regulaer)
+        regulaer = regulaer + np.where((j >= 0) & (j < SONDER_AFA_JAHRE), sonder, 0.0)
+        betrag = np.where(verteilt, np.where(j < verteilung_jahre, basis / np.maximum(verteilung_jahre, 1), 0.0),
+                          regulaer)
+        betrag = np.where(j >= 0, np.clip(betrag, 0, rest), 0.0)
+        rest = np.where(rest - betrag < 1e-6, 0.0, rest - betrag)
+        afa[..., t] = betrag
+        restbuchwert[..., t] = rest
+    return {'afa': afa, 'restbuchwert': restbuchwert}
+
+# ═════════════════════════════════════════════════════════════════════════════
+# KOMPONENTEN EINES OBJEKTS
+# ═════════════════════════════════════════════════════════════════════════════
+def komponenten(inputs, wert=None):
+    """
+    AfA-Komponenten eines Eingabe-Dicts: Gebäude (Kaufpreis × Gebäudeanteil)
+    und der zusätzliche Investitionsbedarf als Modernisierung.
+
+    - afa_methode: 'linear' oder 'degressiv' (nur Baujahr 'ab 2023')
+    - sonder_afa: § 7b (nur Baujahr 'ab 2023'), Bemessungsgrundlage höchstens
+      SONDER_AFA_MAX_QM je m² Wohnfläche
+    - modernisierung_afa: 'gebaeude' (anschaffungsnaher Aufwand, wird wie das
+      Gebäude abgeschrieben) oder 'verteilt' über modernisierung_jahre
+    - wert(key, standard): liefert Zahlenwerte (für immo_varianten als Arrays)
+
+    Ergebnis: Liste von Dicts mit 'name' und den Parametern von afa_verlauf.
+    """
+    wert = wert or (lambda key, standard=0.0: standard if inputs.get(key) is None else inputs[key])
+    baujahr = inputs.get('baujahr_kategorie', '1925 - 2022')
+    neubau = baujahr == 'ab 2023'
+    methode = inputs.get('afa_methode') or 'linear'
+    if methode not in ('linear', 'degressiv'):
+        raise ValueError(f"Unbekannte AfA-Methode für das Gebäude: '{methode}'")
+    if methode == 'degressiv' and not neubau:
+        raise ValueError("Die degressive AfA gilt nur für Neubauten (Baujahr 'ab 2023').")
+    linear_p = afa_satz(baujahr)
+    gebaeude = dict(methode=methode, satz_p=DEGRESSIV_SATZ_P if methode == 'degressiv' else linear_p,
+                    nutzungsdauer=100 / linear_p)
+
+    basis = wert('kaufpreis') * wert('gebaeude_anteil_prozent', 80) / 100
+    sonder = {}
+    if inputs.get('sonder_afa') and neubau:
+        wohnflaeche = wert('wohnflaeche_qm')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            je_qm = np.where(wohnflaeche > 0, basis / np.where(wohnflaeche > 0, wohnflaeche, 1), np.inf)
+        sonder = dict(sonder_p=np.where(je_qm <= SONDER_AFA_BAUKOSTEN_MAX_QM, SONDER_AFA_P, 0.0),
+                      sonder_basis=np.minimum(basis, SONDER_AFA_MAX_QM * wohnflaeche))
+    ergebnis = [{'name': "Gebäude", 'basis': basis, **gebaeude, **sonder}]
+
+    if inputs.get('modernisierung_afa', 'gebaeude') == 'verteilt':
+        modernisierung = dict(methode='verteilt', verteilung_jahre=int(inputs.get('modernisierung_jahre') or 1))
+    elif inputs.get('modernisierung_afa', 'gebaeude') == 'gebaeude':
+        modernisierung = gebaeude
+    else:
+        raise ValueError(f"Unbekannte Behandlung der Modernisierung: '{inputs.get('modernisierung_afa')}'")
+    ergebnis.append({'name': "Modernisierung", 'basis': wert('invest_bedarf'), **modernisierung})
+    return ergebnis
+
+
+def afa_plan(inputs, jahre=STANDARD_JAHRE):
+    """
+    Jahr-für-Jahr-AfA eines Objekts. Ergebnis: 'jahre' (1 … jahre), 'namen'
+    der Komponenten, 'afa' und 'restbuchwert' (Komponenten × Jahre) sowie
+    deren Summen 'afa_summe' und 'restbuchwert_summe'.
+    """
+    return afa_plaene([inputs], jahre)[0]
+
+
+def afa_plaene(inputs_liste, jahre=STANDARD_JAHRE):
+    """
+    AfA-Pläne vieler Objekte; alle Komponenten aller Objekte werden in einem
+    einzigen Aufruf von afa_verlauf gerechnet.
+    """
+    je_objekt = [komponenten(inputs) for inputs in inputs_liste]
+    alle = [k for liste in je_objekt for k in liste]
+    if not alle:
+        return []
+    feld = lambda key, standard: np.array([float(k.get(key, standard)) for k in alle], dtype=np.float64)
+    verlauf = afa_verlauf(
+        feld('basis', 0.0), np.array([k['methode'] for k in alle]), feld('satz_p', 0.0),
+        nutzungsdauer=np.array([k.get('nutzungsdauer') or np.inf for k in alle], dtype=np.float64),
+        sonder_p=feld('sonder_p', 0.0),
+        sonder_basis=np.array([float(k.get('sonder_basis', k['basis'])) for k in alle]),
+        verteilung_jahre=feld('verteilung_jahre', 1), jahre=jahre)
+
+    plaene, beginn = [], 0
+    for liste in je_objekt:
+        zeilen = slice(beginn, beginn + len(liste))
+        beginn += len(liste)
+        plaene.append({
+            'jahre': np.arange(1, jahre + 1),
+            'namen': [k['name'] for k in liste],
+            'afa': verlauf['afa'][zeilen], 'restbuchwert': verlauf['restbuchwert'][zeilen],
+            'afa_summe': verlauf['afa'][zeilen].sum(axis=0),
+            'restbuchwert_summe': verlauf['restbuchwert'][zeilen].sum(axis=0),
+        })
+    return plaene
+
+# ═════════════════════════════════════════════════════════════════════════════
+# STEUERLICHE JAHRESZEILEN
+# ═════════════════════════════════════════════════════════════════════════════
+def steuerzeilen(einnahmen_pa, werbungskosten_pa, zinsen, afa, steuersatz_p, einmalig_j1=0.0):
+    """
+    Steuerliches Ergebnis je Jahr (letzte Achse = Jahre) für mehrjährige
+    Ansichten: Einnahmen − Werbungskosten − Zinsen − AfA, im Jahr 1 zusätzlich
+    einmalig_j1 (Kaufnebenkosten). Zinsen und AfA sind Jahresreihen.
+
+    Ergebnis: {'gewinn', 'steuer'}; steuer > 0 ist eine Erstattung (Verlust),
+    wie '+ Steuerersparnis / -last' in der Detailtabelle.
+    """
+    zinsen, afa = np.asarray(zinsen, dtype=np.float64), np.asarray(afa, dtype=np.float64)
+    gewinn = np.asarray(einnahmen_pa, dtype=np.float64)[..., None] - np.asarray(werbungskosten_pa)[..., None] - zinsen - afa
+    gewinn[..., 0] -= einmalig_j1
+    return {'gewinn': gewinn, 'steuer': -gewinn * np.asarray(steuersatz_p)[..., None] / 100}
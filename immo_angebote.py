@@ -0,0 +1,120 @@
+# immo_angebote.py
+
+import numpy as np
+
+import immo_finanzierung
+
+# Felder eines Bankangebots und ihre Standardwerte (fehlende Felder → Standard)
+ANGEBOT_STANDARD = {
+    'name': "Angebot",
+    'sollzins_p': 0.0,               # gebundener Sollzins p.a.
+    'tilgung_p': 2.0,                # anfängliche Tilgung p.a.
+    'zinsbindung_jahre': 10,
+    'sondertilgung_p': 0.0,          # Sondertilgungsrecht p.a. (fließt nicht in den Effektivzins ein)
+    'bereitstellungszins_p': 0.0,    # p.a. auf den noch nicht ausgezahlten Betrag
+    'bereitstellungsfrei_monate': 0,
+    'auszahlung_monate': 0,          # Monate vom Vertragsschluss bis zur Vollauszahlung
+    'gebuehren': 0.0,                # Bearbeitungs-/Schätzkosten in €, bei Auszahlung fällig
+    'disagio_p': 0.0,                # Abschlag vom Auszahlungsbetrag
+}
+
+_MAX_ITERATIONEN = 100
+_TOLERANZ = 1e-12
+_TOLERANZ_BARWERT = 1e-9      # Restbarwert relativ zur Summe der Beträge
+_UNTERGRENZE, _OBERGRENZE = -0.99, 10.0
+
+
+def interner_zins(zahlungen, perioden_pro_jahr=12):
+    """
+    Jahreszins je Zeile einer Zahlungsmatrix (Zeilen × Perioden, Periode 0 =
+    Beginn, Zuflüsse positiv, Abflüsse negativ).
+
+    Löst Σ Z_k · (1 + X)^(−k/p) = 0 (Abzinsung mit gebrochenen Jahren wie
+    in der Anlage zu § 6 PAngV) für alle Zeilen gleichzeitig per Newton-Verfahren.
+    Bei Monatswerten ist das der Effektivzins, bei Jahreswerten der interne Zinsfuß.
+
+    NaN, wenn die Zeile keinen Vorzeichenwechsel hat (dann gibt es keine
+    Lösung) oder das Verfahren nicht konvergiert bzw. an den Grenzen
+    −99 % / 1.000 % hängen bleibt.
+    """
+    t = np.arange(zahlungen.shape[1], dtype=np.float64) / perioden_pro_jahr
+    x = np.full(zahlungen.shape[0], 0.05)
+    for _ in range(_MAX_ITERATIONEN):
+        abzinsung = (1 + x[:, None]) ** -t
+        f = (zahlungen * abzinsung).sum(axis=1)
+        ableitung = (zahlungen * -t * abzinsung).sum(axis=1) / (1 + x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            schritt = np.where(ableitung != 0, f / ableitung, 0.0)
+        x = np.clip(x - schritt, _UNTERGRENZE, _OBERGRENZE)
+        if np.all(np.abs(schritt) < _TOLERANZ):
+            break
+
+    f = (zahlungen * (1 + x[:, None]) ** -t).sum(axis=1)
+    vorzeichenwechsel = (zahlungen > 0).any(axis=1) & (zahlungen < 0).any(axis=1)
+    konvergiert = (np.abs(f) <= _TOLERANZ_BARWERT * np.abs(zahlungen).sum(axis=1)) \
+        & (x > _UNTERGRENZE) & (x < _OBERGRENZE)
+    return np.where(vorzeichenwechsel & konvergiert, x, np.nan)
+
+
+def vergleiche_angebote(angebote, summe):
+    """
+    Vergleicht Bankangebote über dieselbe Darlehenssumme und sortiert sie nach
+    Effektivzins (günstigstes zuerst).
+
+    - Monatliche Annuität aus Sollzins + Anfangstilgung (immo_finanzierung)
+    - Bereitstellungszinsen für die Monate zwischen Ende der bereitstellungsfreien
+      Zeit und Auszahlung, Gebühren und Disagio mindern die Auszahlung
+    - Am Ende der Zinsbindung wird die Restschuld als fällig angenommen (wie bei
+      der Effektivzinsangabe der Banken)
+
+    Je Angebot: rang, effektivzins_p, monatsrate, zinsen, bereitstellungszinsen,
+    gebuehren (inkl. Disagio), gesamtkosten und restschuld bis Zinsbindungsende,
+    kosten_pa (Gesamtkosten je Jahr, für unterschiedliche Zinsbindungen).
+    """
+    if summe <= 0:
+        raise ValueError("Die Darlehenssumme muss größer als 0 sein.")
+    if not angebote:
+        return []
+    angebote = [{**ANGEBOT_STANDARD, **{k: v for k, v in a.items() if v is not None}} for a in angebote]
+    feld = lambda key: np.array([float(a[key]) for a in angebote], dtype=np.float64)
+    bindung = np.maximum(np.round(feld('zinsbindung_jahre') * 12), 1).astype(int)
+    auszahlung = np.maximum(np.round(feld('auszahlung_monate')), 0).astype(int)
+    frei = feld('bereitstellungsfrei_monate')
+
+    plan = immo_finanzierung.berechne_tranchen(
+        [{'summe': summe, 'zins_p': a['sollzins_p'], 'tilgung_p': a['tilgung_p']} for a in angebote],
+        monate=int(bindung.max()))
+    zeilen = np.arange(len(angebote))
+
+    # Zahlungsmatrix: Monat 0 = Vertragsschluss
+    k = np.arange(int((auszahlung + bindung).max()) + 1)[None, :]
+    tilgungsmonat = k - auszahlung[:, None] - 1                       # 0 … Zinsbindung − 1
+    laufend = (tilgungsmonat >= 0) & (tilgungsmonat < bindung[:, None])
+    raten = np.where(laufend, np.take_along_axis(plan['rate'], np.clip(tilgungsmonat, 0, plan['rate'].shape[1] - 1), axis=1), 0.0)
+    bereitstellung = np.where((k >= 1) & (k <= auszahlung[:, None]) & (k > frei[:, None]),
+                              summe * feld('bereitstellungszins_p')[:, None] / 1200, 0.0)
+    disagio = summe * feld('disagio_p') / 100
+    restschuld = plan['restschuld'][zeilen, bindung - 1]
+
+    zahlungen = -raten - bereitstellung
+    zahlungen[zeilen, auszahlung] += summe - disagio - feld('gebuehren')
+    zahlungen[zeilen, auszahlung + bindung] -= restschuld
+    effektiv = interner_zins(zahlungen) * 100
+
+    zinsen = np.where(np.arange(plan['zinsen'].shape[1])[None, :] < bindung[:, None], plan['zinsen'], 0.0).sum(axis=1)
+    bereitstellungszinsen = bereitstellung.sum(axis=1)
+    gebuehren = feld('gebuehren') + disagio
+    gesamtkosten = zinsen + bereitstellungszinsen + gebuehren
+
+    ergebnis = [{
+        'name': a['name'], 'sollzins_p': a['sollzins_p'], 'effektivzins_p': float(effektiv[i]),
+        'zinsbindung_jahre': a['zinsbindung_jahre'], 'sondertilgung_p': a['sondertilgung_p'],
+        'monatsrate': float(plan['monatsrate_start'][i]),
+        'zinsen': float(zinsen[i]), 'bereitstellungszinsen': float(bereitstellungszinsen[i]),
+        'gebuehren': float(gebuehren[i]), 'gesamtkosten': float(gesamtkosten[i]),
+        'kosten_pa': float(gesamtkosten[i] / (bindung[i] / 12)), 'restschuld': float(restschuld[i]),
+    } for i, a in enumerate(angebote)]
+    ergebnis.sort(key=lambda z: (np.isnan(z['effektivzins_p']), z['effektivzins_p']))   # nicht bestimmbar zuletzt
+    for rang, z in enumerate(ergebnis, 1):
+        z['rang'] = rang
+    return ergebnis
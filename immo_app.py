@@ -6,6 +6,10 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import immo_core
 import pdf_generator
+import immo_export
+import immo_wohnort
+import immo_angebote
+import immo_afa
 
 class App(tk.Tk):
     def __init__(self):
@@ -24,6 +28,7 @@ class App(tk.Tk):
         self.modus_d1_var = tk.StringVar(value="tilgungssatz")
         self.modus_d2_var = tk.StringVar(value="tilgungssatz")
         self.darlehen_ergebnis_labels = {}
+        self.angebote = []
         
         self.gesamtkosten_var = tk.StringVar()
         self.darlehensbedarf_var = tk.StringVar()
@@ -58,6 +63,10 @@ class App(tk.Tk):
         calc_button = ttk.Button(action_frame, text="Analyse berechnen", command=self._run_calculation, style="Accent.TButton"); calc_button.pack(side='left', padx=10)
         self.export_button = ttk.Button(action_frame, text="Bericht als PDF exportieren", command=self._export_pdf, state="disabled")
         self.export_button.pack(side='left', padx=10)
+        self.tilgungsplan_button = ttk.Button(action_frame, text="Tilgungsplan exportieren", command=self._export_tilgungsplan, state="disabled")
+        self.tilgungsplan_button.pack(side='left', padx=10)
+        self.ergebnis_export_button = ttk.Button(action_frame, text="Ergebnisse exportieren", command=self._export_ergebnisse, state="disabled")
+        self.ergebnis_export_button.pack(side='left', padx=10)
         
         self._create_output_widgets(output_container)
     
@@ -126,6 +135,7 @@ class App(tk.Tk):
         darlehen_container = ttk.Frame(parent); darlehen_container.pack(side='left', fill='y', padx=5, anchor='n')
         frame1 = self._create_darlehen_frame(darlehen_container, "Darlehensdetails", 1, self.modus_d1_var); frame1.pack(side='top', fill='y', anchor='n')
         checkbox = ttk.Checkbutton(darlehen_container, text="Weiteres Darlehen hinzufügen", variable=self.show_darlehen2_var, command=self._toggle_darlehen2_fields); checkbox.pack(anchor='w', pady=(10,0))
+        ttk.Button(darlehen_container, text="Bankangebote vergleichen…", command=self._open_angebote_dialog).pack(anchor='w', pady=(10,0))
         self.darlehen2_frame = self._create_darlehen_frame(darlehen_container, "Darlehen II", 2, self.modus_d2_var)
 
     def _create_darlehen_frame(self, parent, title, num, modus_var):
@@ -179,6 +189,61 @@ class App(tk.Tk):
             self.darlehen_ergebnis_labels[num].config(text=text)
         except (ValueError, KeyError, AttributeError): self.darlehen_ergebnis_labels[num].config(text="")
     
+    def _open_angebote_dialog(self):
+        dialog = tk.Toplevel(self); dialog.title("Bankangebote vergleichen (Effektivzins)"); dialog.geometry("1100x520")
+        felder = [("Bank", 'name', "Angebot"), ("Sollzins (%)", 'sollzins_p', "3.5"), ("Tilgung (%)", 'tilgung_p', "2.0"),
+                  ("Zinsbindung (J.)", 'zinsbindung_jahre', "10"), ("Sondertilgung (%)", 'sondertilgung_p', "5"),
+                  ("Bereitst.-Zins (%)", 'bereitstellungszins_p', "3.0"), ("Bereitst.-frei (Mon.)", 'bereitstellungsfrei_monate', "6"),
+                  ("Auszahlung nach (Mon.)", 'auszahlung_monate', "0"), ("Gebühren (€)", 'gebuehren', "0"), ("Disagio (%)", 'disagio_p', "0")]
+        eingabe = ttk.LabelFrame(dialog, text="Angebot erfassen", padding=10); eingabe.pack(fill='x', padx=10, pady=10)
+        variablen = {}
+        for i, (text, key, standard) in enumerate(felder):
+            ttk.Label(eingabe, text=text).grid(row=0, column=i, sticky='w', padx=2)
+            variablen[key] = tk.StringVar(value=standard); ttk.Entry(eingabe, textvariable=variablen[key], width=10).grid(row=1, column=i, padx=2)
+        spalten = ("rang", "bank", "sollzins", "effektivzins", "rate", "bindung", "sondertilgung", "kosten", "kosten_pa", "restschuld")
+        titel = ("Rang", "Bank", "Sollzins (%)", "Effektivzins (%)", "Rate (€/Monat)", "Zinsbindung (J.)", "Sondertilgung (%)",
+                 "Kosten bis Bindungsende (€)", "Kosten p.a. (€)", "Restschuld (€)")
+        tree = ttk.Treeview(dialog, columns=spalten, show="headings", height=10); tree.pack(fill='both', expand=True, padx=10)
+        for spalte, text in zip(spalten, titel): tree.heading(spalte, text=text); tree.column(spalte, width=95 if spalte != "bank" else 140)
+        status = ttk.Label(dialog, text=""); status.pack(anchor='w', padx=10, pady=5)
+
+        def darlehenssumme():
+            text = self.darlehensbedarf_var.get().replace(',', '')
+            return float(text) if text and "Fehler" not in text else 0
+
+        def aktualisieren():
+            tree.delete(*tree.get_children())
+            summe = darlehenssumme()
+            if not self.angebote or summe <= 0: status.config(text="Noch keine Angebote erfasst." if summe > 0 else "Kein Darlehensbedarf."); return
+            vergleich = immo_angebote.vergleiche_angebote(self.angebote, summe)
+            for z in vergleich:
+                tree.insert("", "end", values=(z['rang'], z['name'], f"{z['sollzins_p']:.2f}", f"{z['effektivzins_p']:.2f}", f"{z['monatsrate']:,.2f}",
+                                               z['zinsbindung_jahre'], f"{z['sondertilgung_p']:.0f}", f"{z['gesamtkosten']:,.0f}", f"{z['kosten_pa']:,.0f}", f"{z['restschuld']:,.0f}"))
+            status.config(text=f"Darlehenssumme {summe:,.2f} € — günstigstes Angebot: {vergleich[0]['name']} ({vergleich[0]['effektivzins_p']:.2f} % effektiv)")
+
+        def hinzufuegen():
+            try:
+                angebot = {key: (var.get() if key == 'name' else float(var.get().replace(',', '.') or 0)) for key, var in variablen.items()}
+            except ValueError: messagebox.showerror("Ungültige Eingabe", "Bitte nur Zahlen in die Konditionsfelder eintragen.", parent=dialog); return
+            self.angebote.append(angebot); variablen['name'].set(f"Angebot {len(self.angebote) + 1}"); aktualisieren()
+
+        def entfernen():
+            namen = {tree.item(i, 'values')[1] for i in tree.selection()}
+            self.angebote = [a for a in self.angebote if a['name'] not in namen]; aktualisieren()
+
+        def uebernehmen():
+            if not self.angebote or darlehenssumme() <= 0: return
+            bestes = immo_angebote.vergleiche_angebote(self.angebote, darlehenssumme())[0]
+            angebot = next(a for a in self.angebote if a['name'] == bestes['name'])
+            self.entries['zins1_prozent']['var'].set(f"{angebot['sollzins_p']:g}"); self.entries['tilgung1_prozent']['var'].set(f"{angebot['tilgung_p']:g}")
+            self.modus_d1_var.set('tilgungssatz'); self._update_finance_mode(1); dialog.destroy()
+
+        knoepfe = ttk.Frame(dialog); knoepfe.pack(fill='x', padx=10, pady=(0, 10))
+        ttk.Button(knoepfe, text="Hinzufügen", command=hinzufuegen).pack(side='left', padx=5)
+        ttk.Button(knoepfe, text="Markierte entfernen", command=entfernen).pack(side='left', padx=5)
+        ttk.Button(knoepfe, text="Bestes Angebot übernehmen", command=uebernehmen).pack(side='left', padx=5)
+        aktualisieren()
+
     def _create_rent_tax_tab(self, parent):
         f1 = ttk.LabelFrame(parent, text="Laufende Einnahmen & Kosten", padding=10); f1.pack(side='left', fill='y', padx=5, anchor='n')
         l, e = self._create_entry(f1, "Kaltmiete mtl. (€)", "kaltmiete_monatlich", "1000", lambda ev: self._update_warmmiete()); l.grid(row=0, column=0, sticky='w'); e.grid(row=0, column=1, sticky='w', pady=2)
@@ -201,7 +266,7 @@ class App(tk.Tk):
     
     def _update_afa_satz(self, event=None):
         baujahr_kategorie = self.comboboxes['baujahr_kategorie']['var'].get()
-        self.afa_satz_var.set("2.5" if baujahr_kategorie == 'vor 1925' else "3.0" if baujahr_kategorie == 'ab 2023' else "2.0")
+        self.afa_satz_var.set(str(immo_afa.afa_satz(baujahr_kategorie)))
 
     def _show_info_umlagefaehig(self): messagebox.showinfo("Info: Umlagefähige Kosten", "Kosten, die direkt an den Mieter weitergegeben werden.\n\nBeispiele:\n• Heizung, Grundsteuer, Müllabfuhr")
     def _show_info_nicht_umlagefaehig(self): messagebox.showinfo("Info: Nicht umlagefähige Kosten", "Kosten, die Sie als Eigentümer tragen.\n\nBeispiele:\n• Instandhaltungsrücklage, Verwaltung")
@@ -258,18 +323,22 @@ class App(tk.Tk):
             inputs = self._collect_inputs(darlehen1_summe)
             results = immo_core.calculate_analytics(inputs)
             if 'error' in results: 
-                messagebox.showerror("Fehler bei der Berechnung", results['error']); self.export_button.config(state="disabled"); return
+                messagebox.showerror("Fehler bei der Berechnung", results['error']); self._set_export_state("disabled"); return
             self.last_results = {**results, 'inputs': inputs, 'figures': {'pie': self.fig_pie, 'bar': self.fig_bar}}
             self._update_ui(results)
-            self.export_button.config(state="normal")
+            self._set_export_state("normal")
         except Exception as e: 
-            messagebox.showerror("Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {e}"); self.export_button.config(state="disabled")
+            messagebox.showerror("Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {e}"); self._set_export_state("disabled")
+
+    def _set_export_state(self, state):
+        for button in [self.export_button, self.tilgungsplan_button, self.ergebnis_export_button]: button.config(state=state)
 
     def _collect_inputs(self, darlehen1_summe):
         inputs = {key: var['var'].get() for key, var in self.entries.items()}
         inputs.update({key: var['var'].get() for key, var in self.comboboxes.items()})
         float_keys = ['kaufpreis', 'garage_stellplatz_kosten', 'invest_bedarf', 'eigenkapital', 'zins1_prozent', 'tilgung1_prozent', 'tilgung1_euro_mtl', 'laufzeit1_jahre', 'zins2_prozent', 'tilgung2_prozent', 'tilgung2_euro_mtl', 'laufzeit2_jahre', 'kaltmiete_monatlich', 'umlagefaehige_kosten_monatlich', 'nicht_umlagefaehige_kosten_pa', 'steuersatz', 'verfuegbares_einkommen_mtl']
         for key in float_keys: inputs[key] = self._get_float(key)
+        inputs['wohnort'] = immo_wohnort.kanonischer_wohnort(inputs.get('wohnort', ''))
         inputs.update({'nutzungsart': self.nutzungsart_var.get(), 'darlehen1_summe': darlehen1_summe, 'modus_d1': self.modus_d1_var.get(),
                        'darlehen2_summe': self._get_float("darlehen2_summe") if self.show_darlehen2_var.get() else 0,
                        'modus_d2': self.modus_d2_var.get() if self.show_darlehen2_var.get() else 'tilgungssatz',
@@ -278,13 +347,45 @@ class App(tk.Tk):
 
     def _export_pdf(self):
         if not self.last_results: messagebox.showwarning("Export nicht möglich", "Bitte führen Sie zuerst eine Berechnung durch."); return
-        filepath = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF-Dokumente", "*.pdf")], title="Analyse als PDF speichern", initialfile=f"Immobilienanalyse_{self.last_results['inputs'].get('wohnort', 'Objekt')}.pdf")
+        filepath = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF-Dokumente", "*.pdf")], title="Analyse als PDF speichern", initialfile=f"Immobilienanalyse_{immo_wohnort.sicherer_dateiname(self.last_results['inputs'].get('wohnort', 'Objekt'))}.pdf")
         if filepath:
             try:
                 pdf_generator.create_bank_report(self.last_results, filepath)
                 messagebox.showinfo("Export erfolgreich", f"Bericht wurde gespeichert unter:\n{filepath}")
             except Exception as e: messagebox.showerror("Export fehlgeschlagen", f"Ein Fehler ist aufgetreten:\n{e}")
 
+    def _ask_export_path(self, titel, name):
+        filetypes = [(f"{f.upper()}-Dateien", f"*.{f}") for f in immo_export.verfuegbare_formate()]
+        return filedialog.asksaveasfilename(defaultextension=".csv", filetypes=filetypes, title=titel, initialfile=f"{name}_{immo_wohnort.sicherer_dateiname(self.last_results['inputs'].get('wohnort', 'Objekt'))}.csv")
+
+    def _tilgungsplan_darlehen(self):
+        inputs = self.last_results['inputs']
+        darlehen = []
+        for num, name in [(1, "Darlehen I"), (2, "Darlehen II")]:
+            summe = inputs.get(f'darlehen{num}_summe', 0)
+            if summe <= 0: continue
+            details = immo_core.berechne_darlehen_details(summe, inputs.get(f'zins{num}_prozent', 0), inputs.get(f'tilgung{num}_prozent'), inputs.get(f'tilgung{num}_euro_mtl'), inputs.get(f'laufzeit{num}_jahre'), inputs.get(f'modus_d{num}'))
+            darlehen.append({'darlehen': name, 'summe': summe, 'zins_p': inputs.get(f'zins{num}_prozent', 0), 'monatsrate': details['monatsrate']})
+        return darlehen
+
+    def _export_tilgungsplan(self):
+        if not self.last_results: messagebox.showwarning("Export nicht möglich", "Bitte führen Sie zuerst eine Berechnung durch."); return
+        filepath = self._ask_export_path("Tilgungsplan exportieren", "Tilgungsplan")
+        if filepath:
+            try:
+                anzahl = immo_export.exportiere(filepath, immo_export.iter_tilgungsplaene(self._tilgungsplan_darlehen()), spalten=immo_export.TILGUNGSPLAN_SPALTEN, blatt="Tilgungsplan")
+                messagebox.showinfo("Export erfolgreich", f"{anzahl} Monatszeilen gespeichert unter:\n{filepath}")
+            except Exception as e: messagebox.showerror("Export fehlgeschlagen", f"Ein Fehler ist aufgetreten:\n{e}")
+
+    def _export_ergebnisse(self):
+        if not self.last_results: messagebox.showwarning("Export nicht möglich", "Bitte führen Sie zuerst eine Berechnung durch."); return
+        filepath = self._ask_export_path("Ergebnisse exportieren", "Ergebnisse")
+        if filepath:
+            try:
+                immo_export.exportiere(filepath, immo_export.iter_ergebnis_zeilen(self.last_results), spalten=immo_export.ERGEBNIS_SPALTEN, blatt="Ergebnisse")
+                messagebox.showinfo("Export erfolgreich", f"Ergebnisse wurden gespeichert unter:\n{filepath}")
+            except Exception as e: messagebox.showerror("Export fehlgeschlagen", f"Ein Fehler ist aufgetreten:\n{e}")
+
     def _update_ui(self, data):
         # *** HIER IST DIE VEREINFACHTE UND KORREKTE LOGIK ***
         for tree in [self.output_tree, self.kpi_tree]: tree.delete(*tree.get_children())
@@ -2,18 +2,26 @@
 
 import configparser
 import math
-import matplotlib.pyplot as plt
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
 
-def load_config():
+import immo_afa
+import immo_finanzierung
+
+CONFIG_DATEI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.txt')
+
+def load_config(pfad=CONFIG_DATEI):
     """
-    Lädt Standardwerte aus config.txt (Section DefaultValues).
+    Lädt Standardwerte aus config.txt (Section DefaultValues) neben diesem
+    Modul, unabhängig vom Arbeitsverzeichnis.
     Falls nicht vorhanden, werden Fallback-Werte zurückgegeben.
     """
     config = configparser.ConfigParser()
     try:
-        config.read('config.txt')
+        config.read(pfad, encoding='utf-8')
         return config['DefaultValues']
-    except (configparser.NoSectionError, FileNotFoundError):
+    except (configparser.NoSectionError, FileNotFoundError, KeyError):
         return {
             'grunderwerbsteuer_prozent': '3.5',
             'notar_prozent': '1.5',
@@ -84,70 +92,138 @@ def berechne_darlehen_details(summe, zins_p,
         'tilgung_euro_ergebnis_pa': tilgung_pa
     }
 
-def calculate_analytics(inputs):
+# ═════════════════════════════════════════════════════════════════════════════
+# REINE ANALYSE-API (unveränderliche Eingaben und Ergebnisse)
+# ═════════════════════════════════════════════════════════════════════════════
+class AnalyseEingaben(NamedTuple):
     """
-    Führt die vollständige Analyse durch und liefert:
-    - display_table: Liste von Dicts für GUI/PDF mit Kennzahl, val1, val2, tags
-    - kpi_table: Liste von Dicts für KPI-Anzeige
-    - pie_data: Dict für Tortendiagramm
-    - bar_data: Dict für Balkendiagramm
-    - gesamtinvestition: Gesamtinvestitionsbetrag
+    Rechenrelevante Eingaben einer Analyse. Unveränderlich und hashbar, daher
+    als Cache-Schlüssel und für Thread-/Prozess-Pools geeignet (ein Pickle ist
+    nur ein Tupel). Dokumentationsfelder wie Wohnort oder Stockwerk gehören
+    nicht dazu, weil sie das Ergebnis nicht beeinflussen.
+    """
+    kaufpreis: float = 0.0
+    garage_stellplatz_kosten: float = 0.0
+    invest_bedarf: float = 0.0
+    eigenkapital: float = 0.0
+    nebenkosten_prozente: Tuple[Tuple[str, float], ...] = ()
+    nutzungsart: str = 'Vermietung'
+    baujahr_kategorie: str = '1925 - 2022'
+    zins1_prozent: float = 0.0
+    tilgung1_prozent: Optional[float] = None
+    tilgung1_euro_mtl: Optional[float] = None
+    laufzeit1_jahre: Optional[float] = None
+    modus_d1: Optional[str] = None
+    darlehen2_summe: float = 0.0
+    zins2_prozent: float = 0.0
+    tilgung2_prozent: Optional[float] = None
+    tilgung2_euro_mtl: Optional[float] = None
+    laufzeit2_jahre: Optional[float] = None
+    modus_d2: Optional[str] = None
+    kaltmiete_monatlich: float = 0.0
+    nicht_umlagefaehige_kosten_pa: float = 0.0
+    steuersatz: float = 42.0
+    verfuegbares_einkommen_mtl: float = 0.0
+    tranchen: Tuple[Tuple[Tuple[str, object], ...], ...] = ()
+
+    @classmethod
+    def aus_dict(cls, inputs):
+        """Baut den Datensatz aus dem bisherigen inputs-Dict; unbekannte Schlüssel werden ignoriert."""
+        werte = {k: v for k, v in inputs.items() if k in cls._fields and v is not None}
+        werte['nebenkosten_prozente'] = tuple(sorted((inputs.get('nebenkosten_prozente') or {}).items()))
+        werte['tranchen'] = tuple(tuple(sorted(t.items())) for t in inputs.get('tranchen') or ())
+        return cls(**werte)
+
+
+class Zeile(NamedTuple):
+    kennzahl: str
+    val1: Optional[float]
+    val2: Optional[float]
+    tags: Tuple[str, ...] = ()
+
+
+class AnalyseErgebnis(NamedTuple):
+    display_table: Tuple[Zeile, ...] = ()
+    kpi_table: Tuple[Tuple[str, str], ...] = ()
+    pie_data: Tuple[Tuple[str, float], ...] = ()
+    bar_data: Tuple[Tuple[str, float], ...] = ()
+    gesamtinvestition: float = 0.0
+    darlehen1_summe: float = 0.0
+    error: Optional[str] = None
+
+    def als_dict(self):
+        """Ergebnis im bisherigen Dict-Format für GUI, PDF und Export (immer eine neue Kopie)."""
+        if self.error:
+            return {'error': self.error}
+        return {
+            'display_table': [{'kennzahl': z.kennzahl, 'val1': z.val1, 'val2': z.val2, 'tags': list(z.tags)}
+                              for z in self.display_table],
+            'kpi_table': [{'Kennzahl': k, 'Wert': w} for k, w in self.kpi_table],
+            'pie_data': dict(self.pie_data),
+            'bar_data': dict(self.bar_data),
+            'gesamtinvestition': self.gesamtinvestition,
+            'darlehen1_summe': self.darlehen1_summe,
+        }
+
+
+def analysiere(e):
+    """
+    Führt die vollständige Analyse durch. Reine Funktion: liest nur den
+    übergebenen AnalyseEingaben-Datensatz, verändert nichts und liefert ein
+    neues AnalyseErgebnis. Damit beliebig aus Threads und Worker-Prozessen
+    aufrufbar.
     """
     # Basisdaten
-    kaufpreis = inputs.get('kaufpreis', 0)
+    kaufpreis = e.kaufpreis
     if kaufpreis == 0:
-        return {'error': 'Kaufpreis darf nicht 0 sein.'}
-
-    garage = inputs.get('garage_stellplatz_kosten', 0)
-    invest_bedarf = inputs.get('invest_bedarf', 0)
-    nebenkosten_prozente = inputs.get('nebenkosten_prozente', {})
-    kauf_basis = kaufpreis + garage
-    gesamte_nebenkosten = kauf_basis * sum(nebenkosten_prozente.values()) / 100
-    gesamtinvestition = kauf_basis + gesamte_nebenkosten + invest_bedarf
-    eigenkapital = inputs.get('eigenkapital', 0)
+        return AnalyseErgebnis(error='Kaufpreis darf nicht 0 sein.')
+
+    kauf_basis = kaufpreis + e.garage_stellplatz_kosten
+    gesamte_nebenkosten = kauf_basis * sum(p for _, p in e.nebenkosten_prozente) / 100
+    gesamtinvestition = kauf_basis + gesamte_nebenkosten + e.invest_bedarf
+    eigenkapital = e.eigenkapital
     darlehensbedarf = gesamtinvestition - eigenkapital
 
     # Darlehen I und II
-    inputs['darlehen1_summe'] = darlehensbedarf
     d1 = berechne_darlehen_details(
-        inputs['darlehen1_summe'], inputs.get('zins1_prozent', 0),
-        inputs.get('tilgung1_prozent'), inputs.get('tilgung1_euro_mtl'),
-        inputs.get('laufzeit1_jahre'), inputs.get('modus_d1')
+        darlehensbedarf, e.zins1_prozent,
+        e.tilgung1_prozent, e.tilgung1_euro_mtl,
+        e.laufzeit1_jahre, e.modus_d1
     )
     d2 = berechne_darlehen_details(
-        inputs.get('darlehen2_summe', 0), inputs.get('zins2_prozent', 0),
-        inputs.get('tilgung2_prozent'), inputs.get('tilgung2_euro_mtl'),
-        inputs.get('laufzeit2_jahre'), inputs.get('modus_d2')
+        e.darlehen2_summe, e.zins2_prozent,
+        e.tilgung2_prozent, e.tilgung2_euro_mtl,
+        e.laufzeit2_jahre, e.modus_d2
     )
 
     zinsen_pa = d1['zins_pa'] + d2['zins_pa']
     tilgung_pa = d1['tilgung_pa'] + d2['tilgung_pa']
+    # Alternativ: beliebig viele Tranchen (Tranchen ohne 'summe' decken den Restbedarf)
+    fin = None
+    if e.tranchen:
+        fin = immo_finanzierung.finanzierung_jahr1([dict(t) for t in e.tranchen], darlehensbedarf)
+        zinsen_pa = fin['zinsen_pa']
+        tilgung_pa = fin['tilgung_pa']
     bankrate_pa = zinsen_pa + tilgung_pa
-    nutzungsart = inputs.get('nutzungsart', 'Vermietung')
-    nicht_umlagefaehige = inputs.get('nicht_umlagefaehige_kosten_pa', 0)
-    verfuegbares_einkommen = inputs.get('verfuegbares_einkommen_mtl', 0)
-
-    display_table = []
-    kpi_table = []
-    pie_data = {
-        'Darlehen I': inputs['darlehen1_summe'],
-        'Darlehen II': inputs.get('darlehen2_summe', 0),
-        'Eigenkapital': eigenkapital
-    }
-    bar_data = {}
+    nicht_umlagefaehige = e.nicht_umlagefaehige_kosten_pa
+    verfuegbares_einkommen = e.verfuegbares_einkommen_mtl
+
+    pie_data = (('Darlehen I', darlehensbedarf), ('Darlehen II', e.darlehen2_summe), ('Eigenkapital', eigenkapital))
+    if fin:
+        plan_namen = immo_finanzierung.berechne_tranchen(fin['tranchen'], monate=0)['namen']
+        pie_data = tuple(zip(plan_namen, (t['summe'] for t in fin['tranchen']))) + (('Eigenkapital', eigenkapital),)
 
-    if nutzungsart == 'Vermietung':
+    if e.nutzungsart == 'Vermietung':
         # AfA-Satz ermitteln
-        baujahr = inputs.get('baujahr_kategorie', '1925 - 2022')
-        afa_satz = 2.5 if baujahr == 'vor 1925' else 3.0 if baujahr == 'ab 2023' else 2.0
-        kaltmiete_pa = inputs.get('kaltmiete_monatlich', 0) * 12
+        afa_satz = immo_afa.afa_satz(e.baujahr_kategorie)
+        kaltmiete_pa = e.kaltmiete_monatlich * 12
         cashflow_vor_steuern = kaltmiete_pa - nicht_umlagefaehige - bankrate_pa
         afa_pa = kaufpreis * (afa_satz / 100)
         laufende_werbung = zinsen_pa + nicht_umlagefaehige + afa_pa
         gewinn_jahr1 = kaltmiete_pa - (laufende_werbung + gesamte_nebenkosten)
         gewinn_laufend = kaltmiete_pa - laufende_werbung
-        steuer_jahr1 = -gewinn_jahr1 * (inputs.get('steuersatz', 42.0) / 100)
-        steuer_laufend = -gewinn_laufend * (inputs.get('steuersatz', 42.0) / 100)
+        steuer_jahr1 = -gewinn_jahr1 * (e.steuersatz / 100)
+        steuer_laufend = -gewinn_laufend * (e.steuersatz / 100)
         cashflow_n_st_jahr1 = cashflow_vor_steuern + steuer_jahr1
         cashflow_n_st_laufend = cashflow_vor_steuern + steuer_laufend
 
@@ -156,89 +232,109 @@ def calculate_analytics(inputs):
         neues_einkommen_laufend = verfuegbares_einkommen + (cashflow_n_st_laufend / 12)
 
         # Anzeige-Tabelle aufbauen
-        display_table.extend([
-            {'kennzahl': 'Cashflow-Rechnung (Ihr Konto)', 'val1': None, 'val2': None, 'tags': ['title']},
-            {'kennzahl': ' Einnahmen p.a. (Kaltmiete)', 'val1': kaltmiete_pa, 'val2': kaltmiete_pa, 'tags': []},
-            {'kennzahl': ' - Nicht umlagef. Kosten p.a.', 'val1': -nicht_umlagefaehige, 'val2': -nicht_umlagefaehige, 'tags': []},
-            {'kennzahl': ' - Rückzahlung Darlehen p.a.', 'val1': -bankrate_pa, 'val2': -bankrate_pa, 'tags': []},
-            {'kennzahl': ' = Cashflow vor Steuern p.a.', 'val1': cashflow_vor_steuern, 'val2': cashflow_vor_steuern, 'tags': ['bold']},
-            {'kennzahl': '---', 'val1': None, 'val2': None, 'tags': ['separator']},
-            {'kennzahl': 'Steuer-Rechnung (Finanzamt)', 'val1': None, 'val2': None, 'tags': ['title']},
-            {'kennzahl': ' - Zinsen p.a.', 'val1': -zinsen_pa, 'val2': -zinsen_pa, 'tags': []},
-            {'kennzahl': ' - AfA p.a.', 'val1': -afa_pa, 'val2': -afa_pa, 'tags': []},
-            {'kennzahl': ' - Absetzbare Kaufnebenkosten (Jahr 1)', 'val1': -gesamte_nebenkosten, 'val2': 0, 'tags': []},
-            {'kennzahl': ' = Steuerlicher Gewinn/Verlust p.a.', 'val1': gewinn_jahr1, 'val2': gewinn_laufend, 'tags': ['bold']},
-            {'kennzahl': '---', 'val1': None, 'val2': None, 'tags': ['separator']},
-            {'kennzahl': 'Finale Ergebnisse', 'val1': None, 'val2': None, 'tags': ['title']},
-            {'kennzahl': ' + Steuerersparnis / -last p.a.', 'val1': steuer_jahr1, 'val2': steuer_laufend, 'tags': ['bold', 'green_text' if steuer_laufend >= 0 else 'red_text']},
-            {'kennzahl': ' = Effektiver Cashflow n. St. p.a.', 'val1': cashflow_n_st_jahr1, 'val2': cashflow_n_st_laufend, 'tags': ['bold']},
-            {'kennzahl': '---', 'val1': None, 'val2': None, 'tags': ['separator']},
-            {'kennzahl': 'Gesamt-Cashflow (Ihre persönliche Situation)', 'val1': None, 'val2': None, 'tags': ['title']},
-            {'kennzahl': ' Ihr monatl. Einkommen (vorher)', 'val1': verfuegbares_einkommen, 'val2': verfuegbares_einkommen, 'tags': []},
-            {'kennzahl': ' +/- Mtl. Cashflow Immobilie', 'val1': cashflow_n_st_jahr1 / 12, 'val2': cashflow_n_st_laufend / 12, 'tags': []},
+        display_table = (
+            Zeile('Cashflow-Rechnung (Ihr Konto)', None, None, ('title',)),
+            Zeile(' Einnahmen p.a. (Kaltmiete)', kaltmiete_pa, kaltmiete_pa),
+            Zeile(' - Nicht umlagef. Kosten p.a.', -nicht_umlagefaehige, -nicht_umlagefaehige),
+            Zeile(' - Rückzahlung Darlehen p.a.', -bankrate_pa, -bankrate_pa),
+            Zeile(' = Cashflow vor Steuern p.a.', cashflow_vor_steuern, cashflow_vor_steuern, ('bold',)),
+            Zeile('---', None, None, ('separator',)),
+            Zeile('Steuer-Rechnung (Finanzamt)', None, None, ('title',)),
+            Zeile(' - Zinsen p.a.', -zinsen_pa, -zinsen_pa),
+            Zeile(' - AfA p.a.', -afa_pa, -afa_pa),
+            Zeile(' - Absetzbare Kaufnebenkosten (Jahr 1)', -gesamte_nebenkosten, 0),
+            Zeile(' = Steuerlicher Gewinn/Verlust p.a.', gewinn_jahr1, gewinn_laufend, ('bold',)),
+            Zeile('---', None, None, ('separator',)),
+            Zeile('Finale Ergebnisse', None, None, ('title',)),
+            Zeile(' + Steuerersparnis / -last p.a.', steuer_jahr1, steuer_laufend, ('bold', 'green_text' if steuer_laufend >= 0 else 'red_text')),
+            Zeile(' = Effektiver Cashflow n. St. p.a.', cashflow_n_st_jahr1, cashflow_n_st_laufend, ('bold',)),
+            Zeile('---', None, None, ('separator',)),
+            Zeile('Gesamt-Cashflow (Ihre persönliche Situation)', None, None, ('title',)),
+            Zeile(' Ihr monatl. Einkommen (vorher)', verfuegbares_einkommen, verfuegbares_einkommen),
+            Zeile(' +/- Mtl. Cashflow Immobilie', cashflow_n_st_jahr1 / 12, cashflow_n_st_laufend / 12),
             # HIER: Beide Jahre werden korrekt ausgegeben!
-            {'kennzahl': ' = Neues verfügbares Einkommen', 'val1': neues_einkommen_jahr1, 'val2': neues_einkommen_laufend, 'tags': ['bold', 'green_text' if neues_einkommen_laufend >= verfuegbares_einkommen else 'red_text']}
-        ])
+            Zeile(' = Neues verfügbares Einkommen', neues_einkommen_jahr1, neues_einkommen_laufend, ('bold', 'green_text' if neues_einkommen_laufend >= verfuegbares_einkommen else 'red_text')),
+        )
 
         # KPIs
         bruttomietrendite = (kaltmiete_pa / kaufpreis) * 100
         nettomietrendite = ((kaltmiete_pa - nicht_umlagefaehige) / gesamtinvestition) * 100
         ek_rendite = (cashflow_n_st_laufend / eigenkapital) * 100 if eigenkapital > 0 else 0
 
-        kpi_table = [
-            {'Kennzahl': 'Bruttomietrendite', 'Wert': f"{bruttomietrendite:.2f} %"},
-            {'Kennzahl': 'Nettomietrendite', 'Wert': f"{nettomietrendite:.2f} %"},
-            {'Kennzahl': 'EK-Rendite n.St. (laufend)', 'Wert': f"{ek_rendite:.2f} %"}
-        ]
+        kpi_table = (
+            ('Bruttomietrendite', f"{bruttomietrendite:.2f} %"),
+            ('Nettomietrendite', f"{nettomietrendite:.2f} %"),
+            ('EK-Rendite n.St. (laufend)', f"{ek_rendite:.2f} %"),
+        )
 
         # Balkendiagramm-Daten
-        bar_data = {
-            'Nettokaltmiete': kaltmiete_pa / 12,
-            'Zinsen': zinsen_pa / 12,
-            'Tilgung': tilgung_pa / 12,
-            'Bewirt.-Kosten': nicht_umlagefaehige / 12
-        }
+        bar_data = (
+            ('Nettokaltmiete', kaltmiete_pa / 12),
+            ('Zinsen', zinsen_pa / 12),
+            ('Tilgung', tilgung_pa / 12),
+            ('Bewirt.-Kosten', nicht_umlagefaehige / 12),
+        )
 
     else:  # Eigennutzung
         jaehrliche_kosten = bankrate_pa + nicht_umlagefaehige
         neues_einkommen = verfuegbares_einkommen - (jaehrliche_kosten / 12)
-        display_table.extend([
-            {'kennzahl': 'Rückzahlung Darlehen p.a.', 'val1': -bankrate_pa, 'val2': -bankrate_pa, 'tags': []},
-            {'kennzahl': 'Laufende Kosten p.a.', 'val1': -nicht_umlagefaehige, 'val2': -nicht_umlagefaehige, 'tags': []},
-            {'kennzahl': '---', 'val1': None, 'val2': None, 'tags': ['separator']},
-            {'kennzahl': 'Jährliche Gesamtkosten', 'val1': -jaehrliche_kosten, 'val2': -jaehrliche_kosten, 'tags': ['bold']},
-            {'kennzahl': '---', 'val1': None, 'val2': None, 'tags': ['separator']},
-            {'kennzahl': 'Gesamt-Cashflow (Ihre persönliche Situation)', 'val1': None, 'val2': None, 'tags': ['title']},
-            {'kennzahl': ' Ihr monatl. Einkommen (vorher)', 'val1': verfuegbares_einkommen, 'val2': verfuegbares_einkommen, 'tags': []},
-            {'kennzahl': ' - Mtl. Kosten Immobilie', 'val1': -jaehrliche_kosten / 12, 'val2': -jaehrliche_kosten / 12, 'tags': []},
-            {'kennzahl': ' = Neues verfügbares Einkommen', 'val1': neues_einkommen, 'val2': neues_einkommen, 'tags': ['bold', 'green_text' if neues_einkommen >= verfuegbares_einkommen else 'red_text']}
-        ])
+        display_table = (
+            Zeile('Rückzahlung Darlehen p.a.', -bankrate_pa, -bankrate_pa),
+            Zeile('Laufende Kosten p.a.', -nicht_umlagefaehige, -nicht_umlagefaehige),
+            Zeile('---', None, None, ('separator',)),
+            Zeile('Jährliche Gesamtkosten', -jaehrliche_kosten, -jaehrliche_kosten, ('bold',)),
+            Zeile('---', None, None, ('separator',)),
+            Zeile('Gesamt-Cashflow (Ihre persönliche Situation)', None, None, ('title',)),
+            Zeile(' Ihr monatl. Einkommen (vorher)', verfuegbares_einkommen, verfuegbares_einkommen),
+            Zeile(' - Mtl. Kosten Immobilie', -jaehrliche_kosten / 12, -jaehrliche_kosten / 12),
+            Zeile(' = Neues verfügbares Einkommen', neues_einkommen, neues_einkommen, ('bold', 'green_text' if neues_einkommen >= verfuegbares_einkommen else 'red_text')),
+        )
 
         # KPIs
-        kpi_table = [
-            {'Kennzahl': 'Gesamtinvestition', 'Wert': f"{gesamtinvestition:,.2f} €"},
-            {'Kennzahl': 'Benötigtes EK', 'Wert': f"{gesamtinvestition - (inputs['darlehen1_summe'] + inputs.get('darlehen2_summe', 0)):,.2f} €"}
-        ]
-
-        bar_data = {
-            'Nettokaltmiete': 0,
-            'Zinsen': zinsen_pa / 12,
-            'Tilgung': tilgung_pa / 12,
-            'Bewirt.-Kosten': nicht_umlagefaehige / 12
-        }
+        kpi_table = (
+            ('Gesamtinvestition', f"{gesamtinvestition:,.2f} €"),
+            ('Benötigtes EK', f"{gesamtinvestition - (darlehensbedarf + e.darlehen2_summe):,.2f} €"),
+        )
+
+        bar_data = (
+            ('Nettokaltmiete', 0),
+            ('Zinsen', zinsen_pa / 12),
+            ('Tilgung', tilgung_pa / 12),
+            ('Bewirt.-Kosten', nicht_umlagefaehige / 12),
+        )
 
     # Ergebnis zusammenstellen
-    return {
-        'display_table': display_table,
-        'kpi_table': kpi_table,
-        'pie_data': pie_data,
-        'bar_data': bar_data,
-        'gesamtinvestition': gesamtinvestition
-    }
+    return AnalyseErgebnis(
+        display_table=display_table,
+        kpi_table=kpi_table,
+        pie_data=pie_data,
+        bar_data=bar_data,
+        gesamtinvestition=gesamtinvestition,
+        darlehen1_summe=darlehensbedarf,
+    )
+
+
+# Memoisierte Variante: gleiche Eingaben werden nur einmal gerechnet (lru_cache ist thread-sicher)
+analysiere_gecacht = lru_cache(maxsize=1024)(analysiere)
+
+
+def calculate_analytics(inputs):
+    """
+    Führt die vollständige Analyse durch und liefert:
+    - display_table: Liste von Dicts für GUI/PDF mit Kennzahl, val1, val2, tags
+    - kpi_table: Liste von Dicts für KPI-Anzeige
+    - pie_data: Dict für Tortendiagramm
+    - bar_data: Dict für Balkendiagramm
+    - gesamtinvestition: Gesamtinvestitionsbetrag
+    - darlehen1_summe: berechneter Darlehensbedarf (Darlehen I)
+    Das übergebene inputs-Dict wird nicht verändert.
+    """
+    return analysiere_gecacht(AnalyseEingaben.aus_dict(inputs)).als_dict()
 
 # Helper-Funktionen für Streamlit/Charts
 
 def plt_pie(labels, sizes, ret_fig=False):
+    import matplotlib.pyplot as plt   # erst hier: die Rechen-API braucht kein matplotlib
     fig, ax = plt.subplots()
     ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
     ax.set_title("Finanzierungsstruktur")
@@ -248,6 +344,7 @@ def plt_pie(labels, sizes, ret_fig=False):
         return plt
 
 def plt_bar(data, ret_fig=False):
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots()
     ax.bar("Einnahmen", data.get('Nettokaltmiete', 0), color='green', label='Nettokaltmiete')
     bottom = 0
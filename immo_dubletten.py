@@ -0,0 +1,256 @@
+# immo_dubletten.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+import immo_varianten
+
+# Dublettenindex für Exposés: dieselbe Wohnung steht auf mehreren Portalen und
+# wird nach kleinen Preisänderungen neu eingestellt. Der Index erkennt
+#
+# - identische Rechnungen am Fingerabdruck (Hash des Eingabe-Dicts ohne die
+#   beschreibenden Angaben) und liefert das gespeicherte Ergebnis,
+# - dieselbe Wohnung am unscharfen Schlüssel (Wohnort, Wohnfläche, Baujahr,
+#   Stockwerk) mit Preistoleranz und vergibt dieselbe objekt_id; gerechnet
+#   wird dann neu, die geänderten Eingaben werden mitgeliefert.
+#
+# Eine SQLite-Datei (Standardbibliothek), die mehrere Prozesse gleichzeitig
+# nutzen können (WAL, jede Schreibaktion eine kurze Transaktion).
+
+# Bei jeder Änderung an immo_varianten.detailrechnung oder am Fingerabdruck erhöhen:
+# alte Einträge gelten dann nicht mehr
+RECHENSTAND = 3
+PREIS_TOLERANZ_P = 3.0
+ZEITLIMIT_S = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ergebnisse (
+    fingerabdruck TEXT PRIMARY KEY,
+    ergebnis      TEXT NOT NULL,
+    treffer       INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS inserate (
+    unscharf      TEXT NOT NULL,
+    fingerabdruck TEXT NOT NULL,
+    objekt_id     INTEGER NOT NULL,
+    kaufpreis     REAL NOT NULL,
+    eingaben      TEXT NOT NULL,
+    zuerst        REAL NOT NULL,
+    zuletzt       REAL NOT NULL,
+    PRIMARY KEY (unscharf, fingerabdruck)
+);
+CREATE INDEX IF NOT EXISTS inserate_objekt ON inserate (objekt_id);
+CREATE TABLE IF NOT EXISTS berichte (
+    schluessel    TEXT PRIMARY KEY,
+    pfad          TEXT NOT NULL
+);
+"""
+
+# Angaben, die nur beschreiben und nicht in die Rechnung eingehen; alles andere
+# im Eingabe-Dict zählt zum Fingerabdruck (auch später hinzukommende Felder)
+BESCHREIBUNG = ('name', 'wohnort', 'stockwerk', 'zimmeranzahl', 'oepnv_anbindung', 'besonderheiten',
+                'checklist_status')
+
+_LEER = re.compile(r'\s+')
+
+
+def _kanonisch(wert):
+    """Zahlen als float (250000 == 250000.0), Tupel als Listen, Dicts ohne None-Werte, sonst unverändert."""
+    if isinstance(wert, bool) or wert is None or isinstance(wert, str):
+        return wert
+    if isinstance(wert, (int, float)):
+        return round(float(wert), 6)
+    if isinstance(wert, dict):
+        return {k: _kanonisch(v) for k, v in wert.items() if v is not None}
+    return [_kanonisch(w) for w in wert]
+
+
+def eingaben(objekt):
+    """
+    Rechenrelevante Eingaben als kanonisches Dict (Grundlage von Fingerabdruck
+    und Vergleich): das Eingabe-Dict, das immo_varianten.detailrechnung
+    bekommt, ohne BESCHREIBUNG. Fehlende und leere Angaben (None) rechnen
+    gleich und ergeben denselben Fingerabdruck.
+    """
+    return _kanonisch({k: v for k, v in objekt.items() if k not in BESCHREIBUNG})
+
+
+def _json(kanonisch):
+    return json.dumps(kanonisch, sort_keys=True, separators=(',', ':'))
+
+
+def _hash(text):
+    return hashlib.sha256(f"{RECHENSTAND}\x1f{text}".encode('utf-8')).hexdigest()
+
+
+def fingerabdruck(objekt):
+    """SHA-256 über die rechenrelevanten Eingaben und RECHENSTAND; Wohnort, Name usw. (BESCHREIBUNG) zählen nicht."""
+    return _hash(_json(eingaben(objekt)))
+
+
+def _text(wert):
+    return _LEER.sub(' ', str(wert or '')).strip().casefold()
+
+
+def unscharfer_schluessel(objekt):
+    """
+    Merkmale der Wohnung unabhängig von Preis und Portal: Wohnort und
+    Stockwerk ohne Groß-/Kleinschreibung und Leerzeichen, Wohnfläche auf
+    ganze m², Baujahr (Kategorie). Ohne Wohnort oder Wohnfläche None.
+    """
+    wohnort, flaeche = _text(objekt.get('wohnort')), float(objekt.get('wohnflaeche_qm') or 0)
+    if not wohnort or flaeche <= 0:
+        return None
+    teile = [wohnort, str(round(flaeche)), _text(objekt.get('baujahr_kategorie')), _text(objekt.get('stockwerk'))]
+    return hashlib.sha256('\x1f'.join(teile).encode('utf-8')).hexdigest()
+
+
+def berichtsschluessel(fingerabdruck, objekt):
+    """Ein PDF-Bericht zeigt zusätzlich den Wohnort: gleicher Fingerabdruck und Wohnort → gleicher Bericht."""
+    return hashlib.sha256(f"{fingerabdruck}\x1f{objekt.get('wohnort') or ''}".encode('utf-8')).hexdigest()
+
+
+def _ergebnis_json(ergebnis):
+    return json.dumps(ergebnis, ensure_ascii=False, separators=(',', ':'))
+
+
+def aenderungen(vorher, nachher):
+    """Geänderte rechenrelevante Felder zweier eingaben()-Dicts: Liste von (Feld, vorher, nachher)."""
+    return [(k, vorher.get(k), nachher[k]) for k in nachher if vorher.get(k) != nachher[k]]
+
+
+class DublettenIndex:
+    """
+    Persistenter Dublettenindex (SQLite) mit zwei Ebenen:
+
+    - Ergebnisse je Fingerabdruck: gleiche rechenrelevante Eingaben werden
+      nur einmal gerechnet, egal zu welcher Wohnung sie gehören
+    - Inserate je unscharfem Schlüssel: dieselbe Wohnung bekommt über Portale
+      und Preisänderungen (innerhalb preis_toleranz_p) dieselbe objekt_id
+
+    pruefe() ordnet ein Objekt ein, ohne zu schreiben:
+
+    - status: 'identisch' (dieses Inserat ist bekannt), 'geaendert' (dieselbe
+      Wohnung mit anderen Eingaben) oder 'neu'; ohne Wohnort/Wohnfläche
+      'identisch', sobald das Ergebnis bekannt ist
+    - objekt_id: gemeinsame Nummer aller Inserate derselben Wohnung (None,
+      solange nicht gespeichert oder ohne unscharfen Schlüssel)
+    - ergebnis: gespeichertes Ergebnis von immo_varianten.detailrechnung oder None
+    - aenderungen: geänderte Felder gegenüber dem ähnlichsten Inserat
+    """
+
+    def __init__(self, pfad, preis_toleranz_p=PREIS_TOLERANZ_P):
+        if preis_toleranz_p < 0:
+            raise ValueError("Die Preistoleranz darf nicht negativ sein.")
+        self.pfad = pfad
+        self.preis_toleranz_p = preis_toleranz_p
+        self._db = sqlite3.connect(pfad, timeout=ZEITLIMIT_S, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def _gespeichert(self, fp):
+        zeile = self._db.execute("SELECT ergebnis FROM ergebnisse WHERE fingerabdruck = ?", (fp,)).fetchone()
+        return json.loads(zeile[0]) if zeile else None
+
+    def pruefe(self, objekt):
+        kanonisch = eingaben(objekt)
+        fp = _hash(_json(kanonisch))
+        return self._einordnen(objekt, kanonisch, fp, self._gespeichert(fp))
+
+    def _einordnen(self, objekt, kanonisch, fp, ergebnis):
+        unscharf = unscharfer_schluessel(objekt)
+        treffer = {'fingerabdruck': fp, 'unscharf': unscharf, 'status': 'neu', 'objekt_id': None,
+                   'ergebnis': ergebnis, 'aenderungen': []}
+        if unscharf is None:
+            treffer['status'] = 'identisch' if ergebnis else 'neu'
+            return treffer
+        zeile = self._db.execute("SELECT objekt_id FROM inserate WHERE unscharf = ? AND fingerabdruck = ?",
+                                 (unscharf, fp)).fetchone()
+        if zeile:
+            treffer.update(status='identisch', objekt_id=zeile[0])
+            return treffer
+        kaufpreis = float(objekt.get('kaufpreis') or 0)
+        # ähnlichster Preis zuerst, bei Gleichstand das jüngste Inserat
+        zeile = self._db.execute(
+            "SELECT objekt_id, eingaben FROM inserate WHERE unscharf = ? AND ABS(kaufpreis - ?) <= ? * kaufpreis / 100 "
+            "ORDER BY ABS(kaufpreis - ?), zuletzt DESC LIMIT 1",
+            (unscharf, kaufpreis, self.preis_toleranz_p, kaufpreis)).fetchone()
+        if zeile:
+            treffer.update(status='geaendert', objekt_id=zeile[0],
+                           aenderungen=aenderungen(json.loads(zeile[1]), kanonisch))
+        return treffer
+
+    def analysiere_alle(self, objekte):
+        """
+        Wie immo_varianten.detailrechnung für eine Liste von Eingabe-Dicts; gerechnet
+        wird nur je unbekanntem Fingerabdruck (auch innerhalb der Liste nur
+        einmal). Eingetragen wird am Ende in einer kurzen Transaktion, damit
+        parallele Prozesse sich nicht gegenseitig aufhalten.
+        Ergebnis: Liste von (Ergebnis-Dict, treffer); treffer['wiederverwendet']
+        sagt, ob das Ergebnis aus dem Index stammt.
+        """
+        kanonisch = [eingaben(o) for o in objekte]
+        texte = [_json(k) for k in kanonisch]
+        fps = [_hash(t) for t in texte]
+        ergebnisse, gerechnet = {}, set()
+        for fp, objekt in zip(fps, objekte):
+            if fp not in ergebnisse:
+                ergebnisse[fp] = self._gespeichert(fp)
+                if ergebnisse[fp] is None:
+                    ergebnisse[fp] = immo_varianten.detailrechnung(objekt)
+                    gerechnet.add(fp)
+
+        jetzt, liste = time.time(), []
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            for objekt, k, text, fp in zip(objekte, kanonisch, texte, fps):
+                # innerhalb der Transaktion einordnen: sieht auch die eben eingetragenen Inserate der Liste
+                treffer = self._einordnen(objekt, k, fp, ergebnisse[fp])
+                treffer['wiederverwendet'] = fp not in gerechnet
+                if fp in gerechnet:
+                    self._db.execute("INSERT OR IGNORE INTO ergebnisse (fingerabdruck, ergebnis) VALUES (?, ?)",
+                                     (fp, _ergebnis_json(ergebnisse[fp])))
+                    gerechnet.discard(fp)
+                else:
+                    self._db.execute("UPDATE ergebnisse SET treffer = treffer + 1 WHERE fingerabdruck = ?", (fp,))
+                if treffer['status'] == 'identisch' and treffer['unscharf']:
+                    self._db.execute("UPDATE inserate SET zuletzt = ? WHERE unscharf = ? AND fingerabdruck = ?",
+                                     (jetzt, treffer['unscharf'], fp))
+                elif treffer['unscharf']:
+                    if treffer['objekt_id'] is None:
+                        treffer['objekt_id'] = self._db.execute(
+                            "SELECT COALESCE(MAX(objekt_id), 0) + 1 FROM inserate").fetchone()[0]
+                    self._db.execute(
+                        "INSERT INTO inserate (unscharf, fingerabdruck, objekt_id, kaufpreis, eingaben, zuerst, zuletzt) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (treffer['unscharf'], fp, treffer['objekt_id'], float(objekt.get('kaufpreis') or 0),
+                         text, jetzt, jetzt))
+                liste.append((ergebnisse[fp], treffer))
+        return liste
+
+    def analysiere(self, objekt):
+        """Ein Objekt wie analysiere_alle. Ergebnis: (Ergebnis-Dict, treffer)."""
+        return self.analysiere_alle([objekt])[0]
+
+    def bericht(self, schluessel):
+        """Pfad eines früher erzeugten PDF-Berichts (nur wenn die Datei noch existiert)."""
+        zeile = self._db.execute("SELECT pfad FROM berichte WHERE schluessel = ?", (schluessel,)).fetchone()
+        return zeile[0] if zeile and os.path.exists(zeile[0]) else None
+
+    def bericht_merken(self, schluessel, pfad):
+        self._db.execute("INSERT OR REPLACE INTO berichte (schluessel, pfad) VALUES (?, ?)",
+                         (schluessel, os.path.abspath(pfad)))
+
+    def statistik(self):
+        ergebnisse, treffer = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(treffer), 0) FROM ergebnisse").fetchone()
+        inserate, objekte = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT objekt_id) FROM inserate").fetchone()
+        return {'ergebnisse': ergebnisse, 'treffer': treffer, 'inserate': inserate, 'objekte': objekte}
+
+    def schliessen(self):
+        self._db.close()
@@ -0,0 +1,133 @@
+# immo_eigenkapital.py
+
+import numpy as np
+
+import immo_angebote
+import immo_finanzierung
+import immo_varianten
+
+STANDARD_SCHRITTE = 101
+
+
+def _restschuld(summe, zins_p, rate, monate):
+    """Restschuld einer Annuität nach n Monaten (geschlossene Formel, ≥ 0)."""
+    r = zins_p / 1200
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        q = (1 + r) ** monate
+        rest = np.where(r > 0, summe * q - rate * (q - 1) / np.where(r > 0, r, 1), summe - rate * monate)
+    return np.clip(rest, 0, None)
+
+
+def pareto_front(ziele):
+    """
+    Maske der nicht dominierten Punkte. ziele: Punkte × Ziele, alle zu
+    maximieren; NaN gilt als schlechtester Wert.
+    """
+    z = np.where(np.isnan(ziele), -np.inf, ziele)
+    mindestens = np.ones((len(z), len(z)), dtype=bool)    # [i, j]: j ist in allen Zielen ≥ i
+    besser = np.zeros((len(z), len(z)), dtype=bool)       # [i, j]: j ist in einem Ziel > i
+    for spalte in z.T:
+        mindestens &= spalte[None, :] >= spalte[:, None]
+        besser |= spalte[None, :] > spalte[:, None]
+    return ~(mindestens & besser).any(axis=1)
+
+
+def optimiere_eigenkapital(inputs, verfuegbares_kapital, alternativrendite_p=4.0, horizont_jahre=10,
+                           wertsteigerung_p=2.0, ek_min=0.0, schritte=STANDARD_SCHRITTE,
+                           tranche=None, tranche_max=None, tranche_schritte=11,
+                           min_cashflow_mtl=None, ersparte_miete_pa=0.0):
+    """
+    Durchsucht den Eigenkapitaleinsatz (und optional die Summe einer weiteren
+    Tranche) vektorisiert und bewertet jede Aufteilung.
+
+    - Nicht eingesetztes Kapital (Rückhalt) wächst mit der Alternativrendite
+      (nach Steuern); laufende Cashflows werden ebenso angelegt bzw. entnommen
+    - Die Steuerwirkung der Zinsen steckt im Cashflow nach Steuern (immo_varianten)
+    - Am Horizont: Objektwert (Kaufpreis mit Wertsteigerung) minus Restschuld
+    - tranche: Index in inputs['tranchen'][1:], deren Summe zwischen 0 und
+      tranche_max variiert wird; das Hauptdarlehen deckt jeweils den Rest
+    - Eigennutzung: Cashflow = −Gesamtkosten + ersparte_miete_pa
+
+    Ergebnis: Arrays je Aufteilung (eigenkapital, tranche_summe, rueckhalt,
+    cashflow_mtl, eigenkapitalrendite, irr_p, endvermoegen), die Maske 'pareto'
+    (Cashflow, EK-Rendite, IRR und Rückhalt zugleich nicht verbesserbar) samt
+    'front' (deren Indizes nach Rückhalt sortiert), 'empfehlung' (Index mit dem
+    höchsten Endvermögen unter der Nebenbedingung min_cashflow_mtl) und
+    'ausgangslage' (Index der eingegebenen Aufteilung).
+    """
+    werte = immo_varianten.berechne_varianten(inputs)
+    obergrenze = min(float(verfuegbares_kapital), float(werte['gesamtinvestition']))
+    if obergrenze < ek_min:
+        raise ValueError("Das verfügbare Kapital liegt unter dem Mindest-Eigenkapital.")
+    ek_eingabe = float(inputs.get('eigenkapital', 0) or 0)
+    ek_raster = np.linspace(ek_min, obergrenze, schritte)
+    if ek_min <= ek_eingabe <= obergrenze:
+        ek_raster = np.unique(np.append(ek_raster, ek_eingabe))    # Ausgangslage exakt mitrechnen
+
+    weitere = (inputs.get('tranchen') or [])[1:]
+    summen = np.array([[t['summe'] for t in weitere]], dtype=np.float64) if weitere else np.zeros((1, 0))
+    if tranche is not None:
+        if not 0 <= tranche < len(weitere):
+            raise ValueError(f"Unbekannte Tranche: {tranche}")
+        raster = np.linspace(0, tranche_max if tranche_max is not None else weitere[tranche]['summe'], tranche_schritte)
+        summen = np.repeat(summen, len(raster), axis=0)
+        summen[:, tranche] = raster
+    ek = np.repeat(ek_raster, len(summen))
+    tranche_summen = np.tile(summen, (len(ek_raster), 1))
+
+    aenderungen = {'eigenkapital': ek}
+    if weitere:
+        aenderungen['tranche_summen'] = tranche_summen
+    werte = immo_varianten.berechne_varianten(inputs, aenderungen)
+
+    if inputs.get('nutzungsart') == 'Vermietung':
+        cf_j1, cf = werte['cf_nach_j1'], werte['cf_nach_lfd']
+        ek_rendite = werte['eigenkapitalrendite']
+    else:
+        cf = ersparte_miete_pa - werte['jaehrliche_kosten']
+        cf_j1 = cf
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ek_rendite = np.where(ek > 0, cf / ek * 100, 0.0)
+
+    # Restschuld am Horizont: Hauptdarlehen wie auf der Seite, weitere Tranchen linear je Euro
+    monate = int(round(horizont_jahre * 12))
+    zins = float(inputs.get('zins1_prozent', 0) or 0)
+    haupt = werte['darlehen_summe'] - tranche_summen.sum(axis=1) if weitere else werte['darlehen_summe']
+    rate = immo_varianten.monatsrate(
+        haupt, zins, inputs.get('modus_d1', 'tilgungssatz'),
+        **{k: None if inputs.get(key) is None else np.float64(inputs[key]) for k, key in (
+            ('tilgung_p', 'tilgung1_prozent'), ('tilgung_euro_mtl', 'tilgung1_euro_mtl'), ('laufzeit_jahre', 'laufzeit1_jahre'))})
+    restschuld = _restschuld(haupt, zins, rate, monate)
+    if weitere:
+        je_euro = immo_finanzierung.berechne_tranchen([{**t, 'summe': 1.0} for t in weitere], monate=monate)
+        restschuld = restschuld + tranche_summen @ je_euro['restschuld'][:, monate - 1]
+
+    a = alternativrendite_p / 100
+    jahre = np.arange(1, int(horizont_jahre) + 1)
+    rueckhalt = verfuegbares_kapital - ek
+    objektwert = (inputs.get('kaufpreis', 0) + inputs.get('garage_stellplatz_kosten', 0)) * (1 + wertsteigerung_p / 100) ** horizont_jahre
+    cashflows = np.where(jahre[None, :] == 1, cf_j1[:, None], cf[:, None])                 # Aufteilungen × Jahre
+    endvermoegen = (rueckhalt * (1 + a) ** horizont_jahre
+                    + (cashflows * (1 + a) ** (horizont_jahre - jahre)).sum(axis=1)
+                    + objektwert - restschuld)
+
+    zahlungen = np.concatenate([-ek[:, None], cashflows], axis=1)
+    zahlungen[:, -1] += objektwert - restschuld
+    irr = np.where(ek > 0, immo_angebote.interner_zins(zahlungen, perioden_pro_jahr=1) * 100, np.nan)
+
+    cashflow_mtl = cf / 12
+    pareto = pareto_front(np.column_stack([cashflow_mtl, ek_rendite, irr, rueckhalt]))
+    zulaessig = np.ones(len(ek), dtype=bool) if min_cashflow_mtl is None else cashflow_mtl >= min_cashflow_mtl
+    empfehlung = int(np.argmax(np.where(zulaessig, endvermoegen, -np.inf))) if zulaessig.any() else None
+    abstand = np.abs(ek - ek_eingabe)
+    if tranche is not None:
+        abstand = abstand + np.abs(tranche_summen[:, tranche] - weitere[tranche]['summe'])
+    front = np.flatnonzero(pareto)
+
+    return {
+        'eigenkapital': ek, 'tranche_summe': tranche_summen[:, tranche] if tranche is not None else None,
+        'rueckhalt': rueckhalt, 'cashflow_mtl': cashflow_mtl, 'eigenkapitalrendite': ek_rendite,
+        'irr_p': irr, 'restschuld': restschuld, 'endvermoegen': endvermoegen,
+        'pareto': pareto, 'front': front[np.argsort(rueckhalt[front], kind='stable')].tolist(),
+        'zulaessig': zulaessig, 'empfehlung': empfehlung, 'ausgangslage': int(np.argmin(abstand)),
+    }
@@ -0,0 +1,473 @@
+# immo_eingang.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import immo_core
+import immo_dubletten
+import immo_ergebnisse
+import immo_export
+import immo_format
+import immo_objektliste
+import immo_varianten
+import immo_wohnort
+
+# Eingangsdienst für Objektlisten des Crawlers: beobachtet ein Verzeichnis,
+# bewertet jede neue CSV-/JSON-Datei genau einmal in einem Prozess-Pool und
+# schreibt Ergebnisse sowie optional PDF-Berichte. Gerechnet wird wie in der
+# Objektliste der Seite: Kennzahlen mit immo_objektliste.bewerte_objekte, die
+# Detailrechnung je Objekt mit immo_varianten.detailrechnung, spaltenweise
+# gesammelt in immo_ergebnisse.ErgebnisGruppen.
+# Ein Journal im Ausgangsverzeichnis hält fest, was erledigt ist; nach einem
+# Absturz wird nur Unfertiges erneut gerechnet (Ausgabenamen sind fest, das
+# Wiederholen überschreibt also nur). Mit dem Dublettenindex (immo_dubletten)
+# werden Inserate, die schon einmal gerechnet wurden, nicht neu gerechnet und
+# ihre PDF-Berichte kopiert statt neu erzeugt.
+
+ENDUNGEN = ('.csv', '.json')
+JOURNAL = 'eingang.journal'
+DUBLETTEN = 'dubletten.sqlite'
+RUHEZEIT_S = 2.0           # so lange muss eine Datei unverändert sein (Crawler schreibt noch)
+INTERVALL_S = 1.0
+MAX_VERSUCHE = 3           # danach gilt eine Datei, deren Verarbeitung immer wieder scheitert, als fehlerhaft
+
+
+# Annahmen für Angaben, die in der Objektliste fehlen (wie die Startwerte der Seite)
+STANDARD_VORLAGE = {
+    'nutzungsart': 'Vermietung', 'baujahr_kategorie': '1925 - 2022', 'wohnort': '',
+    'garage_stellplatz_kosten': 0.0, 'invest_bedarf': 0.0, 'eigenkapital': 0.0,
+    'gebaeude_anteil_prozent': 80.0, 'zins1_prozent': 3.5, 'tilgung1_prozent': 2.0,
+    'modus_d1': 'tilgungssatz', 'zinsbindung': 10, 'kaltmiete_monatlich': 0.0,
+    'umlagefaehige_kosten_monatlich': 0.0, 'nicht_umlagefaehige_kosten_pa': 0.0,
+    'mietausfallwagnis_prozent': 2.0, 'instandhaltung_euro_qm': 1.0, 'heizungstyp': 'Gas',
+    'energieeffizienz': 'B', 'afa_methode': 'linear', 'modernisierung_afa': 'gebaeude',
+    'steuersatz': 42.0, 'verfuegbares_einkommen_mtl': 0.0,
+}
+
+
+def standard_vorlage(datei=None):
+    """
+    STANDARD_VORLAGE mit den Kaufnebenkosten aus config.txt, optional
+    überlagert von einer JSON-Datei mit Schlüsseln des Eingabe-Dicts.
+    """
+    config = immo_core.load_config()
+    vorlage = dict(STANDARD_VORLAGE, nebenkosten_prozente={
+        key: float(config.get(f'{key}_prozent', 0)) for key in immo_objektliste.NEBENKOSTEN})
+    if datei:
+        with open(datei, encoding='utf-8') as f:
+            eigene = json.load(f)
+        if not isinstance(eigene, dict):
+            raise ValueError(f"Vorlage '{datei}' muss ein JSON-Objekt sein.")
+        vorlage['nebenkosten_prozente'].update(eigene.pop('nebenkosten_prozente', None) or {})
+        vorlage.update(eigene)
+    return vorlage
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# VERARBEITUNG EINER DATEI (läuft im Worker-Prozess)
+# ═════════════════════════════════════════════════════════════════════════════
+def _atomar(ziel, schreiben):
+    """Schreibt über eine temporäre Datei und benennt erst danach um."""
+    tmp = f"{ziel}.{os.getpid()}.tmp"
+    try:
+        schreiben(tmp)
+        os.replace(tmp, ziel)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _kennzahlen(werte, i):
+    """Kennzahlen der Objektliste (immo_objektliste.KENNZAHLEN) für Objekt i; nicht anwendbare als None."""
+    return {key: float(werte[key][i]) if np.isfinite(werte[key][i]) else None for key in immo_objektliste.KENNZAHLEN}
+
+
+# Arrow-Typen der Ergebnisspalten für Parquet (alle übrigen: float64)
+_SPALTENTYPEN = {'nr': 'int64', 'objekt_id': 'int64', 'objekt': 'string', 'wohnort': 'string',
+                 'nutzungsart': 'string', 'dublette': 'string', 'aenderungen': 'string'}
+
+
+def _ergebniszeile(nr, objekt, kennzahlen, tabellenwerte, treffer=None):
+    """
+    Eine Ergebniszeile je Objekt: die Kennzahlen der Objektliste, darlehen
+    und die Detailrechnung als '<Kennzahl>|jahr_1' usw. (tabellenwerte aus
+    immo_ergebnisse.ErgebnisGruppen); mit Dublettenindex
+    zusätzlich objekt_id, dublette (neu/identisch/geaendert) und die
+    geänderten Eingaben.
+    """
+    zeile = {'nr': nr, 'objekt': objekt.get('name', ''), 'wohnort': objekt.get('wohnort', ''),
+             'nutzungsart': objekt.get('nutzungsart', ''), 'kaufpreis': objekt.get('kaufpreis'), **kennzahlen,
+             'darlehen': kennzahlen['gesamtinvestition'] - (objekt.get('eigenkapital') or 0)}
+    if treffer is not None:
+        zeile['objekt_id'], zeile['dublette'] = treffer['objekt_id'], treffer['status']
+        zeile['aenderungen'] = '; '.join(f"{k}: {vorher} → {nachher}" for k, vorher, nachher in treffer['aenderungen'])
+    zeile.update(tabellenwerte)
+    return zeile
+
+
+def _kpi(titel, wert):
+    """KENNZAHLEN-Titel mit Einheit in Klammern → Zeile der Kennzahlentabelle, z.B. 'Rate mtl.' / '1.234,50 €'."""
+    name, klammer, einheit = titel.rpartition(' (')
+    if not klammer:
+        return {'Kennzahl': titel, 'Wert': immo_format.de_zahl(wert, 2)}
+    return {'Kennzahl': name, 'Wert': f"{immo_format.de_zahl(wert, 2)} {einheit.rstrip(')')}"}
+
+
+def _bankbericht(objekt, kennzahlen, ergebnis):
+    """Daten für pdf_generator.create_bank_report aus Kennzahlen und Detailrechnung eines Objekts."""
+    zeilen = {z['kennzahl']: z['val2'] for z in ergebnis['display_table']}
+    tabelle = []
+    for z in ergebnis['display_table']:
+        tags = ['bold'] if z['kennzahl'].startswith('=') else []
+        if z['kennzahl'] == '= Neues verfügbares Einkommen':
+            tags.append('green_text' if z['val2'] >= (objekt.get('verfuegbares_einkommen_mtl') or 0) else 'red_text')
+        tabelle.append(dict(z, tags=tags))
+    eigenkapital = objekt.get('eigenkapital') or 0
+    return {
+        'inputs': objekt, 'display_table': tabelle, 'gesamtinvestition': kennzahlen['gesamtinvestition'],
+        'kpi_table': [_kpi(titel, kennzahlen[key])
+                      for key, (titel, _) in immo_objektliste.KENNZAHLEN.items() if kennzahlen[key] is not None],
+        'pie_data': {'Darlehen': max(kennzahlen['gesamtinvestition'] - eigenkapital, 0), 'Eigenkapital': eigenkapital},
+        'bar_data': {'Nettokaltmiete': (objekt.get('kaltmiete_monatlich') or 0)
+                     if objekt.get('nutzungsart') == 'Vermietung' else 0,
+                     'Zinsen': zeilen['- Zinsen p.a.'] / 12,
+                     'Tilgung': -(zeilen['Rückzahlung Darlehen p.a.'] + zeilen['- Zinsen p.a.']) / 12,
+                     'Bewirt.-Kosten': (objekt.get('nicht_umlagefaehige_kosten_pa') or 0) / 12},
+    }
+
+
+def _pdf(ziel, objekt, kennzahlen, ergebnis, index=None, fingerabdruck=None):
+    """Bankbericht als PDF; ein im Dublettenindex bekannter Bericht wird nur kopiert. Ergebnis: True, wenn kopiert."""
+    if index is not None:
+        schluessel = immo_dubletten.berichtsschluessel(fingerabdruck, objekt)
+        vorhanden = index.bericht(schluessel)
+        if vorhanden is not None:
+            if os.path.abspath(vorhanden) != os.path.abspath(ziel):
+                _atomar(ziel, lambda tmp: shutil.copyfile(vorhanden, tmp))
+            return True
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pdf_generator
+
+    daten = _bankbericht(objekt, kennzahlen, ergebnis)
+    pie = immo_core.plt_pie(list(daten['pie_data']), list(daten['pie_data'].values()), ret_fig=True)
+    bar = immo_core.plt_bar(daten['bar_data'], ret_fig=True)
+    try:
+        _atomar(ziel, lambda tmp: pdf_generator.create_bank_report(
+            dict(daten, inputs=objekt, figures={'pie': pie, 'bar': bar}), tmp))
+    finally:
+        plt.close(pie)
+        plt.close(bar)
+    if index is not None:
+        index.bericht_merken(schluessel, ziel)
+    return False
+
+
+_INDIZES = {}
+
+
+def _dublettenindex(pfad):
+    """Eine Verbindung je Worker-Prozess und Indexdatei."""
+    if pfad not in _INDIZES:
+        _INDIZES[pfad] = immo_dubletten.DublettenIndex(pfad)
+    return _INDIZES[pfad]
+
+
+def verarbeite_datei(dateiname, inhalt, ausgang, vorlage, format='csv', pdf=False, dubletten=None):
+    """
+    Bewertet eine Objektliste (Bytes) und schreibt <name>.ergebnis.<format>
+    sowie bei pdf=True je Objekt einen Bankbericht nach pdf/<name>/.
+    dubletten: Pfad eines Dublettenindex (oder None).
+    Ergebnis: Dict mit objekte, wiederverwendet (Ergebnisse aus dem Index),
+    pdfs, pdfs_kopiert und fehler (Text, wenn die Datei nicht lesbar war
+    oder ein Objekt ungültige Angaben hat; wie in der Objektliste der Seite
+    wird die Datei dann nicht bewertet).
+    """
+    stamm = os.path.splitext(dateiname)[0]
+    try:
+        objekte = immo_objektliste.lese_objekte(inhalt, dateiname, vorlage)
+        werte = immo_objektliste.bewerte_objekte(objekte)
+    except ValueError as e:
+        return {'objekte': 0, 'wiederverwendet': 0, 'pdfs': 0, 'pdfs_kopiert': 0, 'fehler': str(e)}
+
+    index = _dublettenindex(dubletten) if dubletten else None
+    if index is not None:
+        bewertet = index.analysiere_alle(objekte)
+        ergebnisse, alle_treffer = (e for e, _ in bewertet), [t for _, t in bewertet]
+    else:
+        ergebnisse, alle_treffer = map(immo_varianten.detailrechnung, objekte), [None] * len(objekte)
+    # spaltenweise statt ein Dict je Objekt; die PDFs holen ihr Ergebnis einzeln zurück
+    ergebnisse = immo_ergebnisse.ErgebnisGruppen(ergebnisse)
+    kennzahlen = [_kennzahlen(werte, i) for i in range(len(objekte))]
+    zeilen = [_ergebniszeile(nr, o, k, ergebnisse.tabellenwerte(nr - 1), t)
+              for nr, (o, k, t) in enumerate(zip(objekte, kennzahlen, alle_treffer), start=1)]
+    spalten = {s: _SPALTENTYPEN.get(s, 'float64') for z in zeilen for s in z}
+    _atomar(os.path.join(ausgang, f"{stamm}.ergebnis.{format}"),
+            lambda tmp: immo_export.exportiere(tmp, zeilen, format, spalten))
+
+    pdfs = kopiert = 0
+    if pdf:
+        ordner = os.path.join(ausgang, 'pdf', immo_wohnort.sicherer_dateiname(stamm))
+        os.makedirs(ordner, exist_ok=True)
+        for nr, (objekt, k, treffer) in enumerate(zip(objekte, kennzahlen, alle_treffer), start=1):
+            kopiert += _pdf(os.path.join(ordner, f"{nr:05d}_{immo_wohnort.sicherer_dateiname(objekt['name'])}.pdf"),
+                            objekt, k, ergebnisse.ergebnis(nr - 1), index, treffer and treffer['fingerabdruck'])
+            pdfs += 1
+    return {'objekte': len(objekte), 'wiederverwendet': sum(1 for t in alle_treffer if t and t['wiederverwendet']),
+            'pdfs': pdfs, 'pdfs_kopiert': kopiert, 'fehler': ''}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# JOURNAL (Checkpoint)
+# ═════════════════════════════════════════════════════════════════════════════
+class Journal:
+    """
+    Append-only JSON-Lines-Datei der erledigten Dateien. Eine Datei gilt als
+    erledigt, wenn Name, Größe und Änderungszeit oder ihr Inhalt (SHA-256)
+    schon eingetragen sind; ein Eintrag wird erst nach dem Schreiben aller
+    Ausgaben angehängt und auf die Platte gezwungen.
+    """
+
+    def __init__(self, pfad):
+        self.pfad = pfad
+        self.stand, self.inhalte = set(), {}
+        zeile = ''
+        if os.path.exists(pfad):
+            with open(pfad, encoding='utf-8') as f:
+                for zeile in f:
+                    try:
+                        eintrag = json.loads(zeile)
+                    except json.JSONDecodeError:
+                        continue   # abgebrochene letzte Zeile nach einem Absturz
+                    self._merke(eintrag)
+        self._datei = open(pfad, 'a', encoding='utf-8')
+        if zeile and not zeile.endswith('\n'):
+            self._datei.write('\n')   # abgebrochene Zeile abschließen, sonst klebt der nächste Eintrag daran
+
+    def _merke(self, eintrag):
+        self.stand.add((eintrag['datei'], eintrag['groesse'], eintrag['mtime_ns']))
+        self.inhalte.setdefault(eintrag['sha256'], eintrag['datei'])
+
+    def erledigt(self, datei, groesse, mtime_ns):
+        return (datei, groesse, mtime_ns) in self.stand
+
+    def duplikat(self, sha256):
+        """Name der früher verarbeiteten Datei mit gleichem Inhalt (sonst None)."""
+        return self.inhalte.get(sha256)
+
+    def eintragen(self, eintrag):
+        self._datei.write(json.dumps(eintrag, ensure_ascii=False) + '\n')
+        self._datei.flush()
+        os.fsync(self._datei.fileno())
+        self._merke(eintrag)
+
+    def __len__(self):
+        return len(self.stand)
+
+    def schliessen(self):
+        self._datei.close()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# DIENST
+# ═════════════════════════════════════════════════════════════════════════════
+def _bereit(eingang, journal, ruhezeit_s, offen):
+    """Neue, seit ruhezeit_s unveränderte Dateien, älteste zuerst: Liste von (mtime_ns, name, groesse)."""
+    grenze = time.time_ns() - int(ruhezeit_s * 1e9)
+    kandidaten = []
+    with os.scandir(eingang) as eintraege:
+        for e in eintraege:
+            if e.name.startswith('.') or not e.name.lower().endswith(ENDUNGEN) or e.name in offen:
+                continue
+            try:
+                info = e.stat()
+            except FileNotFoundError:
+                continue
+            if not e.is_file() or info.st_mtime_ns > grenze or journal.erledigt(e.name, info.st_size, info.st_mtime_ns):
+                continue
+            kandidaten.append((info.st_mtime_ns, e.name, info.st_size))
+    kandidaten.sort()
+    return kandidaten
+
+
+class Eingangsdienst:
+    """
+    Beobachtet eingang (Polling, keine zusätzlichen Abhängigkeiten) und
+    verteilt neue Objektlisten auf einen Prozess-Pool.
+
+    Gegendruck: höchstens max_offen Dateien sind gleichzeitig im Pool; der
+    Rückstau bleibt als Dateien im Verzeichnis liegen und wird beim nächsten
+    Durchgang in Ankunftsreihenfolge nachgeschoben. Gelesen wird eine Datei
+    erst, wenn ein Platz frei ist, der Speicherbedarf bleibt also auch bei
+    Tausenden neuen Dateien konstant.
+    """
+
+    def __init__(self, eingang, ausgang, vorlage=None, worker=None, format='csv', pdf=False,
+                 max_offen=None, ruhezeit_s=RUHEZEIT_S, intervall_s=INTERVALL_S, ausgabe=print, dubletten=True):
+        if format not in immo_export.verfuegbare_formate():
+            raise ValueError(f"Exportformat '{format}' ist nicht verfügbar "
+                             f"(installiert: {', '.join(immo_export.verfuegbare_formate())}).")
+        self.eingang, self.ausgang = eingang, ausgang
+        self.vorlage = vorlage if vorlage is not None else standard_vorlage()
+        self.worker = worker or os.cpu_count() or 1
+        self.max_offen = max_offen or 2 * self.worker
+        self.format, self.pdf = format, pdf
+        self.dubletten = os.path.abspath(os.path.join(ausgang, DUBLETTEN)) if dubletten else None
+        self.ruhezeit_s, self.intervall_s = ruhezeit_s, intervall_s
+        self.ausgabe = ausgabe
+        self.stopp = False
+        self.versuche = {}
+        self.statistik = {'dateien': 0, 'objekte': 0, 'wiederverwendet': 0, 'fehler': 0, 'duplikate': 0, 'pdfs': 0,
+                          'rueckstau': 0}
+        os.makedirs(ausgang, exist_ok=True)
+        if self.dubletten:
+            immo_dubletten.DublettenIndex(self.dubletten).schliessen()   # Schema anlegen, bevor die Worker starten
+        self.journal = Journal(os.path.join(ausgang, JOURNAL))
+
+    def _eintrag(self, datei, groesse, mtime_ns, sha256, **werte):
+        self.journal.eintragen(dict({'datei': datei, 'groesse': groesse, 'mtime_ns': mtime_ns, 'sha256': sha256,
+                                     'objekte': 0, 'fehler': '', 'verarbeitet': time.time()}, **werte))
+
+    def _einreichen(self, pool, offen, kandidat):
+        mtime_ns, name, groesse = kandidat
+        try:
+            with open(os.path.join(self.eingang, name), 'rb') as f:
+                inhalt = f.read()
+        except FileNotFoundError:
+            return
+        info = os.stat(os.path.join(self.eingang, name))
+        if (info.st_size, info.st_mtime_ns) != (len(inhalt), mtime_ns):
+            return   # wurde inzwischen geändert: beim nächsten Durchgang erneut
+        sha256 = hashlib.sha256(inhalt).hexdigest()
+        # auch gegen die Dateien im Pool prüfen: ins Journal kommen sie erst, wenn sie fertig sind
+        frueher = self.journal.duplikat(sha256) or next((v[0] for v in offen.values() if v[3] == sha256), None)
+        if frueher is not None:
+            self._eintrag(name, groesse, mtime_ns, sha256, duplikat_von=frueher)
+            self.statistik['duplikate'] += 1
+            return
+        future = pool.submit(verarbeite_datei, name, inhalt, self.ausgang, self.vorlage, self.format, self.pdf,
+                             self.dubletten)
+        offen[future] = (name, groesse, mtime_ns, sha256)
+
+    def _fehlversuch(self, datei, groesse, mtime_ns, sha256, fehler):
+        """Unerwarteter Fehler: bis MAX_VERSUCHE erneut versuchen, danach als fehlerhaft eintragen."""
+        self.versuche[datei] = self.versuche.get(datei, 0) + 1
+        if self.versuche[datei] >= MAX_VERSUCHE:
+            self._eintrag(datei, groesse, mtime_ns, sha256, fehler=fehler)
+            self.statistik['fehler'] += 1
+            self.versuche.pop(datei)
+        self.ausgabe(f"{datei}: {fehler}")
+
+    def _abschliessen(self, future, datei, groesse, mtime_ns, sha256):
+        try:
+            ergebnis = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            return self._fehlversuch(datei, groesse, mtime_ns, sha256, f"{type(e).__name__}: {e}")
+        self._eintrag(datei, groesse, mtime_ns, sha256, **ergebnis)
+        self.versuche.pop(datei, None)
+        s = self.statistik
+        s['dateien'] += 1
+        s['objekte'] += ergebnis['objekte']
+        s['wiederverwendet'] += ergebnis['wiederverwendet']
+        s['pdfs'] += ergebnis['pdfs']
+        s['fehler'] += bool(ergebnis['fehler'])
+        if ergebnis['fehler']:
+            self.ausgabe(f"{datei}: {ergebnis['fehler']}")
+
+    def beenden(self, *_):
+        """Nimmt keine neuen Dateien mehr an; laufende werden noch fertig gerechnet."""
+        self.stopp = True
+
+    def laufen(self, einmal=False, bericht_s=10.0):
+        """
+        Hauptschleife bis beenden() (SIGTERM/SIGINT). Mit einmal=True endet
+        sie, sobald das Verzeichnis keine neuen Dateien mehr enthält.
+        Ergebnis: die Statistik (Zähler, dauer_s und dateien_pro_s).
+        """
+        start = letzter_bericht = time.monotonic()
+        naechster_scan = 0.0
+        warteschlange, offen = deque(), {}
+        pool = ProcessPoolExecutor(max_workers=self.worker)
+        try:
+            while True:
+                if not self.stopp and not warteschlange and time.monotonic() >= naechster_scan:
+                    warteschlange = deque(_bereit(self.eingang, self.journal, self.ruhezeit_s,
+                                                  {v[0] for v in offen.values()}))
+                    naechster_scan = time.monotonic() + self.intervall_s
+                    if einmal and not warteschlange and not offen:
+                        break
+                while warteschlange and len(offen) < self.max_offen and not self.stopp:
+                    self._einreichen(pool, offen, warteschlange.popleft())
+                self.statistik['rueckstau'] = len(warteschlange)
+                if self.stopp and not offen:
+                    break
+
+                if offen:
+                    fertig, _ = wait(offen, timeout=self.intervall_s, return_when=FIRST_COMPLETED)
+                    try:
+                        for future in fertig:
+                            self._abschliessen(future, *offen.pop(future))
+                    except BrokenProcessPool:
+                        # alle offenen Aufträge sind verloren: zählen als Versuch und kommen beim nächsten Scan wieder
+                        for eintrag in offen.values():
+                            self._fehlversuch(*eintrag, "Worker-Prozess abgestürzt.")
+                        offen.clear()
+                        warteschlange.clear()
+                        pool.shutdown(cancel_futures=True)
+                        pool = ProcessPoolExecutor(max_workers=self.worker)
+                elif not warteschlange:
+                    time.sleep(max(0.0, naechster_scan - time.monotonic()))
+
+                if time.monotonic() - letzter_bericht >= bericht_s:
+                    letzter_bericht = time.monotonic()
+                    self.ausgabe(self.bericht(letzter_bericht - start))
+        finally:
+            pool.shutdown(wait=True)
+            self.journal.schliessen()
+        dauer = time.monotonic() - start
+        return dict(self.statistik, dauer_s=dauer, dateien_pro_s=self.statistik['dateien'] / dauer if dauer else 0.0)
+
+    def bericht(self, dauer_s):
+        s = self.statistik
+        return (f"{s['dateien']} Dateien ({s['objekte']} Objekte, davon {s['wiederverwendet']} aus dem Dublettenindex, "
+                f"{s['fehler']} Fehler, {s['duplikate']} Duplikate) "
+                f"in {dauer_s:.0f} s = {s['dateien'] / dauer_s if dauer_s else 0:.1f} Dateien/s; "
+                f"Rückstau {s['rueckstau']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Objektlisten aus einem Verzeichnis laufend bewerten.")
+    parser.add_argument('eingang', help="Verzeichnis, in das der Crawler CSV-/JSON-Dateien legt")
+    parser.add_argument('ausgang', help="Verzeichnis für Ergebnisse, PDFs und das Journal")
+    parser.add_argument('--vorlage', help="JSON-Datei mit Annahmen für fehlende Angaben")
+    parser.add_argument('--worker', type=int, help="Anzahl Worker-Prozesse (Standard: CPU-Kerne)")
+    parser.add_argument('--max-offen', type=int, help="höchstens so viele Dateien gleichzeitig im Pool (Standard: 2 × Worker)")
+    parser.add_argument('--format', default='csv', choices=immo_export.EXPORT_FORMATE)
+    parser.add_argument('--pdf', action='store_true', help="je Objekt einen Bankbericht schreiben")
+    parser.add_argument('--ohne-dubletten', action='store_true', help="jedes Inserat neu rechnen (kein Dublettenindex)")
+    parser.add_argument('--ruhezeit', type=float, default=RUHEZEIT_S, help="Sekunden ohne Änderung, bevor eine Datei gilt")
+    parser.add_argument('--einmal', action='store_true', help="nur den vorhandenen Rückstau abarbeiten und beenden")
+    args = parser.parse_args()
+
+    dienst = Eingangsdienst(args.eingang, args.ausgang, standard_vorlage(args.vorlage), args.worker, args.format,
+                            args.pdf, args.max_offen, args.ruhezeit, dubletten=not args.ohne_dubletten)
+    signal.signal(signal.SIGTERM, dienst.beenden)
+    signal.signal(signal.SIGINT, dienst.beenden)
+    ergebnis = dienst.laufen(einmal=args.einmal)
+    print(dienst.bericht(ergebnis['dauer_s']))
+    sys.exit(1 if args.einmal and ergebnis['fehler'] else 0)
@@ -0,0 +1,329 @@
+# immo_ergebnisse.py
+
+import numbers
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+JAHRE = ('jahr_1', 'laufende_jahre')          # wie immo_export.ERGEBNIS_SPALTEN
+FARB_TAGS = ('green_text', 'red_text')        # wertabhängige Tags, je Zeile als int8 gespeichert
+_BLOCK = 65536                                # max. Zeilen je Puffer beim Einsammeln
+
+
+class Zeilenschema(NamedTuple):
+    kennzahl: str
+    tags: Tuple[str, ...]       # ohne Farb-Tags
+    hat_werte: bool             # Titel/Trenner haben keine Werte
+    farbig: bool
+
+
+class ErgebnisSchema(NamedTuple):
+    """
+    Gemeinsame Beschreibung aller Ergebnisse eines Laufs: Zeilen der
+    display_table in Anzeigereihenfolge und die skalaren Zusatzwerte
+    (z.B. gesamtinvestition, finanzkennzahlen:Bruttomietrendite).
+    Jede Bezeichnung wird nur einmal gespeichert, nicht je Ergebnis.
+    """
+    zeilen: Tuple[Zeilenschema, ...]
+    skalare: Tuple[str, ...]
+    einheiten: Tuple[Tuple[str, str], ...] = ()     # kpi_table-Spalte → '%' oder '€'
+    mit_tags: bool = False                          # Zeilen-Dicts haben einen 'tags'-Eintrag
+
+    @property
+    def spalten(self):
+        """Spaltennamen in Speicherreihenfolge: '<Kennzahl>|jahr_1', '<Kennzahl>|laufende_jahre', dann die Skalare."""
+        return tuple(f"{z.kennzahl.strip()}|{jahr}" for z in self.zeilen if z.hat_werte for jahr in JAHRE) + self.skalare
+
+    @classmethod
+    def aus_ergebnis(cls, ergebnis):
+        zeilen = tuple(
+            Zeilenschema(z['kennzahl'], tuple(t for t in z.get('tags', ()) if t not in FARB_TAGS),
+                         z.get('val1') is not None or z.get('val2') is not None,
+                         any(t in FARB_TAGS for t in z.get('tags', ())))
+            for z in ergebnis.get('display_table', ()))
+        skalare, einheiten = [], []
+        for schluessel, wert in ergebnis.items():
+            if schluessel == 'display_table':
+                continue
+            if isinstance(wert, numbers.Real):
+                skalare.append(schluessel)
+            elif isinstance(wert, dict):
+                skalare.extend(f"{schluessel}:{k}" for k, v in wert.items() if isinstance(v, numbers.Real))
+            elif schluessel == 'kpi_table':
+                for kpi in wert:
+                    name = f"kpi_table:{kpi['Kennzahl']}"
+                    skalare.append(name)
+                    einheiten.append((name, str(kpi['Wert']).split()[-1]))
+        tabelle = ergebnis.get('display_table', ())
+        return cls(zeilen, tuple(skalare), tuple(einheiten), bool(tabelle) and 'tags' in tabelle[0])
+
+
+def _kpi_zahl(text):
+    """'1,234.56 €' bzw. '4.10 %' (Format aus immo_core) → float."""
+    return float(str(text).split()[0].replace(',', ''))
+
+
+def _kpi_text(wert, einheit):
+    return f"{wert:,.2f} €" if einheit == '€' else f"{wert:.2f} {einheit}"
+
+
+def _werte(ergebnis, schema):
+    """Flache Werteliste eines Ergebnis-Dicts in Spaltenreihenfolge plus Farbcodes."""
+    tabelle = ergebnis.get('display_table', ())
+    if len(tabelle) != len(schema.zeilen) or any(
+            z['kennzahl'] != s.kennzahl for z, s in zip(tabelle, schema.zeilen)):
+        raise ValueError("Ergebnis passt nicht zum Schema (andere Zeilen der Detailtabelle, z.B. andere Nutzungsart).")
+    werte, farben = [], []
+    for z, s in zip(tabelle, schema.zeilen):
+        if s.hat_werte:
+            werte.append(z.get('val1') if z.get('val1') is not None else np.nan)
+            werte.append(z.get('val2') if z.get('val2') is not None else np.nan)
+        if s.farbig:
+            tags = z.get('tags', ())
+            farben.append(next((i + 1 for i, t in enumerate(FARB_TAGS) if t in tags), 0))
+    kpis = {f"kpi_table:{k['Kennzahl']}": k['Wert'] for k in ergebnis.get('kpi_table', ())}
+    for name in schema.skalare:
+        if name in kpis:
+            werte.append(_kpi_zahl(kpis[name]))
+        elif ':' in name and name.split(':', 1)[0] in ergebnis:
+            gruppe, schluessel = name.split(':', 1)
+            werte.append(ergebnis[gruppe].get(schluessel, np.nan))
+        else:
+            werte.append(ergebnis.get(name, np.nan))
+    return werte, farben
+
+
+def _als_dict(ergebnis):
+    return ergebnis.als_dict() if hasattr(ergebnis, 'als_dict') else ergebnis
+
+
+class _Sammler:
+    """Füllt wachsende Blöcke (Ergebnisse × Spalten) eines Schemas und baut daraus ein ErgebnisSpalten."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.anzahl = 0
+        self._bloecke, self._farb_bloecke = [], []
+        self._puffer = self._farb_puffer = None
+        self._fuellstand = self._groesse = 0
+
+    def hinzufuegen(self, ergebnis):
+        """Legt ein Ergebnis ab; liefert seine Zeile im späteren Speicher."""
+        if self._puffer is None or self._fuellstand == self._groesse:
+            if self._puffer is not None:
+                self._bloecke.append(self._puffer)
+                self._farb_bloecke.append(self._farb_puffer)
+            self._groesse = min(max(2 * self._groesse, 1024), _BLOCK)   # kleine Läufe belegen wenig Speicher
+            self._puffer = np.empty((self._groesse, len(self.schema.spalten)), dtype=np.float64)
+            self._farb_puffer = np.zeros((self._groesse, sum(z.farbig for z in self.schema.zeilen)), dtype=np.int8)
+            self._fuellstand = 0
+        werte, farben = _werte(ergebnis, self.schema)
+        self._puffer[self._fuellstand] = werte
+        self._farb_puffer[self._fuellstand] = farben
+        self._fuellstand += 1
+        self.anzahl += 1
+        return self.anzahl - 1
+
+    def speicher(self):
+        bloecke, farb_bloecke = list(self._bloecke), list(self._farb_bloecke)
+        if self._puffer is not None:
+            bloecke.append(self._puffer[:self._fuellstand])
+            farb_bloecke.append(self._farb_puffer[:self._fuellstand])
+        daten = np.ascontiguousarray(np.concatenate(bloecke).T) if bloecke else np.empty((len(self.schema.spalten), 0))
+        farben = np.ascontiguousarray(np.concatenate(farb_bloecke).T) if farb_bloecke else None
+        return ErgebnisSpalten(self.schema, daten, farben)
+
+
+class ErgebnisSpalten:
+    """
+    Spaltenorientierter Speicher für viele Analyse-Ergebnisse.
+
+    - Ein float64-Array je Kennzahl und Jahr (zusammen ein Block der Form
+      Spalten × Ergebnisse, jede Spalte liegt zusammenhängend im Speicher)
+    - Bezeichnungen und Tags stehen einmal im Schema
+    - Slices liefern Sichten ohne Kopie; Filter und Sortierung kopieren nur
+      die ausgewählten Zeilen
+    - ergebnis(i) baut bei Bedarf wieder das gewohnte Ergebnis-Dict
+    """
+
+    def __init__(self, schema, daten, farben=None):
+        self.schema = schema
+        self.daten = np.asarray(daten, dtype=np.float64)
+        if self.daten.ndim != 2 or self.daten.shape[0] != len(schema.spalten):
+            raise ValueError(f"Datenblock muss die Form ({len(schema.spalten)}, n) haben, nicht {self.daten.shape}.")
+        anzahl_farbig = sum(z.farbig for z in schema.zeilen)
+        self.farben = (np.zeros((anzahl_farbig, self.daten.shape[1]), dtype=np.int8)
+                       if farben is None else np.asarray(farben, dtype=np.int8))
+        self._index = {name: i for i, name in enumerate(schema.spalten)}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Aufbauen
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def aus_ergebnissen(cls, ergebnisse, schema=None):
+        """
+        Sammelt Ergebnis-Dicts (oder immo_core.AnalyseErgebnis) blockweise ein.
+        Es wird nie eine Liste aller Dicts gehalten; Ergebnisse mit 'error'
+        werden übersprungen.
+        """
+        sammler = None
+        for ergebnis in ergebnisse:
+            ergebnis = _als_dict(ergebnis)
+            if 'error' in ergebnis:
+                continue
+            if sammler is None:
+                sammler = _Sammler(schema or ErgebnisSchema.aus_ergebnis(ergebnis))
+            sammler.hinzufuegen(ergebnis)
+        if sammler is None:
+            if schema is None:
+                raise ValueError("Keine gültigen Ergebnisse zum Einsammeln.")
+            sammler = _Sammler(schema)
+        return sammler.speicher()
+
+    @classmethod
+    def aus_spalten(cls, schema, spalten):
+        """Für vektorisierte Rechnungen: Dict Spaltenname → Array (fehlende Spalten werden NaN)."""
+        anzahl = len(next(iter(spalten.values()))) if spalten else 0
+        daten = np.full((len(schema.spalten), anzahl), np.nan)
+        for i, name in enumerate(schema.spalten):
+            if name in spalten:
+                daten[i] = spalten[name]
+        return cls(schema, daten)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Zugriff
+    # ─────────────────────────────────────────────────────────────────────────
+    def __len__(self):
+        return self.daten.shape[1]
+
+    @property
+    def spalten(self):
+        return self.schema.spalten
+
+    @property
+    def nbytes(self):
+        return self.daten.nbytes + self.farben.nbytes
+
+    def spalte(self, kennzahl, jahr='laufende_jahre'):
+        """Sicht (keine Kopie) auf eine Spalte; kennzahl als voller Spaltenname oder Zeilenbezeichnung."""
+        i = self._index.get(kennzahl)
+        if i is None:
+            i = self._index.get(f"{kennzahl.strip()}|{jahr}")
+        if i is None:
+            raise KeyError(f"Unbekannte Kennzahl: '{kennzahl}'")
+        return self.daten[i]
+
+    def __getitem__(self, auswahl):
+        """
+        Ganzzahl → Ergebnis-Dict; Slice → Sicht; Bool-Maske oder Indexarray → Kopie der Auswahl.
+        """
+        if isinstance(auswahl, numbers.Integral):
+            return self.ergebnis(auswahl)
+        return ErgebnisSpalten(self.schema, self.daten[:, auswahl], self.farben[:, auswahl])
+
+    def filter(self, maske):
+        return self[np.asarray(maske, dtype=bool)]
+
+    def sortiere(self, kennzahl, jahr='laufende_jahre', absteigend=False):
+        reihenfolge = np.argsort(self.spalte(kennzahl, jahr), kind='stable')
+        return self[reihenfolge[::-1] if absteigend else reihenfolge]
+
+    def ergebnis(self, i):
+        """Rekonstruiert das Ergebnis-Dict für Zeile i (Format wie calculate_analytics)."""
+        n = len(self)
+        if not -n <= i < n:
+            raise IndexError(f"Ergebnis {i} außerhalb von 0…{n - 1}")
+        werte = iter(self.daten[:, i].tolist())
+        farben = iter(self.farben[:, i].tolist())
+        tabelle = []
+        for z in self.schema.zeilen:
+            val1, val2 = (next(werte), next(werte)) if z.hat_werte else (None, None)
+            tags = list(z.tags)
+            if z.farbig:
+                code = next(farben)
+                if code:
+                    tags.append(FARB_TAGS[code - 1])
+            zeile = {'kennzahl': z.kennzahl, 'val1': val1, 'val2': val2}
+            if self.schema.mit_tags:
+                zeile['tags'] = tags
+            tabelle.append(zeile)
+        ergebnis = {'display_table': tabelle}
+        einheiten = dict(self.schema.einheiten)
+        for name, wert in zip(self.schema.skalare, werte):
+            if name in einheiten:
+                ergebnis.setdefault('kpi_table', []).append(
+                    {'Kennzahl': name.split(':', 1)[1], 'Wert': _kpi_text(wert, einheiten[name])})
+            elif ':' in name:
+                gruppe, schluessel = name.split(':', 1)
+                ergebnis.setdefault(gruppe, {})[schluessel] = wert
+            else:
+                ergebnis[name] = wert
+        return ergebnis
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Übergabe an NumPy / Arrow
+    # ─────────────────────────────────────────────────────────────────────────
+    def als_numpy(self):
+        """Ergebnisse × Spalten als Sicht auf den Datenblock (keine Kopie)."""
+        return self.daten.T
+
+    def als_dict(self):
+        """Spaltenname → Array-Sicht (keine Kopie)."""
+        return {name: self.daten[i] for i, name in enumerate(self.schema.spalten)}
+
+    def als_arrow(self):
+        """pyarrow.Table; die float64-Spalten werden ohne Kopie übernommen."""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Für die Arrow-Übergabe wird das Paket 'pyarrow' benötigt.") from e
+        return pa.Table.from_arrays([pa.array(self.daten[i]) for i in range(self.daten.shape[0])],
+                                    names=list(self.schema.spalten))
+
+
+class ErgebnisGruppen:
+    """
+    Ergebnisse eines Batch-Laufs mit unterschiedlichen Detailtabellen (z.B.
+    Vermietung und Eigennutzung in einer Objektliste): ein ErgebnisSpalten je
+    Schema und je Eingabeposition die Gruppe und Zeile darin. Ergebnisse mit
+    'error' werden unverändert aufbewahrt.
+    """
+
+    def __init__(self, ergebnisse):
+        sammler, lage, self._fehler = {}, [], {}
+        for i, ergebnis in enumerate(ergebnisse):
+            ergebnis = _als_dict(ergebnis)
+            if 'error' in ergebnis:
+                self._fehler[i] = ergebnis
+                lage.append((-1, -1))
+                continue
+            schema = ErgebnisSchema.aus_ergebnis(ergebnis)
+            if schema not in sammler:
+                sammler[schema] = (len(sammler), _Sammler(schema))
+            gruppe, s = sammler[schema]
+            lage.append((gruppe, s.hinzufuegen(ergebnis)))
+        self.gruppen = [s.speicher() for _, s in sammler.values()]
+        self._gruppe = np.array([g for g, _ in lage], dtype=np.int32)
+        self._zeile = np.array([z for _, z in lage], dtype=np.int64)
+
+    def __len__(self):
+        return len(self._gruppe)
+
+    @property
+    def nbytes(self):
+        return sum(g.nbytes for g in self.gruppen) + self._gruppe.nbytes + self._zeile.nbytes
+
+    def ergebnis(self, i):
+        """Ergebnis-Dict der Eingabeposition i (wie calculate_analytics)."""
+        if i in self._fehler:
+            return self._fehler[i]
+        return self.gruppen[self._gruppe[i]].ergebnis(int(self._zeile[i]))
+
+    def tabellenwerte(self, i):
+        """Die Werte der Detailtabelle von Position i als '<Kennzahl>|<Jahr>' → float (fehlend: None)."""
+        if i in self._fehler:
+            return {}
+        speicher = self.gruppen[self._gruppe[i]]
+        anzahl = len(speicher.spalten) - len(speicher.schema.skalare)
+        werte = speicher.daten[:anzahl, self._zeile[i]].tolist()
+        return {name: None if np.isnan(w) else w for name, w in zip(speicher.spalten[:anzahl], werte)}
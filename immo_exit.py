@@ -0,0 +1,115 @@
+# immo_exit.py
+
+import numpy as np
+
+import immo_afa
+import immo_angebote
+import immo_finanzierung
+import immo_varianten
+
+# § 23 Abs. 1 Nr. 1 EStG: steuerpflichtig, wenn zwischen Anschaffung und Veräußerung "nicht mehr als
+# zehn Jahre" liegen. Die Haltedauer zählt ab dem Kaufdatum; der Verkauf "nach n Jahren" liegt genau
+# auf dem n-ten Jahrestag, Jahr 10 ist also noch steuerpflichtig, steuerfrei erst danach.
+SPEKULATIONSFRIST_JAHRE = 10
+FREIGRENZE_23 = 1000.0             # § 23 Abs. 3 EStG: Gewinne darunter bleiben steuerfrei
+VFE_FREI_NACH_JAHREN = 10          # § 489 Abs. 1 Nr. 2 BGB: danach Kündigung ohne Vorfälligkeitsentschädigung
+
+STANDARD_JAHRE = 30
+
+
+def _vorfaelligkeit(tranchen, plan, zinsbindung_jahre, zinsdifferenz_p, jahre):
+    """
+    Vorfälligkeitsentschädigung bei Ablösung am Ende jedes Jahres 1 … jahre
+    (Zinsschadensmethode): entgangene Zinsmarge auf die planmäßige Restschuld
+    bis zum Ende der Zinsbindung (höchstens VFE_FREI_NACH_JAHREN), abgezinst
+    mit der Wiederanlagerendite. Bausparkassen verlangen keine.
+    """
+    frei = int(min(zinsbindung_jahre, VFE_FREI_NACH_JAHREN) * 12)
+    zins = np.array([float(t.get('zins_p') or 0) for t in tranchen])
+    differenz = np.where([t.get('typ') == 'bauspar' for t in tranchen], 0.0, np.minimum(zinsdifferenz_p, zins))
+    v = 1 / (1 + (zins - differenz) / 1200)                                           # Abzinsung je Monat
+    stand = np.concatenate([plan['summe'][:, None], plan['restschuld'][:, :frei - 1]], axis=1) if frei else \
+        np.zeros((len(tranchen), 0))                                                    # Restschuld zu Monatsbeginn
+    m = np.arange(stand.shape[1])
+    barwert = np.concatenate([np.zeros((len(tranchen), 1)),
+                              np.cumsum(stand * differenz[:, None] / 1200 * v[:, None] ** m, axis=1)], axis=1)
+    verkauf = np.minimum(np.arange(1, jahre + 1) * 12, frei)                            # Monat der Ablösung
+    return ((barwert[:, -1:] - barwert[:, verkauf]) * v[:, None] ** -verkauf[None, :]).sum(axis=0)
+
+
+def exit_analyse(inputs, jahre=STANDARD_JAHRE, wertsteigerung_p=2.0, verkaufskosten_p=0.0,
+                 vfe_zinsdifferenz_p=1.0, ersparte_miete_pa=0.0):
+    """
+    Verkauf am Ende jedes Jahres 1 … jahre, alle Haltedauern in einem
+    Durchgang über die Jahresreihen.
+
+    - Verkaufspreis: Kaufpreis inkl. Stellplatz, fortgeschrieben mit
+      wertsteigerung_p (Zahl oder Pfad mit einem Wert je Jahr)
+    - Restschuld und Kapitaldienst aus dem Tranchenplan (Zins bleibt nach der
+      Zinsbindung gleich), Vorfälligkeitsentschädigung innerhalb der Zinsbindung
+    - Vermietung: laufende Steuer aus AfA-Plan und Zinsen (immo_afa.steuerzeilen);
+      bei Verkauf innerhalb der Spekulationsfrist (Haltedauer ab Kaufdatum
+      höchstens SPEKULATIONSFRIST_JAHRE, Verkauf am n-ten Jahrestag) wird der
+      Gewinn über dem Restbuchwert versteuert, die genutzte AfA also zurückgeholt
+    - Eigennutzung: steuerfrei, Cashflow = −Kosten + ersparte_miete_pa
+
+    Ergebnis: Arrays je Haltedauer (jahre, verkaufspreis, restschuld,
+    vorfaelligkeit, buchwert, veraeusserungsgewinn, spekulationssteuer,
+    nettoerloes, cashflow, gesamtergebnis, irr_p) und 'bestes_jahr' (höchster
+    IRR; None ohne Eigenkapital oder wenn für keine Haltedauer ein IRR
+    bestimmbar ist, etwa weil alle Zahlungen negativ sind).
+    """
+    if jahre < 1:
+        raise ValueError("Die Haltedauer muss mindestens 1 Jahr betragen.")
+    werte = immo_varianten.berechne_varianten(inputs)
+    vermietung = inputs.get('nutzungsart') == 'Vermietung'
+    n = np.arange(1, jahre + 1)
+
+    wachstum = np.broadcast_to(np.asarray(wertsteigerung_p, dtype=np.float64), (jahre,))
+    basiswert = inputs.get('kaufpreis', 0) + inputs.get('garage_stellplatz_kosten', 0)
+    verkaufspreis = basiswert * np.cumprod(1 + wachstum / 100)
+    verkaufskosten = verkaufspreis * verkaufskosten_p / 100
+
+    tranchen = immo_varianten.tranchen(inputs, werte)
+    zinsbindung = inputs.get('zinsbindung') or 10
+    plan = immo_finanzierung.berechne_tranchen(tranchen, monate=int(max(jahre, min(zinsbindung, VFE_FREI_NACH_JAHREN)) * 12))
+    jahr = immo_finanzierung.jahreswerte(plan, jahre)
+    vorfaelligkeit = _vorfaelligkeit(tranchen, plan, zinsbindung, vfe_zinsdifferenz_p, jahre)
+
+    cashflow = float(werte['bewirtschaftung_pa']) - jahr['rate']
+    if vermietung:
+        afa = immo_afa.afa_plan(inputs, jahre)
+        zeilen = immo_afa.steuerzeilen(werte['einnahmen_pa'], werte['werbungskosten_pa'], jahr['zinsen'],
+                                       afa['afa_summe'], inputs.get('steuersatz', 0), float(werte['nebenkosten_summe']))
+        cashflow = cashflow + zeilen['steuer']
+        # Anschaffungskosten: Boden, Stellplatz und die aktivierten AfA-Komponenten (Kaufnebenkosten sind
+        # wie in der Detailtabelle im Jahr 1 abgesetzt); Erhaltungsaufwand zählt nicht dazu
+        aktiviert = [k['methode'] != 'verteilt' for k in immo_afa.komponenten(inputs)]
+        buchwert = (inputs.get('kaufpreis', 0) * (1 - inputs.get('gebaeude_anteil_prozent', 80) / 100)
+                    + inputs.get('garage_stellplatz_kosten', 0) + afa['restbuchwert'][aktiviert].sum(axis=0))
+        gewinn = verkaufspreis - verkaufskosten - buchwert
+        steuerpflichtig = (n <= SPEKULATIONSFRIST_JAHRE) & (gewinn >= FREIGRENZE_23)
+        steuer = np.where(steuerpflichtig, gewinn * inputs.get('steuersatz', 0) / 100, 0.0)
+    else:
+        cashflow = cashflow + ersparte_miete_pa
+        buchwert = np.full(jahre, float(basiswert))
+        gewinn = verkaufspreis - verkaufskosten - buchwert
+        steuer = np.zeros(jahre)
+
+    nettoerloes = verkaufspreis - verkaufskosten - jahr['restschuld'] - vorfaelligkeit - steuer
+    eigenkapital = float(inputs.get('eigenkapital', 0) or 0)
+
+    # Zahlungsreihe je Haltedauer (Zeilen) über die Jahre 0 … jahre (Spalten)
+    gehalten = n[None, :] <= n[:, None]
+    zahlungen = np.concatenate([np.full((jahre, 1), -eigenkapital), np.where(gehalten, cashflow[None, :], 0.0)], axis=1)
+    zahlungen[n - 1, n] += nettoerloes
+    irr = immo_angebote.interner_zins(zahlungen, perioden_pro_jahr=1) * 100 if eigenkapital > 0 else np.full(jahre, np.nan)
+
+    return {
+        'jahre': n, 'verkaufspreis': verkaufspreis, 'verkaufskosten': verkaufskosten,
+        'restschuld': jahr['restschuld'], 'vorfaelligkeit': vorfaelligkeit,
+        'buchwert': buchwert, 'veraeusserungsgewinn': gewinn, 'spekulationssteuer': steuer,
+        'nettoerloes': nettoerloes, 'cashflow': cashflow, 'cashflow_kumuliert': np.cumsum(cashflow),
+        'gesamtergebnis': np.cumsum(cashflow) + nettoerloes - eigenkapital, 'irr_p': irr,
+        'bestes_jahr': int(n[np.nanargmax(irr)]) if np.isfinite(irr).any() else None,
+    }
@@ -0,0 +1,230 @@
+# immo_export.py
+
+import csv
+import io
+import itertools
+import math
+import os
+
+import immo_finanzierung
+
+EXPORT_FORMATE = ('csv', 'xlsx', 'parquet')
+
+# Spalten mit Arrow-Typ (für Parquet; CSV und XLSX nutzen nur die Namen)
+TILGUNGSPLAN_SPALTEN = {'darlehen': 'string', 'monat': 'int64', 'jahr': 'int64', 'rate': 'float64',
+                        'zinsen': 'float64', 'tilgung': 'float64', 'restschuld': 'float64'}
+ERGEBNIS_SPALTEN = {'kennzahl': 'string', 'jahr_1': 'float64', 'laufende_jahre': 'float64'}
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ZEILEN-GENERATOREN
+# ═════════════════════════════════════════════════════════════════════════════
+def iter_tilgungsplan(summe, zins_p, monatsrate, darlehen='Darlehen I', max_monate=600,
+                      tilgungsfrei_monate=0, endfaellig_nach=None):
+    """
+    Erzeugt den Tilgungsplan eines Annuitätendarlehens Monat für Monat.
+    Es wird nie der komplette Plan im Speicher gehalten; der Generator endet,
+    sobald das Darlehen getilgt ist oder max_monate erreicht sind.
+    In den tilgungsfreien Monaten werden nur Zinsen gezahlt; ein endfälliges
+    Darlehen wird im Monat endfaellig_nach auf einmal getilgt.
+    """
+    restschuld = float(summe)
+    mon_zins = zins_p / 100 / 12
+    monat = 0
+    while restschuld > 0.005 and monat < max_monate:
+        monat += 1
+        zinsen = restschuld * mon_zins
+        if monat <= tilgungsfrei_monate or (endfaellig_nach is not None and monat < endfaellig_nach):
+            tilgung = 0.0
+        elif endfaellig_nach is not None:
+            tilgung = restschuld
+        else:
+            tilgung = min(max(monatsrate - zinsen, 0.0), restschuld)
+        restschuld -= tilgung
+        yield {
+            'darlehen': darlehen,
+            'monat': monat,
+            'jahr': (monat - 1) // 12 + 1,
+            'rate': zinsen + tilgung,
+            'zinsen': zinsen,
+            'tilgung': tilgung,
+            'restschuld': restschuld,
+        }
+
+
+def iter_tilgungsplaene(darlehen_liste, max_monate=600):
+    """
+    Batch-Pfad: verkettet die Tilgungspläne beliebig vieler Darlehen zu einem
+    einzigen Zeilenstrom. Jedes Element braucht 'summe' und 'zins_p' sowie
+    'monatsrate' oder die Angaben einer Tranche wie in immo_finanzierung
+    (tilgung_p oder laufzeit_jahre, typ, tilgungsfrei_jahre). Bezeichnung
+    aus 'darlehen' oder 'name'.
+    """
+    for i, d in enumerate(darlehen_liste, start=1):
+        monatsrate = d.get('monatsrate')
+        if monatsrate is None:
+            monatsrate = float(immo_finanzierung.berechne_tranchen([d], monate=0)['monatsrate_start'][0])
+        endfaellig_nach = None
+        if d.get('typ') == 'endfaellig':
+            endfaellig_nach = round(d['laufzeit_jahre'] * 12) if d.get('laufzeit_jahre') else math.inf
+        yield from iter_tilgungsplan(d['summe'], d['zins_p'], monatsrate,
+                                     d.get('darlehen') or d.get('name') or f"Darlehen {i}", max_monate,
+                                     tilgungsfrei_monate=round((d.get('tilgungsfrei_jahre') or 0) * 12),
+                                     endfaellig_nach=endfaellig_nach)
+
+
+def iter_ergebnis_zeilen(results):
+    """Wandelt die display_table eines Analyse-Ergebnisses in Exportzeilen um (ohne Titel/Trenner)."""
+    for row in results.get('display_table', []):
+        if 'title' in row.get('tags', []) or 'separator' in row.get('tags', []):
+            continue
+        yield {'kennzahl': row['kennzahl'].strip(), 'jahr_1': row.get('val1'), 'laufende_jahre': row.get('val2')}
+
+# ═════════════════════════════════════════════════════════════════════════════
+# WRITER
+# ═════════════════════════════════════════════════════════════════════════════
+def _spalten_und_zeilen(zeilen, spalten):
+    """
+    Bestimmt die Spalten aus der ersten Zeile, ohne den Generator zu verbrauchen.
+    spalten: Liste der Namen oder Dict Name → Arrow-Typ ('string', 'int64', 'float64').
+    """
+    zeilen = iter(zeilen)
+    if spalten is None:
+        erste = next(zeilen, None)
+        if erste is None:
+            return [], iter(())
+        spalten = list(erste.keys())
+        zeilen = itertools.chain([erste], zeilen)
+    return list(spalten), zeilen
+
+
+def schreibe_csv(ziel, zeilen, spalten=None, trennzeichen=','):
+    """
+    Schreibt Zeilen (Dicts) als CSV. ziel ist ein Pfad oder ein Binär-/Textstream.
+    Es wird zeilenweise geschrieben; der Speicherbedarf ist unabhängig von der Zeilenzahl.
+    """
+    spalten, zeilen = _spalten_und_zeilen(zeilen, spalten)
+    if isinstance(ziel, (str, os.PathLike)):
+        with open(ziel, 'w', newline='', encoding='utf-8') as f:
+            return _schreibe_csv_stream(f, zeilen, spalten, trennzeichen)
+    if isinstance(ziel, io.TextIOBase):
+        return _schreibe_csv_stream(ziel, zeilen, spalten, trennzeichen)
+    text = io.TextIOWrapper(ziel, encoding='utf-8', newline='')
+    try:
+        return _schreibe_csv_stream(text, zeilen, spalten, trennzeichen)
+    finally:
+        text.detach()
+
+
+def _schreibe_csv_stream(f, zeilen, spalten, trennzeichen):
+    writer = csv.DictWriter(f, fieldnames=spalten, delimiter=trennzeichen, extrasaction='ignore')
+    writer.writeheader()
+    anzahl = 0
+    for zeile in zeilen:
+        writer.writerow(zeile)
+        anzahl += 1
+    f.flush()
+    return anzahl
+
+
+def schreibe_xlsx(ziel, zeilen, spalten=None, blatt='Export'):
+    """
+    Schreibt Zeilen als XLSX im write-only-Modus von openpyxl (Zeilen werden
+    direkt auf die Platte gestreamt statt als Zellobjekte gehalten).
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ImportError("Für den XLSX-Export wird das Paket 'openpyxl' benötigt.") from e
+    spalten, zeilen = _spalten_und_zeilen(zeilen, spalten)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=blatt[:31])
+    ws.append(spalten)
+    anzahl = 0
+    for zeile in zeilen:
+        ws.append([zeile.get(s) for s in spalten])
+        anzahl += 1
+    wb.save(ziel)
+    return anzahl
+
+
+def _parquet_schema(pa, spalten, typen, batch):
+    """
+    Festes Schema der Datei: aus den Spaltentypen oder, ohne Typen, aus dem
+    ersten Batch. Dort leere und ganzzahlige Spalten werden als float64
+    angelegt, damit spätere Batches mit Kommazahlen hineinpassen.
+    """
+    if typen:
+        return pa.schema([(s, pa.type_for_alias(typen[s])) for s in spalten])
+    felder = pa.Table.from_pydict({s: [z.get(s) for z in batch] for s in spalten}).schema
+    return pa.schema([(f.name, pa.float64() if pa.types.is_null(f.type) or pa.types.is_integer(f.type) else f.type)
+                      for f in felder])
+
+
+def schreibe_parquet(ziel, zeilen, spalten=None, batch_groesse=65536):
+    """
+    Schreibt Zeilen spaltenorientiert als Parquet. Es werden immer nur
+    batch_groesse Zeilen als Arrow-RecordBatch gepuffert und dann als
+    Row-Group geschrieben; jeder Batch wird in das Schema der Datei
+    umgewandelt (siehe _parquet_schema).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Für den Parquet-Export wird das Paket 'pyarrow' benötigt.") from e
+    typen = spalten if isinstance(spalten, dict) else None
+    spalten, zeilen = _spalten_und_zeilen(zeilen, spalten)
+    schema = writer = None
+    anzahl = 0
+    try:
+        while True:
+            batch = list(itertools.islice(zeilen, batch_groesse))
+            if not batch:
+                break
+            if writer is None:
+                schema = _parquet_schema(pa, spalten, typen, batch)
+                writer = pq.ParquetWriter(ziel, schema)
+            writer.write_table(pa.Table.from_pydict({s: [z.get(s) for z in batch] for s in spalten}, schema=schema))
+            anzahl += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        schema = _parquet_schema(pa, spalten, typen, []) if typen else pa.schema([(s, pa.null()) for s in spalten])
+        pq.write_table(schema.empty_table(), ziel)
+    return anzahl
+
+
+def exportiere(ziel, zeilen, format=None, spalten=None, blatt='Export'):
+    """
+    Schreibt einen Zeilenstrom im gewünschten Format. Ohne format wird es aus
+    der Dateiendung von ziel bestimmt.
+    """
+    if format is None:
+        format = os.path.splitext(str(ziel))[1].lstrip('.').lower()
+    if format == 'csv':
+        return schreibe_csv(ziel, zeilen, spalten)
+    if format == 'xlsx':
+        return schreibe_xlsx(ziel, zeilen, spalten, blatt)
+    if format == 'parquet':
+        return schreibe_parquet(ziel, zeilen, spalten)
+    raise ValueError(f"Unbekanntes Exportformat: '{format}' (erlaubt: {', '.join(EXPORT_FORMATE)})")
+
+
+def exportiere_bytes(zeilen, format, spalten=None, blatt='Export'):
+    """Wie exportiere(), liefert die Datei aber als Bytes (z.B. für Download-Buttons)."""
+    puffer = io.BytesIO()
+    exportiere(puffer, zeilen, format, spalten, blatt)
+    return puffer.getvalue()
+
+
+def verfuegbare_formate():
+    """Formate, deren optionale Abhängigkeiten installiert sind."""
+    formate = ['csv']
+    for format, modul in (('xlsx', 'openpyxl'), ('parquet', 'pyarrow')):
+        try:
+            __import__(modul)
+            formate.append(format)
+        except ImportError:
+            pass
+    return formate
@@ -0,0 +1,122 @@
+# immo_finanzierung.py
+
+import numpy as np
+
+# Tranchentypen: alle außer 'endfaellig' werden als Annuität (ggf. mit
+# tilgungsfreien Anlaufjahren) gerechnet; die Typen dienen der Beschriftung.
+TRANCHEN_TYPEN = {
+    'annuitaet':  "Annuitätendarlehen (Bank)",
+    'kfw':        "KfW-Förderdarlehen",
+    'bauspar':    "Bauspardarlehen",
+    'endfaellig': "Endfälliges Darlehen",
+}
+
+STANDARD_MONATE = 40 * 12
+
+
+def verteile_darlehensbedarf(darlehensbedarf, tranchen):
+    """
+    Setzt fehlende Summen: Tranchen ohne 'summe' teilen sich den Betrag, der nach
+    Abzug der fest vorgegebenen Tranchen vom Darlehensbedarf übrig bleibt.
+    Die übergebenen Dicts werden nicht verändert.
+    """
+    tranchen = [dict(t) for t in tranchen]
+    fest = sum(t['summe'] for t in tranchen if t.get('summe') is not None)
+    offen = [t for t in tranchen if t.get('summe') is None]
+    for t in offen:
+        t['summe'] = max(darlehensbedarf - fest, 0) / len(offen)
+    return tranchen
+
+
+def _monatsraten(summe, r, tilgung_p, monatsrate, laufzeit_monate, tilgungsfrei_monate):
+    """Annuität je Tranche: explizite Rate > Anfangstilgung > Laufzeit (nach den tilgungsfreien Monaten)."""
+    n = np.maximum(laufzeit_monate - tilgungsfrei_monate, 1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        q = (1 + r) ** n
+        nach_laufzeit = np.where(r > 0, summe * r * q / (q - 1), summe / n)
+    nach_tilgung = summe * (r + tilgung_p / 1200)
+    return np.where(~np.isnan(monatsrate), monatsrate,
+                    np.where(~np.isnan(tilgung_p), nach_tilgung, nach_laufzeit))
+
+
+def berechne_tranchen(tranchen, monate=None):
+    """
+    Berechnet den Monatsplan aller Tranchen in einem Schritt (Arrays T × M).
+
+    Jede Tranche ist ein Dict mit:
+    - summe, zins_p, typ (siehe TRANCHEN_TYPEN, Standard 'annuitaet')
+    - tilgung_p (Anfangstilgung) oder monatsrate oder laufzeit_jahre
+    - tilgungsfrei_jahre (Anlaufjahre: nur Zinsen), laufzeit_jahre für 'endfaellig'
+
+    Die Restschuld folgt der geschlossenen Annuitätenformel
+    B_k = B_0·q^a − R·(q^a − 1)/r mit a = Monate nach den tilgungsfreien Jahren,
+    daher gibt es keine Schleife über die Monate.
+    """
+    anzahl = len(tranchen)
+    feld = lambda key, std=np.nan: np.array(
+        [std if t.get(key) is None else float(t[key]) for t in tranchen], dtype=np.float64)
+    summe = feld('summe', 0.0)
+    r = feld('zins_p', 0.0) / 1200
+    tilgungsfrei = feld('tilgungsfrei_jahre', 0.0) * 12
+    laufzeit = feld('laufzeit_jahre') * 12
+    endfaellig = np.array([t.get('typ', 'annuitaet') == 'endfaellig' for t in tranchen], dtype=bool)
+    rate = _monatsraten(summe, r, feld('tilgung_p'), feld('monatsrate'),
+                        np.nan_to_num(laufzeit, nan=30 * 12), tilgungsfrei)
+    rate = np.where(endfaellig, summe * r, rate)
+
+    if monate is None:
+        monate = int(np.nanmax(np.append(laufzeit, STANDARD_MONATE))) if anzahl else 0
+    k = np.arange(monate + 1, dtype=np.float64)[None, :]            # Monat 0 … M
+    a = np.maximum(k - tilgungsfrei[:, None], 0)                     # Tilgungsmonate
+    r_ = r[:, None]
+    with np.errstate(over='ignore', invalid='ignore'):
+        q = (1 + r_) ** a
+        annuitaet = np.where(r_ > 0, summe[:, None] * q - rate[:, None] * (q - 1) / np.where(r_ > 0, r_, 1),
+                             summe[:, None] - rate[:, None] * a)
+    annuitaet = np.clip(annuitaet, 0, None)
+    bullet = np.where(k < np.nan_to_num(laufzeit, nan=np.inf)[:, None], summe[:, None], 0.0)
+    restschuld = np.where(endfaellig[:, None], bullet, annuitaet)
+
+    zinsen = restschuld[:, :-1] * r_
+    tilgung = restschuld[:, :-1] - restschuld[:, 1:]
+    return {
+        'namen': [t.get('name') or TRANCHEN_TYPEN.get(t.get('typ', 'annuitaet'), 'Darlehen') for t in tranchen],
+        'summe': summe,
+        'monatsrate_start': rate,
+        'zinsen': zinsen,
+        'tilgung': tilgung,
+        'rate': zinsen + tilgung,
+        'restschuld': restschuld[:, 1:],
+    }
+
+
+def jahreswerte(plan, jahre=None):
+    """
+    Verdichtet den Monatsplan auf Jahre (summiert über alle Tranchen).
+    Liefert Arrays je Jahr: zinsen, tilgung, rate und restschuld zum Jahresende.
+    """
+    monate = plan['zinsen'].shape[1]
+    jahre = jahre or monate // 12
+    schnitt = lambda x: x.sum(axis=0)[:jahre * 12].reshape(jahre, 12)
+    return {
+        'zinsen': schnitt(plan['zinsen']).sum(axis=1),
+        'tilgung': schnitt(plan['tilgung']).sum(axis=1),
+        'rate': schnitt(plan['rate']).sum(axis=1),
+        'restschuld': plan['restschuld'].sum(axis=0)[11:jahre * 12:12],
+    }
+
+
+def finanzierung_jahr1(tranchen, darlehensbedarf):
+    """
+    Kurzform für die Cashflow- und Steuerzeilen: Zinsen, Tilgung und
+    Kapitaldienst des ersten Jahres über alle Tranchen.
+    """
+    tranchen = verteile_darlehensbedarf(darlehensbedarf, tranchen)
+    jahr = jahreswerte(berechne_tranchen(tranchen, monate=12), jahre=1)
+    return {
+        'tranchen': tranchen,
+        'zinsen_pa': float(jahr['zinsen'][0]),
+        'tilgung_pa': float(jahr['tilgung'][0]),
+        'rate_pa': float(jahr['rate'][0]),
+        'darlehen_summe': float(sum(t['summe'] for t in tranchen)),
+    }
@@ -0,0 +1,13 @@
+# immo_format.py
+
+import functools
+
+# Deutsche Zahlendarstellung (1.234,56) für Seite, PDF und Stresskatalog;
+# ohne Streamlit-Abhängigkeit, damit auch Rechenmodule sie verwenden können.
+_DE_ZEICHEN = str.maketrans(",.", ".,")
+
+
+@functools.lru_cache(maxsize=8192)
+def de_zahl(f, d):
+    """Formatiert einmal je (Wert, Stellen); Detailtabelle, Kennzahlen und PDF wiederholen dieselben Beträge."""
+    return f"{f:,.{d}f}".translate(_DE_ZEICHEN)
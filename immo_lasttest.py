@@ -0,0 +1,329 @@
+# immo_lasttest.py
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+import immo_latenz
+
+# Lasttest gegen einen lokalen Streamlit-Prozess: jede simulierte Sitzung
+# spricht wie ein Browser über den Websocket (/_stcore/stream) mit dem Server,
+# ändert Eingaben, rechnet und lädt PDF-Berichte herunter.
+
+STANDARD_PORT = 8599
+STANDARD_SKRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'immo_streamlit_app.py')
+ZEITLIMIT_S = 120
+
+# Eingaben, die eine Sitzung zufällig verändert (Beschriftung wie auf der Seite)
+EINGABEN = ("Kaufpreis (€)", "Eigenkapital (€)", "Wohnfläche (m²)", "Zins (%)", "Kaltmiete mtl. (€)")
+SCHALTFLAECHE_ANALYSE = "Analyse berechnen"
+SCHALTFLAECHE_PDF_ERSTELLEN = "PDF-Bericht erstellen"
+SCHALTFLAECHE_PDF = "PDF-Bericht herunterladen"
+
+_TAKT = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SERVER
+# ═════════════════════════════════════════════════════════════════════════════
+def starte_server(port=STANDARD_PORT, skript=STANDARD_SKRIPT, zeitlimit_s=60):
+    """
+    Startet `streamlit run` headless auf localhost und wartet, bis der
+    Health-Check antwortet. Ergebnis: der Prozess (subprocess.Popen).
+    """
+    prozess = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', skript, '--server.headless', 'true',
+         '--server.address', '127.0.0.1', '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ende = time.monotonic() + zeitlimit_s
+    while time.monotonic() < ende:
+        if prozess.poll() is not None:
+            raise RuntimeError(f"Streamlit-Server wurde beendet (Exit-Code {prozess.returncode}).")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as antwort:
+                if antwort.status == 200:
+                    return prozess
+        except OSError:
+            time.sleep(0.2)
+    prozess.terminate()
+    raise RuntimeError(f"Streamlit-Server antwortet nicht auf Port {port}.")
+
+
+def prozesswerte(pid):
+    """CPU-Zeit (s, Nutzer + System) und Arbeitsspeicher (RSS, Bytes) eines Prozesses aus /proc (Linux)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            felder = f.read().rsplit(')', 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_seiten = int(f.read().split()[1])
+    except OSError:
+        return None, None
+    return (int(felder[11]) + int(felder[12])) / _TAKT, rss_seiten * os.sysconf('SC_PAGE_SIZE')
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SITZUNG (Websocket-Client)
+# ═════════════════════════════════════════════════════════════════════════════
+class Sitzung:
+    """
+    Eine Browser-Sitzung ohne Browser: schickt Reruns mit Widget-Zuständen und
+    liest die Antworten bis zum Ende des Skriptlaufs. Gemerkt werden die
+    zuletzt gesehenen Widgets (nach Beschriftung) und die selbst gesetzten
+    Werte, die wie im Browser bei jedem Rerun mitgeschickt werden.
+    """
+
+    def __init__(self, ws, basis_url):
+        self._ws = ws
+        self._basis_url = basis_url
+        self._zwischenspeicher = {}      # Hash → ForwardMsg (Server schickt Wiederholungen nur als Verweis)
+        self._werte = {}                 # Widget-ID → WidgetState
+        self.session_id = None
+        self.widgets = {}                # Beschriftung → Widget-Proto
+        self._fragmente = {}             # Beschriftung → ID des Fragments, in dem das Widget steht
+        self.fehler = []
+
+    async def _empfange(self):
+        nachricht = ForwardMsg()
+        nachricht.ParseFromString(await self._ws.recv())
+        if nachricht.hash:
+            self._zwischenspeicher[nachricht.hash] = nachricht
+        if nachricht.WhichOneof('type') == 'ref_hash':
+            nachricht = self._zwischenspeicher[nachricht.ref_hash]
+        return nachricht
+
+    async def rerun(self, ausloeser=None, fragment_id=""):
+        """
+        Ein Skriptlauf; ausloeser ist die ID einer geklickten Schaltfläche.
+        Mit fragment_id läuft wie im Browser nur dieses Fragment, dessen
+        Widgets dann die bisher gesehenen ergänzen.
+        """
+        nachricht = BackMsg()
+        nachricht.rerun_script.query_string = ""
+        nachricht.rerun_script.fragment_id = fragment_id
+        zustaende = list(self._werte.values())
+        if ausloeser:
+            zustaende.append(WidgetState(id=ausloeser, trigger_value=True))
+        nachricht.rerun_script.widget_states.widgets.extend(zustaende)
+        await self._ws.send(nachricht.SerializeToString())
+
+        widgets, fragmente = {}, {}
+        while True:
+            antwort = await self._empfange()
+            art = antwort.WhichOneof('type')
+            if art == 'new_session':
+                self.session_id = antwort.new_session.initialize.session_id or self.session_id
+            elif art == 'delta' and antwort.delta.WhichOneof('type') == 'new_element':
+                element = antwort.delta.new_element
+                typ = element.WhichOneof('type')
+                inhalt = getattr(element, typ)
+                if typ == 'exception':
+                    self.fehler.append(inhalt.message)
+                elif getattr(inhalt, 'id', '') and getattr(inhalt, 'label', ''):
+                    widgets[inhalt.label] = inhalt
+                    fragmente[inhalt.label] = antwort.delta.fragment_id
+            elif art == 'script_finished' and antwort.script_finished in (ForwardMsg.FINISHED_SUCCESSFULLY,
+                                                                          ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+                                                                          ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                break
+        if fragment_id:
+            self.widgets.update(widgets)
+            self._fragmente.update(fragmente)
+        else:
+            self.widgets, self._fragmente = widgets, fragmente
+
+    def widget(self, beschriftung):
+        """Zuletzt gesehenes Widget, dessen Beschriftung beschriftung enthält."""
+        for b, w in self.widgets.items():
+            if beschriftung in b:
+                return b, w
+        raise RuntimeError(f"Kein Widget „{beschriftung}“ auf der Seite (gesehen: {', '.join(self.widgets) or 'keine'}).")
+
+    async def setze(self, beschriftung, wert):
+        """Zahlenfeld setzen (wie eine Eingabe im Browser) und neu laufen lassen."""
+        widget = self.widgets[beschriftung]
+        zustand = WidgetState(id=widget.id)
+        if widget.data_type == widget.INT:
+            zustand.int_value = int(round(wert))
+        else:
+            zustand.double_value = float(wert)
+        self._werte[widget.id] = zustand
+        await self.rerun()
+
+    async def klicke(self, beschriftung):
+        """Schaltfläche klicken; in einem Fragment läuft nur das Fragment neu."""
+        b, widget = self.widget(beschriftung)
+        await self.rerun(ausloeser=widget.id, fragment_id=self._fragmente.get(b, ""))
+
+    async def lade_herunter(self, beschriftung):
+        """Download-Schaltfläche: Datei (auch verzögert erzeugte) anfordern und abholen. Ergebnis: Bytes."""
+        _, widget = self.widget(beschriftung)
+        url = widget.url
+        if widget.deferred_file_id:
+            anfrage = BackMsg()
+            anfrage.backend_operation_request.request_id = uuid.uuid4().hex
+            anfrage.backend_operation_request.session_id = self.session_id or ""
+            anfrage.backend_operation_request.deferred_file.file_id = widget.deferred_file_id
+            await self._ws.send(anfrage.SerializeToString())
+            while True:
+                antwort = await self._empfange()
+                if antwort.WhichOneof('type') == 'backend_operation_response':
+                    break
+            if antwort.backend_operation_response.error_msg:
+                raise RuntimeError(antwort.backend_operation_response.error_msg)
+            url = antwort.backend_operation_response.deferred_file.url
+        return await asyncio.to_thread(lambda: urllib.request.urlopen(self._basis_url + url, timeout=ZEITLIMIT_S).read())
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ABLAUF
+# ═════════════════════════════════════════════════════════════════════════════
+async def _ablauf(nr, host, messung, runden, pdf_alle, denkzeit_s, anlauf_s, zufall):
+    """
+    Eine simulierte Beraterin: Seite laden, dann je Runde eine Eingabe ändern
+    und rechnen, jede pdf_alle-te Runde den PDF-Bericht erstellen und laden. Zwischen den
+    Schritten liegt eine zufällige Denkzeit (0,5- bis 1,5-fach).
+    """
+    await asyncio.sleep(anlauf_s * nr)
+    ergebnis = {'sitzung': nr + 1, 'schritte': 0, 'fehler': []}
+
+    async def schritt(abschnitt, aufruf):
+        start = time.perf_counter()
+        await asyncio.wait_for(aufruf, ZEITLIMIT_S)
+        messung.erfasse(abschnitt, time.perf_counter() - start)
+        ergebnis['schritte'] += 1
+        if denkzeit_s:
+            await asyncio.sleep(denkzeit_s * zufall.uniform(0.5, 1.5))
+
+    try:
+        async with websockets.connect(f"ws://{host}/_stcore/stream", max_size=None) as ws:
+            sitzung = Sitzung(ws, f"http://{host}")
+            await schritt('Seite laden', sitzung.rerun())
+            for runde in range(runden):
+                feld = zufall.choice([e for e in EINGABEN if e in sitzung.widgets])
+                widget = sitzung.widgets[feld]
+                wert = widget.default * zufall.uniform(0.8, 1.2)
+                wert = min(max(wert, widget.min if widget.has_min else wert), widget.max if widget.has_max else wert)
+                await schritt('Eingabe ändern', sitzung.setze(feld, wert))
+                await schritt('Analyse berechnen', sitzung.klicke(SCHALTFLAECHE_ANALYSE))
+                if pdf_alle and (runde + 1) % pdf_alle == 0:
+                    await schritt('PDF erstellen', sitzung.klicke(SCHALTFLAECHE_PDF_ERSTELLEN))
+                    await schritt('PDF-Download', sitzung.lade_herunter(SCHALTFLAECHE_PDF))
+            ergebnis['fehler'] = sitzung.fehler
+    except Exception as e:   # Sitzung bricht ab, die anderen laufen weiter
+        ergebnis['fehler'].append(f"{type(e).__name__}: {e}")
+    return ergebnis
+
+
+async def _lastlauf(host, sitzungen, pid, **ablauf):
+    messung = immo_latenz.LatenzMessung(max_messungen=10**6)
+    spitze = {'rss': 0}
+    cpu_vorher, rss_vorher = prozesswerte(pid) if pid else (None, None)
+
+    async def beobachte():
+        while True:
+            _, rss = prozesswerte(pid)
+            spitze['rss'] = max(spitze['rss'], rss or 0)
+            await asyncio.sleep(0.2)
+
+    beobachter = asyncio.create_task(beobachte()) if pid else None
+    start = time.perf_counter()
+    ergebnisse = await asyncio.gather(*(_ablauf(nr, host, messung, zufall=random.Random(nr), **ablauf)
+                                        for nr in range(sitzungen)))
+    dauer = time.perf_counter() - start
+    if beobachter:
+        beobachter.cancel()
+    cpu_nachher, rss_nachher = prozesswerte(pid) if pid else (None, None)
+
+    schritte = sum(e['schritte'] for e in ergebnisse)
+    return {
+        'sitzungen': sitzungen, 'dauer_s': dauer, 'schritte': schritte, 'schritte_je_s': schritte / dauer,
+        'abschnitte': messung.zusammenfassung(),
+        'cpu_s_je_sitzung': (cpu_nachher - cpu_vorher) / sitzungen if pid and cpu_nachher is not None else None,
+        'cpu_auslastung_p': (cpu_nachher - cpu_vorher) / dauer * 100 if pid and cpu_nachher is not None else None,
+        'rss_mb': rss_nachher / 2**20 if rss_nachher else None,
+        'rss_mb_je_sitzung': max(spitze['rss'] - rss_vorher, 0) / 2**20 / sitzungen if pid and rss_vorher else None,
+        'fehler': [f"Sitzung {e['sitzung']}: {f}" for e in ergebnisse for f in e['fehler']],
+    }
+
+
+def lasttest(stufen, port=STANDARD_PORT, server=None, pid=None, runden=5, pdf_alle=2, denkzeit_s=1.0, anlauf_s=0.1):
+    """
+    Lasttest mit steigender Zahl gleichzeitiger Sitzungen (stufen, z.B.
+    (1, 5, 10, 20)) gegen einen Streamlit-Prozess auf localhost.
+
+    - server=None: startet immo_streamlit_app.py auf port und beendet ihn danach;
+      sonst Adresse eines laufenden Servers ('127.0.0.1:8501'), CPU und
+      Speicher nur mit pid
+    - vor der ersten Stufe läuft eine Sitzung mit einer Runde samt PDF (Aufwärmen)
+    - je Stufe starten die Sitzungen im Abstand anlauf_s und laufen gleichzeitig
+
+    Ergebnis: je Stufe Laufzeiten je Schritt (Median, 95-%-Quantil, Maximum in
+    ms, wie immo_latenz), Durchsatz, CPU-Sekunden und zusätzlicher
+    Arbeitsspeicher des Serverprozesses je Sitzung sowie Fehlermeldungen.
+    """
+    if not stufen or min(stufen) < 1:
+        raise ValueError("Je Stufe wird mindestens eine Sitzung benötigt.")
+    prozess = None
+    if server is None:
+        prozess = starte_server(port)
+        server, pid = f"127.0.0.1:{port}", prozess.pid
+    try:
+        # Aufwärmen: die ersten Läufe importieren Module und füllen Caches, das gehört zu keiner Sitzung
+        asyncio.run(_ablauf(0, server, immo_latenz.LatenzMessung(), runden=1, pdf_alle=1, denkzeit_s=0,
+                            anlauf_s=0, zufall=random.Random(0)))
+        return [asyncio.run(_lastlauf(server, n, pid, runden=runden, pdf_alle=pdf_alle,
+                                      denkzeit_s=denkzeit_s, anlauf_s=anlauf_s)) for n in stufen]
+    finally:
+        if prozess:
+            prozess.terminate()
+            prozess.wait(timeout=10)
+
+
+def _zahl(x, stellen=1):
+    return "–" if x is None else f"{x:.{stellen}f}"
+
+
+def bericht(stufen):
+    """Textbericht der Stufen für die Konsole."""
+    zeilen = []
+    for s in stufen:
+        zeilen.append(f"── {s['sitzungen']} Sitzung(en): {s['schritte']} Schritte in {s['dauer_s']:.1f} s "
+                      f"({s['schritte_je_s']:.2f}/s), CPU {_zahl(s['cpu_s_je_sitzung'], 2)} s und "
+                      f"RAM +{_zahl(s['rss_mb_je_sitzung'])} MB je Sitzung, Auslastung {_zahl(s['cpu_auslastung_p'], 0)} %, "
+                      f"RSS {_zahl(s['rss_mb'], 0)} MB")
+        zeilen.append(f"   {'Schritt':<20}{'Anzahl':>8}{'Median ms':>12}{'p95 ms':>10}{'Max ms':>10}")
+        for a in s['abschnitte']:
+            zeilen.append(f"   {a['abschnitt']:<20}{a['anzahl']:>8}{a['median_ms']:>12.0f}{a['p95_ms']:>10.0f}{a['max_ms']:>10.0f}")
+        zeilen += [f"   ⚠ {f}" for f in s['fehler'][:10]]
+    return "\n".join(zeilen)
+
+
+if __name__ == "__main__":
+    # python immo_lasttest.py --sitzungen 1 5 10 20 [--runden 5] [--pdf-alle 2] [--json ergebnis.json]
+    parser = argparse.ArgumentParser(description="Lasttest der Streamlit-App auf localhost")
+    parser.add_argument('--sitzungen', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--runden', type=int, default=5, help="Eingabe ändern + rechnen je Sitzung")
+    parser.add_argument('--pdf-alle', type=int, default=2, help="PDF jede n-te Runde (0 = nie)")
+    parser.add_argument('--denkzeit', type=float, default=1.0, help="Pause zwischen Schritten (s)")
+    parser.add_argument('--port', type=int, default=STANDARD_PORT)
+    parser.add_argument('--server', help="laufender Server statt eigenem, z.B. 127.0.0.1:8501")
+    parser.add_argument('--pid', type=int, help="Prozess-ID des laufenden Servers (für CPU und Speicher)")
+    parser.add_argument('--json', help="Ergebnis zusätzlich als JSON-Datei")
+    args = parser.parse_args()
+    ergebnis = lasttest(args.sitzungen, args.port, args.server, args.pid, args.runden, args.pdf_alle, args.denkzeit)
+    print(bericht(ergebnis))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(ergebnis, f, ensure_ascii=False, indent=2)
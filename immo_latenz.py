@@ -0,0 +1,62 @@
+# immo_latenz.py
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+MAX_MESSUNGEN = 2000   # je Abschnitt, älteste fallen heraus
+
+_lock = threading.Lock()
+_messung = None
+
+
+class LatenzMessung:
+    """
+    Sammelt Laufzeiten von Streamlit-Reruns je Abschnitt (ganze Seite oder
+    einzelnes Fragment). Die Messung ist prozessweit und thread-sicher, sodass
+    die Werte aller gleichzeitigen Sitzungen zusammenlaufen.
+    """
+
+    def __init__(self, max_messungen=MAX_MESSUNGEN):
+        self._lock = threading.Lock()
+        self._werte = defaultdict(lambda: deque(maxlen=max_messungen))
+
+    def erfasse(self, abschnitt, sekunden):
+        with self._lock:
+            self._werte[abschnitt].append(sekunden)
+
+    @contextmanager
+    def messe(self, abschnitt):
+        """Misst die Dauer des with-Blocks (auch wenn er mit einer Exception endet)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.erfasse(abschnitt, time.perf_counter() - start)
+
+    def zusammenfassung(self):
+        """Je Abschnitt: Anzahl sowie Median, 95-%-Quantil und Maximum in Millisekunden."""
+        with self._lock:
+            werte = {abschnitt: np.array(w) * 1000 for abschnitt, w in self._werte.items() if w}
+        return [
+            {'abschnitt': abschnitt, 'anzahl': len(ms),
+             'median_ms': float(np.median(ms)), 'p95_ms': float(np.percentile(ms, 95)), 'max_ms': float(ms.max())}
+            for abschnitt, ms in sorted(werte.items())
+        ]
+
+    def zuruecksetzen(self):
+        with self._lock:
+            self._werte.clear()
+
+
+def latenz_messung():
+    """Gemeinsame Messung für den ganzen Prozess (beim ersten Aufruf angelegt)."""
+    global _messung
+    if _messung is None:
+        with _lock:
+            if _messung is None:
+                _messung = LatenzMessung()
+    return _messung
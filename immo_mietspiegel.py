@@ -0,0 +1,201 @@
+# immo_mietspiegel.py
+
+import csv
+import math
+import os
+from array import array
+
+import numpy as np
+
+from immo_wohnort import wohnort_schluessel
+
+# Pflichtspalten der Vergleichsmieten-CSV (Dezimalkomma oder -punkt, Trenner ; oder ,)
+SPALTEN = ('ort', 'lat', 'lon', 'miete_qm', 'baujahr', 'wohnflaeche')
+
+# Baujahr-Kategorien der Apps → Jahresbereich
+BAUJAHR_BEREICHE = {
+    'vor 1925':    (0, 1924),
+    '1925 - 2022': (1925, 2022),
+    'ab 2023':     (2023, 9999),
+}
+
+KM_PRO_GRAD = 111.2
+
+
+def normalisiere_ortsname(name):
+    """Vereinheitlicht Schreibweisen für den Namensindex (gleicher Schlüssel wie die Wohnort-Suche)."""
+    return wohnort_schluessel(name)
+
+
+def _baujahr_bereich(baujahr):
+    """Nimmt eine Jahreszahl oder eine Baujahr-Kategorie der Apps und liefert (von, bis)."""
+    if baujahr is None:
+        return None
+    if isinstance(baujahr, str):
+        return BAUJAHR_BEREICHE.get(baujahr)
+    jahr = int(baujahr)
+    return (jahr - 10, jahr + 10)
+
+
+class Mietspiegel:
+    """
+    Vergleichsmieten-Datensatz mit räumlichem Gitterindex und Namensindex.
+
+    - Alle Zeilen liegen als NumPy-Spalten vor, sortiert nach Gitterzelle
+    - Eine Umkreissuche liest pro Zellenzeile genau einen zusammenhängenden
+      Ausschnitt (binäre Suche auf den Zellschlüsseln), auch bei Millionen Zeilen
+    - Der Namensindex bildet normalisierte Ortsnamen auf den Schwerpunkt ihrer
+      Vergleichsobjekte ab
+    """
+
+    def __init__(self, orte, ort_code, lat, lon, miete_qm, baujahr, wohnflaeche, zellgroesse=0.05):
+        self.zellgroesse = float(zellgroesse)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.lat0 = float(lat.min()) if len(lat) else 0.0
+        self.lon0 = float(lon.min()) if len(lon) else 0.0
+        zy = np.floor((lat - self.lat0) / self.zellgroesse).astype(np.int64)
+        zx = np.floor((lon - self.lon0) / self.zellgroesse).astype(np.int64)
+        self.nx = int(zx.max()) + 1 if len(zx) else 1
+        schluessel = zy * self.nx + zx
+        reihenfolge = np.argsort(schluessel, kind='stable')
+
+        self.schluessel = schluessel[reihenfolge]
+        self.lat = lat[reihenfolge]
+        self.lon = lon[reihenfolge]
+        self.miete_qm = np.asarray(miete_qm, dtype=np.float64)[reihenfolge]
+        self.baujahr = np.asarray(baujahr, dtype=np.float64)[reihenfolge]
+        self.wohnflaeche = np.asarray(wohnflaeche, dtype=np.float64)[reihenfolge]
+        self.ort_code = np.asarray(ort_code, dtype=np.int32)[reihenfolge]
+        self.orte = list(orte)
+
+        # Namensindex: Schwerpunkt und Anzahl je Ort
+        anzahl = np.bincount(self.ort_code, minlength=len(self.orte))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            lat_mittel = np.bincount(self.ort_code, weights=self.lat, minlength=len(self.orte)) / anzahl
+            lon_mittel = np.bincount(self.ort_code, weights=self.lon, minlength=len(self.orte)) / anzahl
+        self.namensindex = {
+            normalisiere_ortsname(name): (float(lat_mittel[i]), float(lon_mittel[i]), int(anzahl[i]))
+            for i, name in enumerate(self.orte) if anzahl[i] > 0
+        }
+
+    def __len__(self):
+        return len(self.lat)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Laden & Speichern
+    # ─────────────────────────────────────────────────────────────────────────
+    @classmethod
+    def aus_csv(cls, pfad, zellgroesse=0.05):
+        """Liest eine Vergleichsmieten-CSV zeilenweise in kompakte Spalten ein."""
+        with open(pfad, newline='', encoding='utf-8-sig') as f:
+            kopf = f.readline()
+            trenner = ';' if kopf.count(';') > kopf.count(',') else ','
+            spalten = [s.strip().lower() for s in next(csv.reader([kopf], delimiter=trenner))]
+            fehlend = [s for s in SPALTEN if s not in spalten]
+            if fehlend:
+                raise ValueError(f"Mietspiegel-CSV unvollständig, es fehlen die Spalten: {', '.join(fehlend)}")
+            idx = [spalten.index(s) for s in SPALTEN]
+            orte, ort_codes = [], {}
+            codes = array('i')
+            werte = [array('d') for _ in SPALTEN[1:]]
+            for zeile in csv.reader(f, delimiter=trenner):
+                if not zeile:
+                    continue
+                name = zeile[idx[0]].strip()
+                code = ort_codes.get(name)
+                if code is None:
+                    code = ort_codes[name] = len(orte)
+                    orte.append(name)
+                codes.append(code)
+                for ziel, i in zip(werte, idx[1:]):
+                    ziel.append(float(zeile[i].replace(',', '.')))
+        lat, lon, miete_qm, baujahr, wohnflaeche = (np.frombuffer(w, dtype=np.float64) for w in werte)
+        return cls(orte, np.frombuffer(codes, dtype=np.int32), lat, lon, miete_qm, baujahr, wohnflaeche, zellgroesse)
+
+    def speichern(self, pfad):
+        """Speichert den fertig sortierten Index als .npz (schnelles Wiederladen ohne CSV-Parsing)."""
+        np.savez(pfad, orte=np.array(self.orte, dtype=str), ort_code=self.ort_code, lat=self.lat, lon=self.lon,
+                 miete_qm=self.miete_qm, baujahr=self.baujahr, wohnflaeche=self.wohnflaeche,
+                 zellgroesse=self.zellgroesse)
+
+    @classmethod
+    def laden(cls, pfad, zellgroesse=0.05):
+        """Lädt eine .csv oder einen mit speichern() erzeugten .npz-Index."""
+        if os.path.splitext(str(pfad))[1].lower() == '.npz':
+            with np.load(pfad, allow_pickle=False) as d:
+                return cls(d['orte'].tolist(), d['ort_code'], d['lat'], d['lon'], d['miete_qm'],
+                           d['baujahr'], d['wohnflaeche'], float(d['zellgroesse']))
+        return cls.aus_csv(pfad, zellgroesse)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Abfragen
+    # ─────────────────────────────────────────────────────────────────────────
+    def ort_koordinaten(self, wohnort):
+        """Schwerpunkt (lat, lon) eines Ortes aus dem Namensindex oder None."""
+        treffer = self.namensindex.get(normalisiere_ortsname(wohnort))
+        return (treffer[0], treffer[1]) if treffer else None
+
+    def im_umkreis(self, lat, lon, radius_km):
+        """Indizes aller Vergleichsobjekte im Umkreis (Gitterzellen + exakte Distanzprüfung)."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        dlat = radius_km / KM_PRO_GRAD
+        dlon = radius_km / (KM_PRO_GRAD * max(math.cos(math.radians(lat)), 0.01))
+        y0 = math.floor((lat - dlat - self.lat0) / self.zellgroesse)
+        y1 = math.floor((lat + dlat - self.lat0) / self.zellgroesse)
+        x0 = max(math.floor((lon - dlon - self.lon0) / self.zellgroesse), 0)
+        x1 = min(math.floor((lon + dlon - self.lon0) / self.zellgroesse), self.nx - 1)
+        if x1 < x0:
+            return np.empty(0, dtype=np.int64)
+        zeilen = np.arange(max(y0, 0), y1 + 1, dtype=np.int64)
+        anfang = np.searchsorted(self.schluessel, zeilen * self.nx + x0, side='left')
+        ende = np.searchsorted(self.schluessel, zeilen * self.nx + x1, side='right')
+        if not len(zeilen) or not (ende - anfang).any():
+            return np.empty(0, dtype=np.int64)
+        kandidaten = np.concatenate([np.arange(a, e) for a, e in zip(anfang, ende) if e > a])
+        dy = (self.lat[kandidaten] - lat) * KM_PRO_GRAD
+        dx = (self.lon[kandidaten] - lon) * KM_PRO_GRAD * math.cos(math.radians(lat))
+        return kandidaten[dy * dy + dx * dx <= radius_km * radius_km]
+
+    def mietvorschlag(self, wohnort=None, wohnflaeche_qm=None, baujahr=None, lat=None, lon=None,
+                      radius_km=3.0, max_radius_km=50.0, min_treffer=10, flaechen_toleranz=0.25):
+        """
+        Schlägt eine Kaltmiete-Spanne für ein Objekt vor.
+
+        - Lage über lat/lon oder den Wohnort (Namensindex)
+        - Vergleichsobjekte mit ähnlicher Wohnfläche (± flaechen_toleranz) und Baujahr
+        - Zu wenige Treffer: zuerst Baujahr-Filter lockern, dann Radius verdoppeln
+        - Ergebnis: 25/50/75-%-Quantile in €/m² und als Monatsmiete, oder None
+        """
+        if lat is None or lon is None:
+            koordinaten = self.ort_koordinaten(wohnort) if wohnort else None
+            if koordinaten is None:
+                return None
+            lat, lon = koordinaten
+        bereich = _baujahr_bereich(baujahr)
+        radius = radius_km
+        while True:
+            idx = self.im_umkreis(lat, lon, radius)
+            if wohnflaeche_qm and len(idx):
+                flaeche = self.wohnflaeche[idx]
+                idx = idx[np.abs(flaeche - wohnflaeche_qm) <= wohnflaeche_qm * flaechen_toleranz]
+            auswahl, baujahr_gefiltert = idx, False
+            if bereich and len(idx):
+                bj = self.baujahr[idx]
+                gefiltert = idx[(bj >= bereich[0]) & (bj <= bereich[1])]
+                if len(gefiltert) >= min_treffer:
+                    auswahl, baujahr_gefiltert = gefiltert, True
+            if len(auswahl) >= min_treffer or radius >= max_radius_km:
+                break
+            radius = min(radius * 2, max_radius_km)
+        if not len(auswahl):
+            return None
+        p25, p50, p75 = np.percentile(self.miete_qm[auswahl], [25, 50, 75])
+        flaeche = wohnflaeche_qm or float(np.median(self.wohnflaeche[auswahl]))
+        return {
+            'miete_qm_p25': float(p25), 'miete_qm_median': float(p50), 'miete_qm_p75': float(p75),
+            'miete_mtl_von': float(p25 * flaeche), 'miete_mtl_median': float(p50 * flaeche),
+            'miete_mtl_bis': float(p75 * flaeche),
+            'anzahl': int(len(auswahl)), 'radius_km': float(radius), 'baujahr_gefiltert': baujahr_gefiltert,
+        }
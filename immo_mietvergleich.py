@@ -0,0 +1,93 @@
+# immo_mietvergleich.py
+
+import numpy as np
+
+import immo_finanzierung
+import immo_varianten
+
+ABGELTUNGSTEUER_ETF_P = 18.46      # 26,375 % auf 70 % der Gewinne (Teilfreistellung Aktienfonds)
+
+STANDARD_JAHRE = 30
+RASTER_ETF = (4.0, 5.0, 6.0, 7.0, 8.0)
+RASTER_WERT = (0.0, 1.0, 2.0, 3.0, 4.0)
+
+
+def projiziere(inputs, miete_mtl, jahre=STANDARD_JAHRE, etf_rendite_p=6.0, wertsteigerung_p=2.0,
+               mietsteigerung_p=2.0, kostensteigerung_p=2.0, verkaufskosten_p=0.0,
+               nebenkosten_mieter_mtl=0.0, abgeltungsteuer_p=ABGELTUNGSTEUER_ETF_P):
+    """
+    Kaufen (Eigennutzung) gegen Mieten + Anlegen, Jahr für Jahr.
+
+    - Kaufen: Kapitaldienst aus dem Tranchenplan plus Hausgeld, Instandhaltung
+      und CO2-Kosten (steigen mit kostensteigerung_p); Vermögen = Objektwert
+      nach Verkaufskosten − Restschuld + Depot
+    - Mieten: Kaltmiete (steigt mit mietsteigerung_p) und Nebenkosten; das
+      Eigenkapital (inkl. der sonst fälligen Kaufnebenkosten) geht ins Depot
+    - Wer in einem Jahr weniger zahlt, legt die Differenz monatlich an
+    - Depots nach Abgeltungsteuer auf den Kursgewinn (Wert bei Auflösung)
+
+    Die Renditeannahmen (etf_rendite_p, wertsteigerung_p, mietsteigerung_p,
+    kostensteigerung_p) dürfen Arrays sein; alle Kombinationen werden
+    gemeinsam gerechnet. Ergebnis: Arrays (Form der Annahmen × jahre)
+    vermoegen_kauf, vermoegen_miete, differenz (Kaufen − Mieten) sowie
+    break_even (erstes Jahr mit Kaufen ≥ Mieten, sonst NaN).
+    """
+    if jahre < 1:
+        raise ValueError("Der Betrachtungszeitraum muss mindestens 1 Jahr betragen.")
+    if inputs.get('nutzungsart') == 'Vermietung':
+        raise ValueError("Der Vergleich Mieten/Kaufen gilt nur für Eigennutzung.")
+    werte = immo_varianten.berechne_varianten(inputs)
+    plan = immo_finanzierung.jahreswerte(
+        immo_finanzierung.berechne_tranchen(immo_varianten.tranchen(inputs, werte), monate=jahre * 12), jahre)
+
+    etf, wert, miete_g, kosten_g = (np.asarray(x, dtype=np.float64) / 100 for x in
+                                    np.broadcast_arrays(etf_rendite_p, wertsteigerung_p, mietsteigerung_p, kostensteigerung_p))
+    monatlich = (1 + etf) ** (1 / 12) - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sparfaktor = np.where(monatlich > 0, ((1 + monatlich) ** 12 - 1) / monatlich, 12.0) / 12    # 1 €/Jahr, monatlich angelegt
+
+    eigenkapital = float(inputs.get('eigenkapital', 0) or 0)
+    objektwert = inputs.get('kaufpreis', 0) + inputs.get('garage_stellplatz_kosten', 0)
+    kosten_kauf = -float(werte['bewirtschaftung_pa'])
+    kosten_miete = (miete_mtl + nebenkosten_mieter_mtl) * 12
+
+    depot_miete, einzahlung_miete = np.full(etf.shape, eigenkapital), np.full(etf.shape, eigenkapital)
+    depot_kauf, einzahlung_kauf = np.zeros(etf.shape), np.zeros(etf.shape)
+    vermoegen_kauf = np.zeros(etf.shape + (jahre,))
+    vermoegen_miete = np.zeros(etf.shape + (jahre,))
+    nach_steuer = lambda depot, einzahlung: depot - np.maximum(depot - einzahlung, 0) * abgeltungsteuer_p / 100
+    for t in range(jahre):
+        differenz = plan['rate'][t] + kosten_kauf * (1 + kosten_g) ** t - kosten_miete * (1 + miete_g) ** t
+        depot_miete = depot_miete * (1 + etf) + np.maximum(differenz, 0) * sparfaktor
+        depot_kauf = depot_kauf * (1 + etf) + np.maximum(-differenz, 0) * sparfaktor
+        einzahlung_miete = einzahlung_miete + np.maximum(differenz, 0)
+        einzahlung_kauf = einzahlung_kauf + np.maximum(-differenz, 0)
+        immobilie = objektwert * (1 + wert) ** (t + 1) * (1 - verkaufskosten_p / 100) - plan['restschuld'][t]
+        vermoegen_kauf[..., t] = immobilie + nach_steuer(depot_kauf, einzahlung_kauf)
+        vermoegen_miete[..., t] = nach_steuer(depot_miete, einzahlung_miete)
+
+    differenz = vermoegen_kauf - vermoegen_miete
+    vorne = differenz >= 0
+    break_even = np.where(vorne.any(axis=-1), vorne.argmax(axis=-1) + 1.0, np.nan)
+    return {'jahre': np.arange(1, jahre + 1), 'vermoegen_kauf': vermoegen_kauf, 'vermoegen_miete': vermoegen_miete,
+            'differenz': differenz, 'break_even': break_even}
+
+
+def vergleich_raster(inputs, miete_mtl, etf_renditen=RASTER_ETF, wertsteigerungen=RASTER_WERT, **annahmen):
+    """
+    projiziere() für alle Kombinationen aus ETF-Rendite und Wertsteigerung in
+    einem Aufruf. Ergebnis je Jahr: Band der Vermögensdifferenz (min, p10,
+    median, p90, max), Anteil der Kombinationen, in denen Kaufen vorne liegt,
+    sowie das vollständige Raster ('differenz': ETF × Wert × Jahre, 'break_even').
+    """
+    etf, wert = np.meshgrid(np.asarray(etf_renditen, dtype=np.float64),
+                            np.asarray(wertsteigerungen, dtype=np.float64), indexing='ij')
+    ergebnis = projiziere(inputs, miete_mtl, etf_rendite_p=etf, wertsteigerung_p=wert, **annahmen)
+    flach = ergebnis['differenz'].reshape(-1, ergebnis['differenz'].shape[-1])
+    p = np.percentile(flach, [10, 50, 90], axis=0)
+    return {
+        'jahre': ergebnis['jahre'], 'etf_renditen': etf[:, 0], 'wertsteigerungen': wert[0],
+        'differenz': ergebnis['differenz'], 'break_even': ergebnis['break_even'],
+        'min': flach.min(axis=0), 'p10': p[0], 'median': p[1], 'p90': p[2], 'max': flach.max(axis=0),
+        'anteil_kauf_vorne': (flach >= 0).mean(axis=0),
+    }
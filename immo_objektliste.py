@@ -0,0 +1,262 @@
+# immo_objektliste.py
+
+import csv
+import io
+import json
+import re
+
+import numpy as np
+
+import immo_varianten
+from immo_stammdaten import CO2_KOST_AUFG_PREIS, HEIZUNG_CO2_FAKTOR, ENERGIEKLASSE_VERBRAUCH
+
+# Spalten einer Objektliste (CSV oder JSON). Fehlende Angaben kommen aus der
+# Vorlage (den Eingaben der Seite); nur kaufpreis ist Pflicht.
+ZAHLEN = (
+    'kaufpreis', 'garage_stellplatz_kosten', 'invest_bedarf', 'eigenkapital', 'wohnflaeche_qm',
+    'gebaeude_anteil_prozent', 'zins1_prozent', 'tilgung1_prozent', 'tilgung1_euro_mtl', 'laufzeit1_jahre',
+    'zinsbindung', 'kaltmiete_monatlich', 'umlagefaehige_kosten_monatlich', 'nicht_umlagefaehige_kosten_pa',
+    'mietausfallwagnis_prozent', 'instandhaltung_euro_qm', 'instand_eigen_pa', 'co2_eigen_pa',
+    'jahresverbrauch_kwh', 'steuersatz', 'verfuegbares_einkommen_mtl', 'modernisierung_jahre',
+    'zimmeranzahl',
+)
+TEXTE = (
+    'name', 'wohnort', 'nutzungsart', 'baujahr_kategorie', 'energieeffizienz', 'heizungstyp', 'modus_d1',
+    'afa_methode', 'modernisierung_afa', 'stockwerk', 'oepnv_anbindung', 'besonderheiten',
+)
+NEBENKOSTEN = ('grunderwerbsteuer', 'notar', 'grundbuch', 'makler')
+WAHRHEITSWERTE = ('sonder_afa',)
+
+# Felder, die berechne_varianten je Objekt als Array bekommt; alles andere
+# (Nutzungsart, Heizung, Modi, …) bildet die Gruppen eines Durchgangs
+VARIANTEN_FELDER = (
+    'kaufpreis', 'garage_stellplatz_kosten', 'invest_bedarf', 'eigenkapital', 'wohnflaeche_qm',
+    'gebaeude_anteil_prozent', 'zins1_prozent', 'tilgung1_prozent', 'tilgung1_euro_mtl', 'laufzeit1_jahre',
+    'kaltmiete_monatlich', 'umlagefaehige_kosten_monatlich', 'nicht_umlagefaehige_kosten_pa',
+    'mietausfallwagnis_prozent', 'instandhaltung_euro_qm', 'instand_eigen_pa', 'co2_eigen_pa',
+    'jahresverbrauch_kwh', 'steuersatz', 'verfuegbares_einkommen_mtl',
+)
+_STANDARD = {'gebaeude_anteil_prozent': 80.0}
+
+MAX_OBJEKTE = 10000
+
+# Kennzahlen der Rangliste: Schlüssel → (Spaltentitel, höher ist besser)
+KENNZAHLEN = {
+    'cashflow_mtl':        ("Cashflow mtl. (€)", True),
+    'nve_mtl':             ("Verfügbar mtl. (€)", True),
+    'bruttomietrendite':   ("Bruttomietrendite (%)", True),
+    'eigenkapitalrendite': ("EK-Rendite (%)", True),
+    'kaufpreisfaktor':     ("Kaufpreisfaktor", False),
+    'preis_qm':            ("Preis je m² (€)", False),
+    'gesamtinvestition':   ("Gesamtinvestition (€)", False),
+    'monatsrate':          ("Rate mtl. (€)", False),
+}
+
+_TAUSENDER = re.compile(r'^-?\d{1,3}(\.\d{3})+$')
+
+
+def _zahl(text):
+    """'250.000', '250000,50', '3,5 %', '1.234,5 €' oder 3.5 → float (leer → None)."""
+    if text is None or isinstance(text, (int, float)):
+        return None if text is None else float(text)
+    text = str(text).strip().rstrip('€%').strip().replace(' ', '')
+    if not text:
+        return None
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    elif _TAUSENDER.match(text):
+        text = text.replace('.', '')
+    return float(text)
+
+
+def _wahr(text):
+    return str(text).strip().lower() in ('1', 'true', 'ja', 'x', 'wahr', 'yes') if not isinstance(text, bool) else text
+
+# ═════════════════════════════════════════════════════════════════════════════
+# EINLESEN
+# ═════════════════════════════════════════════════════════════════════════════
+def _zeilen(inhalt, dateiname):
+    """Rohzeilen (Dicts mit kleingeschriebenen Schlüsseln) aus CSV- oder JSON-Bytes."""
+    text = inhalt.decode('utf-8-sig') if isinstance(inhalt, bytes) else inhalt
+    if str(dateiname).lower().endswith('.json') or text.lstrip()[:1] in ('[', '{'):
+        try:
+            daten = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Objektliste ist kein gültiges JSON: {e}") from None
+        if isinstance(daten, dict):
+            daten = daten.get('objekte')
+        if not isinstance(daten, list) or not all(isinstance(z, dict) for z in daten):
+            raise ValueError("JSON-Objektliste erwartet eine Liste von Objekten (oder {\"objekte\": [...]}).")
+        return [{str(k).strip().lower(): v for k, v in z.items()} for z in daten]
+    kopf = text.split('\n', 1)[0]
+    trenner = ';' if kopf.count(';') > kopf.count(',') else ','
+    leser = csv.DictReader(io.StringIO(text), delimiter=trenner)
+    leser.fieldnames = [s.strip().lower() for s in (leser.fieldnames or ())]
+    return [z for z in leser if any((v or '').strip() for v in z.values() if isinstance(v, str))]
+
+
+def lese_objekte(inhalt, dateiname, vorlage):
+    """
+    Liest eine Objektliste (CSV mit ';' oder ',' bzw. JSON) und ergänzt jede
+    Zeile um die Vorlage. Spaltennamen wie die Schlüssel des Eingabe-Dicts
+    (ZAHLEN, TEXTE, NEBENKOSTEN, sonder_afa); Zahlen gern mit Dezimalkomma.
+
+    Bei Eigennutzung werden fehlende instand_eigen_pa und co2_eigen_pa wie auf
+    der Seite aus Wohnfläche, Instandhaltung je m², Heizung und Effizienzklasse
+    abgeleitet. Ergebnis: Liste von Eingabe-Dicts (ohne Tranchen).
+    """
+    zeilen = _zeilen(inhalt, dateiname)
+    if not zeilen:
+        raise ValueError("Die Objektliste enthält keine Objekte.")
+    if len(zeilen) > MAX_OBJEKTE:
+        raise ValueError(f"Höchstens {MAX_OBJEKTE} Objekte je Liste (Datei enthält {len(zeilen)}).")
+    if 'kaufpreis' not in zeilen[0]:
+        raise ValueError("Die Objektliste braucht mindestens die Spalte 'kaufpreis'.")
+
+    basis = {k: v for k, v in vorlage.items() if k not in ('tranchen', 'checklist_status')}
+    objekte = []
+    for nr, zeile in enumerate(zeilen, start=1):
+        objekt = dict(basis, nebenkosten_prozente=dict(vorlage.get('nebenkosten_prozente', {})))
+        try:
+            for key in ZAHLEN:
+                wert = _zahl(zeile.get(key))
+                if wert is not None:
+                    objekt[key] = wert
+            for key in NEBENKOSTEN:
+                wert = _zahl(zeile.get(key))
+                if wert is not None:
+                    objekt['nebenkosten_prozente'][key] = wert
+        except ValueError:
+            raise ValueError(f"Objekt {nr}: ungültige Zahl in '{key}' ({zeile.get(key)!r}).") from None
+        for key in TEXTE:
+            if zeile.get(key) not in (None, ''):
+                objekt[key] = str(zeile[key]).strip()
+        for key in WAHRHEITSWERTE:
+            if zeile.get(key) not in (None, ''):
+                objekt[key] = _wahr(zeile[key])
+        objekt.setdefault('name', f"Objekt {nr}")
+        if zeile.get('kaufpreis') in (None, ''):
+            raise ValueError(f"Objekt {nr}: Kaufpreis fehlt.")
+        if objekt.get('nutzungsart') not in ('Vermietung', 'Eigennutzung'):
+            raise ValueError(f"Objekt {nr}: Nutzungsart muss 'Vermietung' oder 'Eigennutzung' sein.")
+        if objekt.get('heizungstyp', 'Gas') not in HEIZUNG_CO2_FAKTOR:
+            raise ValueError(f"Objekt {nr}: unbekannter Heizungstyp '{objekt['heizungstyp']}'.")
+        if objekt.get('energieeffizienz', 'B') not in ENERGIEKLASSE_VERBRAUCH:
+            raise ValueError(f"Objekt {nr}: unbekannte Effizienzklasse '{objekt['energieeffizienz']}'.")
+        if objekt.get('jahresverbrauch_kwh') is not None and objekt['jahresverbrauch_kwh'] <= 0:
+            objekt['jahresverbrauch_kwh'] = None
+
+        if objekt['nutzungsart'] == 'Eigennutzung':
+            wohnflaeche = objekt.get('wohnflaeche_qm', 0) or 0
+            if _zahl(zeile.get('instand_eigen_pa')) is None:
+                objekt['instand_eigen_pa'] = wohnflaeche * (objekt.get('instandhaltung_euro_qm', 0) or 0) * 12
+            if _zahl(zeile.get('co2_eigen_pa')) is None:
+                objekt['co2_eigen_pa'] = _verbrauch(objekt) * HEIZUNG_CO2_FAKTOR.get(objekt.get('heizungstyp', 'Gas'), 0) \
+                    / 1000 * CO2_KOST_AUFG_PREIS
+            objekt['instandhaltung_euro_qm'] = 0
+        else:
+            objekt['instand_eigen_pa'] = objekt['co2_eigen_pa'] = 0
+        objekt['tranchen'] = None
+        objekte.append(objekt)
+    return objekte
+
+# ═════════════════════════════════════════════════════════════════════════════
+# BEWERTEN
+# ═════════════════════════════════════════════════════════════════════════════
+def _gruppe(objekt):
+    """
+    Schlüssel der Objekte, die sich einen Aufruf von berechne_varianten teilen.
+    Die Effizienzklasse steckt im Verbrauch (_verbrauch), die Heizung zählt nur
+    für den CO2-Vermieteranteil.
+    """
+    vermietung = objekt.get('nutzungsart') == 'Vermietung'
+    return (objekt.get('nutzungsart'), objekt.get('heizungstyp', 'Gas') if vermietung else None,
+            objekt.get('baujahr_kategorie', '1925 - 2022'), objekt.get('modus_d1', 'tilgungssatz'),
+            objekt.get('afa_methode') or 'linear', bool(objekt.get('sonder_afa')),
+            objekt.get('modernisierung_afa', 'gebaeude'), int(objekt.get('modernisierung_jahre') or 1),
+            sum(objekt.get('nebenkosten_prozente', {}).values()) == 0)
+
+
+def _verbrauch(objekt):
+    """Heizenergieverbrauch in kWh/a, ohne Angabe aus Effizienzklasse × Wohnfläche."""
+    return objekt.get('jahresverbrauch_kwh') or \
+        ENERGIEKLASSE_VERBRAUCH.get(objekt.get('energieeffizienz', 'B'), 100) * (objekt.get('wohnflaeche_qm', 0) or 0)
+
+
+def varianten_werte(objekte):
+    """
+    immo_varianten.berechne_varianten für viele Objekte: je Gruppe gleicher
+    Kategorien (Nutzungsart, Heizung, Baujahr, Tilgungsmodus, AfA-Optionen)
+    ein vektorisierter Durchgang, die Kaufnebenkosten laufen über den
+    nebenkosten_faktor.
+
+    Ergebnis: (Dict Kennzahl → Array in Reihenfolge der Objekte, NaN wo die
+    Kennzahl nicht zur Nutzungsart gehört; Anzahl der Durchgänge).
+    Fehlerhafte Objekte (z.B. ungültige AfA-Option) lösen ValueError mit der
+    Objektnummer aus.
+    """
+    gruppen = {}
+    for i, objekt in enumerate(objekte):
+        gruppen.setdefault(_gruppe(objekt), []).append(i)
+
+    werte = {}
+    for indizes in gruppen.values():
+        vorlage = objekte[indizes[0]]
+        nk_vorlage = sum(vorlage.get('nebenkosten_prozente', {}).values())
+        aenderungen = {key: np.array([objekte[i].get(key) if objekte[i].get(key) is not None else _STANDARD.get(key, 0.0)
+                                      for i in indizes], dtype=np.float64) for key in VARIANTEN_FELDER}
+        aenderungen['jahresverbrauch_kwh'] = np.array([_verbrauch(objekte[i]) for i in indizes], dtype=np.float64)
+        if nk_vorlage:
+            aenderungen['nebenkosten_faktor'] = np.array(
+                [sum(objekte[i].get('nebenkosten_prozente', {}).values()) for i in indizes]) / nk_vorlage
+        try:
+            gruppe = immo_varianten.berechne_varianten(vorlage, aenderungen)
+        except ValueError as e:
+            raise ValueError(f"Objekt {indizes[0] + 1}: {e}") from None
+        for key, wert in gruppe.items():
+            werte.setdefault(key, np.full(len(objekte), np.nan))[indizes] = wert
+    return werte, len(gruppen)
+
+
+def bewerte_objekte(objekte):
+    """
+    Kennzahlen aller Objekte aus varianten_werte.
+
+    Ergebnis: Dict Kennzahl → Array in Reihenfolge der Objekte (KENNZAHLEN
+    sowie kaufpreis, wohnflaeche_qm, eigenkapital), 'vermietung' (Maske) und
+    'gruppen' (Anzahl der Rechendurchgänge); nicht anwendbare Kennzahlen
+    sind NaN.
+    """
+    werte, gruppen = varianten_werte(objekte)
+    feld = lambda key: np.array([float(o.get(key) or 0) for o in objekte])
+    kaufpreis, wohnflaeche, eigenkapital = feld('kaufpreis'), feld('wohnflaeche_qm'), feld('eigenkapital')
+    kaltmiete = feld('kaltmiete_monatlich') * 12
+    vermietung = np.array([o['nutzungsart'] == 'Vermietung' for o in objekte], dtype=bool)
+    leer = np.full(len(objekte), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'cashflow_mtl': np.where(vermietung, werte.get('cf_nach_lfd', leer), -werte.get('jaehrliche_kosten', leer)) / 12,
+            'nve_mtl': np.where(vermietung, werte.get('nve_lfd', leer), werte.get('nve', leer)),
+            'bruttomietrendite': np.where(vermietung, werte.get('bruttomietrendite', leer), np.nan),
+            'eigenkapitalrendite': np.where(vermietung & (eigenkapital > 0), werte.get('eigenkapitalrendite', leer), np.nan),
+            'kaufpreisfaktor': np.where(vermietung & (kaltmiete > 0), kaufpreis / kaltmiete, np.nan),
+            'preis_qm': np.where(wohnflaeche > 0, kaufpreis / wohnflaeche, np.nan),
+            'gesamtinvestition': werte['gesamtinvestition'], 'monatsrate': werte['monatsrate'],
+            'kaufpreis': kaufpreis, 'wohnflaeche_qm': wohnflaeche, 'eigenkapital': eigenkapital,
+            'vermietung': vermietung, 'gruppen': gruppen,
+        }
+
+
+def rangliste(ergebnis, kennzahl, absteigend=None, maske=None):
+    """
+    Indizes der Objekte sortiert nach einer Kennzahl (Standard: bessere
+    zuerst laut KENNZAHLEN), NaN immer am Ende; maske filtert vorab.
+    """
+    if kennzahl not in ergebnis:
+        raise ValueError(f"Unbekannte Kennzahl: '{kennzahl}'")
+    werte = np.asarray(ergebnis[kennzahl], dtype=np.float64)
+    auswahl = np.flatnonzero(maske) if maske is not None else np.arange(len(werte))
+    if absteigend is None:
+        absteigend = KENNZAHLEN.get(kennzahl, ("", True))[1]
+    schluessel = -werte[auswahl] if absteigend else werte[auswahl]
+    return auswahl[np.argsort(np.where(np.isnan(schluessel), np.inf, schluessel), kind='stable')]
@@ -0,0 +1,154 @@
+# immo_sanierung.py
+
+import numpy as np
+
+import immo_afa
+import immo_varianten
+from immo_stammdaten import CO2_KOST_AUFG_PREIS, HEIZUNG_CO2_FAKTOR, ENERGIEKLASSE_VERBRAUCH
+
+# Kostenannahmen je m² Wohnfläche (Schätzwerte inkl. MwSt., Stand 2026)
+HEIZUNG_KOSTEN_QM = {
+    "Gas":                110.0,
+    "Heizöl":             140.0,
+    "Fernwärme (fossil)":  90.0,
+    "Wärmepumpe":         350.0,
+    "Pellets/Holz":       320.0,
+}
+HUELLE_KOSTEN_QM_JE_KLASSE = 120.0     # Dämmung/Fenster je Effizienzklasse Verbesserung
+
+# Heizkosten je kWh Verbrauch (inkl. Wirkungsgrad bzw. Jahresarbeitszahl der Wärmepumpe)
+WAERMEPREIS_KWH = {
+    "Gas":                0.12,
+    "Heizöl":             0.11,
+    "Fernwärme (fossil)": 0.15,
+    "Wärmepumpe":         0.10,        # Wärmepumpenstrom 0,30 €/kWh bei JAZ 3
+    "Pellets/Holz":       0.08,
+}
+
+# BEG-Förderung (Grundförderung); förderfähige Kosten je Maßnahme gedeckelt
+FOERDERUNG_HEIZUNG_P = {"Wärmepumpe": 30.0, "Pellets/Holz": 30.0}
+FOERDERUNG_HUELLE_P = 15.0
+FOERDERFAEHIG_MAX = 30000.0
+
+# Modernisierungsumlage (§ 559 BGB): 8 % der Kosten nach Förderung p.a., Kappung
+# innerhalb von 6 Jahren 3 €/m² (2 €/m² bei einer Miete unter 7 €/m²)
+UMLAGE_P = 8.0
+UMLAGE_KAPPUNG_QM = 3.0
+UMLAGE_KAPPUNG_QM_NIEDRIG = 2.0
+UMLAGE_NIEDRIGMIETE_QM = 7.0
+
+STANDARD_JAHRE = 25
+STANDARD_SANIERUNGSJAHRE = tuple(range(1, 11))
+
+
+def sanierungsplan(inputs, jahre=STANDARD_JAHRE, sanierungsjahre=STANDARD_SANIERUNGSJAHRE,
+                   kalkulationszins_p=3.0, energiepreis_steigerung_p=2.0, co2_preis_steigerung_p=5.0,
+                   foerderung=True, umlage=True):
+    """
+    Energetische Sanierung: alle Kombinationen aus Ziel-Heizung, Ziel-
+    Effizienzklasse und Sanierungsjahr in einem Durchgang.
+
+    - Ziel-Effizienzklassen: die aktuelle und alle besseren; die Kombination
+      ohne jede Änderung entfällt
+    - Investition aus HEIZUNG_KOSTEN_QM (nur bei Heizungswechsel) und
+      HUELLE_KOSTEN_QM_JE_KLASSE je Klasse, abzüglich BEG-Förderung
+    - Sanierung zu Beginn des Sanierungsjahres (1 = sofort), Ersparnis ab
+      diesem Jahr; Energiepreise und CO2-Preis steigen jährlich
+    - Vermietung: Ersparnis beim CO2-Vermieteranteil und Modernisierungsumlage
+      nach Steuern, dazu die Steuerwirkung der AfA auf den Eigenanteil (wie der
+      Investitionsbedarf nach modernisierung_afa); die Heizkosten trägt der Mieter
+    - Eigennutzung: Ersparnis bei Heiz- und CO2-Kosten, keine Steuerwirkung
+
+    Ergebnis: Arrays je Kombination (heizung, effizienzklasse, sanierungsjahr,
+    investition, foerderung, eigenanteil, energie_ersparnis_kwh,
+    co2_ersparnis_kg, vermieter_anteil, energiekosten_ersparnis_pa,
+    co2_kosten_ersparnis_pa, umlage_pa, afa, cashflow, kapitalwert,
+    amortisation_jahre) sowie 'rangfolge' (Indizes nach Kapitalwert absteigend,
+    bei Gleichstand kürzere Amortisation zuerst) und die Ausgangswerte unter
+    'ausgang'. vermieter_anteil ist bei Eigennutzung 1 (alle CO2-Kosten beim
+    Eigentümer).
+    """
+    if jahre < 1:
+        raise ValueError("Der Betrachtungszeitraum muss mindestens 1 Jahr betragen.")
+    sanierungsjahre = np.asarray(sanierungsjahre, dtype=np.int64)
+    if sanierungsjahre.size == 0 or sanierungsjahre.min() < 1 or sanierungsjahre.max() > jahre:
+        raise ValueError(f"Sanierungsjahre müssen zwischen 1 und {jahre} liegen.")
+    heizung_0 = inputs.get('heizungstyp', 'Gas')
+    klasse_0 = inputs.get('energieeffizienz', 'B')
+    if heizung_0 not in HEIZUNG_CO2_FAKTOR or klasse_0 not in ENERGIEKLASSE_VERBRAUCH:
+        raise ValueError(f"Unbekannte Heizung oder Effizienzklasse: '{heizung_0}', '{klasse_0}'")
+    wohnflaeche = float(inputs.get('wohnflaeche_qm', 0) or 0)
+    if wohnflaeche <= 0:
+        raise ValueError("Für die Sanierungsrechnung wird die Wohnfläche benötigt.")
+    vermietung = inputs.get('nutzungsart') == 'Vermietung'
+
+    heizungen = list(HEIZUNG_CO2_FAKTOR)
+    klassen = list(ENERGIEKLASSE_VERBRAUCH)
+    h0, k0 = heizungen.index(heizung_0), klassen.index(klasse_0)
+    h, k, s = (a.ravel() for a in np.meshgrid(np.arange(len(heizungen)), np.arange(k0 + 1), sanierungsjahre,
+                                              indexing='ij'))
+    gueltig = (h != h0) | (k != k0)
+    h, k, s = h[gueltig], k[gueltig], s[gueltig]
+
+    # Verbrauch und CO2 vorher/nachher
+    tabelle = lambda werte, standard=0.0: np.array([werte.get(x, standard) for x in heizungen])
+    faktor, preis = tabelle(HEIZUNG_CO2_FAKTOR), tabelle(WAERMEPREIS_KWH)
+    verbrauch_0 = float(inputs.get('jahresverbrauch_kwh') or 0) or ENERGIEKLASSE_VERBRAUCH[klasse_0] * wohnflaeche
+    verbrauch = np.where(k < k0, np.minimum(np.array(list(ENERGIEKLASSE_VERBRAUCH.values()))[k] * wohnflaeche,
+                                            verbrauch_0), verbrauch_0)
+    co2_kg_0, co2_kg = verbrauch_0 * faktor[h0], verbrauch * faktor[h]
+    anteil_0 = float(immo_varianten.co2_anteil_vermieter(co2_kg_0 / wohnflaeche)) if vermietung else 1.0
+    anteil = immo_varianten.co2_anteil_vermieter(co2_kg / wohnflaeche) if vermietung else np.ones(len(h))
+    co2_kosten_ersparnis = (co2_kg_0 * anteil_0 - co2_kg * anteil) / 1000 * CO2_KOST_AUFG_PREIS
+    energiekosten_ersparnis = verbrauch_0 * preis[h0] - verbrauch * preis[h]
+
+    # Investition und Förderung
+    invest_heizung = np.where(h != h0, tabelle(HEIZUNG_KOSTEN_QM)[h] * wohnflaeche, 0.0)
+    invest_huelle = (k0 - k) * HUELLE_KOSTEN_QM_JE_KLASSE * wohnflaeche
+    zuschuss = (np.minimum(invest_heizung, FOERDERFAEHIG_MAX) * tabelle(FOERDERUNG_HEIZUNG_P)[h]
+                + np.minimum(invest_huelle, FOERDERFAEHIG_MAX) * FOERDERUNG_HUELLE_P) / 100 if foerderung \
+        else np.zeros(len(h))
+    investition = invest_heizung + invest_huelle
+    eigenanteil = investition - zuschuss
+
+    # Jährliche Wirkung ab dem Sanierungsjahr (Kombinationen × Jahre)
+    t = np.arange(1, jahre + 1)
+    aktiv = t[None, :] >= s[:, None]
+    e_wachstum = (1 + energiepreis_steigerung_p / 100) ** (t - 1)
+    co2_wachstum = (1 + co2_preis_steigerung_p / 100) ** (t - 1)
+    ersparnis = co2_kosten_ersparnis[:, None] * co2_wachstum
+    if vermietung:
+        miete_qm = float(inputs.get('kaltmiete_monatlich', 0) or 0) / wohnflaeche
+        kappung = (UMLAGE_KAPPUNG_QM_NIEDRIG if miete_qm < UMLAGE_NIEDRIGMIETE_QM else UMLAGE_KAPPUNG_QM) * wohnflaeche * 12
+        umlage_pa = np.minimum(eigenanteil * UMLAGE_P / 100, kappung) if umlage else np.zeros(len(h))
+        # nachträgliche Herstellungskosten: linear wie das Gebäude (keine degressive/Sonder-AfA)
+        verteilt = inputs.get('modernisierung_afa', 'gebaeude') == 'verteilt'
+        afa = immo_afa.afa_verlauf(eigenanteil, 'verteilt' if verteilt else 'linear',
+                                   immo_afa.afa_satz(inputs.get('baujahr_kategorie', '1925 - 2022')),
+                                   verteilung_jahre=int(inputs.get('modernisierung_jahre') or 1) if verteilt else 1,
+                                   start_jahr=s, jahre=jahre)['afa']
+        steuersatz = inputs.get('steuersatz', 0) / 100
+        cashflow = np.where(aktiv, (ersparnis + umlage_pa[:, None]) * (1 - steuersatz), 0.0) + afa * steuersatz
+    else:
+        umlage_pa = np.zeros(len(h))
+        afa = np.zeros((len(h), jahre))
+        cashflow = np.where(aktiv, ersparnis + energiekosten_ersparnis[:, None] * e_wachstum, 0.0)
+
+    # Kapitalwert auf heute, Amortisation (nicht abgezinst) ab dem Sanierungsjahr
+    diskont = (1 + kalkulationszins_p / 100) ** -t
+    kapitalwert = cashflow @ diskont - eigenanteil * (1 + kalkulationszins_p / 100) ** -(s - 1.0)
+    kumuliert = np.cumsum(cashflow, axis=1) - np.where(aktiv, eigenanteil[:, None], 0.0)
+    erreicht = aktiv & (kumuliert >= 0)
+    amortisation = np.where(erreicht.any(axis=1), erreicht.argmax(axis=1) + 2.0 - s, np.nan)
+
+    return {
+        'heizung': np.array(heizungen)[h], 'effizienzklasse': np.array(klassen)[k], 'sanierungsjahr': s,
+        'investition': investition, 'foerderung': zuschuss, 'eigenanteil': eigenanteil,
+        'energie_ersparnis_kwh': verbrauch_0 - verbrauch, 'co2_ersparnis_kg': co2_kg_0 - co2_kg,
+        'vermieter_anteil': anteil, 'energiekosten_ersparnis_pa': energiekosten_ersparnis,
+        'co2_kosten_ersparnis_pa': co2_kosten_ersparnis, 'umlage_pa': umlage_pa,
+        'afa': afa, 'cashflow': cashflow, 'kapitalwert': kapitalwert, 'amortisation_jahre': amortisation,
+        'rangfolge': np.lexsort((np.nan_to_num(amortisation, nan=np.inf), -kapitalwert)),
+        'ausgang': {'heizung': heizung_0, 'effizienzklasse': klasse_0, 'verbrauch_kwh': verbrauch_0,
+                    'co2_kg': co2_kg_0, 'vermieter_anteil': anteil_0},
+    }
@@ -0,0 +1,73 @@
+# immo_sensitivitaet.py
+
+import numpy as np
+
+import immo_varianten
+
+# Zahlenwerte der Eingaben, die für die Sensitivität variiert werden (Reihenfolge = Anzeige bei Gleichstand)
+EINGABEN = (
+    ('kaltmiete_monatlich',            "Kaltmiete"),
+    ('zins1_prozent',                  "Zinssatz"),
+    ('kaufpreis',                      "Kaufpreis"),
+    ('steuersatz',                     "Steuersatz"),
+    ('mietausfallwagnis_prozent',      "Mietausfallwagnis"),
+    ('instandhaltung_euro_qm',         "Instandhaltung (€/m²)"),
+    ('nicht_umlagefaehige_kosten_pa',  "Nicht umlagef. Kosten / Hausgeld"),
+    ('eigenkapital',                   "Eigenkapital"),
+    ('tilgung1_prozent',               "Tilgungssatz"),
+    ('tilgung1_euro_mtl',              "Tilgungsbetrag"),
+    ('laufzeit1_jahre',                "Laufzeit"),
+    ('nebenkosten_faktor',             "Kaufnebenkosten"),
+    ('invest_bedarf',                  "Zusätzl. Investitionsbedarf"),
+    ('garage_stellplatz_kosten',       "Garage/Stellplatz"),
+    ('gebaeude_anteil_prozent',        "Gebäudeanteil (AfA)"),
+    ('wohnflaeche_qm',                 "Wohnfläche"),
+    ('jahresverbrauch_kwh',            "Heizverbrauch"),
+    ('umlagefaehige_kosten_monatlich', "Umlagefähige Kosten"),
+    ('instand_eigen_pa',               "Private Instandhaltung"),
+    ('co2_eigen_pa',                   "CO2-Kosten"),
+)
+
+# Zielgrößen je Nutzungsart: (Schlüssel aus immo_varianten, Bezeichnung, Einheit); die erste bestimmt die Rangfolge
+KENNZAHLEN = {
+    'Vermietung':   (('cf_nach_lfd', "Cashflow n. St. (lfd. Jahre)", '€/Jahr'),
+                     ('eigenkapitalrendite', "EK-Rendite", '%')),
+    'Eigennutzung': (('nve', "Neues verfügbares Einkommen", '€/Monat'),
+                     ('jaehrliche_kosten', "Jährliche Gesamtkosten", '€/Jahr')),
+}
+
+
+def tornado(inputs, delta_p=10.0):
+    """
+    Einzelsensitivität aller Zahleneingaben: jede Eingabe wird für sich um
+    ±delta_p % verändert, alle 2·N + 1 Varianten werden in einem einzigen
+    Aufruf von immo_varianten.berechne_varianten gerechnet.
+
+    Ergebnis: {'kennzahlen', 'basis', 'zeilen'}; je Zeile Eingabe, Bezeichnung,
+    Ausgangswert und für jede Kennzahl (Wert bei −delta, Wert bei +delta).
+    Zeilen sind nach der Spannweite der ersten Kennzahl sortiert; Eingaben
+    ohne Wirkung (z.B. Wert 0 oder im aktuellen Modus unbenutzt) fehlen.
+    """
+    kennzahlen = KENNZAHLEN['Vermietung' if inputs.get('nutzungsart') == 'Vermietung' else 'Eigennutzung']
+    basiswerte = {'nebenkosten_faktor': 1.0, **inputs}
+    eingaben = [(key, name) for key, name in EINGABEN
+                if isinstance(basiswerte.get(key), (int, float)) and not isinstance(basiswerte.get(key), bool)
+                and basiswerte[key] != 0]
+    faktor = 1 + np.array([-delta_p, delta_p]) / 100
+    aenderungen = {}
+    for i, (key, _) in enumerate(eingaben):
+        spalte = np.full(2 * len(eingaben) + 1, float(basiswerte[key]))
+        spalte[1 + 2 * i: 3 + 2 * i] *= faktor
+        aenderungen[key] = spalte
+    werte = immo_varianten.berechne_varianten(inputs, aenderungen)
+
+    basis = {k: float(np.asarray(werte[k]).flat[0]) for k, _, _ in kennzahlen}
+    zeilen = []
+    for i, (key, name) in enumerate(eingaben):
+        wirkung = {k: (float(werte[k][1 + 2 * i]), float(werte[k][2 + 2 * i])) for k, _, _ in kennzahlen}
+        if all(abs(minus - basis[k]) < 1e-9 and abs(plus - basis[k]) < 1e-9 for k, (minus, plus) in wirkung.items()):
+            continue
+        zeilen.append({'eingabe': key, 'bezeichnung': name, 'wert': float(basiswerte[key]), 'wirkung': wirkung,
+                       'spanne': abs(wirkung[kennzahlen[0][0]][1] - wirkung[kennzahlen[0][0]][0])})
+    zeilen.sort(key=lambda z: z['spanne'], reverse=True)
+    return {'kennzahlen': kennzahlen, 'basis': basis, 'delta_p': delta_p, 'zeilen': zeilen}
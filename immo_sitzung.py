@@ -0,0 +1,92 @@
+# immo_sitzung.py
+
+import sys
+import time
+from collections import OrderedDict
+
+STANDARD_BUDGET_MB = 4
+STANDARD_MAX_ALTER_S = 30 * 60
+
+
+def speicherbedarf(obj, _gesehen=None):
+    """
+    Geschätzter Speicherbedarf eines Objekts samt Inhalt in Bytes.
+    Gemeinsam referenzierte Objekte werden nur einmal gezählt.
+    """
+    gesehen = set() if _gesehen is None else _gesehen
+    if id(obj) in gesehen:
+        return 0
+    gesehen.add(id(obj))
+    groesse = sys.getsizeof(obj)   # bei NumPy-Arrays inkl. eigener Daten
+    if isinstance(obj, dict):
+        groesse += sum(speicherbedarf(k, gesehen) + speicherbedarf(v, gesehen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        groesse += sum(speicherbedarf(x, gesehen) for x in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        groesse += speicherbedarf(vars(obj), gesehen)
+    return groesse
+
+
+class ErgebnisSpeicher:
+    """
+    Berechnete Analysen (und bewertete Objektlisten) einer Sitzung, nach
+    Szenario-Code abgelegt.
+
+    - Wird ein bereits berechnetes Szenario erneut angefordert, entfällt die Berechnung
+    - Überschreitet die Summe das Budget, werden die am längsten nicht genutzten
+      Einträge verdrängt (der zuletzt abgelegte bleibt immer erhalten)
+    - Einträge, die länger als max_alter_s nicht genutzt wurden, gelten als veraltet
+    """
+
+    def __init__(self, budget_bytes=STANDARD_BUDGET_MB * 2**20, max_alter_s=STANDARD_MAX_ALTER_S):
+        self.budget_bytes = int(budget_bytes)
+        self.max_alter_s = max_alter_s
+        self._eintraege = OrderedDict()   # code → (wert, bytes, zuletzt genutzt)
+        self.verdraengt = 0
+
+    def __len__(self):
+        return len(self._eintraege)
+
+    def __contains__(self, code):
+        return code in self._eintraege
+
+    @property
+    def belegt_bytes(self):
+        return sum(groesse for _, groesse, _ in self._eintraege.values())
+
+    def hole(self, code):
+        """Eintrag zu einem Szenario-Code oder None; markiert ihn als zuletzt genutzt."""
+        self._raeume_auf()
+        eintrag = self._eintraege.get(code)
+        if eintrag is None:
+            return None
+        self._eintraege[code] = (eintrag[0], eintrag[1], time.monotonic())
+        self._eintraege.move_to_end(code)
+        return eintrag[0]
+
+    def lege_ab(self, code, wert):
+        self._eintraege.pop(code, None)
+        self._eintraege[code] = (wert, speicherbedarf(wert), time.monotonic())
+        self._raeume_auf()
+        return wert
+
+    def _raeume_auf(self):
+        jetzt = time.monotonic()
+        while len(self._eintraege) > 1:
+            code, (_, _, zuletzt) = next(iter(self._eintraege.items()))
+            if self.belegt_bytes <= self.budget_bytes and jetzt - zuletzt <= self.max_alter_s:
+                break
+            del self._eintraege[code]
+            self.verdraengt += 1
+
+    def bericht(self):
+        """Je Eintrag: Code (gekürzt), Größe und Alter in Sekunden – neueste zuerst."""
+        jetzt = time.monotonic()
+        return [{'code': code[:12] + '…', 'bytes': groesse, 'alter_s': jetzt - zuletzt}
+                for code, (_, groesse, zuletzt) in reversed(self._eintraege.items())]
+
+
+def sitzungs_bericht(session_state):
+    """Speicherbedarf je Schlüssel des Session-States, größte zuerst."""
+    zeilen = [{'schluessel': str(k), 'bytes': speicherbedarf(v)} for k, v in session_state.items()]
+    return sorted(zeilen, key=lambda z: z['bytes'], reverse=True)
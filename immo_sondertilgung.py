@@ -0,0 +1,101 @@
+# immo_sondertilgung.py
+
+ZIELE = ('vermoegen', 'restschuld')
+
+
+def _jahresbudgets(budget, jahre):
+    """Ein fester Betrag gilt für jedes Jahr, eine Liste wird mit 0 aufgefüllt."""
+    if isinstance(budget, (int, float)):
+        return [float(budget)] * jahre
+    budgets = [float(b) for b in budget][:jahre]
+    return budgets + [0.0] * (jahre - len(budgets))
+
+
+def simuliere_sondertilgung(summe, zins_p, monatsrate, jahre, budget, anlage_rendite_p,
+                            sondertilgung_max_pa, tilgen=True):
+    """
+    Spielt die Zinsbindung Monat für Monat durch.
+
+    - Regulär wird die Monatsrate gezahlt; Sondertilgung jeweils am Jahresende
+    - tilgen=True: Sondertilgung = min(Limit, Budget + Depot, Restschuld),
+      der Rest des Budgets fließt ins Depot
+    - tilgen=False: das gesamte Budget wird angelegt
+    - Ist das Darlehen getilgt, wird die frei werdende Rate ebenfalls angelegt
+    Liefert die Jahreszeilen und die Endwerte.
+    """
+    mon_zins = zins_p / 100 / 12
+    mon_rendite = anlage_rendite_p / 100 / 12
+    restschuld, depot = float(summe), 0.0
+    zinsen_gesamt = 0.0
+    plan = []
+    for jahr, jahresbudget in enumerate(_jahresbudgets(budget, jahre), start=1):
+        zinsen_jahr = 0.0
+        for _ in range(12):
+            depot *= 1 + mon_rendite
+            if restschuld > 0:
+                zinsen = restschuld * mon_zins
+                zahlung = min(monatsrate, restschuld + zinsen)
+                restschuld -= zahlung - zinsen
+                zinsen_jahr += zinsen
+                depot += monatsrate - zahlung
+            else:
+                depot += monatsrate
+        depot += jahresbudget
+        sondertilgung = min(sondertilgung_max_pa, depot, restschuld) if tilgen else 0.0
+        depot -= sondertilgung
+        restschuld -= sondertilgung
+        zinsen_gesamt += zinsen_jahr
+        plan.append({
+            'jahr': jahr, 'sondertilgung': sondertilgung, 'anlage': jahresbudget - sondertilgung,
+            'zinsen': zinsen_jahr, 'restschuld': restschuld, 'depot': depot,
+        })
+    return {
+        'plan': plan, 'restschuld': restschuld, 'depot': depot,
+        'nettovermoegen': depot - restschuld, 'zinsen_gesamt': zinsen_gesamt,
+    }
+
+
+def optimiere_sondertilgung(summe, zins_p, monatsrate, zinsbindung_jahre, budget_pa,
+                            sondertilgung_p, anlage_rendite_p, steuersatz_p=0.0, ziel='vermoegen'):
+    """
+    Bestimmt den Sondertilgungsplan bis zum Ende der Zinsbindung.
+
+    Ein Euro Sondertilgung in Jahr t spart bis zum Ende der Zinsbindung Zinsen
+    mit dem effektiven Darlehenszins (bei Vermietung nach Steuern, weil die
+    Zinsen absetzbar sind); ein angelegter Euro wächst mit der Alternativrendite.
+    Beide wachsen über denselben Resthorizont – der Vergleich ist daher für
+    jedes Jahr gleich und der optimale Plan tilgt entweder in jedem Jahr so viel
+    wie erlaubt oder gar nicht.
+
+    - ziel='vermoegen': maximiert Depot − Restschuld am Ende der Zinsbindung
+    - ziel='restschuld': minimiert die Restschuld (tilgt immer maximal)
+    - anlage_rendite_p ist die Rendite der Alternativanlage nach Steuern
+    """
+    if ziel not in ZIELE:
+        raise ValueError(f"Unbekanntes Optimierungsziel: '{ziel}' (erlaubt: {', '.join(ZIELE)})")
+    jahre = int(zinsbindung_jahre)
+    zins_effektiv_p = zins_p * (1 - steuersatz_p / 100)
+    limit = summe * sondertilgung_p / 100
+    tilgen = ziel == 'restschuld' or zins_effektiv_p >= anlage_rendite_p
+
+    optimal = simuliere_sondertilgung(summe, zins_p, monatsrate, jahre, budget_pa, anlage_rendite_p, limit, tilgen)
+    vergleich = simuliere_sondertilgung(summe, zins_p, monatsrate, jahre, budget_pa, anlage_rendite_p, limit, not tilgen)
+    # Steuereffekt der gesparten Zinsen (bei Vermietung fallen weniger Werbungskosten an)
+    for ergebnis in (optimal, vergleich):
+        ergebnis['steuer_mehrbelastung'] = 0.0
+    if steuersatz_p:
+        ohne = optimal if not tilgen else vergleich
+        mit = vergleich if not tilgen else optimal
+        mit['steuer_mehrbelastung'] = (ohne['zinsen_gesamt'] - mit['zinsen_gesamt']) * steuersatz_p / 100
+    for ergebnis in (optimal, vergleich):
+        ergebnis['nettovermoegen'] -= ergebnis['steuer_mehrbelastung']
+
+    return {
+        'strategie': 'tilgen' if tilgen else 'anlegen',
+        'zins_effektiv_p': zins_effektiv_p,
+        'sondertilgung_max_pa': limit,
+        'plan': optimal['plan'],
+        'optimal': optimal,
+        'alternative': vergleich,
+        'vorteil': optimal['nettovermoegen'] - vergleich['nettovermoegen'],
+    }
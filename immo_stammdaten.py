@@ -0,0 +1,53 @@
+# immo_stammdaten.py
+
+from types import MappingProxyType
+
+# Die Tabellen liegen einmal pro Prozess im Speicher und sind schreibgeschützt,
+# damit sie gefahrlos von allen Streamlit-Sitzungen geteilt werden können.
+
+CO2_KOST_AUFG_PREIS = 60  # €/Tonne, gesetzlich fixiert 2026
+
+HEIZUNG_CO2_FAKTOR = MappingProxyType({
+    "Gas":                0.18139,
+    "Heizöl":             0.26640,
+    "Fernwärme (fossil)": 0.18000,
+    "Wärmepumpe":         0.0,
+    "Pellets/Holz":       0.0,
+})
+
+ENERGIEKLASSE_VERBRAUCH = MappingProxyType({  # Endenergie kWh/m²/a (Schätzwert)
+    "A+": 15, "A": 30, "B": 55, "C": 80,
+    "D": 110, "E": 145, "F": 185, "G": 230, "H": 300
+})
+
+CO2_STUFEN_VERMIETER = (  # CO2KostAufG Anlage §§ 5–7
+    (0,  12, 0.00), (12, 17, 0.10), (17, 22, 0.20),
+    (22, 27, 0.30), (27, 32, 0.40), (32, 37, 0.50),
+    (37, 42, 0.60), (42, 47, 0.70), (47, 52, 0.80),
+    (52, float('inf'), 0.95),
+)
+
+CHECKLISTE = (
+    "Grundbuchauszug",
+    "Flurkarte",
+    "Energieausweis",
+    "Teilungserklärung & Gemeinschaftsordnung",
+    "Protokolle der letzten 3–5 Eigentümerversammlungen",
+    "Jahresabrechnung & Wirtschaftsplan",
+    "Höhe der Instandhaltungsrücklage",
+    "Exposé & Grundrisse",
+    "WEG-Protokolle: Hinweise auf Streit, Sanierungen, Rückstände",
+)
+
+
+def berechne_co2_vermieter(heizungstyp, effizienzklasse, wohnflaeche, jahresverbrauch_kwh=None):
+    faktor = HEIZUNG_CO2_FAKTOR.get(heizungstyp, 0)
+    if faktor == 0 or wohnflaeche <= 0:
+        return {'co2_qm': 0.0, 'vermieter_anteil': 0.0, 'vermieter_kosten': 0.0}
+    verbrauch = jahresverbrauch_kwh if (jahresverbrauch_kwh and jahresverbrauch_kwh > 0) \
+                else ENERGIEKLASSE_VERBRAUCH.get(effizienzklasse, 100) * wohnflaeche
+    co2_kg   = verbrauch * faktor
+    co2_qm   = co2_kg / wohnflaeche
+    anteil   = next((a for lo, hi, a in CO2_STUFEN_VERMIETER if lo <= co2_qm < hi), 0.95)
+    kosten   = (co2_kg / 1000 * CO2_KOST_AUFG_PREIS) * anteil
+    return {'co2_qm': round(co2_qm, 1), 'vermieter_anteil': anteil, 'vermieter_kosten': round(kosten, 2)}
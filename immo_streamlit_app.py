@@ -1,65 +1,73 @@
 import streamlit as st
 import math
+import os
+import time
 from datetime import datetime
 from fpdf import FPDF
+import pdf_fonts
+import immo_export
+import immo_format
+import immo_mietspiegel
+import immo_wohnort
+import immo_sondertilgung
+import immo_finanzierung
+import immo_szenario
+import immo_latenz
+import immo_sitzung
+import immo_stammdaten
+import immo_zinshistorie
+import immo_angebote
+import immo_sensitivitaet
+import immo_eigenkapital
+import immo_afa
+import immo_exit
+import immo_mietvergleich
+import immo_sanierung
+import immo_objektliste
+import immo_stress
+import immo_varianten
+from immo_stammdaten import (CO2_KOST_AUFG_PREIS, HEIZUNG_CO2_FAKTOR, ENERGIEKLASSE_VERBRAUCH,
+                             berechne_co2_vermieter)
 
 st.set_page_config(page_title="Immobilien-Analyse", page_icon="🏠", layout="wide")
+_seite_start = time.perf_counter()
 
 # ═════════════════════════════════════════════════════════════════════════════
 # KONSTANTEN
 # ═════════════════════════════════════════════════════════════════════════════
-CO2_KOST_AUFG_PREIS = 60  # €/Tonne, gesetzlich fixiert 2026
-
-HEIZUNG_CO2_FAKTOR = {
-    "Gas":                0.18139,
-    "Heizöl":             0.26640,
-    "Fernwärme (fossil)": 0.18000,
-    "Wärmepumpe":         0.0,
-    "Pellets/Holz":       0.0,
-}
-
-ENERGIEKLASSE_VERBRAUCH = {  # Endenergie kWh/m²/a (Schätzwert)
-    "A+": 15, "A": 30, "B": 55, "C": 80,
-    "D": 110, "E": 145, "F": 185, "G": 230, "H": 300
-}
+# CO2-Tabellen und Checkliste: siehe immo_stammdaten (einmal pro Prozess, schreibgeschützt)
+# Lokaler Vergleichsmieten-Datensatz (.csv oder vorberechneter .npz-Index), optional
+MIETSPIEGEL_DATEI = os.environ.get("IMMO_MIETSPIEGEL", "mietspiegel.csv")
+# Historische Bauzinsen (monatlich, z.B. Bundesbank-Zeitreihe) für den Zins-Backtest, optional
+ZINSREIHE_DATEI = os.environ.get("IMMO_ZINSREIHE", "bauzinsen.csv")
 
-CO2_STUFEN_VERMIETER = [  # CO2KostAufG Anlage §§ 5–7
-    (0,  12, 0.00), (12, 17, 0.10), (17, 22, 0.20),
-    (22, 27, 0.30), (27, 32, 0.40), (32, 37, 0.50),
-    (37, 42, 0.60), (42, 47, 0.70), (47, 52, 0.80),
-    (52, float('inf'), 0.95),
-]
+checklist_items = immo_stammdaten.CHECKLISTE
 
-checklist_items = [
-    "Grundbuchauszug",
-    "Flurkarte",
-    "Energieausweis",
-    "Teilungserklärung & Gemeinschaftsordnung",
-    "Protokolle der letzten 3–5 Eigentümerversammlungen",
-    "Jahresabrechnung & Wirtschaftsplan",
-    "Höhe der Instandhaltungsrücklage",
-    "Exposé & Grundrisse",
-    "WEG-Protokolle: Hinweise auf Streit, Sanierungen, Rückstände"
-]
+# Speicherbudget je Sitzung für zwischengespeicherte Analysen
+SITZUNG_BUDGET_MB = float(os.environ.get("IMMO_SITZUNG_BUDGET_MB", immo_sitzung.STANDARD_BUDGET_MB))
+# Zwischengespeicherte Ergebnisteile (Rechnung samt Tabellen und Diagrammen) je Teil, prozessweit
+ERGEBNIS_TEILE_MAX = 64
 
 # ═════════════════════════════════════════════════════════════════════════════
 # HILFSFUNKTIONEN
 # ═════════════════════════════════════════════════════════════════════════════
+def _als_zahl(val):
+    """float aus Zahl oder Text mit Dezimalkomma; -0.0 wird 0.0 (kein '-0,00')."""
+    f = float(val) if isinstance(val, (int, float)) else float(str(val).replace(",", "."))
+    return f + 0.0
+
 def format_eur(val):
     """Zahl mit €-Zeichen, deutsches Format: 1.234,56 €"""
     try:
-        f = float(str(val).replace(",", "."))
-        return f"{f:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+        return immo_format.de_zahl(_als_zahl(val), 2) + " €"
     except Exception:
         return str(val)
 
 def de(val, d=2):
     """Deutsche Zahlenformatierung ohne €: 1.234,56 — für f-Strings"""
     try:
-        f = float(str(val).replace(",", "."))
-        s = f"{f:,.{d}f}"
-        return s.replace(",", "X").replace(".", ",").replace("X", ".")
-    except:
+        return immo_format.de_zahl(_als_zahl(val), d)
+    except Exception:
         return str(val)
 
 def format_percent(val):
@@ -69,23 +77,69 @@ def format_percent(val):
         return str(val)
 
 def is_number(val):
+    if isinstance(val, (int, float)):
+        return True
     try:
         float(str(val).replace(",", "."))
         return True
     except:
         return False
 
-def berechne_co2_vermieter(heizungstyp, effizienzklasse, wohnflaeche, jahresverbrauch_kwh=None):
-    faktor = HEIZUNG_CO2_FAKTOR.get(heizungstyp, 0)
-    if faktor == 0 or wohnflaeche <= 0:
-        return {'co2_qm': 0.0, 'vermieter_anteil': 0.0, 'vermieter_kosten': 0.0}
-    verbrauch = jahresverbrauch_kwh if (jahresverbrauch_kwh and jahresverbrauch_kwh > 0) \
-                else ENERGIEKLASSE_VERBRAUCH.get(effizienzklasse, 100) * wohnflaeche
-    co2_kg   = verbrauch * faktor
-    co2_qm   = co2_kg / wohnflaeche
-    anteil   = next((a for lo, hi, a in CO2_STUFEN_VERMIETER if lo <= co2_qm < hi), 0.95)
-    kosten   = (co2_kg / 1000 * CO2_KOST_AUFG_PREIS) * anteil
-    return {'co2_qm': round(co2_qm, 1), 'vermieter_anteil': anteil, 'vermieter_kosten': round(kosten, 2)}
+
+# Zeilen der Detailrechnung je Nutzungsart (Hauptansicht und geöffnetes Objekt der Objektliste)
+DETAIL_ZEILEN = {
+    "Vermietung": [
+        "Einnahmen p.a. (Kaltmiete)", "Umlagefähige Kosten p.a.", "Nicht umlagef. Kosten p.a.",
+        "- Mietausfallwagnis p.a.", "- Priv. Instandhaltungsrücklage p.a.",
+        "- CO2-Steuer Vermieteranteil p.a.", "Rückzahlung Darlehen p.a.", "- Zinsen p.a.",
+        "Jährliche Gesamtkosten", "= Cashflow vor Steuern p.a.",
+        "- AfA p.a.", "- Absetzbare Kaufnebenkosten (Jahr 1)",
+        "= Steuerlicher Gewinn/Verlust p.a.", "+ Steuerersparnis / -last p.a.",
+        "= Effektiver Cashflow n. St. p.a.", "Ihr monatl. Einkommen (vorher)",
+        "+/- Mtl. Cashflow Immobilie", "= Neues verfügbares Einkommen"
+    ],
+    "Eigennutzung": [
+        "Hausgeld / Betriebskosten p.a.", "- Private Instandhaltungsrücklage p.a.",
+        "- CO2-Kosten (Eigennutzer) p.a.", "Rückzahlung Darlehen p.a.", "- Zinsen p.a.",
+        "- Tilgung p.a. (Vermögensaufbau)", "Jährliche Gesamtkosten (inkl. Tilgung)",
+        "Ihr monatl. Einkommen (vorher)", "- Mtl. Kosten Immobilie", "= Neues verfügbares Einkommen"
+    ],
+}
+
+
+def detail_tabelle_html(display_table, keys):
+    """
+    Detailrechnung als eine HTML-Tabelle (Jahr der Anschaffung | laufende Jahre)
+    statt einem Element je Zeile und Spalte. '='-Zeilen und die Steuerwirkung
+    fett, '='-Zeilen grün/rot nach Vorzeichen.
+    """
+    zeilen = []
+    for key in keys:
+        row = next((r for r in display_table if key in r['kennzahl']), None)
+        if row is None:
+            continue
+        summe = key.startswith("=")
+        stil = "font-weight:bold; font-size:1.05em;" if summe or "+ Steuerersparnis" in key else ""
+        zellen = []
+        for val in (row.get('val1', ""), row.get('val2', "")):
+            farbe = ""
+            if summe and is_number(val):
+                farbe = "color:green;" if _als_zahl(val) > 0 else "color:red;" if _als_zahl(val) < 0 else ""
+            zellen.append(f"<td style='text-align:right;{farbe}'>{format_eur(val) if is_number(val) else val}</td>")
+        zeilen.append(f"<tr style='{stil}'><td>{key}</td>{''.join(zellen)}</tr>")
+    return ("<table style='width:100%; border-collapse:collapse;'>"
+            "<tr><th style='text-align:left'></th><th style='text-align:right'>Jahr der Anschaffung (€)</th>"
+            "<th style='text-align:right'>Laufende Jahre (€)</th></tr>" + "".join(zeilen) + "</table>")
+
+@st.cache_resource(show_spinner="Mietspiegel wird geladen …")
+def lade_mietspiegel(pfad, geaendert):
+    """Lädt den Mietspiegel einmal pro Prozess; eine geänderte Datei (mtime) wird neu eingelesen."""
+    return immo_mietspiegel.Mietspiegel.laden(pfad)
+
+@st.cache_resource(show_spinner="Zinsreihe wird geladen …")
+def lade_zinsreihe(pfad, geaendert):
+    """Lädt die historische Zinsreihe einmal pro Prozess; eine geänderte Datei (mtime) wird neu eingelesen."""
+    return immo_zinshistorie.Zinsreihe.aus_csv(pfad)
 
 # ═════════════════════════════════════════════════════════════════════════════
 # DARLEHENSBERECHNUNG (Annuitätsformel)
@@ -124,131 +178,19 @@ def berechne_darlehen_details(summe, zins, tilgung_p=None, tilgung_euro_mtl=None
 # HAUPTBERECHNUNG
 # ═════════════════════════════════════════════════════════════════════════════
 def calculate_analytics(inputs):
-    kaufpreis         = inputs.get('kaufpreis', 0)
-    garage            = inputs.get('garage_stellplatz_kosten', 0)
-    invest_bedarf     = inputs.get('invest_bedarf', 0)
-    nk_prozente       = inputs.get('nebenkosten_prozente', {})
-    nebenkosten_summe = (kaufpreis + garage) * sum(nk_prozente.values()) / 100
-    gesamtinvestition = kaufpreis + garage + invest_bedarf + nebenkosten_summe
-    eigenkapital      = inputs.get('eigenkapital', 0)
-    darlehen_summe    = gesamtinvestition - eigenkapital
-
-    d1 = berechne_darlehen_details(
-        darlehen_summe, inputs.get('zins1_prozent', 0),
-        tilgung_p=inputs.get('tilgung1_prozent'),
-        tilgung_euro_mtl=inputs.get('tilgung1_euro_mtl'),
-        laufzeit_jahre=inputs.get('laufzeit1_jahre'),
-        modus=inputs.get('modus_d1', 'tilgungssatz')
-    )
-
-    kaltmiete_jahr        = inputs.get('kaltmiete_monatlich', 0) * 12
-    umlagefaehige_jahr    = inputs.get('umlagefaehige_kosten_monatlich', 0) * 12
-    nicht_umlagefaehige_j = inputs.get('nicht_umlagefaehige_kosten_pa', 0)
-    zinsen_jahr           = darlehen_summe * inputs.get('zins1_prozent', 0) / 100
-    darlehen_rueck_jahr   = d1['monatsrate'] * 12
-
-    # AfA (§ 7 Abs. 4 EStG)
-    baujahr      = inputs.get('baujahr_kategorie', '1925 - 2022')
-    afa_satz     = 2.5 if baujahr == 'vor 1925' else 3.0 if baujahr == 'ab 2023' else 2.0
-    gebaeude_ant = inputs.get('gebaeude_anteil_prozent', 80)
-    afa_jahr     = kaufpreis * (gebaeude_ant / 100) * (afa_satz / 100)
-
-    # Risikopositionen
-    mietausfall_pa    = kaltmiete_jahr * inputs.get('mietausfallwagnis_prozent', 0) / 100
-    instandhaltung_pa = inputs.get('wohnflaeche_qm', 0) * inputs.get('instandhaltung_euro_qm', 0) * 12
-
-    # CO2-Steuer Vermieteranteil
-    co2_data = berechne_co2_vermieter(
-        inputs.get('heizungstyp', 'Gas'),
-        inputs.get('energieeffizienz', 'B'),
-        inputs.get('wohnflaeche_qm', 0),
-        inputs.get('jahresverbrauch_kwh')
-    )
-    co2_pa = co2_data['vermieter_kosten']
-
-    verfuegbar_mtl = inputs.get('verfuegbares_einkommen_mtl', 0)
-
-    if inputs.get('nutzungsart') == 'Vermietung':
-        stg_lfd = kaltmiete_jahr - nicht_umlagefaehige_j - zinsen_jahr - afa_jahr - mietausfall_pa - co2_pa
-        stg_j1  = stg_lfd - nebenkosten_summe
-
-        # KORREKT: Verlust → positive Steuerersparnis | Gewinn → negative Steuerlast
-        steuer_j1  = -(stg_j1  * inputs.get('steuersatz', 0) / 100)
-        steuer_lfd = -(stg_lfd * inputs.get('steuersatz', 0) / 100)
-
-        cf_vor      = (kaltmiete_jahr + umlagefaehige_jahr
-                       - nicht_umlagefaehige_j - darlehen_rueck_jahr
-                       - mietausfall_pa - instandhaltung_pa - co2_pa)
-        cf_nach_j1  = cf_vor + steuer_j1
-        cf_nach_lfd = cf_vor + steuer_lfd
-        nve_j1      = verfuegbar_mtl + cf_nach_j1  / 12
-        nve_lfd     = verfuegbar_mtl + cf_nach_lfd / 12
-        gesamt_kost = -(nicht_umlagefaehige_j + darlehen_rueck_jahr + mietausfall_pa + instandhaltung_pa + co2_pa)
-
-        display_table = [
-            {'kennzahl': 'Einnahmen p.a. (Kaltmiete)',             'val1': kaltmiete_jahr,         'val2': kaltmiete_jahr},
-            {'kennzahl': 'Umlagefähige Kosten p.a.',               'val1': umlagefaehige_jahr,     'val2': umlagefaehige_jahr},
-            {'kennzahl': 'Nicht umlagef. Kosten p.a.',             'val1': -nicht_umlagefaehige_j, 'val2': -nicht_umlagefaehige_j},
-            {'kennzahl': '- Mietausfallwagnis p.a.',               'val1': -mietausfall_pa,        'val2': -mietausfall_pa},
-            {'kennzahl': '- Priv. Instandhaltungsrücklage p.a.',   'val1': -instandhaltung_pa,     'val2': -instandhaltung_pa},
-            {'kennzahl': '- CO2-Steuer Vermieteranteil p.a.',      'val1': -co2_pa,                'val2': -co2_pa},
-            {'kennzahl': 'Rückzahlung Darlehen p.a.',              'val1': -darlehen_rueck_jahr,   'val2': -darlehen_rueck_jahr},
-            {'kennzahl': '- Zinsen p.a.',                          'val1': zinsen_jahr,            'val2': zinsen_jahr},
-            {'kennzahl': 'Jährliche Gesamtkosten',                 'val1': gesamt_kost,            'val2': gesamt_kost},
-            {'kennzahl': '= Cashflow vor Steuern p.a.',            'val1': cf_vor,                 'val2': cf_vor},
-            {'kennzahl': '- AfA p.a.',                             'val1': -afa_jahr,              'val2': -afa_jahr},
-            {'kennzahl': '- Absetzbare Kaufnebenkosten (Jahr 1)',   'val1': -nebenkosten_summe,     'val2': 0},
-            {'kennzahl': '= Steuerlicher Gewinn/Verlust p.a.',     'val1': stg_j1,                 'val2': stg_lfd},
-            {'kennzahl': '+ Steuerersparnis / -last p.a.',         'val1': steuer_j1,              'val2': steuer_lfd},
-            {'kennzahl': '= Effektiver Cashflow n. St. p.a.',      'val1': cf_nach_j1,             'val2': cf_nach_lfd},
-            {'kennzahl': 'Ihr monatl. Einkommen (vorher)',         'val1': verfuegbar_mtl,         'val2': verfuegbar_mtl},
-            {'kennzahl': '+/- Mtl. Cashflow Immobilie',            'val1': cf_nach_j1 / 12,        'val2': cf_nach_lfd / 12},
-            {'kennzahl': '= Neues verfügbares Einkommen',          'val1': nve_j1,                 'val2': nve_lfd},
-        ]
-        bruttomietrendite   = (kaltmiete_jahr / gesamtinvestition * 100) if gesamtinvestition > 0 else 0
-        eigenkapitalrendite = (cf_nach_lfd / eigenkapital * 100) if eigenkapital > 0 else 0
-        finanzkennzahlen    = {'Bruttomietrendite': bruttomietrendite, 'Eigenkapitalrendite': eigenkapitalrendite}
-
-    else:
-        instand_eigen_pa  = inputs.get('instand_eigen_pa', 0)
-        co2_eigen_pa      = inputs.get('co2_eigen_pa', 0)
-        jaehrliche_kosten = darlehen_rueck_jahr + nicht_umlagefaehige_j + instand_eigen_pa + co2_eigen_pa
-        nve = verfuegbar_mtl - jaehrliche_kosten / 12
-        display_table = [
-            {'kennzahl': 'Hausgeld / Betriebskosten p.a.',         'val1': -nicht_umlagefaehige_j,  'val2': -nicht_umlagefaehige_j},
-            {'kennzahl': '- Private Instandhaltungsrücklage p.a.', 'val1': -instand_eigen_pa,        'val2': -instand_eigen_pa},
-            {'kennzahl': '- CO2-Kosten (Eigennutzer) p.a.',        'val1': -co2_eigen_pa,            'val2': -co2_eigen_pa},
-            {'kennzahl': 'Rückzahlung Darlehen p.a.',              'val1': -darlehen_rueck_jahr,     'val2': -darlehen_rueck_jahr},
-            {'kennzahl': '- Zinsen p.a.',                          'val1': zinsen_jahr,              'val2': zinsen_jahr},
-            {'kennzahl': '- Tilgung p.a. (Vermögensaufbau)',       'val1': darlehen_rueck_jahr - zinsen_jahr, 'val2': darlehen_rueck_jahr - zinsen_jahr},
-            {'kennzahl': 'Jährliche Gesamtkosten (inkl. Tilgung)', 'val1': -jaehrliche_kosten,       'val2': -jaehrliche_kosten},
-            {'kennzahl': 'Ihr monatl. Einkommen (vorher)',         'val1': verfuegbar_mtl,           'val2': verfuegbar_mtl},
-            {'kennzahl': '- Mtl. Kosten Immobilie',                'val1': -jaehrliche_kosten / 12,  'val2': -jaehrliche_kosten / 12},
-            {'kennzahl': '= Neues verfügbares Einkommen',          'val1': nve,                      'val2': nve},
-        ]
-        # Eigenkapitalaufbau durch Tilgung
-        tilgung_pa = darlehen_rueck_jahr - zinsen_jahr
-        finanzkennzahlen = {
-            'tilgung_pa': tilgung_pa,
-            'zinsen_pa': zinsen_jahr,
-            'reine_wohnkosten_pa': nicht_umlagefaehige_j + instand_eigen_pa + co2_eigen_pa + zinsen_jahr,
-        }
-
-    return {'display_table': display_table, 'finanzkennzahlen': finanzkennzahlen}
-
+    # Eine Zeile des Rechenkerns: Objektliste, Sensitivität, Stress- und Exit-Rechnung
+    # verwenden dieselben Formeln über immo_varianten.berechne_varianten.
+    return immo_varianten.detailrechnung(inputs)
 # ═════════════════════════════════════════════════════════════════════════════
 # PDF-BERICHT
 # ═════════════════════════════════════════════════════════════════════════════
-def create_pdf_report(results, inputs, checklist_items):
+def create_pdf_report(results, inputs, checklist_items, tornado=None, stress=None):
     pdf = FPDF()
+    schrift = pdf_fonts.registriere_fpdf_schriften(pdf)
     pdf.add_page()
 
     def fmt_eur(val):
-        try:
-            f = float(str(val).replace(",", "."))
-            return f"{f:,.2f} EUR".replace(",", "X").replace(".", ",").replace("X", ".")
-        except:
-            return str(val) if val else '0,00 EUR'
+        return format_eur(val) if is_number(val) else (str(val) if val else '0,00 €')
 
     def fmt_pct(val):
         try:
@@ -256,29 +198,29 @@ def create_pdf_report(results, inputs, checklist_items):
         except:
             return str(val)
 
-    pdf.set_font("Arial", "B", 16)
+    pdf.set_font(schrift, "B", 16)
     pdf.cell(0, 12, "Finanzanalyse Immobilieninvestment", ln=True, align='C')
-    pdf.set_font("Arial", "", 10)
+    pdf.set_font(schrift, "", 10)
     pdf.cell(0, 8, f"Erstellt am: {datetime.now().strftime('%d.%m.%Y')}", ln=True)
     pdf.cell(0, 8, f"Objekt in: {inputs.get('wohnort', '')}", ln=True)
     pdf.cell(0, 8, f"Nutzungsart: {inputs.get('nutzungsart', '')}", ln=True)
     pdf.ln(5)
 
-    pdf.set_font("Arial", "B", 12)
+    pdf.set_font(schrift, "B", 12)
     pdf.cell(0, 8, "1. Objektdaten", ln=True)
-    pdf.set_font("Arial", "", 10)
+    pdf.set_font(schrift, "", 10)
     for label, wert in [
         ("Baujahr:",                        inputs.get('baujahr_kategorie', '')),
-        ("Wohnflaeche (qm):",               str(inputs.get('wohnflaeche_qm', ''))),
+        ("Wohnfläche (m²):",                str(inputs.get('wohnflaeche_qm', ''))),
         ("Zimmeranzahl:",                    str(inputs.get('zimmeranzahl', ''))),
         ("Stockwerk:",                       str(inputs.get('stockwerk', ''))),
         ("Energieeffizienz:",                str(inputs.get('energieeffizienz', ''))),
         ("Heizungstyp:",                     str(inputs.get('heizungstyp', ''))),
-        ("OEPNV-Anbindung:",                 str(inputs.get('oepnv_anbindung', ''))),
+        ("ÖPNV-Anbindung:",                  str(inputs.get('oepnv_anbindung', ''))),
         ("Besonderheiten:",                  str(inputs.get('besonderheiten', ''))),
         ("Kaufpreis:",                       fmt_eur(inputs.get('kaufpreis', 0))),
         ("Eigenkapital:",                    fmt_eur(inputs.get('eigenkapital', 0))),
-        ("Gebaeudeanteil (AfA-Basis):",      fmt_pct(inputs.get('gebaeude_anteil_prozent', 80))),
+        ("Gebäudeanteil (AfA-Basis):",       fmt_pct(inputs.get('gebaeude_anteil_prozent', 80))),
     ]:
         pdf.cell(65, 6, label, border=0)
         pdf.cell(65, 6, str(wert), border=0, ln=True)
@@ -288,9 +230,9 @@ def create_pdf_report(results, inputs, checklist_items):
     gesamtinvest = inputs.get('kaufpreis', 0) + inputs.get('garage_stellplatz_kosten', 0) + inputs.get('invest_bedarf', 0) + nk_sum
     darlehen     = gesamtinvest - inputs.get('eigenkapital', 0)
 
-    pdf.set_font("Arial", "B", 12)
+    pdf.set_font(schrift, "B", 12)
     pdf.cell(0, 8, "2. Finanzierung", ln=True)
-    pdf.set_font("Arial", "", 10)
+    pdf.set_font(schrift, "", 10)
     for label, wert in [
         ("Gesamtinvestition:", fmt_eur(gesamtinvest)),
         ("Eigenkapital:",      fmt_eur(inputs.get('eigenkapital', 0))),
@@ -303,37 +245,87 @@ def create_pdf_report(results, inputs, checklist_items):
     pdf.ln(5)
 
     titel = "3. Cashflow-Analyse (Vermietung)" if inputs.get("nutzungsart") == "Vermietung" else "3. Kostenanalyse (Eigennutzung)"
-    pdf.set_font("Arial", "B", 12)
+    pdf.set_font(schrift, "B", 12)
     pdf.cell(0, 8, titel, ln=True)
-    pdf.set_font("Arial", "B", 8)
+    pdf.set_font(schrift, "B", 8)
     pdf.cell(80, 6, "Kennzahl", border=1)
     pdf.cell(35, 6, "Jahr 1", border=1)
     pdf.cell(35, 6, "Laufende Jahre", border=1, ln=True)
-    pdf.set_font("Arial", "", 8)
+    pdf.set_font(schrift, "", 8)
     for row in results['display_table']:
-        k = str(row.get('kennzahl', '')).replace("ü","ue").replace("ö","oe").replace("ä","ae").replace("–","-")
-        pdf.cell(80, 5, k, border=1)
+        pdf.cell(80, 5, str(row.get('kennzahl', '')), border=1)
         pdf.cell(35, 5, fmt_eur(row.get('val1', 0)), border=1)
         pdf.cell(35, 5, fmt_eur(row.get('val2', 0)), border=1, ln=True)
     pdf.ln(5)
 
     if inputs.get("nutzungsart") == "Vermietung" and results.get('finanzkennzahlen'):
-        pdf.set_font("Arial", "B", 12)
+        pdf.set_font(schrift, "B", 12)
         pdf.cell(0, 8, "4. Finanzkennzahlen", ln=True)
-        pdf.set_font("Arial", "", 10)
+        pdf.set_font(schrift, "", 10)
         for k, v in results['finanzkennzahlen'].items():
             pdf.cell(65, 6, k + ":", border=0)
             pdf.cell(65, 6, fmt_pct(v) if "rendite" in k.lower() else str(v), border=0, ln=True)
         pdf.ln(5)
 
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 8, "5. Checkliste", ln=True)
-    pdf.set_font("Arial", "", 10)
+    if tornado and tornado['zeilen']:
+        haupt, haupt_name, haupt_einheit = tornado['kennzahlen'][0]
+        basis = tornado['basis'][haupt]
+        zeilen = tornado['zeilen'][:10]
+        skala = max(max(abs(m - basis), abs(p - basis)) for m, p in (z['wirkung'][haupt] for z in zeilen)) or 1
+        if pdf.get_y() + 5 * len(zeilen) + 20 > pdf.page_break_trigger:
+            pdf.add_page()
+        pdf.set_font(schrift, "B", 12)
+        pdf.cell(0, 8, f"5. Sensitivität (je Eingabe ±{de(tornado['delta_p'], 0)} %)", ln=True)
+        pdf.set_font(schrift, "", 8)
+        pdf.cell(0, 5, f"Wirkung auf {haupt_name} (Ausgangswert {fmt_eur(basis)}); grün = besser, rot = schlechter", ln=True)
+        mitte, halb = 120, 40
+        for z in zeilen:
+            y = pdf.get_y()
+            pdf.cell(60, 5, z['bezeichnung'], border=0)
+            for wert in z['wirkung'][haupt]:
+                breite = (wert - basis) / skala * halb
+                pdf.set_fill_color(*((46, 139, 87) if breite >= 0 else (192, 80, 77)))
+                pdf.rect(min(mitte, mitte + breite), y + 1, abs(breite), 3, 'F')
+            pdf.set_xy(mitte + halb + 2, y)
+            minus, plus = z['wirkung'][haupt]
+            pdf.cell(0, 5, f"{de(minus - basis, 0)} / {de(plus - basis, 0)}", ln=True)
+        pdf.line(mitte, pdf.get_y() - 5 * len(zeilen), mitte, pdf.get_y())
+        pdf.ln(5)
+
+    if stress:
+        zeilen = [k for k, gilt in enumerate(stress['anwendbar'][0]) if gilt]
+        vermietung = bool(stress['vermietung'][0])
+        if pdf.get_y() + 5 * len(zeilen) + 25 > pdf.page_break_trigger:
+            pdf.add_page()
+        pdf.set_font(schrift, "B", 12)
+        pdf.cell(0, 8, f"6. Stresstest ({len(stress['jahre'])} Jahre)", ln=True)
+        pdf.set_font(schrift, "B", 8)
+        for breite, titel in [(50, "Szenario"), (28, "Cashflow Jahr 1"), (36, "Schlechtestes Jahr"),
+                              (28, "Summe Cashflow"), (28, "ggü. Basis")]:
+            pdf.cell(breite, 6, titel, border=1)
+        pdf.cell(20, 6, "DSCR min." if vermietung else "Netto min.", border=1, ln=True)
+        pdf.set_font(schrift, "", 8)
+        for k in zeilen:
+            pdf.cell(50, 5, stress['szenarien'][k], border=1)
+            pdf.cell(28, 5, fmt_eur(stress['cf_j1'][0, k]), border=1)
+            pdf.cell(36, 5, f"{fmt_eur(stress['cf_min'][0, k])} (J. {stress['cf_min_jahr'][0, k]})", border=1)
+            pdf.cell(28, 5, fmt_eur(stress['kumuliert'][0, k]), border=1)
+            pdf.cell(28, 5, fmt_eur(stress['delta_kumuliert'][0, k]), border=1)
+            dscr = stress['dscr_min'][0, k]
+            pdf.cell(20, 5, (de(dscr) if math.isfinite(dscr) else "–") if vermietung
+                     else format_eur(stress['nve_min_mtl'][0, k]), border=1, ln=True)
+        pdf.set_font(schrift, "", 7)
+        pdf.cell(0, 5, "Cashflow nach Steuern p.a.; DSCR = Überschuss vor Kapitaldienst / Kapitaldienst, "
+                       "Netto = verfügbares Einkommen mtl.", ln=True)
+        pdf.ln(5)
+
+    pdf.set_font(schrift, "B", 12)
+    pdf.cell(0, 8, "7. Checkliste", ln=True)
+    pdf.set_font(schrift, "", 10)
     checklist_status = inputs.get("checklist_status", {})
     for item in checklist_items:
-        box   = "X" if checklist_status.get(item, False) else " "
-        clean = item.replace("ü","ue").replace("ö","oe").replace("ä","ae").replace("–","-")
-        pdf.cell(0, 5, f"[{box}] {clean}", ln=True)
+        box = "X" if checklist_status.get(item, False) else " "
+        pdf.cell(0, 5, f"[{box}] {item}", ln=True)
 
     return bytes(pdf.output())
 
@@ -361,8 +353,34 @@ with st.expander("ℹ️ Wie funktioniert dieses Tool? (Erklärung für Einsteig
     - 🏦 **Eigenkapitalrendite**: Richtwert >10% = gut, >20% = sehr gut.
     """)
 
+# ─────────────────────────────────────────────────────────────────────────────
+# SZENARIO-LINK: ?s=<Code> füllt beim ersten Aufruf alle Eingaben vor
+# ─────────────────────────────────────────────────────────────────────────────
+if '_szenario' not in st.session_state:
+    _code = st.query_params.get(immo_szenario.URL_PARAMETER)
+    try:
+        st.session_state['_szenario'] = immo_szenario.dekodiere(_code) if _code else {}
+    except ValueError as e:
+        st.session_state['_szenario'] = {}
+        st.warning(f"⚠️ Der Szenario-Link konnte nicht gelesen werden: {e}")
+    st.session_state['_szenario_code'] = _code if st.session_state['_szenario'] else None
+    if st.session_state['_szenario']:
+        st.session_state['checklist_status'] = {
+            item: haken for item, haken in zip(checklist_items, st.session_state['_szenario']['checkliste'])}
+vorgabe = st.session_state['_szenario']
+
+def vorgabe_wert(name, standard):
+    """Startwert eines Eingabefelds: aus dem Szenario-Link, sonst der Standardwert."""
+    wert = vorgabe.get(name)
+    return standard if wert is None else type(standard)(wert)
+
+def vorgabe_index(name, standard=0):
+    """Startindex einer Auswahlliste aus immo_szenario.OPTIONEN."""
+    wert = vorgabe.get(name)
+    return immo_szenario.OPTIONEN[name].index(wert) if wert is not None else standard
+
 nutzungsart = st.selectbox(
-    "Nutzungsart wählen", ["Vermietung", "Eigennutzung"], index=0,
+    "Nutzungsart wählen", immo_szenario.OPTIONEN['nutzungsart'], index=vorgabe_index('nutzungsart'),
     help="Vermietung = steuerliche AfA-Berechnung und Cashflow-Analyse. Eigennutzung = reine Kostenübersicht."
 )
 
@@ -379,26 +397,37 @@ with st.expander("ℹ️ Warum sind diese Daten wichtig?", expanded=False):
     - **Wohnfläche** fließt in die CO2-Berechnung und die private Instandhaltungsrücklage ein.
     """)
 
-wohnort        = st.text_input("Wohnort / Stadtteil", "Nürnberg",
-                    help="Erscheint im PDF-Bericht. Beeinflusst keine Berechnung.")
-baujahr        = st.selectbox("Baujahr", ["1925 - 2022", "vor 1925", "ab 2023"],
+wohnort_eingabe = st.text_input("Wohnort / Stadtteil", vorgabe_wert('wohnort', "Nürnberg"),
+                    help="Erscheint im PDF-Bericht. Wird auf die amtliche Schreibweise vereinheitlicht, soweit der Ort "
+                         f"im mitgelieferten Ortsverzeichnis steht ({immo_wohnort.VERZEICHNIS_UMFANG}); "
+                         "andere Orte werden unverändert übernommen.")
+wohnort        = immo_wohnort.kanonischer_wohnort(wohnort_eingabe)
+if wohnort != immo_wohnort.bereinige_wohnort(wohnort_eingabe):
+    st.caption(f"→ Vereinheitlicht zu: **{wohnort}**")
+elif immo_wohnort.wohnort_schluessel(wohnort_eingabe) and not immo_wohnort.wohnort_index_treffer(wohnort_eingabe):
+    _vorschlaege = immo_wohnort.vorschlaege(wohnort_eingabe)
+    if _vorschlaege:
+        st.caption("Meinten Sie: " + ", ".join(f"**{v['name']}** ({v['typ']}, {v['land']})" for v in _vorschlaege))
+    else:
+        st.caption(f"Nicht im Ortsverzeichnis ({immo_wohnort.VERZEICHNIS_UMFANG}), wird unverändert übernommen.")
+baujahr        = st.selectbox("Baujahr", immo_szenario.OPTIONEN['baujahr'], index=vorgabe_index('baujahr'),
                     help="Bestimmt den AfA-Satz (§ 7 Abs. 4 EStG). Gilt nur für den Gebäudeanteil.")
-wohnflaeche_qm = st.number_input("Wohnfläche (m²)", min_value=10, max_value=500, value=80,
+wohnflaeche_qm = st.number_input("Wohnfläche (m²)", min_value=10, max_value=500, value=vorgabe_wert('wohnflaeche_qm', 80),
                     help="Wird für CO2-Berechnung und private Instandhaltungsrücklage (€/m²/Monat) verwendet.")
-stockwerk      = st.selectbox("Stockwerk", ["EG","1","2","3","4","5","6","DG"],
+stockwerk      = st.selectbox("Stockwerk", immo_szenario.OPTIONEN['stockwerk'], index=vorgabe_index('stockwerk'),
                     help="Dokumentation für PDF. EG = höheres Einbruchsrisiko, DG = ggf. Dachschäden.")
-zimmeranzahl   = st.selectbox("Zimmeranzahl", ["1","1,5","2","2,5","3","3,5","4","4,5","5"], index=4,
+zimmeranzahl   = st.selectbox("Zimmeranzahl", immo_szenario.OPTIONEN['zimmeranzahl'], index=vorgabe_index('zimmeranzahl', 4),
                     help="2–3 Zimmer = hohe Mietnachfrage, geringes Leerstandsrisiko.")
-energieeffizienz = st.selectbox("Energieeffizienz", ["A+","A","B","C","D","E","F","G","H"], index=2,
+energieeffizienz = st.selectbox("Energieeffizienz", immo_szenario.OPTIONEN['energieeffizienz'], index=vorgabe_index('energieeffizienz', 2),
                     help="Bestimmt den CO2-Ausstoß und damit den Vermieteranteil an der CO2-Steuer.")
 heizungstyp    = st.selectbox("Heizungstyp",
-                    ["Gas", "Heizöl", "Fernwärme (fossil)", "Wärmepumpe", "Pellets/Holz"], index=0,
+                    immo_szenario.OPTIONEN['heizungstyp'], index=vorgabe_index('heizungstyp'),
                     help="Wärmepumpe & Pellets: 0 € CO2-Steuer. Gas/Öl: CO2-Kosten je nach Effizienzklasse.")
 
 with st.expander("🔧 Jahresheizverbrauch (optional — für genauere CO2-Berechnung)", expanded=False):
     st.caption("Leer lassen (= 0) → Schätzwert aus Energieklasse. Genauen Wert finden Sie im Energieausweis.")
     jahresverbrauch_kwh = st.number_input("Jährl. Heizenergieverbrauch (kWh/Jahr)",
-                              min_value=0, max_value=100000, value=0, step=500,
+                              min_value=0, max_value=100000, value=vorgabe_wert('jahresverbrauch_kwh', 0), step=500,
                               help="0 = Schätzwert aus Energieklasse × Wohnfläche.")
 
 co2_vorschau = berechne_co2_vermieter(heizungstyp, energieeffizienz, wohnflaeche_qm,
@@ -433,9 +462,9 @@ if energieeffizienz in ["D","E","F","G","H"]:
     st.info("💡 Tipp: Eine energetische Sanierung (Dämmung, Heizungstausch) kann den CO2-Steueranteil "
             "erheblich senken oder eliminieren — und den Wiederverkaufswert steigern.")
 
-oepnv_anbindung = st.selectbox("ÖPNV-Anbindung", ["Sehr gut","Gut","Okay"],
+oepnv_anbindung = st.selectbox("ÖPNV-Anbindung", immo_szenario.OPTIONEN['oepnv_anbindung'], index=vorgabe_index('oepnv_anbindung'),
                     help="Gute Anbindung senkt Leerstandsrisiko und stützt den Wiederverkaufspreis.")
-besonderheiten  = st.text_input("Besonderheiten", "Balkon, Einbauküche",
+besonderheiten  = st.text_input("Besonderheiten", vorgabe_wert('besonderheiten', "Balkon, Einbauküche"),
                     help="Freitext für den PDF-Bericht.")
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -453,13 +482,13 @@ with st.expander("ℹ️ Was ist der Unterschied zwischen Kaufpreis und Gesamtin
     💡 Die Kaufnebenkosten sind im Jahr 1 bei Vermietung steuerlich absetzbar → großer Steuereffekt in Jahr 1.
     """)
 
-kaufpreis     = st.number_input("Kaufpreis (€)", min_value=0, max_value=10000000, value=250000, step=1000,
+kaufpreis     = st.number_input("Kaufpreis (€)", min_value=0, max_value=10000000, value=vorgabe_wert('kaufpreis', 250000), step=1000,
                     help="Reiner Kaufpreis laut Kaufvertrag. Basis für AfA und Renditeberechnung.")
-garage        = st.number_input("Garage/Stellplatz (€)", min_value=0, max_value=50000, value=0, step=1000,
+garage        = st.number_input("Garage/Stellplatz (€)", min_value=0, max_value=50000, value=vorgabe_wert('garage', 0), step=1000,
                     help="Wird zur Nebenkosten-Basis addiert. Stellplätze selbst sind nicht AfA-fähig.")
-invest_bedarf = st.number_input("Zusätzl. Investitionsbedarf (€)", min_value=0, max_value=1000000, value=10000, step=1000,
+invest_bedarf = st.number_input("Zusätzl. Investitionsbedarf (€)", min_value=0, max_value=1000000, value=vorgabe_wert('invest_bedarf', 10000), step=1000,
                     help="Geplante Renovierungen. Erhöht Darlehenssumme, kann als Werbungskosten absetzbar sein.")
-eigenkapital  = st.number_input("Eigenkapital (€)", min_value=0, max_value=10000000, value=80000, step=1000,
+eigenkapital  = st.number_input("Eigenkapital (€)", min_value=0, max_value=10000000, value=vorgabe_wert('eigenkapital', 80000), step=1000,
                     help="Faustregel: Mind. die Kaufnebenkosten (~10%) sollten aus Eigenkapital stammen.")
 if nutzungsart == "Eigennutzung" and eigenkapital == 0:
     st.error("⚠️ **Kein Eigenkapital:** Bei einer 100%-Finanzierung werden auch die Kaufnebenkosten kreditfinanziert. Das ist ungewöhnlich risikoreich — Banken verlangen i.d.R. mind. 10–20% EK.")
@@ -474,15 +503,43 @@ if nutzungsart == "Vermietung":
             "Bodenrichtwert: [boris.bayern.de](https://www.boris.bayern.de)")
     gebaeude_anteil = st.slider(
         "Gebäudeanteil am Kaufpreis (%) — AfA-Basis",
-        min_value=40, max_value=95, value=80, step=5,
+        min_value=40, max_value=95, value=vorgabe_wert('gebaeude_anteil', 80), step=5,
         help="100% minus dieser Wert = Bodenanteil (nicht abschreibbar). Je niedriger, desto geringer die jährliche AfA."
     )
     st.caption(
         f"→ AfA-Basis: **{de(kaufpreis * gebaeude_anteil / 100, 0)} €** "
         f"| Bodenanteil (nicht absetzbar): **{de(kaufpreis * (100 - gebaeude_anteil) / 100, 0)} €**"
     )
+    afa_methode, sonder_afa = 'linear', False
+    if baujahr == "ab 2023":
+        _a1, _a2 = st.columns(2)
+        afa_methode = _a1.radio(
+            "AfA-Methode (Neubau)", immo_szenario.OPTIONEN['afa_methode'], index=vorgabe_index('afa_methode'),
+            format_func=lambda m: f"Linear {de(immo_afa.afa_satz(baujahr), 0)} %" if m == 'linear'
+                                  else f"Degressiv {de(immo_afa.DEGRESSIV_SATZ_P, 0)} % vom Restwert",
+            help="Degressive AfA (§ 7 Abs. 5a EStG) für Neubauten mit Baubeginn 10/2023 – 09/2029. "
+                 "Wechselt automatisch zur linearen AfA, sobald diese höher ist.")
+        sonder_afa = _a2.checkbox(
+            "Sonder-AfA § 7b", value=bool(vorgabe_wert('sonder_afa', 0)),
+            help=f"Zusätzlich {de(immo_afa.SONDER_AFA_P, 0)} % p.a. in den ersten {immo_afa.SONDER_AFA_JAHRE} Jahren. "
+                 f"Bemessungsgrundlage max. {de(immo_afa.SONDER_AFA_MAX_QM, 0)} €/m², entfällt bei Baukosten über "
+                 f"{de(immo_afa.SONDER_AFA_BAUKOSTEN_MAX_QM, 0)} €/m² (Effizienzhaus 40 / QNG erforderlich).")
+    modernisierung_afa, modernisierung_jahre = 'gebaeude', None
+    if invest_bedarf > 0:
+        _m1, _m2 = st.columns(2)
+        modernisierung_afa = _m1.selectbox(
+            "Investitionsbedarf steuerlich", immo_szenario.OPTIONEN['modernisierung_afa'],
+            index=vorgabe_index('modernisierung_afa'),
+            format_func=lambda m: "Wie Gebäude abschreiben" if m == 'gebaeude' else "Erhaltungsaufwand (verteilt)",
+            help="Anschaffungsnahe Kosten (> 15 % des Gebäudewerts in 3 Jahren) erhöhen die AfA-Basis des Gebäudes. "
+                 "Reiner Erhaltungsaufwand ist sofort oder verteilt auf 2–5 Jahre absetzbar (§ 82b EStDV).")
+        if modernisierung_afa == 'verteilt':
+            modernisierung_jahre = _m2.number_input("Verteilt auf (Jahre)", min_value=1, max_value=5,
+                                                    value=vorgabe_wert('modernisierung_jahre', 1), step=1,
+                                                    help="1 = sofort im Jahr 1 absetzbar.")
 else:
     gebaeude_anteil = 80  # Standardwert, für Eigennutzung nicht relevant
+    afa_methode, sonder_afa, modernisierung_afa, modernisierung_jahre = 'linear', False, 'gebaeude', None
 
 st.subheader("Kaufnebenkosten (%)")
 with st.expander("ℹ️ Was sind Kaufnebenkosten?", expanded=False):
@@ -497,18 +554,17 @@ with st.expander("ℹ️ Was sind Kaufnebenkosten?", expanded=False):
     Bei Vermietung sind alle Kaufnebenkosten als Werbungskosten absetzbar (Jahr 1).
     """)
 
-grunderwerbsteuer = st.number_input("Grunderwerbsteuer %", min_value=0.0, max_value=15.0, value=3.5, step=0.1,
+grunderwerbsteuer = st.number_input("Grunderwerbsteuer %", min_value=0.0, max_value=15.0, value=vorgabe_wert('grunderwerbsteuer', 3.5), step=0.1,
                         help="Bayern: 3,5% (2026). Bitte an Ihr Bundesland anpassen.")
-notar     = st.number_input("Notar %", min_value=0.0, max_value=10.0, value=1.5, step=0.1,
+notar     = st.number_input("Notar %", min_value=0.0, max_value=10.0, value=vorgabe_wert('notar', 1.5), step=0.1,
                         help="Beurkundung + notarielle Leistungen. Ca. 1,0–2,0% des Kaufpreises.")
-grundbuch = st.number_input("Grundbuch %", min_value=0.0, max_value=10.0, value=0.5, step=0.1,
+grundbuch = st.number_input("Grundbuch %", min_value=0.0, max_value=10.0, value=vorgabe_wert('grundbuch', 0.5), step=0.1,
                         help="Eintragung ins Grundbuch (Eigentum + Grundschuld). Ca. 0,5%.")
-makler    = st.number_input("Makler %", min_value=0.0, max_value=10.0, value=3.57, step=0.01,
+makler    = st.number_input("Makler %", min_value=0.0, max_value=10.0, value=vorgabe_wert('makler', 3.57), step=0.01,
                         help="Seit 2020 max. 3,57% je Seite. Bei Direktkauf: 0%.")
 
 nebenkosten_summe  = (kaufpreis + garage) * (grunderwerbsteuer + notar + grundbuch + makler) / 100
 gesamtfinanzierung = kaufpreis + garage + invest_bedarf + nebenkosten_summe
-darlehen1_summe    = gesamtfinanzierung - eigenkapital
 
 st.caption(
     f"Kaufnebenkosten gesamt: **{de(nebenkosten_summe, 0)} €** "
@@ -517,9 +573,35 @@ st.caption(
 )
 
 st.subheader("Darlehen")
-st.info(f"**Darlehenssumme (automatisch):** {de(darlehen1_summe)} € *(Gesamtinvestition − Eigenkapital)*")
+with st.expander("➕ Weitere Tranchen (KfW, Bauspar, endfällig)", expanded=False):
+    st.caption("Zusätzliche Darlehen mit fester Summe. Das Hauptdarlehen deckt den verbleibenden Bedarf. "
+               "Je Tranche entweder Tilgung (%) oder Laufzeit angeben; KfW-Darlehen oft mit tilgungsfreien Anlaufjahren.")
+    _tranchen_tabelle = st.data_editor(
+        {spalte: [t[feld] for t in vorgabe.get('tranchen', [])] for spalte, feld in (
+            ("Name", 'name'), ("Typ", 'typ'), ("Summe (€)", 'summe'), ("Zins (%)", 'zins_p'), ("Tilgung (%)", 'tilgung_p'),
+            ("Laufzeit (J.)", 'laufzeit_jahre'), ("Tilgungsfrei (J.)", 'tilgungsfrei_jahre'))},
+        num_rows="dynamic", key="tranchen_editor",
+        column_config={
+            "Typ": st.column_config.SelectboxColumn(options=list(immo_finanzierung.TRANCHEN_TYPEN), default="kfw", required=True),
+            "Summe (€)": st.column_config.NumberColumn(min_value=0, step=1000, required=True),
+            "Zins (%)": st.column_config.NumberColumn(min_value=0.0, max_value=15.0, step=0.05, required=True),
+            "Tilgung (%)": st.column_config.NumberColumn(min_value=0.0, max_value=20.0, step=0.1),
+            "Laufzeit (J.)": st.column_config.NumberColumn(min_value=1, max_value=50, step=1),
+            "Tilgungsfrei (J.)": st.column_config.NumberColumn(min_value=0, max_value=10, step=1, default=0),
+        })
+weitere_tranchen = [
+    {'name': name or immo_finanzierung.TRANCHEN_TYPEN[typ or 'kfw'], 'typ': typ or 'kfw', 'summe': summe, 'zins_p': zins or 0.0,
+     'tilgung_p': tilg, 'laufzeit_jahre': lz, 'tilgungsfrei_jahre': frei or 0}
+    for name, typ, summe, zins, tilg, lz, frei in zip(*_tranchen_tabelle.values())
+    if summe
+]
+darlehen1_summe = gesamtfinanzierung - eigenkapital - sum(t['summe'] for t in weitere_tranchen)
+if weitere_tranchen:
+    st.info(f"**Hauptdarlehen (automatisch):** {de(darlehen1_summe)} € *(Gesamtinvestition − Eigenkapital − weitere Tranchen)*")
+else:
+    st.info(f"**Darlehenssumme (automatisch):** {de(darlehen1_summe)} € *(Gesamtinvestition − Eigenkapital)*")
 
-zins1 = st.number_input("Zins (%)", min_value=0.0, max_value=10.0, value=3.5, step=0.05,
+zins1 = st.number_input("Zins (%)", min_value=0.0, max_value=10.0, value=vorgabe_wert('zins1', 3.5), step=0.05,
             help="Aktueller Bauzins für Ihre Zinsbindungsperiode. Nach Ablauf muss neu verhandelt werden.")
 
 with st.expander("ℹ️ Welchen Tilgungsmodus soll ich wählen?", expanded=False):
@@ -533,18 +615,18 @@ with st.expander("ℹ️ Welchen Tilgungsmodus soll ich wählen?", expanded=Fals
     """)
 
 tilgung1_modus = st.selectbox("Tilgungsmodus",
-    ["Tilgungssatz (%)","Tilgungsbetrag (€ mtl.)","Laufzeit (Jahre)"], index=0)
+    immo_szenario.OPTIONEN['tilgung1_modus'], index=vorgabe_index('tilgung1_modus'))
 
 if tilgung1_modus.startswith("Tilgungssatz"):
-    tilgung1 = st.number_input("Tilgung (%)", min_value=0.0, max_value=10.0, value=2.0, step=0.1,
+    tilgung1 = st.number_input("Tilgung (%)", min_value=0.0, max_value=10.0, value=vorgabe_wert('tilgung1', 2.0), step=0.1,
                     help="Anfangstilgungssatz p.a. Empfehlung: mind. 2%.")
     tilg_eur1, laufzeit1 = None, None
 elif tilgung1_modus.startswith("Tilgungsbetrag"):
-    tilg_eur1 = st.number_input("Tilgung (€ mtl.)", min_value=0, max_value=50000, value=350, step=50,
+    tilg_eur1 = st.number_input("Tilgung (€ mtl.)", min_value=0, max_value=50000, value=vorgabe_wert('tilg_eur1', 350), step=50,
                     help="Muss höher sein als der monatliche Zinsanteil, sonst tilgen Sie nichts.")
     tilgung1, laufzeit1 = None, None
 else:
-    laufzeit1 = st.number_input("Laufzeit (Jahre)", min_value=1, max_value=50, value=25, step=1,
+    laufzeit1 = st.number_input("Laufzeit (Jahre)", min_value=1, max_value=50, value=vorgabe_wert('laufzeit1', 25), step=1,
                     help="Die monatliche Rate wird automatisch per Annuitätsformel berechnet.")
     tilgung1, tilg_eur1 = None, None
 
@@ -560,9 +642,23 @@ st.markdown(f"""
 - Laufzeit (Annuität): **{d1['laufzeit_jahre']:.1f} Jahre**
 - Tilgungssatz: **{d1['tilgung_p_ergebnis']:.2f} %**
 """)
-zinsbindung = st.number_input("Zinsbindung (Jahre)", min_value=5, max_value=30, value=10, step=5,
+tranchen = None
+if weitere_tranchen:
+    tranchen = [{'name': "Hauptdarlehen", 'typ': 'annuitaet', 'summe': darlehen1_summe, 'zins_p': zins1,
+                 'monatsrate': d1['monatsrate']}] + weitere_tranchen
+    _plan = immo_finanzierung.berechne_tranchen(tranchen)
+    _jahre = immo_finanzierung.jahreswerte(_plan)
+    st.markdown(f"**Gesamtfinanzierung ({len(tranchen)} Tranchen):** Kapitaldienst Jahr 1 **{de(_jahre['rate'][0])} €** "
+                f"(davon Zinsen {de(_jahre['zinsen'][0])} €)")
+    st.dataframe([
+        {'Tranche': name, 'Summe (€)': round(_plan['summe'][i]), 'Rate zu Beginn (€/Monat)': round(_plan['monatsrate_start'][i], 2),
+         'Restschuld nach 10 J. (€)': round(_plan['restschuld'][i, 119])}
+        for i, name in enumerate(_plan['namen'])
+    ], hide_index=True)
+
+zinsbindung = st.number_input("Zinsbindung (Jahre)", min_value=5, max_value=30, value=vorgabe_wert('zinsbindung', 10), step=5,
                 help="Nach Ablauf der Zinsbindung muss das Darlehen zu dann geltenden Zinsen weitergeführt oder umgeschuldet werden. Üblich: 10–15 Jahre.")
-sondertilgung_p = st.number_input("Sondertilgungsrecht (% p.a.)", min_value=0.0, max_value=20.0, value=5.0, step=1.0,
+sondertilgung_p = st.number_input("Sondertilgungsrecht (% p.a.)", min_value=0.0, max_value=20.0, value=vorgabe_wert('sondertilgung_p', 5.0), step=1.0,
                 help="Die meisten Kreditverträge erlauben 5–10% der Darlehenssumme p.a. als Sondertilgung. Erhöht Ihre Flexibilität erheblich.")
 if nutzungsart == "Vermietung":
     st.caption(
@@ -577,6 +673,48 @@ else:
     )
 st.caption("ℹ️ Laufzeit ≠ Zinsbindung. Nach Ablauf der Zinsbindung muss zu dann geltenden Konditionen neu finanziert werden.")
 
+with st.expander("🏦 Bankangebote vergleichen (Effektivzins)", expanded=False):
+    st.caption("Tragen Sie die Konditionen der Angebote ein (eine Zeile je Angebot). Verglichen wird über die Darlehenssumme des Hauptdarlehens; "
+               "Ihre aktuelle Eingabe (ohne Gebühren) läuft als Referenz mit.")
+    _angebote_tabelle = st.data_editor(
+        {"Bank": ["Angebot 1"], "Sollzins (%)": [3.5], "Tilgung (%)": [2.0], "Zinsbindung (J.)": [10], "Sondertilgung (%)": [5.0],
+         "Bereitstellungszins (%)": [3.0], "Bereitstellungsfrei (Mon.)": [6], "Auszahlung nach (Mon.)": [0],
+         "Gebühren (€)": [0], "Disagio (%)": [0.0]},
+        num_rows="dynamic", key="angebote_editor",
+        column_config={
+            "Bank": st.column_config.TextColumn(required=True),
+            "Sollzins (%)": st.column_config.NumberColumn(min_value=0.0, max_value=15.0, step=0.01, required=True),
+            "Tilgung (%)": st.column_config.NumberColumn(min_value=0.0, max_value=20.0, step=0.1, default=2.0),
+            "Zinsbindung (J.)": st.column_config.NumberColumn(min_value=1, max_value=40, step=1, default=10),
+            "Sondertilgung (%)": st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=1.0, default=5.0),
+            "Bereitstellungszins (%)": st.column_config.NumberColumn(min_value=0.0, max_value=10.0, step=0.25, default=0.0),
+            "Bereitstellungsfrei (Mon.)": st.column_config.NumberColumn(min_value=0, max_value=60, step=1, default=0),
+            "Auszahlung nach (Mon.)": st.column_config.NumberColumn(min_value=0, max_value=60, step=1, default=0),
+            "Gebühren (€)": st.column_config.NumberColumn(min_value=0, step=100, default=0),
+            "Disagio (%)": st.column_config.NumberColumn(min_value=0.0, max_value=10.0, step=0.5, default=0.0),
+        })
+    angebote = [
+        {'name': bank, 'sollzins_p': soll, 'tilgung_p': tilg, 'zinsbindung_jahre': bindung, 'sondertilgung_p': st_p,
+         'bereitstellungszins_p': bz, 'bereitstellungsfrei_monate': frei, 'auszahlung_monate': ausz,
+         'gebuehren': geb, 'disagio_p': dis}
+        for bank, soll, tilg, bindung, st_p, bz, frei, ausz, geb, dis in zip(*_angebote_tabelle.values())
+        if soll is not None
+    ]
+    if angebote and darlehen1_summe > 0:
+        _vergleich = immo_angebote.vergleiche_angebote(
+            angebote + [{'name': "Ihre Eingabe", 'sollzins_p': zins1, 'tilgung_p': d1['tilgung_p_ergebnis'],
+                         'zinsbindung_jahre': zinsbindung, 'sondertilgung_p': sondertilgung_p}], darlehen1_summe)
+        st.dataframe([
+            {'Rang': z['rang'], 'Bank': z['name'], 'Sollzins (%)': z['sollzins_p'], 'Effektivzins (%)': round(z['effektivzins_p'], 2),
+             'Rate (€/Monat)': round(z['monatsrate'], 2), 'Zinsbindung (J.)': z['zinsbindung_jahre'],
+             'Sondertilgung (%)': z['sondertilgung_p'], 'Kosten bis Bindungsende (€)': round(z['gesamtkosten']),
+             'Kosten p.a. (€)': round(z['kosten_pa']), 'Restschuld (€)': round(z['restschuld'])}
+            for z in _vergleich], hide_index=True)
+        _bestes = next(z for z in _vergleich if z['name'] != "Ihre Eingabe")
+        st.caption(f"💡 Günstigstes Angebot: **{_bestes['name']}** mit {de(_bestes['effektivzins_p'])} % effektiv "
+                   f"(Sollzins {de(_bestes['sollzins_p'])} %). Übernehmen Sie Sollzins, Tilgung und Zinsbindung oben, "
+                   "um die Analyse damit zu rechnen. Bei unterschiedlichen Zinsbindungen zusätzlich Restschuld und Zinsrisiko beachten.")
+
 # ─────────────────────────────────────────────────────────────────────────────
 # SEKTION 3: Laufende Posten & Steuer
 # ─────────────────────────────────────────────────────────────────────────────
@@ -594,21 +732,35 @@ with st.expander("ℹ️ Was ist umlagefähig und was nicht?", expanded=False):
     """)
 
 if nutzungsart == "Vermietung":
-    kaltmiete_monatlich = st.number_input("Kaltmiete mtl. (€)", min_value=0, max_value=10000, value=1000, step=50,
+    if os.path.exists(MIETSPIEGEL_DATEI):
+        try:
+            mietspiegel = lade_mietspiegel(MIETSPIEGEL_DATEI, os.path.getmtime(MIETSPIEGEL_DATEI))
+            vorschlag   = mietspiegel.mietvorschlag(wohnort, wohnflaeche_qm, baujahr)
+        except (OSError, ValueError) as e:
+            vorschlag = None
+            st.caption(f"⚠️ Mietspiegel konnte nicht geladen werden: {e}")
+        if vorschlag:
+            st.info(
+                f"📍 **Mietspiegel-Vorschlag für {wohnort}:** {de(vorschlag['miete_mtl_von'], 0)}–{de(vorschlag['miete_mtl_bis'], 0)} €/Monat "
+                f"(Median {de(vorschlag['miete_mtl_median'], 0)} € = {de(vorschlag['miete_qm_median'])} €/m²) "
+                f"— {vorschlag['anzahl']} Vergleichsobjekte im Umkreis von {de(vorschlag['radius_km'], 0)} km"
+                f"{'' if vorschlag['baujahr_gefiltert'] else ', ohne Baujahr-Filter'}."
+            )
+    kaltmiete_monatlich = st.number_input("Kaltmiete mtl. (€)", min_value=0, max_value=10000, value=vorgabe_wert('kaltmiete_monatlich', 1000), step=50,
                               help="Nur Kaltmiete — ohne Nebenkosten. Die Nebenkosten werden separat als 'umlagefähig' erfasst.")
-    umlagefaehige_monat = st.number_input("Umlagefähige Kosten (€ mtl.)", min_value=0, max_value=1000, value=150, step=10,
+    umlagefaehige_monat = st.number_input("Umlagefähige Kosten (€ mtl.)", min_value=0, max_value=1000, value=vorgabe_wert('umlagefaehige_monat', 150), step=10,
                               help="Betriebskosten, die Sie als Vorauszahlung vom Mieter einziehen und weiterleiten. Durchlaufposten.")
-    nicht_umlagefaehige_pa = st.number_input("Nicht umlagef. Kosten p.a. (€)", min_value=0, max_value=10000, value=960, step=10,
+    nicht_umlagefaehige_pa = st.number_input("Nicht umlagef. Kosten p.a. (€)", min_value=0, max_value=10000, value=vorgabe_wert('nicht_umlagefaehige_pa', 960), step=10,
                               help="WEG-Hausgeldanteil (Verwaltung, Rücklage), Kontoführung etc. Typisch: 80–150 €/Monat.")
 
     st.subheader("Risikoabschläge (konservative Planung)")
     st.caption("Diese Positionen fehlen in vielen vereinfachten Rechnern — sie sind entscheidend für eine realistische Einschätzung.")
 
     mietausfallwagnis_p = st.slider("Mietausfallwagnis (% der Jahreskaltmiete)",
-                              min_value=0.0, max_value=10.0, value=3.0, step=0.5,
+                              min_value=0.0, max_value=10.0, value=vorgabe_wert('mietausfallwagnis_p', 3.0), step=0.5,
                               help="Puffer für Leerstand bei Mieterwechsel. Standard: 2–4% = ca. 1–2 Monatsleerstand p.a.")
     instandhaltung_qm   = st.slider("Private Instandhaltungsrücklage (€/m²/Monat)",
-                              min_value=0.0, max_value=2.0, value=0.75, step=0.25,
+                              min_value=0.0, max_value=2.0, value=vorgabe_wert('instandhaltung_qm', 0.75), step=0.25,
                               help="Für wohnungsinternes Sondereigentum (Böden, Bad, Heizung in der Wohnung). Empfehlung: 0,50–1,00 €/m².")
     if kaltmiete_monatlich > 0:
         ausfall_pa      = kaltmiete_monatlich * 12 * mietausfallwagnis_p / 100
@@ -621,7 +773,7 @@ if nutzungsart == "Vermietung":
 else:
     kaltmiete_monatlich, umlagefaehige_monat, mietausfallwagnis_p = 0, 0, 0.0
     nicht_umlagefaehige_pa = st.number_input("Hausgeld p.a. (€)",
-                                min_value=0, max_value=50000, value=2400, step=120,
+                                min_value=0, max_value=50000, value=vorgabe_wert('nicht_umlagefaehige_pa', 2400), step=120,
                                 help="Hausgeld × 12. Enthält WEG-Verwaltung, Betriebskosten, ggf. Grundsteuer. Typisch: 2,50–4,00 €/m²/Monat.")
     hausgeld_qm = nicht_umlagefaehige_pa / wohnflaeche_qm / 12 if wohnflaeche_qm > 0 else 0
     if hausgeld_qm < 2.0 and nicht_umlagefaehige_pa > 0:
@@ -632,7 +784,7 @@ else:
     st.subheader("Private Instandhaltungsrücklage (Sondereigentum)")
     st.caption("Für wohnungsinterne Instandhaltung (Bad, Böden, Türen etc.) — zusätzlich zur WEG-Rücklage im Hausgeld.")
     instandhaltung_qm = st.slider("Private Instandhaltungsrücklage (€/m²/Monat)",
-                        min_value=0.0, max_value=2.0, value=0.75, step=0.25,
+                        min_value=0.0, max_value=2.0, value=vorgabe_wert('instandhaltung_qm', 0.75), step=0.25,
                         help="Empfehlung: 0,50–1,00 €/m² bei älteren Objekten eher 1,00–1,50 €/m².")
     instand_eigen_pa = wohnflaeche_qm * instandhaltung_qm * 12
     st.caption(f"→ Private Instandhaltungsrücklage p.a.: **{de(instand_eigen_pa, 0)} €** ({de(instand_eigen_pa/12, 0)} €/Monat)")
@@ -643,7 +795,7 @@ else:
         co2_eigen_pa_calc = jahresverbrauch_kwh * HEIZUNG_CO2_FAKTOR.get(heizungstyp, 0) / 1000 * CO2_KOST_AUFG_PREIS
 
 if nutzungsart == "Vermietung":
-    steuersatz = st.number_input("Persönl. Grenzsteuersatz (%)", min_value=0.0, max_value=100.0, value=42.0, step=0.5,
+    steuersatz = st.number_input("Persönl. Grenzsteuersatz (%)", min_value=0.0, max_value=100.0, value=vorgabe_wert('steuersatz', 42.0), step=0.5,
                       help="Verwenden Sie Ihren Grenzsteuersatz (nicht Durchschnitt). Bei ~60.000 € Einkommen: ca. 42%.")
 else:
     steuersatz = 0.0
@@ -663,7 +815,7 @@ with st.expander("ℹ️ Welchen Steuersatz soll ich eintragen?", expanded=False
 
 st.subheader("Persönliche Finanzsituation")
 verfuegbares_einkommen = st.number_input("Monatl. verfügbares Einkommen (€)",
-                            min_value=0, max_value=100000, value=2500, step=100,
+                            min_value=0, max_value=100000, value=vorgabe_wert('verfuegbares_einkommen', 2500), step=100,
                             help="Ihr aktuelles frei verfügbares Nettoeinkommen. Das Tool zeigt, wie die Immobilie diesen Betrag verändert.")
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -687,19 +839,31 @@ with st.expander("ℹ️ Warum sind diese Dokumente wichtig?", expanded=False):
 st.markdown("Haken Sie ab, welche Dokumente Sie bereits haben:")
 if 'checklist_status' not in st.session_state:
     st.session_state['checklist_status'] = {}
-for i, item in enumerate(checklist_items):
-    st.session_state['checklist_status'][item] = st.checkbox(
-        item, key=f"check_{item}_{i}",
-        value=st.session_state['checklist_status'].get(item, False)
-    )
-checked_count = sum(st.session_state['checklist_status'].values())
-total_count   = len(checklist_items)
-if checked_count == total_count:
-    st.success(f"✅ Alle {total_count} Dokumente vorhanden — gut vorbereitet!")
-elif checked_count >= total_count * 0.6:
-    st.warning(f"⚠️ {checked_count}/{total_count} Dokumente vorhanden — noch nicht vollständig.")
-else:
-    st.error(f"❌ Nur {checked_count}/{total_count} Dokumente vorhanden — bitte anfordern vor der Entscheidung.")
+
+@st.fragment
+def zeige_checkliste():
+    """Eigenes Fragment: ein Haken lädt nur die Checkliste neu, nicht die ganze Seite."""
+    with immo_latenz.latenz_messung().messe('Fragment: Checkliste'):
+        for i, item in enumerate(checklist_items):
+            st.session_state['checklist_status'][item] = st.checkbox(
+                item, key=f"check_{item}_{i}",
+                value=st.session_state['checklist_status'].get(item, False)
+            )
+        checked_count = sum(st.session_state['checklist_status'].values())
+        total_count   = len(checklist_items)
+        if checked_count == total_count:
+            st.success(f"✅ Alle {total_count} Dokumente vorhanden — gut vorbereitet!")
+        elif checked_count >= total_count * 0.6:
+            st.warning(f"⚠️ {checked_count}/{total_count} Dokumente vorhanden — noch nicht vollständig.")
+        else:
+            st.error(f"❌ Nur {checked_count}/{total_count} Dokumente vorhanden — bitte anfordern vor der Entscheidung.")
+        # Szenario-Link ohne Neuladen der Seite nachführen
+        if '_szenario_felder' in st.session_state:
+            st.query_params[immo_szenario.URL_PARAMETER] = immo_szenario.kodiere(dict(
+                st.session_state['_szenario_felder'],
+                checkliste=[st.session_state['checklist_status'].get(item, False) for item in checklist_items]))
+
+zeige_checkliste()
 
 # ─────────────────────────────────────────────────────────────────────────────
 # INPUTS-DICT
@@ -712,6 +876,8 @@ inputs = {
     'oepnv_anbindung': oepnv_anbindung, 'besonderheiten': besonderheiten,
     'kaufpreis': kaufpreis, 'garage_stellplatz_kosten': garage, 'invest_bedarf': invest_bedarf,
     'eigenkapital': eigenkapital, 'gebaeude_anteil_prozent': gebaeude_anteil,
+    'afa_methode': afa_methode, 'sonder_afa': sonder_afa,
+    'modernisierung_afa': modernisierung_afa, 'modernisierung_jahre': modernisierung_jahre,
     'nebenkosten_prozente': {'grunderwerbsteuer': grunderwerbsteuer, 'notar': notar,
                              'grundbuch': grundbuch, 'makler': makler},
     'nutzungsart': nutzungsart, 'zins1_prozent': zins1, 'modus_d1': modus_d1,
@@ -722,28 +888,153 @@ inputs = {
     'nicht_umlagefaehige_kosten_pa': nicht_umlagefaehige_pa,
     'instand_eigen_pa': instand_eigen_pa if nutzungsart == "Eigennutzung" else 0,
     'co2_eigen_pa': co2_eigen_pa_calc if nutzungsart == "Eigennutzung" else 0,
-    'zinsbindung': zinsbindung,
+    'zinsbindung': zinsbindung, 'tranchen': tranchen,
     'sondertilgung_p': sondertilgung_p,
     'mietausfallwagnis_prozent': mietausfallwagnis_p, 'instandhaltung_euro_qm': instandhaltung_qm if nutzungsart == 'Vermietung' else 0,
     'steuersatz': steuersatz, 'verfuegbares_einkommen_mtl': verfuegbares_einkommen,
     'checklist_status': st.session_state['checklist_status']
 }
 
+szenario_felder = {
+    'nutzungsart': nutzungsart, 'baujahr': baujahr, 'stockwerk': stockwerk, 'zimmeranzahl': zimmeranzahl,
+    'energieeffizienz': energieeffizienz, 'heizungstyp': heizungstyp, 'oepnv_anbindung': oepnv_anbindung,
+    'tilgung1_modus': tilgung1_modus, 'wohnflaeche_qm': wohnflaeche_qm, 'jahresverbrauch_kwh': jahresverbrauch_kwh,
+    'kaufpreis': kaufpreis, 'garage': garage, 'invest_bedarf': invest_bedarf, 'eigenkapital': eigenkapital,
+    'gebaeude_anteil': gebaeude_anteil, 'grunderwerbsteuer': grunderwerbsteuer, 'notar': notar,
+    'grundbuch': grundbuch, 'makler': makler, 'zins1': zins1, 'tilgung1': tilgung1, 'tilg_eur1': tilg_eur1,
+    'laufzeit1': laufzeit1, 'zinsbindung': zinsbindung, 'sondertilgung_p': sondertilgung_p,
+    'kaltmiete_monatlich': kaltmiete_monatlich, 'umlagefaehige_monat': umlagefaehige_monat,
+    'nicht_umlagefaehige_pa': nicht_umlagefaehige_pa, 'mietausfallwagnis_p': mietausfallwagnis_p,
+    'instandhaltung_qm': instandhaltung_qm, 'steuersatz': steuersatz, 'verfuegbares_einkommen': verfuegbares_einkommen,
+    'checkliste': [st.session_state['checklist_status'].get(item, False) for item in checklist_items],
+    'wohnort': wohnort, 'besonderheiten': besonderheiten, 'tranchen': weitere_tranchen,
+    'afa_methode': afa_methode, 'sonder_afa': sonder_afa,
+    'modernisierung_afa': modernisierung_afa, 'modernisierung_jahre': modernisierung_jahre,
+}
+st.session_state['_szenario_felder'] = szenario_felder
+szenario_code = immo_szenario.kodiere(szenario_felder)
+# Vergleichsstand für den Hinweis "Eingaben geändert": ohne Checkliste, sie geht nicht in die Rechnung ein
+eingaben_code = immo_szenario.kodiere(dict(szenario_felder, checkliste=()))
+# Adresszeile aktuell halten: ein Neuladen oder Teilen der URL stellt das Szenario wieder her
+if st.query_params.get(immo_szenario.URL_PARAMETER) != szenario_code:
+    st.query_params[immo_szenario.URL_PARAMETER] = szenario_code
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def analyse_fuer_szenario(code, _inputs):
+    """Ergebnis eines Szenario-Links; gleiche Links werden sitzungsübergreifend nur einmal berechnet."""
+    return calculate_analytics(_inputs)
+
+def ergebnis_stand():
+    """
+    Momentaufnahme der Eingaben zum Zeitpunkt der Berechnung. Ergebnisse und
+    PDF zeigen diesen Stand, bis erneut auf "Analyse berechnen" geklickt wird.
+    """
+    return {'inputs': dict(inputs, checklist_status=dict(st.session_state['checklist_status'])),
+            'd1': d1, 'darlehen1_summe': darlehen1_summe, 'eingaben_code': eingaben_code}
+
+def zeige_analyse(berechnung):
+    """Holt die Analyse des aktuellen Szenarios aus dem Sitzungsspeicher oder berechnet sie."""
+    eintrag = speicher.hole(szenario_code) or speicher.lege_ab(
+        szenario_code, {'results': berechnung(), 'stand': ergebnis_stand()})
+    st.session_state['results'] = eintrag['results']
+    st.session_state['results_stand'] = eintrag['stand']
+
 if 'results' not in st.session_state:
     st.session_state['results'] = None
+if 'ergebnis_speicher' not in st.session_state:
+    st.session_state['ergebnis_speicher'] = immo_sitzung.ErgebnisSpeicher(SITZUNG_BUDGET_MB * 2**20)
+speicher = st.session_state['ergebnis_speicher']
+# Aus einem Link geladen: Ergebnisse sofort anzeigen, ohne Klick auf "Analyse berechnen"
+if st.session_state.pop('_szenario_code', None):
+    zeige_analyse(lambda: analyse_fuer_szenario(szenario_code, inputs))
 
 st.markdown("---")
+with st.expander("🔗 Szenario teilen", expanded=False):
+    st.caption("Der Link enthält alle Eingaben in komprimierter Form. Beim Öffnen werden die Felder "
+               "vorausgefüllt und die Ergebnisse direkt angezeigt.")
+    st.code(f"?{immo_szenario.URL_PARAMETER}={szenario_code}", language=None)
 if st.button("🔍 Analyse berechnen", type="primary"):
-    st.session_state['results'] = calculate_analytics(inputs)
+    zeige_analyse(lambda: calculate_analytics(inputs))
 
 results = st.session_state['results']
 
+STRESS_VORGABEN = {'stress_jahre': immo_stress.STANDARD_JAHRE, 'stress_zins': 3.0, 'stress_leer': 6,
+                   'stress_mietstopp': 5, 'stress_co2': 200, 'stress_reparatur': 30000}
+
+def stress_einstellungen():
+    return tuple(st.session_state.get(key, wert) for key, wert in STRESS_VORGABEN.items())
+
+def stresstest(objekte, einstellungen=None):
+    """Stresstest mit den Einstellungen aus dem Ergebnisteil (auch für PDF und Objektliste)."""
+    jahre, *staerke = einstellungen or stress_einstellungen()
+    return immo_stress.stresstest(objekte, immo_stress.katalog(*staerke), jahre)
+
 # ─────────────────────────────────────────────────────────────────────────────
-# ERGEBNISSE
+# ERGEBNISSE (Fragment: Eingaben im Ergebnisteil laden nur diesen Teil neu)
 # ─────────────────────────────────────────────────────────────────────────────
-if results:
-    st.markdown("---")
-    st.header("5. Ergebnisse")
+# Die Ergebnisteile hängen nur vom Rechenstand (stand['eingaben_code']) und ihren
+# eigenen Einstellungen ab. st.cache_data spielt Kennzahlen, Tabellen und
+# Diagramme bei geänderten Eingaben nur wieder ab; neu gerechnet wird erst
+# nach "Analyse berechnen" oder wenn sich die Einstellungen des Teils ändern.
+ergebnisteil = st.cache_data(max_entries=ERGEBNIS_TEILE_MAX, show_spinner=False)
+
+@ergebnisteil
+def _teil_zins_backtest(geaendert, _reihe, darlehen1_summe, zins1, monatsrate, zinsbindung, horizont, modus):
+    tilgung_p = monatsrate * 1200 / darlehen1_summe - zins1
+    try:
+        vergleich = immo_zinshistorie.vergleiche_zinsbindungen(
+            _reihe, darlehen1_summe, zins1, tilgung_p, horizont,
+            zinsbindungen=sorted({5, 10, 15, 20, zinsbindung}),
+            modus='relativ' if modus.startswith("Relativ") else 'absolut')
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    st.dataframe(
+        [{'Zinsbindung (J.)': z['zinsbindung'], 'Startmonate': z['fenster'],
+          'Zinsen Median (€)': round(z['zinsen_median']),
+          'Zinsen 10–90 % (€)': f"{de(z['zinsen_p10'], 0)} – {de(z['zinsen_p90'], 0)}",
+          f'Restschuld nach {horizont} J. Median (€)': round(z['restschuld_median']),
+          'Restschuld 90 % (€)': round(z['restschuld_p90']),
+          'Max. Monatsrate 90 % (€)': round(z['rate_max_p90'])} for z in vergleich],
+        hide_index=True)
+    gewaehlt = next(z for z in vergleich if z['zinsbindung'] == zinsbindung)
+    guenstigste = min(vergleich, key=lambda z: z['zinsen_median'])
+    st.caption(
+        f"Ihre Wahl ({zinsbindung} J.): Zinskosten im Median **{de(gewaehlt['zinsen_median'], 0)} €**, "
+        f"in 9 von 10 historischen Startmonaten höchstens {de(gewaehlt['zinsen_p90'], 0)} €. "
+        f"Im Median am günstigsten wäre eine Bindung von {guenstigste['zinsbindung']} Jahren gewesen "
+        "(ohne Aufschlag für längere Bindungen)."
+    )
+
+def zeige_zins_backtest(darlehen1_summe, zins1, d1, zinsbindung):
+    try:
+        geaendert = os.path.getmtime(ZINSREIHE_DATEI)
+        reihe = lade_zinsreihe(ZINSREIHE_DATEI, geaendert)
+    except (OSError, ValueError) as e:
+        st.caption(f"⚠️ Zinsreihe konnte nicht geladen werden: {e}")
+        return
+    st.subheader("📉 Zins-Backtest: Wie wäre es früher ausgegangen?")
+    with st.expander("ℹ️ Wie funktioniert der Backtest?", expanded=False):
+        st.markdown(f"""
+        Die Finanzierung wird für **jeden möglichen Startmonat** der Zinsreihe
+        ({reihe.monate[0]} bis {reihe.monate[-1]}) durchgespielt. Am Ende jeder Zinsbindung wird die Restschuld
+        zum **damaligen Zins** mit derselben Anfangstilgung anschlussfinanziert.
+
+        - **Relativ:** Start mit Ihrem Zins von {de(zins1)} %, danach ändern sich die Zinsen so wie in der Historie
+        - **Absolut:** Es gelten die historischen Zinsniveaus des jeweiligen Startmonats
+        """)
+    b1, b2 = st.columns(2)
+    horizont = b1.slider("Betrachtungszeitraum (Jahre)", min_value=5, max_value=40,
+                         value=min(max(2 * zinsbindung, 10), 30), step=1, key="bt_horizont")
+    modus = b2.radio("Zinsniveau", ["Relativ zu meinem Zins", "Historisch absolut"], key="bt_modus")
+    _teil_zins_backtest(geaendert, reihe, darlehen1_summe, zins1, d1['monatsrate'], zinsbindung, horizont, modus)
+
+@ergebnisteil
+def _teil_uebersicht(code, _results, _stand):
+    """Schnellübersicht, Detailrechnung und (Eigennutzung) Vermögensaufbau."""
+    results, inputs, d1 = _results, _stand['inputs'], _stand['d1']
+    nutzungsart, eigenkapital = inputs['nutzungsart'], inputs['eigenkapital']
+    verfuegbares_einkommen = inputs['verfuegbares_einkommen_mtl']
 
     if nutzungsart == "Vermietung":
         cf_vor  = next((r['val2'] for r in results['display_table'] if '= Cashflow vor Steuern'  in r['kennzahl']), 0)
@@ -777,41 +1068,7 @@ if results:
     # --- Detailtabelle ---
     st.subheader("Detaillierte Cashflow-Rechnung")
 
-    if nutzungsart == "Vermietung":
-        all_keys = [
-            "Einnahmen p.a. (Kaltmiete)", "Umlagefähige Kosten p.a.", "Nicht umlagef. Kosten p.a.",
-            "- Mietausfallwagnis p.a.", "- Priv. Instandhaltungsrücklage p.a.",
-            "- CO2-Steuer Vermieteranteil p.a.", "Rückzahlung Darlehen p.a.", "- Zinsen p.a.",
-            "Jährliche Gesamtkosten", "= Cashflow vor Steuern p.a.",
-            "- AfA p.a.", "- Absetzbare Kaufnebenkosten (Jahr 1)",
-            "= Steuerlicher Gewinn/Verlust p.a.", "+ Steuerersparnis / -last p.a.",
-            "= Effektiver Cashflow n. St. p.a.", "Ihr monatl. Einkommen (vorher)",
-            "+/- Mtl. Cashflow Immobilie", "= Neues verfügbares Einkommen"
-        ]
-    else:
-        all_keys = [
-            "Hausgeld / Betriebskosten p.a.", "- Private Instandhaltungsrücklage p.a.",
-            "- CO2-Kosten (Eigennutzer) p.a.", "Rückzahlung Darlehen p.a.", "- Zinsen p.a.",
-            "- Tilgung p.a. (Vermögensaufbau)", "Jährliche Gesamtkosten (inkl. Tilgung)",
-            "Ihr monatl. Einkommen (vorher)", "- Mtl. Kosten Immobilie", "= Neues verfügbares Einkommen"
-        ]
-
-    col1, col2 = st.columns(2)
-    for col, val_key, titel in [(col1, 'val1', "#### Jahr der Anschaffung (€)"),
-                                 (col2, 'val2', "#### Laufende Jahre (€)")]:
-        with col:
-            st.markdown(titel)
-            for key in all_keys:
-                val = next((r[val_key] for r in results['display_table'] if key in r['kennzahl']), "")
-                if val != "":
-                    is_bold = key.startswith("=") or "+ Steuerersparnis" in key
-                    style   = "font-weight:bold; font-size:1.05em;" if is_bold else ""
-                    color   = ("color:green;" if is_number(val) and float(val) > 0 and key.startswith("=") else
-                               "color:red;"   if is_number(val) and float(val) < 0 and key.startswith("=") else "")
-                    st.markdown(
-                        f"<div style='{style}{color}'>{key}: {format_eur(val) if is_number(val) else val}</div>",
-                        unsafe_allow_html=True
-                    )
+    st.markdown(detail_tabelle_html(results['display_table'], DETAIL_ZEILEN[nutzungsart]), unsafe_allow_html=True)
 
     # --- Eigennutzung: Zusatzinfos ---
     if nutzungsart == "Eigennutzung" and results.get('finanzkennzahlen'):
@@ -833,54 +1090,44 @@ if results:
         ek_nach_10j = eigenkapital + tilgung_pa * 10
         st.caption(f"📈 Geschätztes Eigenkapital nach 10 Jahren (nur Tilgung, ohne Wertsteigerung): **{de(ek_nach_10j, 0)} €**")
 
-        st.subheader("⚖️ Kaufen vs. Mieten+Investieren (Opportunity Cost)")
-        with st.expander("ℹ️ Was ist der Opportunity-Cost-Vergleich?", expanded=True):
-            st.markdown("""
-            Der wichtigste Vergleich bei Eigennutzung: Was wäre, wenn Sie **weiter mieten** und die
-            Differenz (Eigenkapital + monatliche Mehrkosten) am Kapitalmarkt anlegen würden?
-
-            **Annahmen für den Vergleich:**
-            - Kapitalmarktrendite (ETF): 6% p.a. (historischer Ø MSCI World nach Inflation ~5–7%)
-            - Immobilienwertentwicklung: 2% p.a. (konservativ für Nürnberg)
-            """)
-
-        vergleichsmiete = st.number_input("Vergleichsmiete (€/mtl. Kaltmiete für gleichwertige Wohnung)",
-                            min_value=0, max_value=5000, value=int(wohnflaeche_qm * 12),
-                            step=50, key="vergleichsmiete",
-                            help="Was würden Sie für eine gleichwertige Mietwohnung zahlen? Basis für den Opportunitätskostenvergleich.")
-
-        etf_rendite = 0.06
-        immo_wertzuwachs = 0.02
-        jahre = 20
-
-        monatliche_immo_kosten = jaehrliche_kosten_display = (
-            results['finanzkennzahlen'].get('reine_wohnkosten_pa', 0) + (d1['monatsrate'] * 12)
-        ) / 12
-        monatliche_immo_kosten = next(
-            (r['val2'] for r in results['display_table'] if '- Mtl. Kosten Immobilie' in r['kennzahl']), 0
-        )
-        monatliche_immo_kosten = abs(float(monatliche_immo_kosten)) if monatliche_immo_kosten else d1['monatsrate']
-
-        mtl_differenz = monatliche_immo_kosten - vergleichsmiete
-
-        # Szenario Kaufen: Immobilienwert nach X Jahren
-        immo_wert_20j = kaufpreis * (1 + immo_wertzuwachs) ** jahre
-        restschuld_20j = darlehen1_summe * ((1 + zins1/100/12)**(jahre*12) - 1) / ((1 + zins1/100/12)**(d1['laufzeit_jahre']*12) - 1) if d1['laufzeit_jahre'] > 0 else 0
-        nettoverm_kaufen = immo_wert_20j - max(restschuld_20j, 0)
-
-        # Szenario Mieten: EK + mtl. Differenz in ETF
-        etf_monatlich = max(mtl_differenz, 0)
-        etf_wert_20j  = eigenkapital * (1 + etf_rendite)**jahre + etf_monatlich * 12 * (((1+etf_rendite)**jahre - 1) / etf_rendite) if etf_rendite > 0 else eigenkapital + etf_monatlich * 12 * jahre
-
-        col_k, col_m = st.columns(2)
-        col_k.metric("🏠 Kaufen — Nettovermögen nach 20 J.", f"{de(nettoverm_kaufen, 0)} €",
-                     delta=f"Immo-Wert: {de(immo_wert_20j, 0)} € − Restschuld: {de(max(restschuld_20j,0), 0)} €")
-        col_m.metric("📈 Mieten+ETF — Depotwert nach 20 J.", f"{de(etf_wert_20j, 0)} €",
-                     delta=f"EK ({de(eigenkapital, 0)} €) + {de(etf_monatlich, 0)} €/Monat @ 6% p.a." if mtl_differenz >= 0 else "Kauf ist günstiger als Miete — Mieter hat weniger übrig")
-        st.caption("⚠️ Vereinfachte Modellrechnung ohne Steuern, Inflationsanpassung, Mietsteigerungen oder Sonderumlagen. Dient nur zur Orientierung.")
+@ergebnisteil
+def _teil_mietvergleich(code, _inputs, vergleichsmiete, mv_jahre, mv_etf, mv_wert, mv_miete, mv_kosten, mv_nk):
+    annahmen = dict(jahre=mv_jahre, mietsteigerung_p=mv_miete, kostensteigerung_p=mv_kosten,
+                    verkaufskosten_p=3.57, nebenkosten_mieter_mtl=mv_nk)
+    try:
+        mv = immo_mietvergleich.projiziere(_inputs, vergleichsmiete, etf_rendite_p=mv_etf, wertsteigerung_p=mv_wert, **annahmen)
+        band = immo_mietvergleich.vergleich_raster(_inputs, vergleichsmiete, **annahmen)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        mv = None
+    if mv:
+        ende = mv_jahre - 1
+        col_k, col_m, col_b = st.columns(3)
+        col_k.metric(f"🏠 Kaufen — Nettovermögen nach {mv_jahre} J.", f"{de(mv['vermoegen_kauf'][ende], 0)} €")
+        col_m.metric(f"📈 Mieten+ETF — Vermögen nach {mv_jahre} J.", f"{de(mv['vermoegen_miete'][ende], 0)} €",
+                     delta=f"{de(mv['vermoegen_miete'][ende] - mv['vermoegen_kauf'][ende], 0)} € vs. Kaufen")
+        col_b.metric("Break-even Kaufen", f"nach {mv['break_even']:.0f} Jahren" if math.isfinite(mv['break_even'])
+                     else f"nicht in {mv_jahre} Jahren")
+        st.line_chart({"Jahr": mv['jahre'], "Kaufen": mv['vermoegen_kauf'], "Mieten + ETF": mv['vermoegen_miete']},
+                      x="Jahr", y=["Kaufen", "Mieten + ETF"], y_label="Nettovermögen (€)")
+        st.markdown("**Vorsprung Kaufen gegenüber Mieten (€) über alle Renditeannahmen**")
+        st.line_chart({"Jahr": band['jahre'], "Ungünstig (10 %)": band['p10'], "Median": band['median'], "Günstig (90 %)": band['p90']},
+                      x="Jahr", y=["Ungünstig (10 %)", "Median", "Günstig (90 %)"])
+        st.caption(
+            f"Nach {mv_jahre} Jahren liegt Kaufen in **{band['anteil_kauf_vorne'][ende] * 100:.0f} %** der "
+            f"{band['differenz'].shape[0] * band['differenz'].shape[1]} Renditekombinationen vorne "
+            f"(Spanne {de(band['min'][ende], 0)} € bis {de(band['max'][ende], 0)} €). "
+            "⚠️ Modellrechnung in nominalen Euro, ohne Sonderumlagen; Verkaufskosten 3,57 %.")
+
+@ergebnisteil
+def _teil_steuer(code, _results, _stand):
+    """Vermietung: Finanzkennzahlen, AfA-Plan und steuerliche Jahreszeilen."""
+    results, inputs = _results, _stand['inputs']
+    d1, darlehen1_summe = _stand['d1'], _stand['darlehen1_summe']
+    zins1, steuersatz = inputs['zins1_prozent'], inputs['steuersatz']
 
     # --- Renditekennzahlen ---
-    if nutzungsart == "Vermietung" and results.get('finanzkennzahlen'):
+    if results.get('finanzkennzahlen'):
         st.subheader("📈 Finanzkennzahlen & Einordnung")
         with st.expander("ℹ️ Was bedeuten diese Kennzahlen?", expanded=False):
             st.markdown("""
@@ -910,17 +1157,595 @@ if results:
                 else:
                     st.error(f"❌ **{k}:** {format_percent(v)} — schwach (Richtwert: >10%)")
 
-    # --- PDF Export ---
+    # --- AfA-Plan & steuerliche Jahreszeilen ---
+    if results.get('steuer'):
+        st.subheader("📉 Abschreibung & Steuer über die Jahre")
+        steuer = results['steuer']
+        afa = immo_afa.afa_plan(inputs)
+        jahre = len(afa['jahre'])
+        plan_tranchen = inputs.get('tranchen') or [{'name': "Hauptdarlehen", 'typ': 'annuitaet', 'summe': darlehen1_summe,
+                                                    'zins_p': zins1, 'monatsrate': d1['monatsrate']}]
+        zinsen = immo_finanzierung.jahreswerte(
+            immo_finanzierung.berechne_tranchen(plan_tranchen, monate=jahre * 12), jahre)['zinsen']
+        zeilen = immo_afa.steuerzeilen(steuer['einnahmen_pa'], steuer['werbungskosten_pa'], zinsen,
+                                       afa['afa_summe'], steuersatz, steuer['einmalig_j1'])
+        komponenten = [(name, afa['afa'][i]) for i, name in enumerate(afa['namen']) if afa['afa'][i].any()]
+        if komponenten:
+            st.bar_chart({"Jahr": afa['jahre'], **{f"AfA {name}": werte for name, werte in komponenten}},
+                         x="Jahr", y=[f"AfA {name}" for name, _ in komponenten], y_label="€ pro Jahr")
+        st.dataframe(
+            [{'Jahr': int(j), **{f'AfA {name} (€)': round(werte[i]) for name, werte in komponenten},
+              'Restbuchwert (€)': round(afa['restbuchwert_summe'][i]), 'Zinsen (€)': round(zinsen[i]),
+              'Steuerl. Ergebnis (€)': round(zeilen['gewinn'][i]), 'Steuerwirkung (€)': round(zeilen['steuer'][i])}
+             for i, j in enumerate(afa['jahre'])],
+            hide_index=True, height=300)
+        letztes = max((int(j) for j, a in zip(afa['jahre'], afa['afa_summe']) if a > 0), default=None)
+        st.caption(
+            (f"AfA läuft bis Jahr **{letztes}**. " if letztes else "")
+            + f"Steuerwirkung der ersten 10 Jahre: **{de(zeilen['steuer'][:10].sum(), 0)} €** "
+            "(Miete und Kosten konstant, Zinsen aus dem Tilgungsplan bei gleichbleibendem Zins).")
+
+@ergebnisteil
+def _teil_exit(code, _inputs, exit_jahre, exit_wert, exit_kosten, exit_vfe, ersparte_miete_pa):
+    nutzungsart, eigenkapital = _inputs['nutzungsart'], _inputs['eigenkapital']
+    try:
+        exit_erg = immo_exit.exit_analyse(_inputs, exit_jahre, exit_wert, exit_kosten, exit_vfe,
+                                          ersparte_miete_pa=ersparte_miete_pa)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        exit_erg = None
+    if exit_erg:
+        jahre_x = exit_erg['jahre']
+        if exit_erg['bestes_jahr']:
+            b = exit_erg['bestes_jahr'] - 1
+            y1, y2, y3 = st.columns(3)
+            y1.metric("Höchster IRR bei Verkauf nach", f"{exit_erg['bestes_jahr']} Jahren", delta=f"{de(exit_erg['irr_p'][b])} % p.a.", delta_color="off")
+            y2.metric("Nettoerlös", f"{de(exit_erg['nettoerloes'][b], 0)} €")
+            y3.metric("Gesamtergebnis", f"{de(exit_erg['gesamtergebnis'][b], 0)} €",
+                      help="Summe der Cashflows + Nettoerlös − Eigenkapital (nicht abgezinst)")
+            st.line_chart({"Jahr": jahre_x, "IRR (% p.a.)": exit_erg['irr_p']}, x="Jahr", y="IRR (% p.a.)")
+        elif eigenkapital > 0:
+            st.info("Kein IRR bestimmbar: Bei keiner Haltedauer übersteigen Cashflows und Nettoerlös das "
+                    "eingesetzte Eigenkapital (die Zahlungsreihe wechselt nie das Vorzeichen).")
+        st.dataframe(
+            [{'Verkauf nach (J.)': int(j), 'Verkaufspreis (€)': round(exit_erg['verkaufspreis'][k]),
+              'Restschuld (€)': round(exit_erg['restschuld'][k]), 'VFE (€)': round(exit_erg['vorfaelligkeit'][k]),
+              'Spekulationssteuer (€)': round(exit_erg['spekulationssteuer'][k]), 'Nettoerlös (€)': round(exit_erg['nettoerloes'][k]),
+              'Cashflows kum. (€)': round(exit_erg['cashflow_kumuliert'][k]), 'Gesamtergebnis (€)': round(exit_erg['gesamtergebnis'][k]),
+              'IRR (%)': round(exit_erg['irr_p'][k], 2) if math.isfinite(exit_erg['irr_p'][k]) else None}
+             for k, j in enumerate(jahre_x)],
+            hide_index=True, height=300)
+        if nutzungsart == "Vermietung":
+            st.caption(f"Verkauf jeweils am Jahrestag des Kaufs; steuerfrei erst nach mehr als "
+                       f"{immo_exit.SPEKULATIONSFRIST_JAHRE} Jahren (ab Jahr {immo_exit.SPEKULATIONSFRIST_JAHRE + 1}). "
+                       "Cashflows mit konstanter Miete; Zinsen aus dem Tilgungsplan bei gleichbleibendem Zins.")
+
+@ergebnisteil
+def _teil_sanierung(code, _inputs, san_jahre, san_zins, san_energie, san_co2, san_foerderung, san_umlage):
+    nutzungsart = _inputs['nutzungsart']
+    try:
+        san = immo_sanierung.sanierungsplan(
+            _inputs, san_jahre, range(1, min(10, san_jahre) + 1), san_zins, san_energie, san_co2,
+            foerderung=san_foerderung, umlage=san_umlage)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        san = None
+    if san and len(san['rangfolge']):
+        b = int(san['rangfolge'][0])
+        if san['kapitalwert'][b] > 0:
+            z1, z2, z3 = st.columns(3)
+            z1.metric("Beste Kombination", f"{san['heizung'][b]}, Klasse {san['effizienzklasse'][b]}",
+                      delta=f"Sanierung in Jahr {san['sanierungsjahr'][b]}", delta_color="off")
+            z2.metric("Kapitalwert", f"{de(san['kapitalwert'][b], 0)} €",
+                      help=f"Eigenanteil {de(san['eigenanteil'][b], 0)} € nach {de(san['foerderung'][b], 0)} € Förderung")
+            z3.metric("Amortisation", f"{de(san['amortisation_jahre'][b], 0)} Jahre"
+                      if math.isfinite(san['amortisation_jahre'][b]) else "nicht im Zeitraum")
+        else:
+            st.info(f"ℹ️ Keine der {len(san['rangfolge'])} Kombinationen erreicht unter diesen Annahmen "
+                    "einen positiven Kapitalwert.")
+        st.dataframe(
+            [{'Heizung': san['heizung'][k], 'Klasse': san['effizienzklasse'][k], 'Jahr': int(san['sanierungsjahr'][k]),
+              'Investition (€)': round(san['investition'][k]), 'Förderung (€)': round(san['foerderung'][k]),
+              'Energie −kWh/a': round(san['energie_ersparnis_kwh'][k]), 'CO2 −kg/a': round(san['co2_ersparnis_kg'][k]),
+              **({'Vermieteranteil CO2 (%)': round(san['vermieter_anteil'][k] * 100),
+                  'Umlage (€/a)': round(san['umlage_pa'][k]), 'AfA gesamt (€)': round(san['afa'][k].sum())}
+                 if nutzungsart == "Vermietung" else
+                 {'Heizkosten −€/a': round(san['energiekosten_ersparnis_pa'][k])}),
+              'Kapitalwert (€)': round(san['kapitalwert'][k]),
+              'Amortisation (J.)': int(san['amortisation_jahre'][k]) if math.isfinite(san['amortisation_jahre'][k]) else None}
+             for k in (int(i) for i in san['rangfolge'])],
+            hide_index=True, height=300)
+        st.caption(f"Ausgangslage: {san['ausgang']['heizung']}, Klasse {san['ausgang']['effizienzklasse']}, "
+                   f"{de(san['ausgang']['verbrauch_kwh'], 0)} kWh/a. Kostensätze und Förderquoten sind Schätzwerte — "
+                   "für die Entscheidung Angebote und einen Energieberater (iSFP) einholen.")
+
+@ergebnisteil
+def _teil_stress(code, _inputs, einstellungen):
+    nutzungsart, zinsbindung = _inputs['nutzungsart'], _inputs['zinsbindung']
+    try:
+        stress = stresstest([_inputs], einstellungen)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        stress = None
+    if stress:
+        zeilen = [k for k, gilt in enumerate(stress['anwendbar'][0]) if gilt]
+        schlimmste = min(zeilen, key=lambda k: stress['cf_min'][0, k])
+        w1, w2, w3 = st.columns(3)
+        w1.metric("Härtester Fall", stress['szenarien'][schlimmste])
+        w2.metric("Schlechtestes Jahr", f"{de(stress['cf_min'][0, schlimmste], 0)} €",
+                  delta=f"Jahr {stress['cf_min_jahr'][0, schlimmste]}", delta_color="off")
+        if nutzungsart == "Vermietung":
+            dscr = stress['dscr_min'][0, schlimmste]
+            w3.metric("DSCR min.", de(dscr) if math.isfinite(dscr) else "–")
+        else:
+            w3.metric("Netto mtl. min.", f"{de(stress['nve_min_mtl'][0, schlimmste], 0)} €")
+        st.line_chart({"Jahr": stress['jahre'], **{stress['szenarien'][k]: stress['cashflow'][0, k] for k in zeilen}},
+                      x="Jahr", y=[stress['szenarien'][k] for k in zeilen], y_label="Cashflow n. St. (€/Jahr)")
+        st.dataframe(
+            [{'Szenario': stress['szenarien'][k], 'Cashflow Jahr 1 (€)': round(stress['cf_j1'][0, k]),
+              'Schlechtestes Jahr (€)': round(stress['cf_min'][0, k]), 'in Jahr': int(stress['cf_min_jahr'][0, k]),
+              f"Summe {len(stress['jahre'])} J. (€)": round(stress['kumuliert'][0, k]),
+              'ggü. Basis (€)': round(stress['delta_kumuliert'][0, k]),
+              **({'DSCR min.': round(stress['dscr_min'][0, k], 2) if math.isfinite(stress['dscr_min'][0, k]) else None}
+                 if nutzungsart == "Vermietung" else {}),
+              'Netto mtl. min. (€)': round(stress['nve_min_mtl'][0, k])}
+             for k in zeilen],
+            hide_index=True)
+        if zinsbindung >= len(stress['jahre']):
+            st.caption("Die Zinsbindung reicht über den Betrachtungszeitraum hinaus — der Anschlusszins wirkt erst danach.")
+
+@ergebnisteil
+def _teil_tornado(code, _inputs, tornado_delta):
+    tornado = immo_sensitivitaet.tornado(_inputs, tornado_delta)
+    (haupt, haupt_name, haupt_einheit), (neben, neben_name, neben_einheit) = tornado['kennzahlen']
+    if tornado['zeilen']:
+        st.bar_chart(
+            {'Eingabe': [z['bezeichnung'] for z in tornado['zeilen'][:10]],
+             f"−{tornado_delta} %": [z['wirkung'][haupt][0] - tornado['basis'][haupt] for z in tornado['zeilen'][:10]],
+             f"+{tornado_delta} %": [z['wirkung'][haupt][1] - tornado['basis'][haupt] for z in tornado['zeilen'][:10]]},
+            x='Eingabe', horizontal=True, sort=False, stack="layered",
+            x_label=f"Änderung {haupt_name} ({haupt_einheit})", y_label="")
+        st.dataframe([
+            {'Rang': rang, 'Eingabe': z['bezeichnung'], 'Ausgangswert': de(z['wert']),
+             f'{haupt_name} −{tornado_delta} %': round(z['wirkung'][haupt][0]),
+             f'{haupt_name} +{tornado_delta} %': round(z['wirkung'][haupt][1]),
+             f'{neben_name} −{tornado_delta} %': round(z['wirkung'][neben][0], 2),
+             f'{neben_name} +{tornado_delta} %': round(z['wirkung'][neben][1], 2)}
+            for rang, z in enumerate(tornado['zeilen'], 1)], hide_index=True)
+        st.caption(f"Ausgangswert {haupt_name}: **{de(tornado['basis'][haupt], 0)} {haupt_einheit}**. "
+                   f"Größter Hebel: **{tornado['zeilen'][0]['bezeichnung']}** "
+                   f"(Spannweite {de(tornado['zeilen'][0]['spanne'], 0)} {haupt_einheit}).")
+
+@ergebnisteil
+def _teil_eigenkapital(code, _inputs, ek_verfuegbar, ek_min, ek_alt, ek_wert, ek_min_cf, ek_tranche, ersparte_miete_pa):
+    eigenkapital, zinsbindung = _inputs['eigenkapital'], _inputs['zinsbindung']
+    _weitere = [t['name'] for t in (_inputs.get('tranchen') or [])[1:]]
+    try:
+        tranche_nr = _weitere.index(ek_tranche) if ek_tranche != "—" else None
+        ek_opt = immo_eigenkapital.optimiere_eigenkapital(
+            _inputs, ek_verfuegbar, ek_alt, zinsbindung, ek_wert, ek_min=min(ek_min, ek_verfuegbar),
+            tranche=tranche_nr, tranche_max=2 * _inputs['tranchen'][1 + tranche_nr]['summe'] if tranche_nr is not None else None,
+            min_cashflow_mtl=ek_min_cf, ersparte_miete_pa=ersparte_miete_pa)
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        ek_opt = None
+    if ek_opt and ek_opt['empfehlung'] is None:
+        st.warning("⚠️ Keine Aufteilung erreicht den Mindest-Cashflow.")
+    elif ek_opt:
+        i = ek_opt['empfehlung']
+        jetzt = ek_opt['ausgangslage']
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Empfohlenes Eigenkapital", f"{de(ek_opt['eigenkapital'][i], 0)} €",
+                  delta=f"{de(ek_opt['eigenkapital'][i] - eigenkapital, 0)} € vs. Eingabe", delta_color="off")
+        r2.metric("Cashflow", f"{de(ek_opt['cashflow_mtl'][i], 0)} €/Monat",
+                  delta=f"{de(ek_opt['cashflow_mtl'][i] - ek_opt['cashflow_mtl'][jetzt], 0)} €")
+        r3.metric("IRR", f"{de(ek_opt['irr_p'][i])} %" if math.isfinite(ek_opt['irr_p'][i]) else "–")
+        r4.metric(f"Vermögen nach {zinsbindung} J.", f"{de(ek_opt['endvermoegen'][i], 0)} €",
+                  delta=f"{de(ek_opt['endvermoegen'][i] - ek_opt['endvermoegen'][jetzt], 0)} € vs. Eingabe")
+        if ek_opt['tranche_summe'] is not None:
+            st.caption(f"Empfohlene Summe {ek_tranche}: **{de(ek_opt['tranche_summe'][i], 0)} €**")
+        front = ek_opt['front']
+        st.scatter_chart({'Zurückbehaltenes Kapital (€)': ek_opt['rueckhalt'][front], 'IRR (%)': ek_opt['irr_p'][front]},
+                         x='Zurückbehaltenes Kapital (€)', y='IRR (%)')
+        auswahl = [front[round(k * (len(front) - 1) / 10)] for k in range(11)] if len(front) > 11 else front
+        auswahl = sorted(set(auswahl) | {i}, key=lambda j: ek_opt['rueckhalt'][j])
+        st.dataframe([
+            {'Eigenkapital (€)': round(ek_opt['eigenkapital'][j]), 'Rückhalt (€)': round(ek_opt['rueckhalt'][j]),
+             **({f'{ek_tranche} (€)': round(ek_opt['tranche_summe'][j])} if ek_opt['tranche_summe'] is not None else {}),
+             'Cashflow (€/Monat)': round(ek_opt['cashflow_mtl'][j]), 'EK-Rendite (%)': round(ek_opt['eigenkapitalrendite'][j], 2),
+             'IRR (%)': round(ek_opt['irr_p'][j], 2) if math.isfinite(ek_opt['irr_p'][j]) else None,
+             f'Vermögen nach {zinsbindung} J. (€)': round(ek_opt['endvermoegen'][j]),
+             'Empfehlung': "⭐" if j == i else ""}
+            for j in auswahl], hide_index=True)
+
+@ergebnisteil
+def _teil_sondertilgung(code, _stand, st_budget, st_rendite, st_ziel):
+    inputs, d1, darlehen1_summe = _stand['inputs'], _stand['d1'], _stand['darlehen1_summe']
+    nutzungsart, zinsbindung = inputs['nutzungsart'], inputs['zinsbindung']
+    st_opt = immo_sondertilgung.optimiere_sondertilgung(
+        darlehen1_summe, inputs['zins1_prozent'], d1['monatsrate'], zinsbindung, st_budget, inputs['sondertilgung_p'], st_rendite,
+        inputs['steuersatz'] if nutzungsart == "Vermietung" else 0.0,
+        'vermoegen' if st_ziel.startswith("Netto") else 'restschuld')
+    opt, alt = st_opt['optimal'], st_opt['alternative']
+    if st_opt['strategie'] == 'tilgen':
+        st.success(f"✅ **Sondertilgen lohnt sich:** effektiver Darlehenszins {de(st_opt['zins_effektiv_p'])} % "
+                   f"vs. Alternativrendite {de(st_rendite)} %. Jährlich bis zu **{de(st_opt['sondertilgung_max_pa'], 0)} €** tilgen.")
+    else:
+        st.warning(f"⚠️ **Anlegen statt tilgen:** Die Alternativrendite ({de(st_rendite)} %) liegt über dem effektiven "
+                   f"Darlehenszins ({de(st_opt['zins_effektiv_p'])} %).")
+    s1, s2, s3 = st.columns(3)
+    s1.metric(f"Restschuld nach {zinsbindung} J.", f"{de(opt['restschuld'], 0)} €",
+              delta=f"{de(opt['restschuld'] - alt['restschuld'], 0)} € vs. Alternative", delta_color="inverse")
+    s2.metric("Depot (Alternativanlage)", f"{de(opt['depot'], 0)} €")
+    s3.metric("Nettovermögen", f"{de(opt['nettovermoegen'], 0)} €",
+              delta=f"{de(st_opt['vorteil'], 0)} € vs. Alternative")
+    st.dataframe(
+        [{'Jahr': z['jahr'], 'Sondertilgung (€)': round(z['sondertilgung']), 'Anlage (€)': round(z['anlage']),
+          'Restschuld (€)': round(z['restschuld']), 'Depot (€)': round(z['depot'])} for z in st_opt['plan']],
+        hide_index=True)
+
+@st.fragment
+def zeige_ergebnisse(results, stand):
+    with immo_latenz.latenz_messung().messe('Fragment: Ergebnisse'):
+        _zeige_ergebnisse(results, stand)
+
+def _zeige_ergebnisse(results, stand):
+    """Einstellungen des Ergebnisteils; Rechnung und Anzeige in den zwischengespeicherten Teilen."""
+    inputs, d1, darlehen1_summe = stand['inputs'], stand['d1'], stand['darlehen1_summe']
+    code                   = stand['eingaben_code']
+    nutzungsart, wohnort   = inputs['nutzungsart'], inputs['wohnort']
+    eigenkapital           = inputs['eigenkapital']
+    wohnflaeche_qm, zins1  = inputs['wohnflaeche_qm'], inputs['zins1_prozent']
+    zinsbindung, sondertilgung_p = inputs['zinsbindung'], inputs['sondertilgung_p']
+
     st.markdown("---")
-    if st.button("📄 PDF-Bericht erstellen"):
-        try:
-            pdf_bytes = create_pdf_report(results, inputs, checklist_items)
-            st.success("PDF erfolgreich erstellt!")
+    st.header("5. Ergebnisse")
+
+    _teil_uebersicht(code, results, stand)
+
+    if nutzungsart == "Eigennutzung" and results.get('finanzkennzahlen'):
+        st.subheader("⚖️ Kaufen vs. Mieten+Investieren (Opportunity Cost)")
+        with st.expander("ℹ️ Was ist der Opportunity-Cost-Vergleich?", expanded=True):
+            st.markdown("""
+            Der wichtigste Vergleich bei Eigennutzung: Was wäre, wenn Sie **weiter mieten** und das
+            Eigenkapital sowie jede monatliche Ersparnis am Kapitalmarkt (ETF) anlegen würden?
+
+            - **Kaufen:** Rate + Hausgeld, Instandhaltung, CO2 (steigen mit der Kostensteigerung);
+              Vermögen = Immobilienwert nach Verkaufskosten − Restschuld
+            - **Mieten:** Miete + Nebenkosten (steigen mit der Mietsteigerung); Eigenkapital und
+              Kaufnebenkosten bleiben im Depot
+            - Wer in einem Jahr weniger zahlt, legt die Differenz an; Depots nach Abgeltungsteuer
+            - Das **Band** zeigt die Differenz über ein Raster aus ETF-Renditen (4–8 %) und Wertsteigerungen (0–4 %)
+            """)
+
+        vergleichsmiete = st.number_input("Vergleichsmiete (€/mtl. Kaltmiete für gleichwertige Wohnung)",
+                            min_value=0, max_value=5000, value=int(wohnflaeche_qm * 12),
+                            step=50, key="vergleichsmiete",
+                            help="Was würden Sie für eine gleichwertige Mietwohnung zahlen? Basis für den Opportunitätskostenvergleich.")
+        v1, v2, v3 = st.columns(3)
+        mv_jahre  = v1.slider("Betrachtung (Jahre)", min_value=10, max_value=40, value=20, step=1, key="mv_jahre")
+        mv_etf    = v2.number_input("ETF-Rendite (% p.a.)", min_value=0.0, max_value=12.0, value=6.0, step=0.5, key="mv_etf",
+                                    help="Historischer Ø MSCI World nach Inflation ~5–7 %.")
+        mv_wert   = v3.number_input("Wertsteigerung Immobilie (% p.a.)", min_value=-5.0, max_value=10.0, value=2.0, step=0.5, key="mv_wert")
+        v4, v5, v6 = st.columns(3)
+        mv_miete  = v4.number_input("Mietsteigerung (% p.a.)", min_value=0.0, max_value=10.0, value=2.0, step=0.5, key="mv_miete")
+        mv_kosten = v5.number_input("Kostensteigerung (% p.a.)", min_value=0.0, max_value=10.0, value=2.0, step=0.5, key="mv_kosten",
+                                    help="Hausgeld, Instandhaltung und CO2-Kosten des Eigentümers.")
+        mv_nk     = v6.number_input("Nebenkosten als Mieter (€/Monat)", min_value=0, max_value=2000, value=0, step=25, key="mv_nk",
+                                    help="Betriebskosten, die Sie als Mieter zusätzlich zur Kaltmiete zahlen würden (im Hausgeld des Eigentümers enthalten).")
+        _teil_mietvergleich(code, inputs, vergleichsmiete, mv_jahre, mv_etf, mv_wert, mv_miete, mv_kosten, mv_nk)
+
+    if nutzungsart == "Vermietung":
+        _teil_steuer(code, results, stand)
+
+    ersparte_miete_pa = st.session_state.get('vergleichsmiete', 0) * 12 if nutzungsart == "Eigennutzung" else 0.0
+
+    # --- Exit-Analyse: Verkauf nach 1 … N Jahren ---
+    st.subheader("🏁 Verkauf: Wann lohnt sich der Ausstieg?")
+    with st.expander("ℹ️ Was wird gerechnet?", expanded=False):
+        st.markdown(f"""
+        Für **jedes mögliche Verkaufsjahr** wird der Erlös nach Kosten, Restschuld und Steuern berechnet:
+
+        - **Verkaufspreis** = Kaufpreis mit der angenommenen Wertsteigerung, abzüglich Verkaufskosten (Makler)
+        - **Vorfälligkeitsentschädigung** bei Ablösung innerhalb der Zinsbindung
+          (spätestens nach {immo_exit.VFE_FREI_NACH_JAHREN} Jahren kündbar, § 489 BGB)
+        - **Spekulationssteuer** bei Verkauf innerhalb von {immo_exit.SPEKULATIONSFRIST_JAHRE} Jahren ab Kaufdatum
+          (§ 23 EStG, nur Vermietung; Verkauf am Jahrestag, der {immo_exit.SPEKULATIONSFRIST_JAHRE}. Jahrestag zählt noch
+          dazu): Gewinn über dem Restbuchwert — die genutzte AfA wird also nachversteuert
+        - **IRR**: interner Zinsfuß aus Eigenkapital, jährlichen Cashflows nach Steuern und Nettoerlös
+        """)
+    x1, x2, x3, x4 = st.columns(4)
+    exit_jahre  = x1.slider("Betrachtung (Jahre)", min_value=5, max_value=40, value=30, step=1, key="exit_jahre")
+    exit_wert   = x2.number_input("Wertsteigerung (% p.a.)", min_value=-5.0, max_value=10.0, value=2.0, step=0.5, key="exit_wert")
+    exit_kosten = x3.number_input("Verkaufskosten (%)", min_value=0.0, max_value=10.0, value=3.57, step=0.1, key="exit_kosten",
+                                  help="Maklerprovision des Verkäufers inkl. MwSt.")
+    exit_vfe    = x4.number_input("Zinsdifferenz VFE (%-Pkt.)", min_value=0.0, max_value=5.0, value=1.0, step=0.25, key="exit_vfe",
+                                  help="Vertragszins minus Wiederanlagerendite der Bank (Pfandbriefe). Bestimmt die Vorfälligkeitsentschädigung.")
+    _teil_exit(code, inputs, exit_jahre, exit_wert, exit_kosten, exit_vfe, ersparte_miete_pa)
+
+    # --- Energetische Sanierung: alle Kombinationen aus Heizung, Effizienzklasse und Jahr ---
+    st.subheader("🔥 Energetische Sanierung: Was rechnet sich?")
+    with st.expander("ℹ️ Was wird gerechnet?", expanded=False):
+        st.markdown(f"""
+        Durchgerechnet wird **jede Kombination** aus neuer Heizung, Ziel-Effizienzklasse (gleich oder besser)
+        und Sanierungsjahr:
+
+        - **Investition**: Heizungstausch ca. {de(immo_sanierung.HEIZUNG_KOSTEN_QM['Wärmepumpe'], 0)} €/m² (Wärmepumpe),
+          Gebäudehülle ca. {de(immo_sanierung.HUELLE_KOSTEN_QM_JE_KLASSE, 0)} €/m² je Effizienzklasse, abzüglich BEG-Förderung
+        - **Vermietung**: geringerer CO2-Vermieteranteil, Modernisierungsumlage (§ 559 BGB, {de(immo_sanierung.UMLAGE_P, 0)} % p.a.
+          mit Kappung) und AfA auf den Eigenanteil — die Heizkosten selbst trägt der Mieter
+        - **Eigennutzung**: geringere Heiz- und CO2-Kosten
+        - **Kapitalwert** auf heute abgezinst; **Amortisation** in Jahren ab der Sanierung (nicht abgezinst)
+        """)
+    s1, s2, s3, s4 = st.columns(4)
+    san_jahre  = s1.slider("Betrachtung (Jahre)", min_value=10, max_value=40, value=25, step=1, key="san_jahre")
+    san_zins   = s2.number_input("Kalkulationszins (%)", min_value=0.0, max_value=10.0, value=3.0, step=0.5, key="san_zins")
+    san_energie = s3.number_input("Energiepreise (% p.a.)", min_value=-5.0, max_value=15.0, value=2.0, step=0.5, key="san_energie")
+    san_co2    = s4.number_input("CO2-Preis (% p.a.)", min_value=-5.0, max_value=30.0, value=5.0, step=1.0, key="san_co2",
+                                 help=f"Ausgehend von {CO2_KOST_AUFG_PREIS} €/t; ab 2027 gilt der europäische Emissionshandel.")
+    s5, s6 = st.columns(2)
+    san_foerderung = s5.checkbox("BEG-Förderung einrechnen", value=True, key="san_foerderung")
+    san_umlage = s6.checkbox("Modernisierungsumlage erheben", value=True, key="san_umlage",
+                             disabled=nutzungsart != "Vermietung")
+    _teil_sanierung(code, inputs, san_jahre, san_zins, san_energie, san_co2, san_foerderung, san_umlage)
+
+    # --- Stresstest: Standardszenarien der Banken ---
+    st.subheader("🧯 Stresstest: Was hält das Objekt aus?")
+    with st.expander("ℹ️ Was wird gerechnet?", expanded=False):
+        st.markdown(f"""
+        Jedes Szenario verändert **eine** Annahme gegenüber der Basis (Miete und Kosten steigen um 2 % p.a.,
+        Zinsen aus dem Tilgungsplan):
+
+        - **Anschlusszins**: nach Ablauf der Zinsbindung ({zinsbindung} Jahre) höherer Zins auf die Restschuld,
+          die Tilgung bleibt gleich — die Rate steigt um den Mehrzins
+        - **Leerstand** (nur Vermietung): Kaltmiete und umlagefähige Nebenkosten fallen im ersten Jahr aus
+        - **Mietstopp** (nur Vermietung): keine Mieterhöhung in den ersten Jahren
+        - **CO2-Preis** statt {CO2_KOST_AUFG_PREIS} €/t (bei Vermietung der Vermieteranteil)
+        - **Instandhaltung**: einmalige Reparatur im ersten Jahr, bei Vermietung sofort abziehbar
+        - **DSCR** (Kapitaldienstdeckung) = Überschuss vor Kapitaldienst / Kapitaldienst; Banken erwarten meist ≥ 1,2
+        """)
+    t1, t2, t3, t4, t5, t6 = st.columns(6)
+    t1.slider("Betrachtung (Jahre)", min_value=5, max_value=30, value=STRESS_VORGABEN['stress_jahre'], step=1, key="stress_jahre")
+    t2.number_input("Anschlusszins (+%-Pkt.)", min_value=0.0, max_value=10.0, value=STRESS_VORGABEN['stress_zins'], step=0.5, key="stress_zins")
+    t3.number_input("Leerstand (Monate)", min_value=0, max_value=12, value=STRESS_VORGABEN['stress_leer'], step=1, key="stress_leer",
+                    disabled=nutzungsart != "Vermietung")
+    t4.number_input("Mietstopp (Jahre)", min_value=0, max_value=30, value=STRESS_VORGABEN['stress_mietstopp'], step=1, key="stress_mietstopp",
+                    disabled=nutzungsart != "Vermietung")
+    t5.number_input("CO2-Preis (€/t)", min_value=0, max_value=1000, value=STRESS_VORGABEN['stress_co2'], step=25, key="stress_co2")
+    t6.number_input("Reparatur (€)", min_value=0, max_value=500000, value=STRESS_VORGABEN['stress_reparatur'], step=5000, key="stress_reparatur")
+    _teil_stress(code, inputs, stress_einstellungen())
+
+    # --- Sensitivität (Tornado) ---
+    st.subheader("🌪️ Sensitivität: Welche Annahme zählt am meisten?")
+    tornado_delta = st.slider("Veränderung je Eingabe (± %)", min_value=1, max_value=30, value=10, step=1, key="tornado_delta",
+                              help="Jede Eingabe wird einzeln um diesen Prozentsatz verringert und erhöht, alle anderen bleiben gleich.")
+    _teil_tornado(code, inputs, tornado_delta)
+
+    # --- Eigenkapital-Optimierer ---
+    st.subheader("💰 Eigenkapital: Wie viel soll ich einsetzen?")
+    with st.expander("ℹ️ Wie wird optimiert?", expanded=False):
+        st.markdown(f"""
+        Der Eigenkapitaleinsatz wird zwischen dem Mindestbetrag und Ihrem verfügbaren Kapital in kleinen Schritten
+        durchgerechnet. Was Sie **nicht** einsetzen, wird zur **Alternativrendite** angelegt; Zuzahlungen werden daraus
+        entnommen. Bewertet wird das **Vermögen nach {zinsbindung} Jahren** (Anlage + Objektwert − Restschuld).
+        {'Die steuerliche Absetzbarkeit der Zinsen ist im Cashflow nach Steuern enthalten.' if nutzungsart == "Vermietung" else ''}
+
+        Die **Pareto-Front** enthält alle Aufteilungen, bei denen sich Cashflow, EK-Rendite, IRR und
+        zurückbehaltenes Kapital nicht gleichzeitig verbessern lassen.
+        """)
+    nk_summe = (inputs['kaufpreis'] + inputs['garage_stellplatz_kosten']) * sum(inputs['nebenkosten_prozente'].values()) / 100
+    e1, e2, e3, e4 = st.columns(4)
+    ek_verfuegbar = e1.number_input("Verfügbares Kapital (€)", min_value=0, max_value=10000000, value=int(eigenkapital), step=5000, key="ek_verfuegbar")
+    ek_min        = e2.number_input("Mindest-Eigenkapital (€)", min_value=0, max_value=10000000, value=int(round(nk_summe, -3)), step=5000, key="ek_min",
+                                    help="Viele Banken verlangen mindestens die Kaufnebenkosten als Eigenkapital.")
+    ek_alt        = e3.number_input("Alternativrendite n. St. (% p.a.)", min_value=0.0, max_value=15.0, value=4.0, step=0.25, key="ek_alt")
+    ek_wert       = e4.number_input("Wertsteigerung (% p.a.)", min_value=-5.0, max_value=10.0, value=2.0, step=0.5, key="ek_wert")
+    e5, e6 = st.columns(2)
+    ek_min_cf = e5.number_input("Mindest-Cashflow (€/Monat, optional)", min_value=-10000, max_value=10000, value=None, step=50, key="ek_min_cf",
+                                help="Aufteilungen mit geringerem monatlichem Cashflow werden nicht empfohlen.")
+    _weitere = [t['name'] for t in (inputs.get('tranchen') or [])[1:]]
+    ek_tranche = e6.selectbox("Aufteilung auf Tranche mitoptimieren", ["—"] + _weitere, key="ek_tranche") if _weitere else "—"
+    _teil_eigenkapital(code, inputs, ek_verfuegbar, ek_min, ek_alt, ek_wert, ek_min_cf, ek_tranche, ersparte_miete_pa)
+
+    # --- Sondertilgungs-Optimierer ---
+    if sondertilgung_p > 0 and darlehen1_summe > 0 and d1['monatsrate'] > 0:
+        st.subheader("🧮 Sondertilgung: wie viel, wann?")
+        with st.expander("ℹ️ Wie wird optimiert?", expanded=False):
+            st.markdown(f"""
+            Jeder Euro Sondertilgung spart bis zum Ende der Zinsbindung Zinsen zum **Darlehenszins**
+            {'(bei Vermietung **nach Steuern**, da Zinsen absetzbar sind)' if nutzungsart == "Vermietung" else ''}.
+            Jeder angelegte Euro wächst mit der **Alternativrendite**. Verglichen wird das Nettovermögen
+            (Depot − Restschuld) am Ende der Zinsbindung nach **{zinsbindung} Jahren**.
+            """)
+        o1, o2, o3 = st.columns(3)
+        st_budget  = o1.number_input("Sparbudget (€/Jahr)", min_value=0, max_value=1000000,
+                        value=int(round(darlehen1_summe * sondertilgung_p / 100, -2)), step=500, key="st_budget")
+        st_rendite = o2.number_input("Alternativrendite n. St. (% p.a.)", min_value=0.0, max_value=15.0,
+                        value=4.0, step=0.25, key="st_rendite")
+        st_ziel    = o3.radio("Ziel", ["Nettovermögen maximieren", "Restschuld minimieren"], key="st_ziel")
+        _teil_sondertilgung(code, stand, st_budget, st_rendite, st_ziel)
+
+    # --- Zins-Backtest gegen historische Bauzinsen ---
+    if os.path.exists(ZINSREIHE_DATEI) and darlehen1_summe > 0 and d1['monatsrate'] > 0:
+        zeige_zins_backtest(darlehen1_summe, zins1, d1, zinsbindung)
+
+    # --- Datenexport (Tilgungsplan & Ergebnisse) ---
+    st.subheader("💾 Datenexport für Bank & Steuerberater")
+    st.caption("Tilgungsplan (monatlich) und Detailrechnung als maschinenlesbare Tabellen.")
+    _tilgungsplan = lambda: immo_export.iter_tilgungsplaene(
+        inputs.get('tranchen') or [{'name': "Hauptdarlehen", 'summe': darlehen1_summe, 'zins_p': zins1,
+                                    'monatsrate': d1['monatsrate']}])
+    _ergebnisse   = lambda: immo_export.iter_ergebnis_zeilen(results)
+    _mime = {'csv': "text/csv",
+             'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+             'parquet': "application/vnd.apache.parquet"}
+    for format, col in zip(immo_export.verfuegbare_formate(), st.columns(len(immo_export.EXPORT_FORMATE))):
+        with col:
+            st.download_button(
+                label=f"⬇️ Tilgungsplan ({format.upper()})",
+                data=lambda f=format: immo_export.exportiere_bytes(_tilgungsplan(), f, immo_export.TILGUNGSPLAN_SPALTEN, "Tilgungsplan"),
+                file_name=f"Tilgungsplan_{immo_wohnort.sicherer_dateiname(wohnort)}.{format}", mime=_mime[format], key=f"export_tilgung_{format}"
+            )
             st.download_button(
-                label="⬇️ PDF-Bericht herunterladen",
-                data=pdf_bytes,
-                file_name=f"Immobilien_Analyse_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                mime="application/pdf"
+                label=f"⬇️ Detailrechnung ({format.upper()})",
+                data=lambda f=format: immo_export.exportiere_bytes(_ergebnisse(), f, immo_export.ERGEBNIS_SPALTEN, "Ergebnisse"),
+                file_name=f"Detailrechnung_{immo_wohnort.sicherer_dateiname(wohnort)}.{format}", mime=_mime[format], key=f"export_ergebnis_{format}"
             )
-        except Exception as e:
-            st.error(f"Fehler beim Erstellen des PDFs: {str(e)}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF-EXPORT (Fragment; das PDF wird nur auf Knopfdruck erzeugt und nicht
+# in der Sitzung gehalten)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.fragment
+def zeige_pdf_export(results, stand):
+    with immo_latenz.latenz_messung().messe('Fragment: PDF'):
+        st.markdown("---")
+        if st.button("📄 PDF-Bericht erstellen", key="pdf_erstellen"):
+            try:
+                # Checkliste im aktuellen Stand: Haken gelten nicht als geänderte Eingabe
+                pdf_bytes = create_pdf_report(results, dict(stand['inputs'], checklist_status=st.session_state['checklist_status']),
+                                              checklist_items,
+                                              immo_sensitivitaet.tornado(stand['inputs'], st.session_state.get('tornado_delta', 10)),
+                                              stresstest([stand['inputs']]))
+                st.success("PDF erfolgreich erstellt!")
+                st.download_button(
+                    label="⬇️ PDF-Bericht herunterladen",
+                    data=pdf_bytes,
+                    file_name=f"Immobilienanalyse_{immo_wohnort.sicherer_dateiname(stand['inputs']['wohnort'])}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                    mime="application/pdf", key="pdf_download"
+                )
+            except Exception as e:
+                st.error(f"Fehler beim Erstellen des PDFs: {str(e)}")
+
+if results:
+    stand = st.session_state['results_stand']
+    if stand['eingaben_code'] != eingaben_code:
+        st.info("ℹ️ Die Eingaben wurden seit der letzten Berechnung geändert. "
+                "Die Ergebnisse unten zeigen noch den alten Stand — bitte **Analyse berechnen** klicken.")
+    zeige_ergebnisse(results, stand)
+    zeige_pdf_export(results, stand)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OBJEKTLISTE (Fragment: Upload, Filter und Blättern laden nur diesen Teil neu;
+# Detailrechnung und PDF entstehen erst für ein geöffnetes Objekt)
+# ─────────────────────────────────────────────────────────────────────────────
+OBJEKTLISTE_SEITE = 50
+
+@st.fragment
+def zeige_objektliste(vorlage, code):
+    with immo_latenz.latenz_messung().messe('Fragment: Objektliste'):
+        st.markdown("---")
+        st.header("📂 Objektliste vergleichen")
+        with st.expander("ℹ️ Welche Datei kann ich hochladen?", expanded=False):
+            st.markdown(f"""
+            Eine **CSV** (Trenner `;` oder `,`, Dezimalkomma erlaubt) oder **JSON**-Datei (Liste von Objekten)
+            mit bis zu {de(immo_objektliste.MAX_OBJEKTE, 0)} Objekten. Pflicht ist nur die Spalte `kaufpreis`;
+            alle übrigen Angaben werden aus den Eingaben oben übernommen, wenn die Spalte fehlt oder leer ist.
+
+            Spalten (wie die Felder oben): `name`, `wohnort`, `nutzungsart`, `wohnflaeche_qm`, `kaltmiete_monatlich`,
+            `eigenkapital`, `zins1_prozent`, `tilgung1_prozent`, `baujahr_kategorie`, `energieeffizienz`, `heizungstyp`,
+            `grunderwerbsteuer`, `makler`, `nicht_umlagefaehige_kosten_pa` u.a.
+            """)
+        datei = st.file_uploader("CSV- oder JSON-Datei mit Objekten", type=['csv', 'json'], key="objektliste_datei")
+        if datei is None:
+            return
+        # Bewertete Liste im Sitzungsspeicher (gleiches Budget wie die Analysen); neu bewertet wird
+        # nur bei anderer Datei, anderen Rechen-Eingaben (ohne Checkliste) oder Stress-Einstellungen
+        schluessel = f"objektliste {datei.file_id} {code} {stress_einstellungen()}"
+        liste = speicher.hole(schluessel)
+        if liste is None:
+            try:
+                objekte = immo_objektliste.lese_objekte(datei.getvalue(), datei.name, vorlage)
+                werte = immo_objektliste.bewerte_objekte(objekte)
+                stress = stresstest(objekte)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                return
+            werte['stress_cf_min'] = stress['cf_min'].min(axis=1)
+            liste = speicher.lege_ab(schluessel, {
+                'objekte': objekte, 'werte': werte,
+                'suchtext': [f"{o['name']} {o.get('wohnort', '')}".lower() for o in objekte]})
+        objekte, werte = liste['objekte'], liste['werte']
+
+        f1, f2, f3, f4 = st.columns(4)
+        nutzung   = f1.selectbox("Nutzungsart", ("Alle", "Vermietung", "Eigennutzung"), key="ol_nutzung")
+        suche     = f2.text_input("Suche (Name, Ort)", key="ol_suche").strip().lower()
+        preis_max = f3.number_input("Kaufpreis bis (€)", min_value=0, value=0, step=10000, key="ol_preis_max",
+                                    help="0 = ohne Grenze")
+        cf_min    = f4.number_input("Cashflow mtl. ab (€)", value=-10000, step=50, key="ol_cf_min")
+        k1, k2 = st.columns([3, 1])
+        kennzahl  = k1.selectbox("Sortieren nach", list(immo_objektliste.KENNZAHLEN), key="ol_kennzahl",
+                                 format_func=lambda k: immo_objektliste.KENNZAHLEN[k][0])
+        umgekehrt = k2.toggle("Umgekehrt", key="ol_umgekehrt")
+
+        maske = werte['cashflow_mtl'] >= cf_min
+        if nutzung != "Alle":
+            maske &= werte['vermietung'] == (nutzung == "Vermietung")
+        if preis_max:
+            maske &= werte['kaufpreis'] <= preis_max
+        if suche:
+            maske &= [suche in t for t in liste['suchtext']]
+        reihenfolge = immo_objektliste.rangliste(
+            werte, kennzahl, absteigend=immo_objektliste.KENNZAHLEN[kennzahl][1] != umgekehrt, maske=maske)
+
+        seiten = max(1, math.ceil(len(reihenfolge) / OBJEKTLISTE_SEITE))
+        if st.session_state.get('ol_seite', 1) > seiten:
+            st.session_state['ol_seite'] = seiten
+        seite = st.number_input(f"Seite (von {seiten})", min_value=1, max_value=seiten, step=1, key="ol_seite")
+        start = (seite - 1) * OBJEKTLISTE_SEITE
+        auf_seite = reihenfolge[start:start + OBJEKTLISTE_SEITE]
+        zahl = lambda key, i, d=0: round(float(werte[key][i]), d) if math.isfinite(werte[key][i]) else None
+        st.dataframe(
+            [{'Rang': start + n + 1, 'Objekt': objekte[i]['name'], 'Ort': objekte[i].get('wohnort', ''),
+              'Nutzung': objekte[i]['nutzungsart'], 'Kaufpreis (€)': zahl('kaufpreis', i), 'm²': zahl('wohnflaeche_qm', i, 1),
+              **{titel: zahl(key, i, 0 if '€' in titel else 2) for key, (titel, _) in immo_objektliste.KENNZAHLEN.items()},
+              'Stress: schlechtestes Jahr (€)': zahl('stress_cf_min', i)}
+             for n, i in enumerate(auf_seite)],
+            hide_index=True)
+        st.caption(f"{de(len(reihenfolge), 0)} von {de(len(objekte), 0)} Objekten "
+                   f"(in {werte['gruppen']} Rechendurchgängen bewertet). Stress: niedrigster Jahres-Cashflow "
+                   "über alle Szenarien des Stresstests.")
+
+        wahl = st.selectbox("Objekt öffnen (Detailrechnung & PDF)", [None] + [int(i) for i in auf_seite], key="ol_objekt",
+                            format_func=lambda i: "—" if i is None else f"{objekte[i]['name']} ({objekte[i].get('wohnort', '')})")
+        if wahl is not None:
+            objekt = objekte[wahl]
+            ergebnis = calculate_analytics(objekt)
+            st.markdown(detail_tabelle_html(ergebnis['display_table'], DETAIL_ZEILEN[objekt['nutzungsart']]),
+                        unsafe_allow_html=True)
+            if st.button("📄 PDF-Bericht für dieses Objekt erstellen", key="ol_pdf_erstellen"):
+                try:
+                    pdf_bytes = create_pdf_report(ergebnis, dict(objekt, checklist_status={}), checklist_items,
+                                                  stress=stresstest([objekt]))
+                    st.download_button(
+                        label="⬇️ PDF-Bericht herunterladen",
+                        data=pdf_bytes,
+                        file_name=f"Immobilienanalyse_{immo_wohnort.sicherer_dateiname(objekt['name'])}.pdf",
+                        mime="application/pdf", key="ol_pdf")
+                except Exception as e:
+                    st.error(f"Fehler beim Erstellen des PDFs: {str(e)}")
+
+zeige_objektliste(dict(inputs, instandhaltung_euro_qm=instandhaltung_qm), eingaben_code)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RERUN-LATENZ (Messwerte aller Sitzungen dieses Prozesses)
+# ─────────────────────────────────────────────────────────────────────────────
+immo_latenz.latenz_messung().erfasse('Seite (kompletter Rerun)', time.perf_counter() - _seite_start)
+if os.environ.get("IMMO_LATENZ"):
+    with st.expander("⏱️ Rerun-Latenz", expanded=False):
+        st.dataframe([
+            {'Abschnitt': z['abschnitt'], 'Reruns': z['anzahl'], 'Median (ms)': round(z['median_ms'], 1),
+             'p95 (ms)': round(z['p95_ms'], 1), 'Max (ms)': round(z['max_ms'], 1)}
+            for z in immo_latenz.latenz_messung().zusammenfassung()
+        ], hide_index=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SPEICHERBERICHT (nur diese Sitzung)
+# ─────────────────────────────────────────────────────────────────────────────
+if os.environ.get("IMMO_SPEICHERBERICHT"):
+    with st.expander("🧠 Speicherbedarf dieser Sitzung", expanded=False):
+        st.caption(f"Zwischengespeicherte Analysen: {len(speicher)} "
+                   f"({de(speicher.belegt_bytes / 1024, 1)} KiB von {de(SITZUNG_BUDGET_MB * 1024, 0)} KiB Budget, "
+                   f"{speicher.verdraengt} verdrängt)")
+        st.dataframe([{'Schlüssel': z['schluessel'], 'KiB': round(z['bytes'] / 1024, 1)}
+                      for z in immo_sitzung.sitzungs_bericht(st.session_state)], hide_index=True)
@@ -0,0 +1,179 @@
+# immo_stress.py
+
+import numpy as np
+
+import immo_afa
+import immo_finanzierung
+import immo_format
+import immo_objektliste
+import immo_varianten
+from immo_stammdaten import CO2_KOST_AUFG_PREIS
+
+STANDARD_JAHRE = 15
+
+
+def katalog(anschlusszins_plus_p=3.0, leerstand_monate=6, mietstopp_jahre=5, co2_preis=200.0,
+            instandhaltung_einmalig=30000.0, leerstand_jahr=1, instandhaltung_jahr=1):
+    """
+    Standard-Stressfälle der Banken mit einstellbarer Stärke; der erste
+    Eintrag ist die Basis. Jeder Eintrag überlagert die Ausgangswerte,
+    fehlende Schlüssel lassen die Annahme unverändert:
+
+    - anschlusszins_plus_p: Zinsaufschlag nach Ablauf der Zinsbindung (%-Punkte)
+    - leerstand_monate, leerstand_jahr: Leerstand über die Mietausfallpauschale hinaus
+    - mietstopp_jahre: keine Mieterhöhung in den ersten Jahren
+    - co2_preis: CO2-Preis in €/t statt CO2_KOST_AUFG_PREIS
+    - instandhaltung_einmalig, instandhaltung_jahr: einmalige Reparatur
+
+    'nur_vermietung' markiert Fälle ohne Wirkung bei Eigennutzung (siehe
+    'anwendbar' im Ergebnis von stresstest).
+    """
+    zahl = lambda x, d=0: immo_format.de_zahl(float(x), d)
+    return (
+        {'name': "Basis"},
+        {'name': f"Anschlusszins +{zahl(anschlusszins_plus_p, 0 if float(anschlusszins_plus_p).is_integer() else 1)} %-Pkt.", 'anschlusszins_plus_p': anschlusszins_plus_p},
+        {'name': f"{zahl(leerstand_monate)} Monate Leerstand", 'leerstand_monate': leerstand_monate,
+         'leerstand_jahr': leerstand_jahr, 'nur_vermietung': True},
+        {'name': f"Mietstopp {zahl(mietstopp_jahre)} Jahre", 'mietstopp_jahre': mietstopp_jahre, 'nur_vermietung': True},
+        {'name': f"CO2-Preis {zahl(co2_preis)} €/t", 'co2_preis': co2_preis},
+        {'name': f"Instandhaltung {zahl(instandhaltung_einmalig)} €", 'instandhaltung_einmalig': instandhaltung_einmalig,
+         'instandhaltung_jahr': instandhaltung_jahr},
+    )
+
+
+SZENARIEN = katalog()
+
+
+def _szenariowerte(szenarien, jahre):
+    """Überlagerungen als Arrays (Szenarien) bzw. (Szenarien × Jahre)."""
+    feld = lambda key, standard=0.0: np.array([float(s.get(key, standard) or 0) for s in szenarien])
+    t = np.arange(1, jahre + 1)
+    leer_jahr = feld('leerstand_jahr', 1)
+    shock_jahr = feld('instandhaltung_jahr', 1)
+    if (feld('leerstand_monate') < 0).any() or (feld('leerstand_monate') > 12).any():
+        raise ValueError("Leerstand muss zwischen 0 und 12 Monaten liegen.")
+    if ((leer_jahr < 1) | (leer_jahr > jahre) | (shock_jahr < 1) | (shock_jahr > jahre)).any():
+        raise ValueError(f"Stressjahre müssen zwischen 1 und {jahre} liegen.")
+    co2 = np.array([float(s['co2_preis']) if s.get('co2_preis') is not None else CO2_KOST_AUFG_PREIS
+                    for s in szenarien])
+    return {
+        'zins_plus': feld('anschlusszins_plus_p'),
+        'leerstand': np.where(t[None, :] == leer_jahr[:, None], feld('leerstand_monate')[:, None] / 12, 0.0),
+        'mietstopp': feld('mietstopp_jahre'),
+        'co2_faktor': co2 / CO2_KOST_AUFG_PREIS,
+        'instandhaltung': np.where(t[None, :] == shock_jahr[:, None], feld('instandhaltung_einmalig')[:, None], 0.0),
+    }
+
+
+def _kredit(objekte, werte, jahre):
+    """
+    Kapitaldienst aller Objekte aus einem gemeinsamen Tranchenplan (Objekte ×
+    Jahre) sowie die Restschuld zu Monatsbeginn nach Ablauf der Zinsbindung,
+    summiert je Jahr: Grundlage des Mehrzinses bei höherem Anschlusszins.
+    Bauspardarlehen haben einen festen Zins und bleiben außen vor.
+    """
+    alle, objekt_nr = [], []
+    for i, objekt in enumerate(objekte):
+        liste = immo_varianten.tranchen(objekt, {'darlehen_summe': werte['darlehen_summe'][i],
+                                                 'monatsrate': werte['monatsrate'][i]})
+        alle += liste
+        objekt_nr += [i] * len(liste)
+    objekt_nr = np.array(objekt_nr, dtype=np.int64)
+    o = len(objekte)
+
+    plan = immo_finanzierung.berechne_tranchen(alle, monate=jahre * 12)
+    je_jahr = lambda x: x.reshape(len(alle), jahre, 12).sum(axis=2)
+    stand = np.concatenate([plan['summe'][:, None], plan['restschuld'][:, :-1]], axis=1)   # Restschuld zu Monatsbeginn
+    bindung = np.array([int((objekte[i].get('zinsbindung') or 10) * 12) for i in objekt_nr])
+    variabel = np.array([t.get('typ') != 'bauspar' for t in alle], dtype=bool)
+    anschluss = np.where((np.arange(jahre * 12)[None, :] >= bindung[:, None]) & variabel[:, None], stand, 0.0)
+
+    # jedes Objekt hat mindestens eine Tranche (sonst das Hauptdarlehen), die Zeilen liegen am Stück
+    summe = lambda x: np.add.reduceat(je_jahr(x), np.searchsorted(objekt_nr, np.arange(o)), axis=0)
+    return {'zinsen': summe(plan['zinsen']), 'rate': summe(plan['rate']), 'anschluss_schuld': summe(anschluss)}
+
+
+def stresstest(objekte, szenarien=SZENARIEN, jahre=STANDARD_JAHRE, mietsteigerung_p=2.0, kostensteigerung_p=2.0):
+    """
+    Alle Stressszenarien für alle Objekte in einem Durchgang (Objekte ×
+    Szenarien × Jahre). Objekte sind Eingabe-Dicts wie für calculate_analytics
+    bzw. aus immo_objektliste.lese_objekte.
+
+    - Ausgangswerte aus immo_objektliste.varianten_werte, Kapitaldienst aus
+      einem gemeinsamen Tranchenplan, AfA aus immo_afa.afa_plaene
+    - Miete steigt mit mietsteigerung_p, Bewirtschaftungskosten mit
+      kostensteigerung_p (Jahr 1 wie auf der Seite)
+    - Anschlusszins: Mehrzins auf die planmäßige Restschuld, die Tilgung bleibt
+      gleich (Rate steigt um den Mehrzins), der Mehrzins ist Werbungskosten
+    - Leerstand: Kaltmiete und umlagefähige Kosten fallen anteilig aus, die
+      Nebenkosten trägt der Vermieter (Werbungskosten)
+    - Mietstopp und Leerstand betreffen nur Vermietung; die Reparatur ist bei
+      Vermietung sofort abziehbarer Erhaltungsaufwand
+
+    Ergebnis: 'szenarien' (Namen), 'jahre', 'vermietung' (Maske), 'anwendbar'
+    (Objekte × Szenarien: False für 'nur_vermietung'-Fälle bei Eigennutzung), 'cashflow'
+    (nach Steuern, Objekte × Szenarien × Jahre) und je Objekt × Szenario
+    cf_j1, cf_min, cf_min_jahr, kumuliert, delta_kumuliert (gegenüber dem
+    ersten Szenario), dscr_min (Kapitaldienstdeckung, nur Vermietung mit
+    Darlehen) und nve_min_mtl (niedrigstes monatliches Netto).
+    """
+    if jahre < 1:
+        raise ValueError("Der Betrachtungszeitraum muss mindestens 1 Jahr betragen.")
+    if not objekte or not szenarien:
+        raise ValueError("Es werden mindestens ein Objekt und ein Szenario benötigt.")
+    werte, _ = immo_objektliste.varianten_werte(objekte)
+    s = _szenariowerte(szenarien, jahre)
+    kredit = _kredit(objekte, werte, jahre)
+    vermietung = np.array([o.get('nutzungsart') == 'Vermietung' for o in objekte], dtype=bool)
+    feld = lambda key: np.array([float(o.get(key) or 0) for o in objekte])
+    spalte = lambda x: np.nan_to_num(x)[:, None, None]
+
+    t = np.arange(1, jahre + 1)
+    kosten_g = (1 + kostensteigerung_p / 100) ** (t - 1)
+    miete_g = (1 + mietsteigerung_p / 100) ** np.maximum(t[None, :] - 1 - s['mietstopp'][:, None], 0)   # S × J
+    mehrzins = kredit['anschluss_schuld'][:, None, :] * s['zins_plus'][None, :, None] / 1200            # O × S × J
+    rate = kredit['rate'][:, None, :] + mehrzins
+    reparatur = s['instandhaltung'][None, :, :]
+
+    if vermietung.any():
+        miete, ausfall = spalte(werte['einnahmen_pa']), spalte(werte['mietausfall_pa'])
+        co2, instand = spalte(werte['co2_pa']), spalte(werte['instandhaltung_pa'])
+        nicht_umlagef = spalte(werte['werbungskosten_pa']) - ausfall - co2
+        umlagef = spalte(werte['bewirtschaftung_pa']) - miete + spalte(werte['werbungskosten_pa']) + instand
+        leer = s['leerstand'][None, :, :]
+        einnahmen = miete * miete_g * (1 - leer)                               # Kaltmiete nach Leerstand
+        umlage_verlust = umlagef * kosten_g * leer
+        laufend = nicht_umlagef * kosten_g + ausfall * miete_g + co2 * s['co2_faktor'][None, :, None]
+        cf_vor = einnahmen + umlagef * kosten_g - umlage_verlust - laufend - instand * kosten_g - rate - reparatur
+
+        afa = np.zeros((len(objekte), jahre))
+        idx = np.flatnonzero(vermietung)
+        afa[idx] = np.array([p['afa_summe'] for p in immo_afa.afa_plaene([objekte[i] for i in idx], jahre)])
+        gewinn = (einnahmen - umlage_verlust - laufend - kredit['zinsen'][:, None, :] - mehrzins
+                  - afa[:, None, :] - reparatur)
+        gewinn[..., 0] -= spalte(werte['nebenkosten_summe'])[..., 0]
+        cf_vermietung = cf_vor - gewinn * feld('steuersatz')[:, None, None] / 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dscr = np.where(rate > 0, (cf_vor + rate) / rate, np.nan)
+    else:
+        cf_vermietung = dscr = np.full(rate.shape, np.nan)
+
+    # Eigennutzung: Hausgeld und Instandhaltung steigen, CO2 nach Szenariopreis
+    co2_eigen = feld('co2_eigen_pa')[:, None, None]
+    uebrige = np.nan_to_num(-werte['bewirtschaftung_pa'])[:, None, None] - co2_eigen
+    cf_eigen = -(uebrige * kosten_g + co2_eigen * s['co2_faktor'][None, :, None] + rate + reparatur)
+
+    maske = vermietung[:, None, None]
+    cashflow = np.where(maske, cf_vermietung, cf_eigen)
+    dscr = np.where(maske, dscr, np.nan)
+    kumuliert = cashflow.sum(axis=2)
+    dscr_gueltig = ~np.isnan(dscr).all(axis=2)
+    return {
+        'szenarien': [sz.get('name', f"Szenario {k + 1}") for k, sz in enumerate(szenarien)],
+        'jahre': t, 'vermietung': vermietung, 'cashflow': cashflow,
+        'anwendbar': vermietung[:, None] | ~np.array([bool(sz.get('nur_vermietung')) for sz in szenarien])[None, :],
+        'cf_j1': cashflow[..., 0], 'cf_min': cashflow.min(axis=2), 'cf_min_jahr': cashflow.argmin(axis=2) + 1,
+        'kumuliert': kumuliert, 'delta_kumuliert': kumuliert - kumuliert[:, :1],
+        'dscr_min': np.where(dscr_gueltig, np.nanmin(np.where(dscr_gueltig[..., None], dscr, np.inf), axis=2), np.nan),
+        'nve_min_mtl': feld('verfuegbares_einkommen_mtl')[:, None] + cashflow.min(axis=2) / 12,
+    }
@@ -0,0 +1,177 @@
+# immo_szenario.py
+
+import base64
+import binascii
+import struct
+import zlib
+
+URL_PARAMETER = 's'
+# Version 2 hängt ANHANG_V2 an; Codes der Version 1 bleiben lesbar (diese Felder dann None)
+VERSION = 2
+VERSIONEN = (1, 2)
+
+# Auswahllisten der Streamlit-App; Auswahlfelder werden als Index (1 Byte) gespeichert
+OPTIONEN = {
+    'nutzungsart':      ("Vermietung", "Eigennutzung"),
+    'baujahr':          ("1925 - 2022", "vor 1925", "ab 2023"),
+    'stockwerk':        ("EG", "1", "2", "3", "4", "5", "6", "DG"),
+    'zimmeranzahl':     ("1", "1,5", "2", "2,5", "3", "3,5", "4", "4,5", "5"),
+    'energieeffizienz': ("A+", "A", "B", "C", "D", "E", "F", "G", "H"),
+    'heizungstyp':      ("Gas", "Heizöl", "Fernwärme (fossil)", "Wärmepumpe", "Pellets/Holz"),
+    'oepnv_anbindung':  ("Sehr gut", "Gut", "Okay"),
+    'tilgung1_modus':   ("Tilgungssatz (%)", "Tilgungsbetrag (€ mtl.)", "Laufzeit (Jahre)"),
+    'tranche_typ':      ('annuitaet', 'kfw', 'bauspar', 'endfaellig'),
+    'afa_methode':      ('linear', 'degressiv'),
+    'modernisierung_afa': ('gebaeude', 'verteilt'),
+}
+
+# Feldtypen: 'e' Auswahl (uint8), 'B'/'H'/'I' ganze Zahl (uint8/16/32),
+# '%' Dezimalzahl mit 2 Nachkommastellen (uint16), 'c' Checkliste (Bitmaske uint16).
+# Der jeweils größte Wert eines Typs steht für None.
+_FORMAT = {'e': 'B', 'B': 'B', 'H': 'H', 'I': 'I', '%': 'H', 'c': 'H'}
+
+FELDER_V1 = (
+    ('nutzungsart', 'e'), ('baujahr', 'e'), ('stockwerk', 'e'), ('zimmeranzahl', 'e'),
+    ('energieeffizienz', 'e'), ('heizungstyp', 'e'), ('oepnv_anbindung', 'e'), ('tilgung1_modus', 'e'),
+    ('wohnflaeche_qm', 'H'), ('jahresverbrauch_kwh', 'I'),
+    ('kaufpreis', 'I'), ('garage', 'I'), ('invest_bedarf', 'I'), ('eigenkapital', 'I'), ('gebaeude_anteil', 'B'),
+    ('grunderwerbsteuer', '%'), ('notar', '%'), ('grundbuch', '%'), ('makler', '%'),
+    ('zins1', '%'), ('tilgung1', '%'), ('tilg_eur1', 'I'), ('laufzeit1', 'B'),
+    ('zinsbindung', 'B'), ('sondertilgung_p', '%'),
+    ('kaltmiete_monatlich', 'I'), ('umlagefaehige_monat', 'I'), ('nicht_umlagefaehige_pa', 'I'),
+    ('mietausfallwagnis_p', '%'), ('instandhaltung_qm', '%'), ('steuersatz', '%'),
+    ('verfuegbares_einkommen', 'I'), ('checkliste', 'c'),
+)
+TEXTE_V1 = ('wohnort', 'besonderheiten')
+# Ab Version 2 nach den Tranchen angehängt
+ANHANG_V2 = (('afa_methode', 'e'), ('sonder_afa', 'B'), ('modernisierung_afa', 'e'), ('modernisierung_jahre', 'B'))
+TRANCHE_V1 = (('typ', 'e'), ('summe', 'I'), ('zins_p', '%'), ('tilgung_p', '%'),
+              ('laufzeit_jahre', 'B'), ('tilgungsfrei_jahre', 'B'))
+
+_KOPF = struct.Struct('<B')
+
+
+def _struct(felder):
+    return struct.Struct('<' + ''.join(_FORMAT[typ] for _, typ in felder))
+
+
+_FELDER_STRUCT = _struct(FELDER_V1)
+_TRANCHE_STRUCT = _struct(TRANCHE_V1)
+_ANHANG_STRUCT = _struct(ANHANG_V2)
+# Größte Nutzdaten, die kodiere() erzeugen kann (Texte je max. 255 Bytes + Längenbyte, max. 255 Tranchen);
+# mehr wird beim Dekodieren gar nicht erst entpackt
+MAX_NUTZDATEN = (_FELDER_STRUCT.size + 256 * len(TEXTE_V1) + 1 + 255 * (_TRANCHE_STRUCT.size + 256)
+                 + _ANHANG_STRUCT.size)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FELDER PACKEN
+# ═════════════════════════════════════════════════════════════════════════════
+def _packe_wert(name, typ, wert):
+    leer = (1 << (8 * struct.calcsize(_FORMAT[typ]))) - 1
+    if wert is None:
+        return leer
+    if typ == 'e':
+        optionen = OPTIONEN['tranche_typ' if name == 'typ' else name]
+        if wert not in optionen:
+            raise ValueError(f"Ungültiger Wert für '{name}': {wert!r}")
+        return optionen.index(wert)
+    if typ == 'c':
+        return sum(1 << i for i, haken in enumerate(wert[:16]) if haken)
+    zahl = round(float(wert) * 100) if typ == '%' else round(float(wert))
+    if not 0 <= zahl < leer:
+        raise ValueError(f"Wert für '{name}' außerhalb des speicherbaren Bereichs: {wert}")
+    return zahl
+
+
+def _entpacke_wert(name, typ, zahl):
+    leer = (1 << (8 * struct.calcsize(_FORMAT[typ]))) - 1
+    if typ == 'c':
+        return [bool(zahl >> i & 1) for i in range(16)]
+    if zahl == leer:
+        return None
+    if typ == 'e':
+        optionen = OPTIONEN['tranche_typ' if name == 'typ' else name]
+        if zahl >= len(optionen):
+            raise ValueError(f"Ungültiger Auswahlindex für '{name}': {zahl}")
+        return optionen[zahl]
+    return zahl / 100 if typ == '%' else zahl
+
+
+def _packe_text(text):
+    daten = str(text or '').encode('utf-8')[:255]
+    # Keine halben UTF-8-Zeichen am Ende stehen lassen
+    daten = daten.decode('utf-8', 'ignore').encode('utf-8')
+    return bytes([len(daten)]) + daten
+
+
+def _lese_text(puffer, pos):
+    laenge = puffer[pos]
+    return puffer[pos + 1:pos + 1 + laenge].decode('utf-8'), pos + 1 + laenge
+
+# ═════════════════════════════════════════════════════════════════════════════
+# KODIEREN / DEKODIEREN
+# ═════════════════════════════════════════════════════════════════════════════
+def kodiere(szenario):
+    """
+    Verpackt ein Szenario (Dict mit den Feldern aus FELDER_V1, TEXTE_V1,
+    ANHANG_V2 und optional 'tranchen') in einen kurzen, URL-tauglichen Code:
+    Versionsbyte + deflate(struct-gepackte Felder), base64url ohne Padding.
+    """
+    nutzdaten = bytearray(_FELDER_STRUCT.pack(
+        *(_packe_wert(name, typ, szenario.get(name)) for name, typ in FELDER_V1)))
+    for name in TEXTE_V1:
+        nutzdaten += _packe_text(szenario.get(name))
+    tranchen = list(szenario.get('tranchen') or ())[:255]
+    nutzdaten.append(len(tranchen))
+    for t in tranchen:
+        nutzdaten += _TRANCHE_STRUCT.pack(*(_packe_wert(name, typ, t.get(name)) for name, typ in TRANCHE_V1))
+        nutzdaten += _packe_text(t.get('name'))
+    nutzdaten += _ANHANG_STRUCT.pack(*(_packe_wert(name, typ, szenario.get(name)) for name, typ in ANHANG_V2))
+    komprimierer = zlib.compressobj(9, zlib.DEFLATED, -15)
+    roh = _KOPF.pack(VERSION) + komprimierer.compress(bytes(nutzdaten)) + komprimierer.flush()
+    return base64.urlsafe_b64encode(roh).rstrip(b'=').decode('ascii')
+
+
+def dekodiere(code):
+    """
+    Gegenstück zu kodiere(), auch für Codes älterer VERSIONEN. Liefert das
+    Szenario-Dict; ein beschädigter Code oder eine unbekannte Version führt
+    zu ValueError.
+    """
+    try:
+        roh = base64.urlsafe_b64decode(code + '=' * (-len(code) % 4))
+        version, = _KOPF.unpack_from(roh, 0)
+    except (binascii.Error, struct.error, TypeError, ValueError) as e:
+        raise ValueError("Szenario-Code ist beschädigt.") from e
+    if version not in VERSIONEN:
+        raise ValueError(f"Unbekannte Szenario-Version: {version}")
+    try:
+        entpacker = zlib.decompressobj(-15)
+        puffer = entpacker.decompress(roh[_KOPF.size:], MAX_NUTZDATEN)
+        if entpacker.unconsumed_tail or not entpacker.eof:
+            raise ValueError("Szenario-Code ist beschädigt.")
+        werte = _FELDER_STRUCT.unpack_from(puffer, 0)
+        szenario = {name: _entpacke_wert(name, typ, zahl) for (name, typ), zahl in zip(FELDER_V1, werte)}
+        pos = _FELDER_STRUCT.size
+        for name in TEXTE_V1:
+            szenario[name], pos = _lese_text(puffer, pos)
+        tranchen = []
+        anzahl, pos = puffer[pos], pos + 1
+        for _ in range(anzahl):
+            werte = _TRANCHE_STRUCT.unpack_from(puffer, pos)
+            tranche = {name: _entpacke_wert(name, typ, zahl) for (name, typ), zahl in zip(TRANCHE_V1, werte)}
+            tranche['name'], pos = _lese_text(puffer, pos + _TRANCHE_STRUCT.size)
+            tranchen.append(tranche)
+        # Version 1 endet nach den Tranchen
+        if version >= 2:
+            werte = _ANHANG_STRUCT.unpack_from(puffer, pos)
+            szenario.update({name: _entpacke_wert(name, typ, zahl) for (name, typ), zahl in zip(ANHANG_V2, werte)})
+            pos += _ANHANG_STRUCT.size
+        else:
+            szenario.update(dict.fromkeys(name for name, _ in ANHANG_V2))
+        if pos != len(puffer):
+            raise ValueError("Szenario-Code ist beschädigt.")
+    except (zlib.error, struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError("Szenario-Code ist beschädigt.") from e
+    szenario['tranchen'] = tranchen
+    return szenario
@@ -0,0 +1,265 @@
+# immo_varianten.py
+
+import numpy as np
+
+import immo_afa
+import immo_finanzierung
+from immo_stammdaten import (CO2_KOST_AUFG_PREIS, HEIZUNG_CO2_FAKTOR, ENERGIEKLASSE_VERBRAUCH,
+                             CO2_STUFEN_VERMIETER)
+
+# Rechenkern der Streamlit-Seite: berechne_varianten rechnet beliebig viele
+# Varianten eines Szenarios in einem Aufruf, jede Eingabe kann als Array (eine
+# Zeile je Variante) überschrieben werden. detailrechnung ist der Aufruf mit einer
+# Zeile und liefert die Ergebnistabelle (calculate_analytics der Seite).
+
+_CO2_GRENZEN = np.array([hi for _, hi, _ in CO2_STUFEN_VERMIETER])
+_CO2_ANTEILE = np.array([anteil for _, _, anteil in CO2_STUFEN_VERMIETER])
+
+
+def _wert(inputs, aenderungen, key, standard=0.0):
+    """Eingabe als float-Array: aus aenderungen, sonst aus inputs (None → standard)."""
+    if key in aenderungen:
+        return np.asarray(aenderungen[key], dtype=np.float64)
+    wert = inputs.get(key)
+    return np.float64(standard if wert is None else wert)
+
+
+def monatsrate(summe, zins, modus, tilgung_p=None, tilgung_euro_mtl=None, laufzeit_jahre=None):
+    """Monatsrate wie berechne_darlehen_details (Modus skalar, Werte als Arrays)."""
+    r = zins / 100 / 12
+    if modus == 'tilgungssatz' and tilgung_p is not None:
+        return np.where(tilgung_p != 0, summe * (zins + tilgung_p) / 100 / 12, 0.0)
+    if modus == 'tilgung_euro' and tilgung_euro_mtl is not None:
+        return np.where(tilgung_euro_mtl != 0, tilgung_euro_mtl, 0.0)
+    if modus == 'laufzeit' and laufzeit_jahre is not None:
+        n = laufzeit_jahre * 12
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            q = (1 + r) ** n
+            rate = np.where(r > 0, summe * r * q / (q - 1), summe / n)
+        return np.where(laufzeit_jahre != 0, rate, 0.0)
+    return np.zeros_like(summe * zins, dtype=np.float64)
+
+
+def _jahr1_annuitaet(summe, zins, rate):
+    """Zinsen und Kapitaldienst der ersten 12 Monate einer Annuität (wie immo_finanzierung, Restschuld ≥ 0)."""
+    r = np.asarray(zins / 1200, dtype=np.float64)[..., None]
+    k = np.arange(13, dtype=np.float64)
+    b0, rate_ = np.asarray(summe)[..., None], np.asarray(rate)[..., None]
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        q = (1 + r) ** k
+        rest = np.where(r > 0, b0 * q - rate_ * (q - 1) / np.where(r > 0, r, 1), b0 - rate_ * k)
+    rest = np.clip(rest, 0, None)
+    zinsen = (rest[..., :-1] * r).sum(axis=-1)
+    return zinsen, zinsen + rest[..., 0] - rest[..., -1]
+
+
+def co2_anteil_vermieter(co2_qm):
+    """Vermieteranteil nach CO2_STUFEN_VERMIETER für einen CO2-Ausstoß in kg/m²/a (Arrays erlaubt)."""
+    stufe = np.searchsorted(_CO2_GRENZEN, co2_qm, side='right')
+    return _CO2_ANTEILE[np.minimum(stufe, len(_CO2_ANTEILE) - 1)]
+
+
+def _co2_vermieter(heizungstyp, effizienzklasse, wohnflaeche, jahresverbrauch_kwh):
+    """Vermieteranteil der CO2-Kosten wie immo_stammdaten.berechne_co2_vermieter, für Arrays."""
+    faktor = HEIZUNG_CO2_FAKTOR.get(heizungstyp, 0)
+    verbrauch = np.where(jahresverbrauch_kwh > 0, jahresverbrauch_kwh,
+                         ENERGIEKLASSE_VERBRAUCH.get(effizienzklasse, 100) * wohnflaeche)
+    co2_kg = verbrauch * faktor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        co2_qm = np.where(wohnflaeche > 0, co2_kg / wohnflaeche, 0.0)
+    anteil = co2_anteil_vermieter(co2_qm)
+    kosten = np.round(co2_kg / 1000 * CO2_KOST_AUFG_PREIS * anteil, 2)
+    return np.where((faktor == 0) | (wohnflaeche <= 0), 0.0, kosten)
+
+
+def berechne_varianten(inputs, aenderungen=None):
+    """
+    Rechnet alle Varianten eines Szenarios in einem Durchgang.
+
+    - inputs: Eingabe-Dict wie für detailrechnung
+    - aenderungen: Dict Eingabe → Array gleicher Länge (eine Zeile je Variante);
+      'nebenkosten_faktor' skaliert alle Kaufnebenkosten-Prozentsätze gemeinsam,
+      'tranche_summen' (Varianten × weitere Tranchen) setzt die Summen der weiteren Tranchen
+    - Bei mehreren Tranchen wird das Hauptdarlehen wie auf der Seite neu aus
+      Darlehensbedarf und Tilgungseingabe gebildet, die weiteren Tranchen bleiben fest
+
+    Ergebnis: Dict Kennzahl → Array (Form der Änderungen), u.a. cf_vor,
+    cf_nach_j1, cf_nach_lfd, nve_lfd, eigenkapitalrendite bzw. bei Eigennutzung
+    jaehrliche_kosten, nve, tilgung_pa; bewirtschaftung_pa ist der Cashflow
+    vor Kapitaldienst und Steuern (für mehrjährige Rechnungen).
+    """
+    aenderungen = aenderungen or {}
+    w = lambda key, standard=0.0: _wert(inputs, aenderungen, key, standard)
+
+    kaufpreis, garage, invest_bedarf = w('kaufpreis'), w('garage_stellplatz_kosten'), w('invest_bedarf')
+    nk_prozent = sum(inputs.get('nebenkosten_prozente', {}).values()) * w('nebenkosten_faktor', 1.0)
+    nebenkosten_summe = (kaufpreis + garage) * nk_prozent / 100
+    gesamtinvestition = kaufpreis + garage + invest_bedarf + nebenkosten_summe
+    eigenkapital = w('eigenkapital')
+    darlehen_summe = gesamtinvestition - eigenkapital
+    zins = w('zins1_prozent')
+
+    modus = inputs.get('modus_d1', 'tilgungssatz')
+    optional = lambda key: None if inputs.get(key) is None and key not in aenderungen else w(key)
+    tilgung = dict(tilgung_p=optional('tilgung1_prozent'), tilgung_euro_mtl=optional('tilgung1_euro_mtl'),
+                   laufzeit_jahre=optional('laufzeit1_jahre'))
+    rate_mtl = monatsrate(darlehen_summe, zins, modus, **tilgung)
+
+    kaltmiete_jahr = w('kaltmiete_monatlich') * 12
+    umlagefaehige_jahr = w('umlagefaehige_kosten_monatlich') * 12
+    nicht_umlagefaehige_j = w('nicht_umlagefaehige_kosten_pa')
+    zinsen_jahr = darlehen_summe * zins / 100
+    darlehen_rueck_jahr = rate_mtl * 12
+
+    weitere = (inputs.get('tranchen') or [])[1:]
+    if inputs.get('tranchen'):
+        if 'tranche_summen' in aenderungen:
+            # Varianten der Aufteilung: Zins und Rate je Tranche wachsen linear mit der Summe
+            summen = np.asarray(aenderungen['tranche_summen'], dtype=np.float64)
+            je_euro = immo_finanzierung.berechne_tranchen([{**t, 'summe': 1.0} for t in weitere], monate=12)
+            haupt_summe = darlehen_summe - summen.sum(axis=-1)
+            weitere_zinsen = summen @ je_euro['zinsen'].sum(axis=1)
+            weitere_rate = summen @ je_euro['rate'].sum(axis=1)
+        else:
+            haupt_summe = darlehen_summe - sum(t['summe'] for t in weitere)
+            fest = immo_finanzierung.jahreswerte(immo_finanzierung.berechne_tranchen(weitere, monate=12), jahre=1) \
+                if weitere else {'zinsen': [0.0], 'rate': [0.0]}
+            weitere_zinsen, weitere_rate = fest['zinsen'][0], fest['rate'][0]
+        zinsen_jahr, darlehen_rueck_jahr = _jahr1_annuitaet(
+            haupt_summe, zins, monatsrate(haupt_summe, zins, modus, **tilgung))
+        zinsen_jahr = zinsen_jahr + weitere_zinsen
+        darlehen_rueck_jahr = darlehen_rueck_jahr + weitere_rate
+
+    afa_j1, afa_lfd = 0.0, 0.0
+    for k in immo_afa.komponenten(inputs, w):
+        verlauf = immo_afa.afa_verlauf(**{p: v for p, v in k.items() if p != 'name'}, jahre=2)['afa']
+        afa_j1, afa_lfd = afa_j1 + verlauf[..., 0], afa_lfd + verlauf[..., 1]
+
+    mietausfall_pa = kaltmiete_jahr * w('mietausfallwagnis_prozent') / 100
+    wohnflaeche = w('wohnflaeche_qm')
+    instandhaltung_pa = wohnflaeche * w('instandhaltung_euro_qm') * 12
+    co2_pa = _co2_vermieter(inputs.get('heizungstyp', 'Gas'), inputs.get('energieeffizienz', 'B'),
+                            wohnflaeche, w('jahresverbrauch_kwh'))
+    verfuegbar_mtl = w('verfuegbares_einkommen_mtl')
+
+    werte = {
+        'gesamtinvestition': gesamtinvestition, 'nebenkosten_summe': nebenkosten_summe,
+        'darlehen_summe': darlehen_summe, 'monatsrate': rate_mtl,
+        'zinsen_jahr': zinsen_jahr, 'darlehen_rueck_jahr': darlehen_rueck_jahr,
+    }
+    if inputs.get('nutzungsart') == 'Vermietung':
+        steuersatz = w('steuersatz')
+        stg_lfd = kaltmiete_jahr - nicht_umlagefaehige_j - zinsen_jahr - afa_lfd - mietausfall_pa - co2_pa
+        stg_j1 = stg_lfd + afa_lfd - afa_j1 - nebenkosten_summe
+        cf_vor = (kaltmiete_jahr + umlagefaehige_jahr - nicht_umlagefaehige_j - darlehen_rueck_jahr
+                  - mietausfall_pa - instandhaltung_pa - co2_pa)
+        cf_nach_j1 = cf_vor - stg_j1 * steuersatz / 100
+        cf_nach_lfd = cf_vor - stg_lfd * steuersatz / 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            brutto = np.where(gesamtinvestition > 0, kaltmiete_jahr / gesamtinvestition * 100, 0.0)
+            ek_rendite = np.where(eigenkapital > 0, cf_nach_lfd / eigenkapital * 100, 0.0)
+        werte.update({
+            'einnahmen_pa': kaltmiete_jahr, 'werbungskosten_pa': nicht_umlagefaehige_j + mietausfall_pa + co2_pa,
+            'umlagefaehige_pa': umlagefaehige_jahr, 'nicht_umlagefaehige_pa': nicht_umlagefaehige_j,
+            'bewirtschaftung_pa': cf_vor + darlehen_rueck_jahr,
+            'afa_j1': afa_j1, 'afa_lfd': afa_lfd, 'mietausfall_pa': mietausfall_pa, 'instandhaltung_pa': instandhaltung_pa,
+            'co2_pa': co2_pa, 'steuerlicher_gewinn_j1': stg_j1, 'steuerlicher_gewinn_lfd': stg_lfd,
+            'cf_vor': cf_vor, 'cf_nach_j1': cf_nach_j1, 'cf_nach_lfd': cf_nach_lfd,
+            'verfuegbar_mtl': verfuegbar_mtl, 'nve_j1': verfuegbar_mtl + cf_nach_j1 / 12, 'nve_lfd': verfuegbar_mtl + cf_nach_lfd / 12,
+            'bruttomietrendite': brutto, 'eigenkapitalrendite': ek_rendite,
+        })
+    else:
+        instand_eigen_pa, co2_eigen_pa = w('instand_eigen_pa'), w('co2_eigen_pa')
+        jaehrliche_kosten = darlehen_rueck_jahr + nicht_umlagefaehige_j + instand_eigen_pa + co2_eigen_pa
+        werte.update({
+            'bewirtschaftung_pa': -(nicht_umlagefaehige_j + instand_eigen_pa + co2_eigen_pa),
+            'nicht_umlagefaehige_pa': nicht_umlagefaehige_j, 'instand_eigen_pa': instand_eigen_pa,
+            'co2_eigen_pa': co2_eigen_pa, 'verfuegbar_mtl': verfuegbar_mtl,
+            'jaehrliche_kosten': jaehrliche_kosten, 'nve': verfuegbar_mtl - jaehrliche_kosten / 12,
+            'tilgung_pa': darlehen_rueck_jahr - zinsen_jahr,
+            'reine_wohnkosten_pa': nicht_umlagefaehige_j + instand_eigen_pa + co2_eigen_pa + zinsen_jahr,
+        })
+    form = np.broadcast_shapes(*(np.shape(v)[:-1] if k == 'tranche_summen' else np.shape(v)
+                                 for k, v in aenderungen.items())) if aenderungen else ()
+    return {k: np.broadcast_to(v, form).astype(np.float64) for k, v in werte.items()}
+
+
+def tranchen(inputs, werte):
+    """
+    Tranchen für mehrjährige Rechnungen wie auf der Seite; ohne weitere
+    Tranchen nur das Hauptdarlehen mit der Rate aus werte (berechne_varianten
+    ohne Änderungen).
+    """
+    if inputs.get('tranchen'):
+        return inputs['tranchen']
+    return [{'name': "Hauptdarlehen", 'typ': 'annuitaet', 'summe': float(werte['darlehen_summe']),
+             'zins_p': inputs.get('zins1_prozent', 0) or 0.0, 'monatsrate': float(werte['monatsrate'])}]
+
+
+def detailrechnung(inputs):
+    """
+    Ergebnistabelle eines Szenarios (Jahr 1 und laufende Jahre) als ein
+    Aufruf von berechne_varianten ohne Änderungen.
+
+    Ergebnis: {'display_table': [{'kennzahl', 'val1', 'val2'}, …],
+    'finanzkennzahlen': {…}} und bei Vermietung zusätzlich 'steuer' (Grundlage
+    der steuerlichen Jahreszeilen).
+    """
+    w = {k: float(v) for k, v in berechne_varianten(inputs).items()}
+    zeile = lambda kennzahl, val1, val2=None: {'kennzahl': kennzahl, 'val1': val1,
+                                                'val2': val1 if val2 is None else val2}
+    kapitaldienst, zinsen = w['darlehen_rueck_jahr'], w['zinsen_jahr']
+
+    if inputs.get('nutzungsart') != 'Vermietung':
+        kosten = w['jaehrliche_kosten']
+        display_table = [
+            zeile('Hausgeld / Betriebskosten p.a.',         -w['nicht_umlagefaehige_pa']),
+            zeile('- Private Instandhaltungsrücklage p.a.', -w['instand_eigen_pa']),
+            zeile('- CO2-Kosten (Eigennutzer) p.a.',        -w['co2_eigen_pa']),
+            zeile('Rückzahlung Darlehen p.a.',              -kapitaldienst),
+            zeile('- Zinsen p.a.',                          zinsen),
+            zeile('- Tilgung p.a. (Vermögensaufbau)',       w['tilgung_pa']),
+            zeile('Jährliche Gesamtkosten (inkl. Tilgung)', -kosten),
+            zeile('Ihr monatl. Einkommen (vorher)',         w['verfuegbar_mtl']),
+            zeile('- Mtl. Kosten Immobilie',                -kosten / 12),
+            zeile('= Neues verfügbares Einkommen',          w['nve']),
+        ]
+        # Eigenkapitalaufbau durch Tilgung
+        finanzkennzahlen = {'tilgung_pa': w['tilgung_pa'], 'zinsen_pa': zinsen,
+                            'reine_wohnkosten_pa': w['reine_wohnkosten_pa']}
+        return {'display_table': display_table, 'finanzkennzahlen': finanzkennzahlen}
+
+    # Verlust → positive Steuerersparnis | Gewinn → negative Steuerlast
+    steuersatz = inputs.get('steuersatz', 0) or 0
+    stg_j1, stg_lfd = w['steuerlicher_gewinn_j1'], w['steuerlicher_gewinn_lfd']
+    steuer_j1, steuer_lfd = -(stg_j1 * steuersatz / 100), -(stg_lfd * steuersatz / 100)
+    cf_vor, cf_nach_j1, cf_nach_lfd = w['cf_vor'], w['cf_nach_j1'], w['cf_nach_lfd']
+    gesamt_kost = -(w['nicht_umlagefaehige_pa'] + kapitaldienst + w['mietausfall_pa']
+                    + w['instandhaltung_pa'] + w['co2_pa'])
+    display_table = [
+        zeile('Einnahmen p.a. (Kaltmiete)',             w['einnahmen_pa']),
+        zeile('Umlagefähige Kosten p.a.',               w['umlagefaehige_pa']),
+        zeile('Nicht umlagef. Kosten p.a.',             -w['nicht_umlagefaehige_pa']),
+        zeile('- Mietausfallwagnis p.a.',               -w['mietausfall_pa']),
+        zeile('- Priv. Instandhaltungsrücklage p.a.',   -w['instandhaltung_pa']),
+        zeile('- CO2-Steuer Vermieteranteil p.a.',      -w['co2_pa']),
+        zeile('Rückzahlung Darlehen p.a.',              -kapitaldienst),
+        zeile('- Zinsen p.a.',                          zinsen),
+        zeile('Jährliche Gesamtkosten',                 gesamt_kost),
+        zeile('= Cashflow vor Steuern p.a.',            cf_vor),
+        zeile('- AfA p.a.',                             -w['afa_j1'], -w['afa_lfd']),
+        zeile('- Absetzbare Kaufnebenkosten (Jahr 1)',  -w['nebenkosten_summe'], 0),
+        zeile('= Steuerlicher Gewinn/Verlust p.a.',     stg_j1, stg_lfd),
+        zeile('+ Steuerersparnis / -last p.a.',         steuer_j1, steuer_lfd),
+        zeile('= Effektiver Cashflow n. St. p.a.',      cf_nach_j1, cf_nach_lfd),
+        zeile('Ihr monatl. Einkommen (vorher)',         w['verfuegbar_mtl']),
+        zeile('+/- Mtl. Cashflow Immobilie',            cf_nach_j1 / 12, cf_nach_lfd / 12),
+        zeile('= Neues verfügbares Einkommen',          w['nve_j1'], w['nve_lfd']),
+    ]
+    return {
+        'display_table': display_table,
+        'finanzkennzahlen': {'Bruttomietrendite': w['bruttomietrendite'],
+                             'Eigenkapitalrendite': w['eigenkapitalrendite']},
+        'steuer': {'einnahmen_pa': w['einnahmen_pa'], 'werbungskosten_pa': w['werbungskosten_pa'],
+                   'einmalig_j1': w['nebenkosten_summe']},
+    }
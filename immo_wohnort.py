@@ -0,0 +1,215 @@
+# immo_wohnort.py
+
+import argparse
+import csv
+import mmap
+import os
+import re
+import struct
+import threading
+
+# Mitgeliefertes Ortsverzeichnis (wohnorte.csv → wohnorte.idx) mit reduziertem
+# Umfang: die Städte ab 100.000 Einwohnern, die Landkreise und einige Gemeinden
+# um Nürnberg sowie Nürnberger Stadtteile, keine vollständige Gemeindeliste.
+# Orte außerhalb davon werden nur bereinigt übernommen. Für alle Gemeinden
+# wohnorte.csv durch einen Export des Gemeindeverzeichnisses ersetzen und den
+# Index neu bauen: python immo_wohnort.py wohnorte.csv wohnorte.idx
+_ORDNER = os.path.dirname(os.path.abspath(__file__))
+QUELL_DATEI = os.path.join(_ORDNER, 'wohnorte.csv')
+INDEX_DATEI = os.path.join(_ORDNER, 'wohnorte.idx')
+VERZEICHNIS_UMFANG = "Städte ab 100.000 Einwohnern, Landkreise und Stadtteile rund um Nürnberg"
+
+# Dateiformat: Kopf | (n+1) Offsets (uint32, little endian) | Datensätze
+# Datensatz: schluessel \0 name \0 typ \0 land  (UTF-8, nach schluessel sortiert)
+_MAGIC = b'WOI1'
+_KOPF = struct.Struct('<4sI')
+_OFFSET = struct.Struct('<I')
+
+_UMLAUTE = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+_NICHT_ALNUM = re.compile(r'[^0-9a-z]+')
+
+_lock = threading.Lock()
+_index = None
+
+
+def wohnort_schluessel(name):
+    """
+    Suchschlüssel eines Ortsnamens: klein, Umlaute ausgeschrieben, Satzzeichen
+    und Bindestriche als Leerzeichen. 'Nürnberg-Südstadt' → 'nuernberg suedstadt'.
+    """
+    return _NICHT_ALNUM.sub(' ', str(name).casefold().translate(_UMLAUTE)).strip()
+
+
+def bereinige_wohnort(name):
+    """Entfernt doppelte Leerzeichen aus einer Freitext-Eingabe."""
+    return " ".join(str(name).split())
+
+
+def sicherer_dateiname(text):
+    """Macht einen Wohnort dateinamentauglich: 'Halle (Saale)' → 'Halle_Saale'."""
+    return re.sub(r'[^\w-]+', '_', bereinige_wohnort(text)).strip('_') or 'Objekt'
+
+# ═════════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═════════════════════════════════════════════════════════════════════════════
+class WohnortIndex:
+    """
+    Sortiertes Array von Ortsnamen mit binärer Suche direkt auf einer
+    speichergemappten Datei. Beim Öffnen wird nur der Kopf gelesen; das
+    Betriebssystem lädt die Seiten erst, wenn eine Suche sie berührt.
+    """
+
+    def __init__(self, pfad=INDEX_DATEI):
+        with open(pfad, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.anzahl = _KOPF.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Keine Wohnort-Indexdatei: {pfad}")
+        self._offsets = _KOPF.size
+        self._daten = self._offsets + (self.anzahl + 1) * _OFFSET.size
+
+    def __len__(self):
+        return self.anzahl
+
+    def _bereich(self, i):
+        start = _OFFSET.unpack_from(self._mm, self._offsets + i * _OFFSET.size)[0]
+        ende = _OFFSET.unpack_from(self._mm, self._offsets + (i + 1) * _OFFSET.size)[0]
+        return self._daten + start, self._daten + ende
+
+    def _schluessel(self, i):
+        start, ende = self._bereich(i)
+        return self._mm[start:self._mm.find(b'\0', start, ende)]
+
+    def _eintrag(self, i):
+        start, ende = self._bereich(i)
+        _, name, typ, land = self._mm[start:ende].decode('utf-8').split('\0')
+        return {'name': name, 'typ': typ, 'land': land}
+
+    def _untere_grenze(self, schluessel):
+        lo, hi = 0, self.anzahl
+        while lo < hi:
+            mitte = (lo + hi) // 2
+            if self._schluessel(mitte) < schluessel:
+                lo = mitte + 1
+            else:
+                hi = mitte
+        return lo
+
+    def vervollstaendige(self, eingabe, limit=10):
+        """Alle Orte, deren Schlüssel mit der Eingabe beginnt (je Name nur einmal)."""
+        praefix = wohnort_schluessel(eingabe).encode('utf-8')
+        if not praefix:
+            return []
+        treffer, gesehen = [], set()
+        i = self._untere_grenze(praefix)
+        while i < self.anzahl and len(treffer) < limit and self._schluessel(i).startswith(praefix):
+            eintrag = self._eintrag(i)
+            if eintrag['name'] not in gesehen:
+                gesehen.add(eintrag['name'])
+                treffer.append(eintrag)
+            i += 1
+        return treffer
+
+    def suche(self, name):
+        """
+        Eintrag, dessen voller Name exakt auf den Schlüssel passt, oder None.
+        Stadtteile ohne Stadtnamen ('Altstadt') und mehrdeutige Namen
+        (gleicher Schlüssel, verschiedene Schreibweisen) ergeben None.
+        """
+        schluessel = wohnort_schluessel(name).encode('utf-8')
+        if not schluessel:
+            return None
+        treffer = {}
+        i = self._untere_grenze(schluessel)
+        while i < self.anzahl and self._schluessel(i) == schluessel:
+            eintrag = self._eintrag(i)
+            if wohnort_schluessel(eintrag['name']).encode('utf-8') == schluessel:
+                treffer.setdefault(eintrag['name'], eintrag)
+            i += 1
+        return next(iter(treffer.values())) if len(treffer) == 1 else None
+
+
+def wohnort_index():
+    """Öffnet den mitgelieferten Index beim ersten Aufruf (prozessweit geteilt)."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = WohnortIndex()
+    return _index
+
+
+def kanonischer_wohnort(name):
+    """
+    Offizielle Schreibweise eines Ortes ('nuernberg suedstadt' → 'Nürnberg-Südstadt').
+    Unbekannte Orte werden nur bereinigt zurückgegeben.
+    """
+    eintrag = wohnort_index_treffer(name)
+    return eintrag['name'] if eintrag else bereinige_wohnort(name)
+
+
+def wohnort_index_treffer(name):
+    """Eintrag (name, typ, land) für einen exakt bekannten Ort oder None."""
+    try:
+        return wohnort_index().suche(name)
+    except (OSError, ValueError):
+        return None
+
+
+def vorschlaege(eingabe, limit=8):
+    """Präfix-Vervollständigung; leer, falls kein Index vorhanden ist."""
+    try:
+        return wohnort_index().vervollstaendige(eingabe, limit)
+    except (OSError, ValueError):
+        return []
+
+# ═════════════════════════════════════════════════════════════════════════════
+# INDEX ERZEUGEN
+# ═════════════════════════════════════════════════════════════════════════════
+def _schluessel_fuer(name, typ):
+    """
+    Suchschlüssel eines Eintrags. Stadtteile sind für die Vorschläge zusätzlich
+    ohne Stadtnamen auffindbar; suche() übernimmt nur den vollen Namen.
+    """
+    schluessel = {wohnort_schluessel(name)}
+    if typ == 'Stadtteil' and '-' in name:
+        schluessel.add(wohnort_schluessel(name.split('-', 1)[1]))
+    return schluessel
+
+
+def lese_verzeichnis(quelle=QUELL_DATEI):
+    """(name, typ, land)-Tupel aus einer CSV mit den Spalten name;typ;land."""
+    with open(quelle, newline='', encoding='utf-8') as f:
+        return [(z['name'], z['typ'], z['land']) for z in csv.DictReader(f, delimiter=';')]
+
+
+def baue_index(eintraege, ziel=INDEX_DATEI):
+    """
+    Schreibt eine Indexdatei aus (name, typ, land)-Tupeln, z.B. aus dem
+    Gemeindeverzeichnis (GV-ISys) des Statistischen Bundesamts.
+    """
+    datensaetze = sorted(
+        (schluessel.encode('utf-8'), '\0'.join([name, typ, land]).encode('utf-8'))
+        for name, typ, land in eintraege
+        for schluessel in _schluessel_fuer(name, typ)
+    )
+    offsets, daten, pos = [], bytearray(), 0
+    for schluessel, inhalt in datensaetze:
+        offsets.append(pos)
+        daten += schluessel + b'\0' + inhalt
+        pos = len(daten)
+    offsets.append(pos)
+    with open(ziel, 'wb') as f:
+        f.write(_KOPF.pack(_MAGIC, len(datensaetze)))
+        f.write(b''.join(_OFFSET.pack(o) for o in offsets))
+        f.write(daten)
+    return len(datensaetze)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Baut den Wohnort-Index (wohnorte.idx) aus einer CSV-Liste.")
+    parser.add_argument('quelle', nargs='?', default=QUELL_DATEI,
+                        help="CSV mit den Spalten name;typ;land, z.B. aus dem Gemeindeverzeichnis (Standard: wohnorte.csv)")
+    parser.add_argument('ziel', nargs='?', default=INDEX_DATEI, help="Indexdatei (Standard: wohnorte.idx)")
+    args = parser.parse_args()
+    print(f"{baue_index(lese_verzeichnis(args.quelle), args.ziel)} Einträge nach {args.ziel} geschrieben.")
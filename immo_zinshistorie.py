@@ -0,0 +1,195 @@
+# immo_zinshistorie.py
+
+import csv
+import re
+
+import numpy as np
+
+# CSV: Spalte 'monat' (JJJJ-MM oder MM.JJJJ) und eine oder mehrere Zinsspalten in % p.a.:
+# 'zins' oder je Zinsbindung 'zins_5', 'zins_10', … (z.B. aus den Bundesbank-Reihen
+# "Effektivzinssätze Wohnungsbaukredite an private Haushalte").
+MODI = ('relativ', 'absolut')
+
+_MONAT = re.compile(r'^\s*(?:(\d{4})-(\d{1,2})|(\d{1,2})\.(\d{4}))')
+_ZINSSPALTE = re.compile(r'^zins(?:_(\d+))?$')
+
+
+class Zinsreihe:
+    """Monatliche Bauzinsen, optional getrennt nach Zinsbindung (in Jahren)."""
+
+    def __init__(self, monate, spalten):
+        reihenfolge = np.argsort(monate, kind='stable')
+        self.monate = np.asarray(monate, dtype='datetime64[M]')[reihenfolge]
+        self.spalten = {j: np.asarray(z, dtype=np.float64)[reihenfolge] for j, z in spalten.items()}
+        # Der Backtest rechnet mit Positionen als Monatsabständen: jeder Monat genau einmal
+        abstand = np.diff(self.monate).astype(np.int64)
+        if (abstand == 0).any():
+            raise ValueError(f"Monat doppelt in der Zinsreihe: {self.monate[1:][abstand == 0][0]}")
+        if (abstand > 1).any():
+            i = int(np.argmax(abstand > 1))
+            raise ValueError(f"Lücke in der Zinsreihe zwischen {self.monate[i]} und {self.monate[i + 1]} "
+                             "(fehlende Zinswerte bitte als leere Zeile des Monats angeben).")
+
+    def __len__(self):
+        return len(self.monate)
+
+    @classmethod
+    def aus_csv(cls, pfad):
+        with open(pfad, newline='', encoding='utf-8-sig') as f:
+            kopf = f.readline()
+            trenner = ';' if kopf.count(';') > kopf.count(',') else ','
+            namen = [s.strip().lower() for s in next(csv.reader([kopf], delimiter=trenner))]
+            if 'monat' not in namen:
+                raise ValueError("Zins-CSV ohne Spalte 'monat'.")
+            zinsspalten = {i: _ZINSSPALTE.match(n) for i, n in enumerate(namen) if _ZINSSPALTE.match(n)}
+            if not zinsspalten:
+                raise ValueError("Zins-CSV ohne Zinsspalte ('zins' oder 'zins_<Jahre>').")
+            i_monat = namen.index('monat')
+            monate, werte = [], {i: [] for i in zinsspalten}
+            for zeile in csv.reader(f, delimiter=trenner):
+                if not zeile or not zeile[i_monat].strip():
+                    continue
+                treffer = _MONAT.match(zeile[i_monat])
+                if not treffer:
+                    raise ValueError(f"Unlesbarer Monat in der Zins-CSV: '{zeile[i_monat]}'")
+                jahr, monat = (treffer[1], treffer[2]) if treffer[1] else (treffer[4], treffer[3])
+                monate.append(f"{jahr}-{int(monat):02d}")
+                for i in zinsspalten:
+                    text = zeile[i].strip().replace(',', '.') if i < len(zeile) else ''
+                    werte[i].append(float(text) if text else np.nan)
+        spalten = {int(m[1]) if m[1] else 0: werte[i] for i, m in zinsspalten.items()}
+        return cls(np.array(monate, dtype='datetime64[M]'), spalten)
+
+    def zinsen(self, zinsbindung_jahre=None):
+        """
+        Zinsreihe für eine Zinsbindung: die Spalte mit der nächstliegenden
+        Bindung, sonst die allgemeine Spalte 'zins'. Lücken werden mit dem
+        letzten bekannten Wert gefüllt.
+        """
+        bindungen = [j for j in self.spalten if j]
+        if zinsbindung_jahre and bindungen:
+            reihe = self.spalten[min(bindungen, key=lambda j: abs(j - zinsbindung_jahre))]
+        else:
+            reihe = self.spalten.get(0, self.spalten[min(self.spalten)])
+        gueltig = ~np.isnan(reihe)
+        if not gueltig.any():
+            raise ValueError("Die Zinsreihe enthält keine Werte.")
+        letzter = np.maximum.accumulate(np.where(gueltig, np.arange(len(reihe)), 0))
+        gefuellt = reihe[letzter]
+        return np.where(np.isnan(gefuellt), reihe[gueltig][0], gefuellt)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# BACKTEST
+# ═════════════════════════════════════════════════════════════════════════════
+def _periode(restschuld, zins_p, rate, monate):
+    """
+    Eine Zinsbindungsperiode für alle Startmonate zugleich (geschlossene
+    Annuitätenformel). Liefert Restschuld am Ende, gezahlte Zinsen und den
+    Monat der vollständigen Tilgung innerhalb der Periode (sonst NaN).
+    """
+    r = zins_p / 1200
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        q = (1 + r) ** monate
+        ende = np.where(r > 0, restschuld * q - rate * (q - 1) / np.where(r > 0, r, 1), restschuld - rate * monate)
+        # Monate bis zur vollständigen Tilgung (nur relevant, falls innerhalb der Periode)
+        n_tilgung = np.where(r > 0, -np.log1p(-restschuld * r / rate) / np.log1p(r), restschuld / rate)
+    getilgt = (ende <= 0) & (restschuld > 0)
+    m = np.floor(np.nan_to_num(n_tilgung, nan=monate, posinf=monate))
+    m = np.clip(np.where(getilgt, m, monate), 0, monate)
+    with np.errstate(over='ignore', invalid='ignore'):
+        qm = (1 + r) ** m
+        vor_letzter = np.where(r > 0, restschuld * qm - rate * (qm - 1) / np.where(r > 0, r, 1), restschuld - rate * m)
+    gezahlt = np.where(getilgt, rate * m + np.maximum(vor_letzter, 0) * (1 + r), rate * monate)
+    gezahlt = np.where(restschuld > 0, gezahlt, 0.0)
+    ende = np.where(getilgt | (restschuld <= 0), 0.0, ende)
+    zinsen = gezahlt - (restschuld - ende)
+    tilgungsmonat = np.where(getilgt, m + (vor_letzter > 0), np.nan)
+    return ende, zinsen, gezahlt, tilgungsmonat
+
+
+def backtest(reihe, summe, zins_p, tilgung_p, zinsbindung_jahre, horizont_jahre,
+             modus='relativ', aufschlag_p=0.0, anschluss_tilgung_p=None):
+    """
+    Spielt eine Finanzierung für jeden möglichen Startmonat der Zinsreihe durch.
+
+    - Die Monatsrate ergibt sich aus Zins + Anfangstilgung; bei jedem Ende der
+      Zinsbindung wird die Restschuld zum dann geltenden Zins mit derselben
+      (oder anschluss_tilgung_p) Tilgung neu finanziert
+    - modus='relativ': Start mit zins_p, danach folgen die Zinsen den
+      historischen Veränderungen seit dem Startmonat (Zins heute + Δ Historie)
+    - modus='absolut': es gelten die historischen Zinsniveaus (+ aufschlag_p)
+    - Alle Startmonate werden gemeinsam als Arrays gerechnet; Schleifen gibt
+      es nur über die Zinsbindungsperioden
+
+    Ergebnis: Arrays je Startmonat (start, zinsen_gesamt, restschuld_ende, …)
+    """
+    if modus not in MODI:
+        raise ValueError(f"Unbekannter Backtest-Modus: '{modus}' (erlaubt: {', '.join(MODI)})")
+    zinsen_hist = reihe.zinsen(zinsbindung_jahre) + aufschlag_p
+    bindung = max(int(round(zinsbindung_jahre * 12)), 1)
+    horizont = int(round(horizont_jahre * 12))
+    anzahl = len(zinsen_hist) - horizont + 1
+    if anzahl <= 0:
+        raise ValueError(f"Die Zinsreihe ist kürzer als der Betrachtungszeitraum von {horizont_jahre} Jahren.")
+    anschluss_tilgung_p = tilgung_p if anschluss_tilgung_p is None else anschluss_tilgung_p
+
+    start = np.arange(anzahl)
+    restschuld = np.full(anzahl, float(summe))
+    zinsen_gesamt = np.zeros(anzahl)
+    gezahlt_gesamt = np.zeros(anzahl)
+    rate_max = np.zeros(anzahl)
+    schuldenfrei = np.full(anzahl, np.nan)
+    restschuld_bindung = None
+    zinssaetze = []
+    for beginn in range(0, horizont, bindung):
+        if modus == 'relativ':
+            zins = np.maximum(zins_p + zinsen_hist[start + beginn] - zinsen_hist[start], 0.0)
+        else:
+            zins = zinsen_hist[start + beginn]
+        zinssaetze.append(zins)
+        tilgung = tilgung_p if beginn == 0 else anschluss_tilgung_p
+        rate = restschuld * (zins + tilgung) / 1200
+        monate = min(bindung, horizont - beginn)
+        aktiv = restschuld > 0
+        ende, zinsen, gezahlt, tilgungsmonat = _periode(restschuld, zins, np.where(aktiv, rate, 1.0), monate)
+        rate_max = np.maximum(rate_max, np.where(aktiv, rate, 0.0))
+        zinsen_gesamt += np.where(aktiv, zinsen, 0.0)
+        gezahlt_gesamt += np.where(aktiv, gezahlt, 0.0)
+        schuldenfrei = np.where(np.isnan(schuldenfrei) & ~np.isnan(tilgungsmonat), beginn + tilgungsmonat, schuldenfrei)
+        restschuld = np.where(aktiv, ende, 0.0)
+        if restschuld_bindung is None:
+            restschuld_bindung = restschuld.copy()
+
+    return {
+        'start': reihe.monate[:anzahl],
+        'zins_start': zinssaetze[0],
+        'zins_anschluss_max': np.max(zinssaetze[1:], axis=0) if len(zinssaetze) > 1 else zinssaetze[0],
+        'monatsrate_max': rate_max,
+        'zinsen_gesamt': zinsen_gesamt,
+        'gezahlt_gesamt': gezahlt_gesamt,
+        'restschuld_bindung': restschuld_bindung,
+        'restschuld_ende': restschuld,
+        'schuldenfrei_monate': schuldenfrei,
+    }
+
+
+def vergleiche_zinsbindungen(reihe, summe, zins_p, tilgung_p, horizont_jahre,
+                             zinsbindungen=(5, 10, 15, 20), modus='relativ', zins_aufschlaege=None):
+    """
+    Backtest mehrerer Zinsbindungen über denselben Zeitraum. zins_aufschlaege
+    (Dict Bindung → Prozentpunkte) bildet ab, dass längere Bindungen teurer sind.
+    Je Bindung: Median und 10/90-%-Quantile von Zinskosten und Restschuld.
+    """
+    zeilen = []
+    for bindung in zinsbindungen:
+        aufschlag = (zins_aufschlaege or {}).get(bindung, 0.0)
+        ergebnis = backtest(reihe, summe, zins_p + aufschlag, tilgung_p, bindung, horizont_jahre, modus)
+        zinsen, rest = ergebnis['zinsen_gesamt'], ergebnis['restschuld_ende']
+        zeilen.append({
+            'zinsbindung': bindung, 'fenster': len(zinsen),
+            'zinsen_median': float(np.median(zinsen)),
+            'zinsen_p10': float(np.percentile(zinsen, 10)), 'zinsen_p90': float(np.percentile(zinsen, 90)),
+            'restschuld_median': float(np.median(rest)), 'restschuld_p90': float(np.percentile(rest, 90)),
+            'rate_max_p90': float(np.percentile(ergebnis['monatsrate_max'], 90)),
+        })
+    return zeilen
@@ -0,0 +1,111 @@
+# pdf_fonts.py
+
+import copy
+import io
+import os
+import threading
+
+SCHRIFT_VERZEICHNIS = os.path.dirname(os.path.abspath(__file__))
+SCHRIFT_FAMILIE = "DejaVu"
+SCHRIFT_DATEIEN = {
+    '': 'DejaVuSans.ttf',
+    'B': 'DejaVuSans-Bold.ttf',
+}
+# Namen, unter denen die Schriften bei reportlab registriert werden
+REPORTLAB_NORMAL = "DejaVuSans"
+REPORTLAB_BOLD = "DejaVuSans-Bold"
+
+_lock = threading.Lock()
+_schrift_bytes = {}
+_fpdf_vorlagen = {}
+_reportlab_registriert = False
+
+
+def schrift_pfad(stil=''):
+    """Absoluter Pfad der mitgelieferten DejaVu-TTF für den Stil ('' oder 'B')."""
+    return os.path.join(SCHRIFT_VERZEICHNIS, SCHRIFT_DATEIEN[stil])
+
+
+def _lade_schrift_bytes(stil):
+    """Liest die TTF-Datei genau einmal pro Prozess von der Platte."""
+    daten = _schrift_bytes.get(stil)
+    if daten is None:
+        with open(schrift_pfad(stil), 'rb') as f:
+            daten = f.read()
+        _schrift_bytes[stil] = daten
+    return daten
+
+
+def _fpdf_vorlage(stil):
+    """
+    Parst die Schrift einmal mit fpdf2 und hält das TTFFont-Objekt als Vorlage.
+    Die teure Arbeit (cmap, Zeichenbreiten, Glyph-IDs, Deskriptor) steckt in der
+    Vorlage und wird für jedes weitere Dokument nur noch flach kopiert.
+    """
+    vorlage = _fpdf_vorlagen.get(stil)
+    if vorlage is None:
+        from fpdf import FPDF
+        parser = FPDF()
+        parser.add_font(SCHRIFT_FAMILIE, stil, schrift_pfad(stil))
+        vorlage = parser.fonts[f"{SCHRIFT_FAMILIE.lower()}{stil}"]
+        _fpdf_vorlagen[stil] = vorlage
+    return vorlage
+
+
+def registriere_fpdf_schriften(pdf):
+    """
+    Stellt die DejaVu-Familie (normal + fett) in einem FPDF-Dokument bereit.
+
+    - Metriken werden aus der prozessweiten Vorlage übernommen (kein erneutes Parsen)
+    - Jedes Dokument erhält ein eigenes, lazy geöffnetes fontTools-Objekt aus dem
+      Byte-Cache, weil fpdf2 beim Subsetting die Schrift in-place verändert
+    - Eingebettet werden nur die tatsächlich verwendeten Glyphen (Subset)
+
+    Setzt interne Attribute von fpdf2 (SubsetMap, _hbfont, …); deshalb ist
+    fpdf2 in requirements.txt exakt festgelegt. tests/test_pdf_fonts.py
+    prüft, dass das Ergebnis mit FPDF.add_font übereinstimmt.
+    """
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+
+    for stil in SCHRIFT_DATEIEN:
+        fontkey = f"{SCHRIFT_FAMILIE.lower()}{stil}"
+        if fontkey in pdf.fonts:
+            continue
+        with _lock:
+            vorlage = _fpdf_vorlage(stil)
+            daten = _lade_schrift_bytes(stil)
+        font = copy.copy(vorlage)
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = ttLib.TTFont(io.BytesIO(daten), recalcTimestamp=False, lazy=True)
+        font.desc = copy.copy(vorlage.desc)
+        font.subset = SubsetMap(font)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font._hbfont = None
+        pdf.fonts[fontkey] = font
+    return SCHRIFT_FAMILIE
+
+
+def registriere_reportlab_schriften():
+    """
+    Registriert DejaVu einmal pro Prozess in der globalen reportlab-Registry.
+    reportlab bettet TrueType-Schriften grundsätzlich als Subset ein.
+    """
+    global _reportlab_registriert
+    if _reportlab_registriert:
+        return REPORTLAB_NORMAL, REPORTLAB_BOLD
+    with _lock:
+        if not _reportlab_registriert:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+            from reportlab.lib.fonts import addMapping
+            pdfmetrics.registerFont(TTFont(REPORTLAB_NORMAL, io.BytesIO(_lade_schrift_bytes(''))))
+            pdfmetrics.registerFont(TTFont(REPORTLAB_BOLD, io.BytesIO(_lade_schrift_bytes('B'))))
+            # <b>-Tags in Paragraphen auf die fette Variante abbilden
+            addMapping(REPORTLAB_NORMAL, 0, 0, REPORTLAB_NORMAL)
+            addMapping(REPORTLAB_NORMAL, 1, 0, REPORTLAB_BOLD)
+            addMapping(REPORTLAB_NORMAL, 0, 1, REPORTLAB_NORMAL)
+            addMapping(REPORTLAB_NORMAL, 1, 1, REPORTLAB_BOLD)
+            _reportlab_registriert = True
+    return REPORTLAB_NORMAL, REPORTLAB_BOLD
@@ -7,14 +7,25 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib import colors
+import pdf_fonts
 
 def fig_to_image(fig):
     buf = io.BytesIO(); fig.savefig(buf, format='png', dpi=300, bbox_inches='tight'); buf.seek(0)
     return Image(buf, width=450, height=280)
 
+def _schrift_styles():
+    # DejaVu statt Helvetica, damit Umlaute und das €-Zeichen korrekt erscheinen
+    font, font_bold = pdf_fonts.registriere_reportlab_schriften()
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        if hasattr(style, 'fontName'):
+            style.fontName = font_bold if style.fontName.endswith('-Bold') else font
+    styles.add(ParagraphStyle(name='Right', fontName=font, alignment=TA_RIGHT)); styles.add(ParagraphStyle(name='Center', fontName=font, alignment=TA_CENTER))
+    return styles, font, font_bold
+
 def create_bank_report(data, filepath):
     doc = SimpleDocTemplate(filepath, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-    styles = getSampleStyleSheet(); styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT)); styles.add(ParagraphStyle(name='Center', alignment=TA_CENTER))
+    styles, font, font_bold = _schrift_styles()
     story = []
     
     story.append(Paragraph("Finanzanalyse Immobilieninvestment", styles['h1'])); story.append(Spacer(1, 24))
@@ -29,7 +40,7 @@ def create_bank_report(data, filepath):
         ["Kaufnebenkosten:", f"{data['gesamtinvestition'] - data['inputs']['kaufpreis'] - data['inputs']['garage_stellplatz_kosten'] - data['inputs']['invest_bedarf']:,.2f} €"],
         [Paragraph("<b>Gesamtinvestition:</b>", styles['Normal']), Paragraph(f"<b>{data['gesamtinvestition']:,.2f} €</b>", styles['Right'])],
     ]
-    invest_table = Table(invest_data, colWidths=[200, 250]); invest_table.setStyle(TableStyle([('ALIGN', (1,0), (1,-1), 'RIGHT'), ('GRID', (0,0), (-1,-1), 0.5, colors.grey), ('BACKGROUND', (0, 4), (-1, 4), colors.lightgrey)])); story.append(invest_table); story.append(Spacer(1, 24))
+    invest_table = Table(invest_data, colWidths=[200, 250]); invest_table.setStyle(TableStyle([('FONTNAME', (0,0), (-1,-1), font), ('ALIGN', (1,0), (1,-1), 'RIGHT'), ('GRID', (0,0), (-1,-1), 0.5, colors.grey), ('BACKGROUND', (0, 4), (-1, 4), colors.lightgrey)])); story.append(invest_table); story.append(Spacer(1, 24))
 
     story.append(Paragraph("2. Finanzierungsstruktur", styles['h2'])); story.append(Spacer(1, 12)); story.append(fig_to_image(data['figures']['pie'])); story.append(PageBreak())
 
@@ -37,7 +48,7 @@ def create_bank_report(data, filepath):
     
     # *** HIER IST DIE VEREINFACHTE PDF-LOGIK ***
     table_data = [["Kennzahl", "Jahr 1 (€)", "Laufende Jahre (€)"]]
-    style_commands = [('BACKGROUND', (0,0), (-1,0), colors.HexColor("#4F81BD")), ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke), ('ALIGN', (1,1), (-1,-1), 'RIGHT'), ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('BOTTOMPADDING', (0,0), (-1,0), 12), ('GRID', (0,0), (-1,-1), 1, colors.black)]
+    style_commands = [('BACKGROUND', (0,0), (-1,0), colors.HexColor("#4F81BD")), ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke), ('ALIGN', (1,1), (-1,-1), 'RIGHT'), ('FONTNAME', (0,0), (-1,-1), font), ('FONTNAME', (0,0), (-1,0), font_bold), ('BOTTOMPADDING', (0,0), (-1,0), 12), ('GRID', (0,0), (-1,-1), 1, colors.black)]
     
     for i, row in enumerate(data.get('display_table', [])):
         row_idx = i + 1
@@ -48,7 +59,7 @@ def create_bank_report(data, filepath):
         elif 'separator' in row['tags']: continue # Separatoren im PDF weglassen für kompakteres Layout
         else: table_data.append([row['kennzahl'], val1, val2])
             
-        if 'bold' in row['tags']: style_commands.append(('FONTNAME', (0, row_idx), (-1, row_idx), 'Helvetica-Bold'))
+        if 'bold' in row['tags']: style_commands.append(('FONTNAME', (0, row_idx), (-1, row_idx), font_bold))
         if 'green_text' in row['tags']: style_commands.append(('TEXTCOLOR', (0, row_idx), (-1, row_idx), colors.green))
         if 'red_text' in row['tags']: style_commands.append(('TEXTCOLOR', (0, row_idx), (-1, row_idx), colors.red))
 
@@ -56,7 +67,7 @@ def create_bank_report(data, filepath):
     
     story.append(Paragraph("4. Finanzkennzahlen", styles['h2'])); story.append(Spacer(1, 12))
     kpi_data = [["Kennzahl", "Wert"]]; kpi_data.extend([[row['Kennzahl'], row['Wert']] for row in data.get('kpi_table', [])])
-    kpi_table = Table(kpi_data, colWidths=[250, 200]); kpi_table.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.HexColor("#4F81BD")), ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke), ('ALIGN', (1,1), (1,-1), 'RIGHT'), ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('GRID', (0,0), (-1,-1), 1, colors.black)])); story.append(kpi_table); story.append(Spacer(1, 24))
+    kpi_table = Table(kpi_data, colWidths=[250, 200]); kpi_table.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), colors.HexColor("#4F81BD")), ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke), ('ALIGN', (1,1), (1,-1), 'RIGHT'), ('FONTNAME', (0,0), (-1,-1), font), ('FONTNAME', (0,0), (-1,0), font_bold), ('GRID', (0,0), (-1,-1), 1, colors.black)])); story.append(kpi_table); story.append(Spacer(1, 24))
 
     story.append(Paragraph("5. Grafische Cashflow-Analyse (Monatlich)", styles['h2'])); story.append(Spacer(1, 12)); story.append(fig_to_image(data['figures']['bar']))
     doc.build(story)
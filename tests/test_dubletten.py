@@ -0,0 +1,30 @@
+# test_dubletten.py
+
+import immo_dubletten
+import immo_eingang
+import immo_objektliste
+
+VORLAGE = dict(immo_eingang.STANDARD_VORLAGE, wohnflaeche_qm=70.0, kaltmiete_monatlich=900.0,
+               nebenkosten_prozente={'grunderwerbsteuer': 6.5, 'notar': 1.5, 'grundbuch': 0.5, 'makler': 0.0})
+
+
+def objekt(**felder):
+    zeile = ';'.join(['kaufpreis', *felder]) + '\n' + ';'.join(['250000', *map(str, felder.values())]) + '\n'
+    return immo_objektliste.lese_objekte(zeile.encode('utf-8'), 'x.csv', VORLAGE)[0]
+
+
+def test_fingerabdruck_umfasst_alle_rechenrelevanten_felder():
+    """Jedes Feld, das die Rechnung verändert, verändert auch den Fingerabdruck."""
+    basis = immo_dubletten.fingerabdruck(objekt())
+    for feld, wert in [('gebaeude_anteil_prozent', 70), ('mietausfallwagnis_prozent', 4), ('instandhaltung_euro_qm', 2),
+                       ('heizungstyp', 'Heizöl'), ('energieeffizienz', 'F'), ('wohnflaeche_qm', 90),
+                       ('modernisierung_afa', 'verteilt'), ('zinsbindung', 15), ('makler', 3.57),
+                       ('baujahr_kategorie', 'vor 1925'), ('jahresverbrauch_kwh', 12000)]:
+        assert immo_dubletten.fingerabdruck(objekt(**{feld: wert})) != basis, feld
+
+
+def test_fingerabdruck_ohne_beschreibung():
+    """Name, Wohnort usw. und Schreibweisen von Zahlen ändern den Fingerabdruck nicht."""
+    basis = immo_dubletten.fingerabdruck(objekt())
+    assert immo_dubletten.fingerabdruck(objekt(name='Portal B', wohnort='Köln', stockwerk='3. OG')) == basis
+    assert immo_dubletten.fingerabdruck(dict(objekt(), kaufpreis=250000.0, tilgung1_euro_mtl=None)) == basis
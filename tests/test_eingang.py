@@ -0,0 +1,103 @@
+# test_eingang.py
+
+import csv
+import math
+
+import pytest
+
+import immo_eingang
+import immo_objektliste
+import immo_varianten
+
+VORLAGE = dict(immo_eingang.STANDARD_VORLAGE, eigenkapital=40000.0, wohnflaeche_qm=70.0, kaltmiete_monatlich=900.0,
+               nebenkosten_prozente={'grunderwerbsteuer': 6.5, 'notar': 1.5, 'grundbuch': 0.5, 'makler': 3.57})
+
+# Felder, die die Rechnung beeinflussen, aber früher im Dienst nicht ankamen
+OBJEKTLISTE = """\
+name;wohnort;nutzungsart;kaufpreis;wohnflaeche_qm;kaltmiete_monatlich;gebaeude_anteil_prozent;baujahr_kategorie;afa_methode;sonder_afa;mietausfallwagnis_prozent;instandhaltung_euro_qm;heizungstyp;energieeffizienz;invest_bedarf;modernisierung_afa;modernisierung_jahre;makler;instand_eigen_pa;co2_eigen_pa
+Altbau;Leipzig;Vermietung;250.000;72;850;70;vor 1925;;;2;1,2;Heizöl;E;15000;verteilt;3;0;;
+Altbau Anteil 90;Leipzig;Vermietung;250.000;72;850;90;vor 1925;;;2;1,2;Heizöl;E;15000;verteilt;3;0;;
+Neubau;Köln;Vermietung;480000;85;1450;80;ab 2023;degressiv;ja;3;0,5;Wärmepumpe;A+;0;gebaeude;;3,57;;
+Selbst;Bonn;Eigennutzung;390000;95;;80;1925 - 2022;;;;;Gas;C;20000;gebaeude;;;1200;300
+"""
+
+
+def lies_ergebnis(pfad):
+    with open(pfad, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def zahl(text):
+    return float(text) if text != '' else None
+
+
+def test_dienst_rechnet_wie_objektliste(tmp_path):
+    """Eine CSV ergibt im Dienst dieselben Kennzahlen und Detailzeilen wie in der Objektliste der Seite."""
+    inhalt = OBJEKTLISTE.encode('utf-8')
+    status = immo_eingang.verarbeite_datei('liste.csv', inhalt, str(tmp_path), VORLAGE)
+    assert status['fehler'] == '' and status['objekte'] == 4
+
+    # Weg der Seite: Objektliste einlesen, Kennzahlen für die Rangliste, Detailrechnung je Objekt
+    objekte = immo_objektliste.lese_objekte(inhalt, 'liste.csv', VORLAGE)
+    werte = immo_objektliste.bewerte_objekte(objekte)
+    zeilen = lies_ergebnis(tmp_path / 'liste.ergebnis.csv')
+    for i, (objekt, zeile) in enumerate(zip(objekte, zeilen)):
+        for key in immo_objektliste.KENNZAHLEN:
+            erwartet = float(werte[key][i])
+            assert zahl(zeile[key]) == (pytest.approx(erwartet) if math.isfinite(erwartet) else None), key
+        for z in immo_varianten.detailrechnung(objekt)['display_table']:
+            assert zahl(zeile[f"{z['kennzahl']}|jahr_1"]) == pytest.approx(z['val1']), z['kennzahl']
+            assert zahl(zeile[f"{z['kennzahl']}|laufende_jahre"]) == pytest.approx(z['val2']), z['kennzahl']
+
+    # Gebäudeanteil, AfA-Methode und Modernisierung wirken sich aus
+    afa = [zahl(z['- AfA p.a.|jahr_1']) for z in zeilen[:3]]
+    assert afa[0] != afa[1] and afa[2] < afa[1]
+
+
+def test_bankbericht_kennzahlen_deutsch():
+    """Die Kennzahlentabelle des Bankberichts zeigt deutsche Zahlen mit Einheit."""
+    objekt = immo_objektliste.lese_objekte(OBJEKTLISTE.encode('utf-8'), 'liste.csv', VORLAGE)[0]
+    kennzahlen = dict.fromkeys(immo_objektliste.KENNZAHLEN, None)
+    kennzahlen.update(cashflow_mtl=-1234.5, bruttomietrendite=4.08, kaufpreisfaktor=24.5, gesamtinvestition=281000.0)
+    bericht = immo_eingang._bankbericht(objekt, kennzahlen, immo_varianten.detailrechnung(objekt))
+    assert bericht['kpi_table'] == [{'Kennzahl': "Cashflow mtl.", 'Wert': "-1.234,50 €"},
+                                    {'Kennzahl': "Bruttomietrendite", 'Wert': "4,08 %"},
+                                    {'Kennzahl': "Kaufpreisfaktor", 'Wert': "24,50"},
+                                    {'Kennzahl': "Gesamtinvestition", 'Wert': "281.000,00 €"}]
+
+
+def test_dubletten_liefern_dasselbe_ergebnis(tmp_path):
+    """Mit Dublettenindex: der zweite Durchgang verwendet alle Ergebnisse wieder und schreibt dieselben Zahlen."""
+    inhalt, index = OBJEKTLISTE.encode('utf-8'), str(tmp_path / immo_eingang.DUBLETTEN)
+    erster = immo_eingang.verarbeite_datei('a.csv', inhalt, str(tmp_path), VORLAGE, dubletten=index)
+    zweiter = immo_eingang.verarbeite_datei('b.csv', inhalt, str(tmp_path), VORLAGE, dubletten=index)
+    assert erster['wiederverwendet'] == 0 and zweiter['wiederverwendet'] == 4
+    ohne = lambda zeilen: [{k: v for k, v in z.items() if k not in ('dublette', 'aenderungen')} for z in zeilen]
+    assert ohne(lies_ergebnis(tmp_path / 'a.ergebnis.csv')) == ohne(lies_ergebnis(tmp_path / 'b.ergebnis.csv'))
+
+
+def test_ungueltige_angabe_verwirft_datei(tmp_path):
+    """Wie in der Objektliste der Seite: ein ungültiges Objekt macht die ganze Datei fehlerhaft."""
+    inhalt = "name;kaufpreis;afa_methode\nA;200000;degressiv\n".encode('utf-8')
+    status = immo_eingang.verarbeite_datei('kaputt.csv', inhalt, str(tmp_path), VORLAGE)
+    assert status['objekte'] == 0 and 'Objekt 1' in status['fehler']
+    assert not (tmp_path / 'kaputt.ergebnis.csv').exists()
+
+
+def test_gleicher_inhalt_im_selben_durchgang_nur_einmal(tmp_path):
+    """Zwei gleiche Dateien im selben Schub: die zweite ist ein Duplikat, obwohl die erste noch im Pool ist."""
+    eingang, ausgang = tmp_path / 'eingang', tmp_path / 'ausgang'
+    eingang.mkdir()
+    for name in ('a.csv', 'b.csv'):
+        (eingang / name).write_text(OBJEKTLISTE, encoding='utf-8')
+    dienst = immo_eingang.Eingangsdienst(str(eingang), str(ausgang), VORLAGE, worker=1, max_offen=4,
+                                         ruhezeit_s=0, intervall_s=0.05, ausgabe=lambda text: None, dubletten=False)
+    statistik = dienst.laufen(einmal=True)
+    assert (statistik['dateien'], statistik['duplikate']) == (1, 1)
+    assert not (ausgang / 'b.ergebnis.csv').exists()
+
+
+def test_standard_vorlage_ausserhalb_des_projektverzeichnisses(tmp_path, monkeypatch):
+    """config.txt wird neben dem Modul gefunden, nicht im Arbeitsverzeichnis."""
+    monkeypatch.chdir(tmp_path)
+    assert immo_eingang.standard_vorlage()['nebenkosten_prozente']['notar'] == 1.5
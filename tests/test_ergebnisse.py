@@ -0,0 +1,45 @@
+# test_ergebnisse.py
+
+import random
+
+import numpy as np
+import pytest
+
+import immo_core
+import immo_ergebnisse
+import immo_varianten
+from test_varianten import zufallsszenario
+
+SZENARIEN = [zufallsszenario(random.Random(seed)) for seed in range(40)]
+
+
+@pytest.mark.parametrize('rechnung', [immo_core.calculate_analytics, immo_varianten.detailrechnung])
+def test_rundreise(rechnung):
+    """Vermietung und Eigennutzung gemischt: jedes Ergebnis kommt unverändert aus dem Spaltenspeicher zurück."""
+    ergebnisse = [rechnung(inputs) for inputs in SZENARIEN]
+    gruppen = immo_ergebnisse.ErgebnisGruppen(iter(ergebnisse))
+    assert len(gruppen) == len(SZENARIEN) and len(gruppen.gruppen) >= 2
+    for i, erwartet in enumerate(ergebnisse):
+        assert gruppen.ergebnis(i) == erwartet
+        assert gruppen.tabellenwerte(i) == {f"{z['kennzahl'].strip()}|{jahr}": z[val]
+                                            for z in erwartet['display_table'] if z['val1'] is not None
+                                            for jahr, val in (('jahr_1', 'val1'), ('laufende_jahre', 'val2'))}
+
+
+def test_spalten_filtern_und_sortieren():
+    vermietung = [immo_core.calculate_analytics(i) for i in SZENARIEN if i['nutzungsart'] == 'Vermietung']
+    speicher = immo_ergebnisse.ErgebnisSpalten.aus_ergebnissen(iter(vermietung))
+    cashflow = speicher.spalte('= Effektiver Cashflow n. St. p.a.')
+    assert len(speicher) == len(vermietung) and np.shares_memory(cashflow, speicher.daten)
+
+    positiv = speicher.filter(cashflow > 0)
+    assert len(positiv) == int((cashflow > 0).sum())
+    sortiert = speicher.sortiere('= Effektiver Cashflow n. St. p.a.', absteigend=True)
+    assert np.all(np.diff(sortiert.spalte('= Effektiver Cashflow n. St. p.a.')) <= 0)
+    assert speicher[1:3].ergebnis(0) == vermietung[1]
+
+
+def test_fehler_bleiben_erhalten():
+    gruppen = immo_ergebnisse.ErgebnisGruppen([{'error': "kaputt"}, immo_varianten.detailrechnung(SZENARIEN[0])])
+    assert gruppen.ergebnis(0) == {'error': "kaputt"} and gruppen.tabellenwerte(0) == {}
+    assert gruppen.ergebnis(1) == immo_varianten.detailrechnung(SZENARIEN[0])
@@ -0,0 +1,54 @@
+# test_export.py
+
+import numpy as np
+import pytest
+
+import immo_export
+import immo_finanzierung
+
+TRANCHEN = [
+    {'name': "Hauptdarlehen", 'typ': 'annuitaet', 'summe': 250000, 'zins_p': 3.8, 'monatsrate': 1200.0},
+    {'name': "KfW", 'typ': 'kfw', 'summe': 100000, 'zins_p': 2.1, 'laufzeit_jahre': 20, 'tilgungsfrei_jahre': 3},
+    {'name': "Bauspar", 'typ': 'bauspar', 'summe': 40000, 'zins_p': 1.5, 'tilgung_p': 4.0},
+    {'name': "Endfällig", 'typ': 'endfaellig', 'summe': 30000, 'zins_p': 4.2, 'laufzeit_jahre': 10},
+]
+
+
+def test_tilgungsplaene_wie_tranchenplan():
+    """Jede Tranche im Export folgt Monat für Monat dem Plan aus immo_finanzierung."""
+    zeilen = list(immo_export.iter_tilgungsplaene(TRANCHEN))
+    plan = immo_finanzierung.berechne_tranchen(TRANCHEN, monate=600)
+    assert [t['name'] for t in TRANCHEN] == list(dict.fromkeys(z['darlehen'] for z in zeilen))
+    for i, tranche in enumerate(TRANCHEN):
+        eigene = [z for z in zeilen if z['darlehen'] == tranche['name']]
+        n = len(eigene)
+        for feld in ('zinsen', 'tilgung', 'restschuld'):
+            np.testing.assert_allclose([z[feld] for z in eigene], plan[feld][i, :n], atol=0.01, err_msg=feld)
+        assert plan['restschuld'][i, n - 1] < 0.01
+
+    kfw = [z for z in zeilen if z['darlehen'] == "KfW"]
+    assert all(z['tilgung'] == 0 for z in kfw[:36]) and kfw[36]['tilgung'] > 0
+    endfaellig = [z for z in zeilen if z['darlehen'] == "Endfällig"]
+    assert len(endfaellig) == 120 and endfaellig[-1]['tilgung'] == pytest.approx(30000)
+
+
+def test_parquet_festes_schema(tmp_path):
+    """Spätere Batches mit Kommazahlen passen in das Schema, auch wenn der erste Batch leer/ganzzahlig war."""
+    pq = pytest.importorskip('pyarrow.parquet')
+    zeilen = [{'name': "a", 'wert': None, 'anzahl': 1}, {'name': "b", 'wert': None, 'anzahl': 2},
+              {'name': "c", 'wert': 1.5, 'anzahl': 2.5}, {'name': None, 'wert': 2, 'anzahl': None}]
+    ziel = tmp_path / "ohne_typen.parquet"
+    assert immo_export.schreibe_parquet(ziel, iter(zeilen), batch_groesse=2) == 4
+    tabelle = pq.read_table(ziel).to_pydict()
+    assert tabelle == {'name': ["a", "b", "c", None], 'wert': [None, None, 1.5, 2.0], 'anzahl': [1.0, 2.0, 2.5, None]}
+
+    ziel = tmp_path / "tilgungsplan.parquet"
+    immo_export.schreibe_parquet(ziel, immo_export.iter_tilgungsplaene(TRANCHEN), immo_export.TILGUNGSPLAN_SPALTEN,
+                                 batch_groesse=7)
+    schema = pq.read_schema(ziel)
+    assert [str(schema.field(s).type) for s in immo_export.TILGUNGSPLAN_SPALTEN] == \
+        ['string', 'int64', 'int64', 'double', 'double', 'double', 'double']
+
+    ziel = tmp_path / "leer.parquet"
+    assert immo_export.schreibe_parquet(ziel, [], immo_export.ERGEBNIS_SPALTEN) == 0
+    assert pq.read_table(ziel).num_rows == 0
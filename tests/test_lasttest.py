@@ -0,0 +1,19 @@
+# test_lasttest.py
+
+import socket
+
+import immo_lasttest
+
+
+def freier_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_eine_sitzung_mit_pdf():
+    """Eine Sitzung rechnet, erstellt den PDF-Bericht und lädt ihn herunter – ohne Abbruch."""
+    stufe, = immo_lasttest.lasttest([1], port=freier_port(), runden=1, pdf_alle=1, denkzeit_s=0)
+    assert stufe['fehler'] == []
+    anzahl = {a['abschnitt']: a['anzahl'] for a in stufe['abschnitte']}
+    assert anzahl == {'Seite laden': 1, 'Eingabe ändern': 1, 'Analyse berechnen': 1, 'PDF erstellen': 1, 'PDF-Download': 1}
@@ -0,0 +1,21 @@
+# test_mietspiegel.py
+
+import numpy as np
+
+import immo_mietspiegel
+
+
+def test_npz_ohne_pickle(tmp_path):
+    """Der gespeicherte Index enthält nur Zahlen- und Textarrays und lädt ohne allow_pickle."""
+    csv = tmp_path / "mietspiegel.csv"
+    csv.write_text("ort;lat;lon;miete_qm;baujahr;wohnflaeche\n"
+                   "Köln;50,94;6,96;12,5;1965;70\nBonn;50,73;7,10;11,2;1980;55\nKöln;50,93;6,95;13,1;2001;82\n",
+                   encoding='utf-8')
+    original = immo_mietspiegel.Mietspiegel.laden(csv)
+    original.speichern(tmp_path / "index.npz")
+    with np.load(tmp_path / "index.npz", allow_pickle=False) as d:
+        assert d['orte'].dtype.kind == 'U'
+    geladen = immo_mietspiegel.Mietspiegel.laden(tmp_path / "index.npz")
+    assert geladen.orte == original.orte == ["Köln", "Bonn"]
+    assert np.array_equal(geladen.miete_qm, original.miete_qm)
+    assert geladen.ort_koordinaten("Köln") == original.ort_koordinaten("Köln")
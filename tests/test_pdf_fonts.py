@@ -0,0 +1,34 @@
+# test_pdf_fonts.py
+
+import datetime
+
+import pytest
+
+import pdf_fonts
+
+fpdf = pytest.importorskip('fpdf')
+
+
+def dokument(text, wiederverwenden):
+    """Ein Dokument mit normaler und fetter Schrift, entweder über die Vorlage oder über FPDF.add_font."""
+    pdf = fpdf.FPDF()
+    pdf.set_creation_date(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+    if wiederverwenden:
+        familie = pdf_fonts.registriere_fpdf_schriften(pdf)
+    else:
+        familie = pdf_fonts.SCHRIFT_FAMILIE
+        for stil in pdf_fonts.SCHRIFT_DATEIEN:
+            pdf.add_font(familie, stil, pdf_fonts.schrift_pfad(stil))
+    pdf.add_page()
+    pdf.set_font(familie, '', 12)
+    pdf.cell(text=text)
+    pdf.ln()
+    pdf.set_font(familie, 'B', 14)
+    pdf.cell(text=f"Summe: {text}")
+    return bytes(pdf.output())
+
+
+def test_wiederverwendete_schrift_wie_add_font():
+    """Mehrere Dokumente nacheinander: jedes ist byte-gleich mit dem Weg über die öffentliche API."""
+    for text in ("Grüße aus Köln – 1.234,50 €", "ÄÖÜ ß ½ m²", "Grüße aus Köln – 1.234,50 €"):
+        assert dokument(text, True) == dokument(text, False)
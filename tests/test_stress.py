@@ -0,0 +1,24 @@
+# test_stress.py
+
+import numpy as np
+
+import immo_eingang
+import immo_stress
+
+
+def test_katalog_deutsche_zahlen():
+    namen = [sz['name'] for sz in immo_stress.katalog(2.5, 6, 5, 1200.0, 30000.0)]
+    assert namen[1:] == ["Anschlusszins +2,5 %-Pkt.", "6 Monate Leerstand", "Mietstopp 5 Jahre",
+                         "CO2-Preis 1.200 €/t", "Instandhaltung 30.000 €"]
+
+
+def test_nur_vermietung_bei_eigennutzung_nicht_anwendbar():
+    basis = dict(immo_eingang.STANDARD_VORLAGE, kaufpreis=300000.0, eigenkapital=60000.0, wohnflaeche_qm=80.0,
+                 kaltmiete_monatlich=1000.0, nebenkosten_prozente={'grunderwerbsteuer': 3.5})
+    objekte = [basis, dict(basis, nutzungsart='Eigennutzung')]
+    ergebnis = immo_stress.stresstest(objekte, immo_stress.SZENARIEN, jahre=10)
+    nur_vermietung = np.array([bool(sz.get('nur_vermietung')) for sz in immo_stress.SZENARIEN])
+    assert ergebnis['anwendbar'][0].all()
+    assert (ergebnis['anwendbar'][1] == ~nur_vermietung).all()
+    # ohne Miete wirken Leerstand und Mietstopp nicht: dieselben Zahlen wie die Basis
+    assert np.allclose(ergebnis['cashflow'][1, nur_vermietung], ergebnis['cashflow'][1, 0])
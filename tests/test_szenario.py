@@ -0,0 +1,64 @@
+# test_szenario.py
+
+import base64
+import zlib
+
+import pytest
+
+import immo_szenario
+
+SZENARIO = {'nutzungsart': 'Vermietung', 'kaufpreis': 300000, 'zins1': 3.75, 'wohnort': 'Köln',
+            'checkliste': [True, False, True], 'afa_methode': 'degressiv', 'sonder_afa': 1,
+            'modernisierung_afa': 'verteilt', 'modernisierung_jahre': 5,
+            'tranchen': [{'name': 'KfW', 'typ': 'kfw', 'summe': 50000, 'zins_p': 2.1}]}
+
+
+def umverpacken(code, version, kuerzen=0):
+    """Code mit anderem Versionsbyte und ohne die letzten kuerzen Bytes der Nutzdaten."""
+    roh = base64.urlsafe_b64decode(code + '=' * (-len(code) % 4))
+    nutzdaten = zlib.decompress(roh[1:], -15)
+    nutzdaten = nutzdaten[:len(nutzdaten) - kuerzen]
+    k = zlib.compressobj(9, zlib.DEFLATED, -15)
+    neu = bytes([version]) + k.compress(nutzdaten) + k.flush()
+    return base64.urlsafe_b64encode(neu).rstrip(b'=').decode('ascii')
+
+
+def test_hin_und_zurueck():
+    szenario = immo_szenario.dekodiere(immo_szenario.kodiere(SZENARIO))
+    assert (szenario['kaufpreis'], szenario['zins1'], szenario['wohnort']) == (300000, 3.75, 'Köln')
+    assert (szenario['afa_methode'], szenario['modernisierung_jahre']) == ('degressiv', 5)
+    assert szenario['tranchen'][0]['name'] == 'KfW' and szenario['checkliste'][:3] == [True, False, True]
+
+
+def test_version_1_ohne_anhang():
+    code = umverpacken(immo_szenario.kodiere(SZENARIO), 1, kuerzen=immo_szenario._ANHANG_STRUCT.size)
+    szenario = immo_szenario.dekodiere(code)
+    assert szenario['kaufpreis'] == 300000 and szenario['tranchen'][0]['summe'] == 50000
+    assert all(szenario[name] is None for name, _ in immo_szenario.ANHANG_V2)
+
+
+@pytest.mark.parametrize('code', [
+    umverpacken(immo_szenario.kodiere(SZENARIO), 3),
+    umverpacken(immo_szenario.kodiere(SZENARIO), 2, kuerzen=1),
+    umverpacken(immo_szenario.kodiere(SZENARIO), 1),
+    'kaputt!',
+])
+def test_ungueltige_codes(code):
+    with pytest.raises(ValueError):
+        immo_szenario.dekodiere(code)
+
+
+def test_zu_grosse_nutzdaten():
+    """Ein kleiner Code, der auf Megabytes entpackt, wird nach MAX_NUTZDATEN abgebrochen."""
+    k = zlib.compressobj(9, zlib.DEFLATED, -15)
+    roh = bytes([immo_szenario.VERSION]) + k.compress(bytes(10 * immo_szenario.MAX_NUTZDATEN)) + k.flush()
+    code = base64.urlsafe_b64encode(roh).rstrip(b'=').decode('ascii')
+    assert len(code) < 2000
+    with pytest.raises(ValueError, match="beschädigt"):
+        immo_szenario.dekodiere(code)
+
+
+def test_abgeschnittener_datenstrom():
+    code = immo_szenario.kodiere(SZENARIO)
+    with pytest.raises(ValueError):
+        immo_szenario.dekodiere(code[:-4])
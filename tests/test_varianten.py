@@ -0,0 +1,108 @@
+# test_varianten.py
+
+import random
+
+import numpy as np
+import pytest
+
+import immo_varianten
+from immo_stammdaten import ENERGIEKLASSE_VERBRAUCH, HEIZUNG_CO2_FAKTOR
+
+
+def zufallsszenario(rnd):
+    """Eingabe-Dict wie von der Streamlit-Seite, mit zufälligen Werten."""
+    modus = rnd.choice(['tilgungssatz', 'tilgung_euro', 'laufzeit'])
+    neubau = rnd.random() < 0.3
+    inputs = {
+        'kaufpreis': rnd.uniform(50e3, 900e3), 'garage_stellplatz_kosten': rnd.choice([0, 15000]),
+        'invest_bedarf': rnd.uniform(0, 80e3), 'eigenkapital': rnd.uniform(0, 300e3),
+        'gebaeude_anteil_prozent': rnd.uniform(50, 90),
+        'baujahr_kategorie': 'ab 2023' if neubau else rnd.choice(['vor 1925', '1925 - 2022']),
+        'afa_methode': rnd.choice(['linear', 'degressiv']) if neubau else 'linear',
+        'sonder_afa': neubau and rnd.random() < 0.5,
+        'modernisierung_afa': rnd.choice(['gebaeude', 'verteilt']), 'modernisierung_jahre': rnd.randint(1, 5),
+        'nebenkosten_prozente': {'grunderwerbsteuer': 6.5, 'notar': 1.5, 'grundbuch': 0.5,
+                                 'makler': rnd.choice([0, 3.57])},
+        'nutzungsart': rnd.choice(['Vermietung', 'Eigennutzung']),
+        'zins1_prozent': rnd.choice([0, rnd.uniform(0.5, 6)]), 'modus_d1': modus,
+        'tilgung1_prozent': rnd.uniform(0.5, 4) if modus == 'tilgungssatz' else None,
+        'tilgung1_euro_mtl': rnd.uniform(100, 2000) if modus == 'tilgung_euro' else None,
+        'laufzeit1_jahre': rnd.randint(5, 35) if modus == 'laufzeit' else None,
+        'kaltmiete_monatlich': rnd.uniform(300, 3000), 'umlagefaehige_kosten_monatlich': rnd.uniform(0, 400),
+        'nicht_umlagefaehige_kosten_pa': rnd.uniform(0, 3000), 'instand_eigen_pa': rnd.uniform(0, 2000),
+        'co2_eigen_pa': rnd.uniform(0, 500), 'mietausfallwagnis_prozent': rnd.uniform(0, 5),
+        'instandhaltung_euro_qm': rnd.uniform(0, 1.5), 'wohnflaeche_qm': rnd.uniform(20, 200),
+        'heizungstyp': rnd.choice(list(HEIZUNG_CO2_FAKTOR)),
+        'energieeffizienz': rnd.choice(list(ENERGIEKLASSE_VERBRAUCH)),
+        'jahresverbrauch_kwh': rnd.choice([None, rnd.uniform(2000, 30000)]),
+        'steuersatz': rnd.uniform(0, 45), 'verfuegbares_einkommen_mtl': rnd.uniform(0, 6000), 'tranchen': None,
+    }
+    if rnd.random() < 0.3:
+        inputs['tranchen'] = [
+            {'name': "Hauptdarlehen", 'typ': 'annuitaet', 'summe': None, 'zins_p': inputs['zins1_prozent']},
+            {'name': "KfW", 'typ': 'annuitaet', 'summe': 20000.0, 'zins_p': 2.0, 'tilgung_p': 2.0},
+        ]
+    return inputs
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_varianten_zeilen_gleich_einzelrechnung(seed):
+    """Jede Zeile eines Variantenaufrufs entspricht dem Aufruf mit nur dieser Variante."""
+    rnd = random.Random(seed)
+    inputs = zufallsszenario(rnd)
+    aenderungen = {
+        'kaufpreis': np.array([rnd.uniform(50e3, 900e3) for _ in range(4)]),
+        'zins1_prozent': np.array([0.0, 1.0, 3.5, 6.0]),
+        'kaltmiete_monatlich': np.array([rnd.uniform(300, 3000) for _ in range(4)]),
+    }
+    varianten = immo_varianten.berechne_varianten(inputs, aenderungen)
+    for i in range(4):
+        einzeln = immo_varianten.berechne_varianten({**inputs, **{k: float(v[i]) for k, v in aenderungen.items()}})
+        for kennzahl, wert in einzeln.items():
+            assert varianten[kennzahl][i] == pytest.approx(float(wert), rel=1e-9, abs=1e-6), kennzahl
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_detailrechnung_summen(seed):
+    """Die Zeilen der Ergebnistabelle addieren sich zu den Ergebniszeilen."""
+    inputs = zufallsszenario(random.Random(seed))
+    ergebnis = immo_varianten.detailrechnung(inputs)
+    zeilen = {z['kennzahl']: (z['val1'], z['val2']) for z in ergebnis['display_table']}
+    approx = lambda x: pytest.approx(x, rel=1e-9, abs=1e-6)
+    if inputs['nutzungsart'] == 'Vermietung':
+        (kalt, _), (umlag, _) = zeilen['Einnahmen p.a. (Kaltmiete)'], zeilen['Umlagefähige Kosten p.a.']
+        cf_vor = zeilen['= Cashflow vor Steuern p.a.'][0]
+        assert cf_vor == approx(kalt + umlag + zeilen['Jährliche Gesamtkosten'][0])
+        for j in range(2):
+            gewinn = zeilen['= Steuerlicher Gewinn/Verlust p.a.'][j]
+            assert zeilen['+ Steuerersparnis / -last p.a.'][j] == approx(-gewinn * inputs['steuersatz'] / 100)
+            cf_nach = zeilen['= Effektiver Cashflow n. St. p.a.'][j]
+            assert cf_nach == approx(cf_vor + zeilen['+ Steuerersparnis / -last p.a.'][j])
+            assert zeilen['= Neues verfügbares Einkommen'][j] == approx(inputs['verfuegbares_einkommen_mtl'] + cf_nach / 12)
+        assert set(ergebnis['steuer']) == {'einnahmen_pa', 'werbungskosten_pa', 'einmalig_j1'}
+    else:
+        kosten = -zeilen['Jährliche Gesamtkosten (inkl. Tilgung)'][0]
+        assert kosten == approx(-sum(zeilen[k][0] for k in (
+            'Hausgeld / Betriebskosten p.a.', '- Private Instandhaltungsrücklage p.a.',
+            '- CO2-Kosten (Eigennutzer) p.a.', 'Rückzahlung Darlehen p.a.')))
+        assert zeilen['= Neues verfügbares Einkommen'][0] == approx(inputs['verfuegbares_einkommen_mtl'] - kosten / 12)
+        assert 'steuer' not in ergebnis
+
+
+def test_detailrechnung_beispiel():
+    """Nachgerechnetes Beispiel: 200.000 € Kaufpreis, 4 % Zins, 2 % Tilgung, 800 € Kaltmiete."""
+    inputs = {
+        'nutzungsart': 'Vermietung', 'kaufpreis': 200000, 'eigenkapital': 20000,
+        'nebenkosten_prozente': {'grunderwerbsteuer': 5.0, 'notar': 0, 'grundbuch': 0, 'makler': 0},
+        'gebaeude_anteil_prozent': 75, 'baujahr_kategorie': '1925 - 2022',
+        'zins1_prozent': 4.0, 'modus_d1': 'tilgungssatz', 'tilgung1_prozent': 2.0,
+        'kaltmiete_monatlich': 800, 'steuersatz': 30, 'heizungstyp': 'Wärmepumpe',
+    }
+    ergebnis = immo_varianten.detailrechnung(inputs)
+    zeilen = {z['kennzahl']: (z['val1'], z['val2']) for z in ergebnis['display_table']}
+    darlehen = 210000 - 20000
+    assert zeilen['Rückzahlung Darlehen p.a.'][0] == pytest.approx(-darlehen * 0.06)
+    assert zeilen['- AfA p.a.'] == pytest.approx((-150000 * 0.02, -150000 * 0.02))
+    gewinn_lfd = 9600 - darlehen * 0.04 - 3000
+    assert zeilen['= Steuerlicher Gewinn/Verlust p.a.'] == pytest.approx((gewinn_lfd - 10000, gewinn_lfd))
+    assert ergebnis['finanzkennzahlen']['Bruttomietrendite'] == pytest.approx(9600 / 210000 * 100)
@@ -0,0 +1,33 @@
+# test_wohnort.py
+
+import immo_wohnort
+
+
+def test_mitgelieferter_index_entspricht_der_liste(tmp_path):
+    """wohnorte.idx ist genau das, was immo_wohnort.py aus wohnorte.csv baut."""
+    ziel = tmp_path / 'wohnorte.idx'
+    immo_wohnort.baue_index(immo_wohnort.lese_verzeichnis(), str(ziel))
+    with open(immo_wohnort.INDEX_DATEI, 'rb') as f:
+        assert ziel.read_bytes() == f.read()
+
+
+def test_schreibweise_und_unbekannte_orte():
+    assert immo_wohnort.kanonischer_wohnort('nuernberg  suedstadt') == 'Nürnberg-Südstadt'
+    assert immo_wohnort.kanonischer_wohnort(' Gunzenhausen ') == 'Gunzenhausen'
+
+
+def test_stadtteil_ohne_stadtnamen_wird_nicht_zugeordnet():
+    """'Altstadt' kann in jeder Stadt liegen: nur vorgeschlagen, nicht umgeschrieben."""
+    for stadtteil in ('Altstadt', 'südstadt', 'Wöhrd', 'Gostenhof'):
+        assert immo_wohnort.kanonischer_wohnort(stadtteil) == stadtteil
+        assert immo_wohnort.wohnort_index_treffer(stadtteil) is None
+    assert [v['name'] for v in immo_wohnort.vorschlaege('Altstadt')] == ['Nürnberg-Altstadt']
+
+
+def test_mehrdeutiger_name(tmp_path):
+    ziel = tmp_path / 'orte.idx'
+    immo_wohnort.baue_index([('Halle (Saale)', 'Stadt', 'Sachsen-Anhalt'), ('Halle-Saale', 'Gemeinde', 'Hessen'),
+                             ('Fürth', 'Stadt', 'Bayern'), ('Fürth', 'Landkreis', 'Bayern')], str(ziel))
+    index = immo_wohnort.WohnortIndex(str(ziel))
+    assert index.suche('halle saale') is None
+    assert index.suche('Fuerth')['name'] == 'Fürth'
@@ -0,0 +1,25 @@
+# test_zinshistorie.py
+
+import numpy as np
+import pytest
+
+import immo_zinshistorie
+
+
+def schreibe(pfad, monate):
+    pfad.write_text("monat;zins\n" + "".join(f"{m};3,5\n" for m in monate), encoding='utf-8')
+    return pfad
+
+
+def test_monate_sortiert_und_lueckenlos(tmp_path):
+    reihe = immo_zinshistorie.Zinsreihe.aus_csv(schreibe(tmp_path / "z.csv", ["2020-02", "01.2020", "2020-03"]))
+    assert reihe.monate.tolist() == list(np.arange('2020-01', '2020-04', dtype='datetime64[M]'))
+
+
+@pytest.mark.parametrize('monate, meldung', [
+    (["2020-01", "2020-02", "02.2020"], "doppelt"),
+    (["2020-01", "2020-02", "2020-05"], "Lücke"),
+])
+def test_ungueltige_monate(tmp_path, monate, meldung):
+    with pytest.raises(ValueError, match=meldung):
+        immo_zinshistorie.Zinsreihe.aus_csv(schreibe(tmp_path / "z.csv", monate))